@@ -88,6 +88,8 @@ except ImportError as e:
 
 try:
     from src.database.connection import DatabaseConnection
+    from src.services.import_phase_timer import ImportPhaseTimer
+    from src.services.language_block_summary import refresh_queued_block_summary
 
     print("✅ Successfully imported DatabaseConnection")
 except ImportError as e:
@@ -221,6 +223,7 @@ class ImportResult:
     sheet_breakdown: Dict[str, int] = field(
         default_factory=dict
     )  # NEW: Sheet source tracking
+    import_batch_id: Optional[str] = None  # import_batches.batch_id of the run
 
     @property
     def net_change(self) -> int:
@@ -259,6 +262,7 @@ class DailyUpdateResult:
     language_assignment: Optional[LanguageAssignmentResult] = None
     duration_seconds: float = 0.0
     error_messages: List[str] = field(default_factory=list)
+    phase_timer: Optional[ImportPhaseTimer] = None
 
     @property
     def summary_line(self) -> str:
@@ -819,10 +823,12 @@ class ImportService:
         self.spot_repository = spot_repository
         self.progress_reporter = progress_reporter
 
-    def ensure_bill_codes_in_raw_inputs(self, excel_file: Path) -> None:
+    def ensure_bill_codes_in_raw_inputs(self, excel_file: Path) -> int:
         """
         Ensure all bill_code values from Excel are added to raw_customer_inputs
         This prevents normalization gaps from occurring.
+
+        Returns the number of distinct bill codes checked (0 on failure).
         """
         try:
             import pandas as pd
@@ -852,7 +858,7 @@ class ImportService:
 
             if not dataframes:
                 self.progress_reporter.write("Warning: Could not read any sheet from Excel file")
-                return
+                return 0
 
             df = pd.concat(dataframes, ignore_index=True)
             sheet_used = ", ".join(sheets_read)
@@ -873,7 +879,7 @@ class ImportService:
                 self.progress_reporter.write("⚠️ Warning: No bill code column found in Excel file")
                 available_columns = list(df.columns)[:10]  # Show first 10 columns
                 self.progress_reporter.write(f"Available columns: {available_columns}")
-                return
+                return 0
             
             # Clean and filter bill codes
             clean_bill_codes = []
@@ -910,30 +916,39 @@ class ImportService:
                     self.progress_reporter.write(f"   (All bill codes were already in system)")
             else:
                 self.progress_reporter.write("⚠️ Warning: No valid bill codes found after cleaning")
+
+            return len(clean_bill_codes)
         
         except Exception as e:
             self.progress_reporter.write(f"⚠️ Warning: Could not update raw_customer_inputs: {e}")
             # Don't fail the entire import if this step fails
+            return 0
 
     def execute_import_with_progress(
-        self, excel_file: Path, batch_id: str
+        self,
+        excel_file: Path,
+        batch_id: str,
+        phase_timer: Optional[ImportPhaseTimer] = None,
     ) -> ImportResult:
         """Execute import with enhanced multi-sheet progress tracking + normalization repair"""
         start_time = datetime.now()
+        timer = phase_timer or ImportPhaseTimer()
 
         # CRITICAL FIX: Ensure bill codes are in raw_customer_inputs BEFORE import
         self.progress_reporter.write("🔧 Step 1: Updating normalization system with new bill codes...")
-        self.ensure_bill_codes_in_raw_inputs(excel_file)
+        with timer.phase("bill_code_registration") as phase:
+            phase.rows = self.ensure_bill_codes_in_raw_inputs(excel_file)
 
         # Get summary first for progress setup
         self.progress_reporter.write("🔍 Step 2: Analyzing Excel file for import...")
-        try:
-            summary = get_excel_import_summary(
-                str(excel_file), self.broadcast_service.db_connection.db_path
-            )
-        except Exception as e:
-            self.progress_reporter.write(f"⚠️ Warning: Could not get import summary: {e}")
-            summary = {"months_in_excel": [], "total_existing_spots_affected": 0}
+        with timer.phase("excel_summary"):
+            try:
+                summary = get_excel_import_summary(
+                    str(excel_file), self.broadcast_service.db_connection.db_path
+                )
+            except Exception as e:
+                self.progress_reporter.write(f"⚠️ Warning: Could not get import summary: {e}")
+                summary = {"months_in_excel": [], "total_existing_spots_affected": 0}
 
         # Create a progress bar for the overall import
         self.progress_reporter.write("📦 Step 3: Executing data import...")
@@ -953,6 +968,9 @@ class ImportService:
                     "WEEKLY_UPDATE",  # Use WEEKLY_UPDATE mode for daily operations
                     closed_by=None,
                     dry_run=False,
+                    phase_timer=timer,
+                    # Refreshed once language processing has also committed
+                    refresh_read_replica=False,
                 )
             except Exception as e:
                 self.progress_reporter.write(f"❌ Import failed: {e}")
@@ -992,6 +1010,7 @@ class ImportService:
             duration_seconds=(datetime.now() - start_time).total_seconds(),
             months_processed=summary.get("months_in_excel", []),
             sheet_breakdown=sheet_breakdown,
+            import_batch_id=import_result.batch_id,
         )
 
         if result.success:
@@ -1616,16 +1635,20 @@ class DailyUpdateOrchestrator:
         self._display_update_header(config, batch_id)
 
         result = DailyUpdateResult(success=False, batch_id=batch_id)
+        # Started before any service opens a connection so SQL counts are complete
+        timer = ImportPhaseTimer().start()
+        result.phase_timer = timer
 
         try:
             # Step 1: Market setup (if enabled)
             if config.auto_setup_markets and not config.dry_run:
                 self.progress_reporter.write(f"STEP 1: Automatic Market Setup")
-                result.market_setup = (
-                    self.market_setup_service.execute_daily_market_setup(
-                        config.excel_file
+                with timer.phase("market_scan"):
+                    result.market_setup = (
+                        self.market_setup_service.execute_daily_market_setup(
+                            config.excel_file
+                        )
                     )
-                )
                 self.progress_reporter.write(f"Setup: {result.market_setup.summary}")
                 self.progress_reporter.write("")
 
@@ -1643,7 +1666,7 @@ class DailyUpdateOrchestrator:
                     )
             else:
                 result.import_result = self.import_service.execute_import_with_progress(
-                    config.excel_file, batch_id
+                    config.excel_file, batch_id, phase_timer=timer
                 )
 
             # Step 3: Language Assignment Processing (if import succeeded)
@@ -1653,9 +1676,11 @@ class DailyUpdateOrchestrator:
                 and not config.dry_run
             ):
                 self.progress_reporter.write(f"STEP 3: Language Assignment Processing")
-                result.language_assignment = (
-                    self.language_service.process_languages_directly(batch_id)
-                )
+                with timer.phase("language_processing") as phase:
+                    result.language_assignment = (
+                        self.language_service.process_languages_directly(batch_id)
+                    )
+                    phase.rows = result.language_assignment.processed
 
             # Only mark success if import actually succeeded
             if result.import_result and not result.import_result.success:
@@ -1667,15 +1692,56 @@ class DailyUpdateOrchestrator:
             else:
                 result.success = True
 
+            if result.success and not config.dry_run:
+                self._refresh_read_replica(timer)
+
         except Exception as e:
             error_msg = f"Enhanced multi-sheet daily update failed: {str(e)}"
             result.error_messages.append(error_msg)
             self.progress_reporter.write(f"ERROR: {error_msg}")
 
+        timer.stop()
+        if not config.dry_run:
+            self._record_phase_timings(result, timer)
+
         # Calculate total duration
         result.duration_seconds = (datetime.now() - start_time).total_seconds()
         return result
 
+    def _refresh_read_replica(self, timer: ImportPhaseTimer) -> None:
+        """Rebuild the read replica snapshot (READ_REPLICA_PATH) if configured"""
+        db = self.import_service.broadcast_service.db_connection
+        if not db.read_replica_path:
+            return
+        with timer.phase("replica_refresh"):
+            # Includes the months language assignment queued above
+            refresh_queued_block_summary(db)
+            if db.refresh_read_replica():
+                self.progress_reporter.write(
+                    f"Read replica refreshed: {db.read_replica_path}"
+                )
+            else:
+                self.progress_reporter.write(
+                    "WARNING: Read replica refresh failed (import data is safe)"
+                )
+
+    def _record_phase_timings(
+        self, result: DailyUpdateResult, timer: ImportPhaseTimer
+    ) -> None:
+        """Persist phase timings under the import batch and print the table"""
+        import_batch_id = (
+            result.import_result.import_batch_id if result.import_result else None
+        )
+        timer.persist(
+            self.import_service.broadcast_service.db_connection,
+            import_batch_id or result.batch_id,
+        )
+
+        self.progress_reporter.write("")
+        self.progress_reporter.write("Phase timings:")
+        for line in timer.summary_lines():
+            self.progress_reporter.write(f"   {line}")
+
     def _display_update_header(self, config: DailyUpdateConfig, batch_id: str) -> None:
         """Display enhanced header for multi-sheet processing"""
         self.progress_reporter.write(f"Enhanced Multi-Sheet Daily Update Starting")
@@ -1895,7 +1961,9 @@ Enhanced Multi-Sheet Features:
 
     # Create database connection
     try:
-        db_connection = DatabaseConnection(args.db_path)
+        db_connection = DatabaseConnection(
+            args.db_path, read_replica_path=os.environ.get("READ_REPLICA_PATH")
+        )
 
         # Create and execute enhanced CLI
         cli = DailyUpdateCLI(db_connection)
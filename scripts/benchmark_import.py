@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Import pipeline benchmark.
+
+Runs the full daily-update pipeline (market scan, bill-code registration,
+Excel read, fingerprinting, delete, insert, customer alignment, language
+processing, cache refresh) against a synthetic Commercial Log workbook and
+prints the per-phase timings recorded in import_batch_phases.
+
+Each workbook size is imported twice into a fresh copy of the base DB:
+
+    initial   first load of the open months (mostly inserts)
+    daily     same workbook with --change-fraction of contract groups
+              edited, i.e. a typical day's diff
+
+Usage:
+    # build a base DB once, then benchmark two workbook sizes
+    python scripts/generate_synthetic_db.py --output /tmp/bench.db --scale small
+    python scripts/benchmark_import.py --db /tmp/bench.db --rows 10000 40000
+
+    # keep raw numbers for trend comparison
+    python scripts/benchmark_import.py --db /tmp/bench.db --json /tmp/import.json
+
+The base DB is never modified; every run works on a copy in --workdir.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_synthetic_db import (  # noqa: E402
+    DAY_PARTS,
+    LANGUAGES,
+    MARKETS,
+    REVENUE_TYPES,
+    SCALES,
+    SPOT_TYPES,
+    _weighted,
+    generate_synthetic_db,
+)
+
+logger = logging.getLogger(__name__)
+
+# Header row of the Commercial Log, in EXCEL_COLUMN_POSITIONS order.
+WORKBOOK_HEADERS = [
+    "bill_code", "air_date", "end_date", "day_of_week", "time_in", "time_out",
+    "length_seconds", "media", "comments", "language_code", "format",
+    "sequence_number", "line_number", "spot_type", "estimate", "gross_rate",
+    "make_good", "spot_value", "broadcast_month", "broker_fees", "priority",
+    "station_net", "sales_person", "revenue_type", "billing_type",
+    "agency_flag", "affidavit_flag", "contract", "market_name", "sheet_source",
+]
+WORLDLINK_FRACTION = 0.08
+
+
+@dataclass
+class ImportRun:
+    rows: int
+    run: str
+    success: bool
+    total_seconds: float
+    records_imported: int
+    records_deleted: int
+    phases: List[dict] = field(default_factory=list)
+
+
+# ============================================================================
+# Synthetic workbook
+# ============================================================================
+
+
+def _open_months(count: int) -> List[date]:
+    """First day of the current month and the following count-1 months."""
+    first = date.today().replace(day=1)
+    months = []
+    for _ in range(count):
+        months.append(first)
+        first = (first + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def build_workbook_rows(
+    db_path: str, rows: int, months: int, seed: int
+) -> List[list]:
+    """Spot rows for the open months, using bill codes that exist in the DB."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        bill_codes = conn.execute("""
+            SELECT bill_code, MAX(sales_person), COUNT(*) AS n
+            FROM spots
+            WHERE bill_code IS NOT NULL
+            GROUP BY bill_code
+            ORDER BY n DESC
+        """).fetchall()
+    finally:
+        conn.close()
+    if not bill_codes:
+        raise SystemExit(f"{db_path} has no spots; generate it first")
+
+    weights = [row[2] for row in bill_codes]
+    market_codes = [c for c, _ in MARKETS if c != "ADMIN"]
+    lang_codes = [c for c, _, _ in LANGUAGES]
+    month_starts = _open_months(months)
+
+    out = []
+    for n in range(rows):
+        bill_code, ae, _ = rng.choices(bill_codes, weights=weights, k=1)[0]
+        month = rng.choice(month_starts)
+        air = datetime(month.year, month.month, rng.randint(1, 28))
+        start, end, _ = rng.choice(DAY_PARTS)
+        gross = round(rng.lognormvariate(4.5, 0.9), 2)
+        is_agency = ":" in bill_code
+        broker = round(gross * 0.15, 2) if is_agency else 0.0
+        sheet = "Worldlink Lines" if rng.random() < WORLDLINK_FRACTION else "Commercials"
+        out.append([
+            bill_code, air, air, air.strftime("%A"), start, end,
+            rng.choice(["00:00:15", "00:00:30", "00:01:00"]), "TV", None,
+            rng.choice(lang_codes), "Spot", n + 1, rng.randint(1, 40),
+            _weighted(rng, SPOT_TYPES), None, gross, None, gross, air, broker,
+            rng.randint(1, 4), round(gross - broker, 2), ae,
+            _weighted(rng, REVENUE_TYPES), "Calendar",
+            "Agency" if is_agency else "Direct", None,
+            f"B{zlib.crc32(f'{bill_code}|{month}'.encode()) % 10_000_000:07d}",
+            rng.choice(market_codes), sheet,
+        ])
+    return out
+
+
+def edit_groups(rows: List[list], fraction: float, seed: int) -> List[list]:
+    """Copy of rows with spot_value changed in fraction of contract groups."""
+    rng = random.Random(seed + 1)
+    groups = sorted({(r[0], r[27], r[18].strftime("%b-%y")) for r in rows})
+    changed = set(rng.sample(groups, int(len(groups) * fraction)))
+    edited = []
+    for row in rows:
+        row = list(row)
+        if (row[0], row[27], row[18].strftime("%b-%y")) in changed:
+            row[17] = round(row[17] * 1.1 + 1, 2)
+            row[15] = row[17]
+        edited.append(row)
+    return edited
+
+
+def write_workbook(path: Path, rows: List[list]) -> None:
+    """Write rows as a Commercial Log with Commercials and Worldlink sheets.
+
+    Not write_only: those workbooks have no <dimension> record, so
+    read-only readers (the import's excel_summary phase) see max_row None,
+    unlike the Commercial Logs Excel saves.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    sheets = {
+        name: workbook.create_sheet(name)
+        for name in ("Commercials", "Worldlink Lines")
+    }
+    for sheet in sheets.values():
+        sheet.append(WORKBOOK_HEADERS)
+    for row in rows:
+        sheets[row[-1]].append(row)
+    workbook.save(path)
+
+
+# ============================================================================
+# Pipeline run
+# ============================================================================
+
+
+def run_daily_update(db_path: str, excel_file: Path) -> Tuple[object, str]:
+    """Run DailyUpdateOrchestrator quietly; return (result, captured output)."""
+    captured = io.StringIO()
+    with contextlib.redirect_stdout(captured), contextlib.redirect_stderr(captured):
+        from cli.daily_update import (
+            DailyUpdateConfig,
+            DailyUpdateOrchestrator,
+            ImportService,
+            LanguageAssignmentService,
+            LoggingProgressReporter,
+            MarketRepository,
+            MarketSetupService,
+            SpotRepository,
+        )
+        from src.database.connection import DatabaseConnection
+        from src.services.broadcast_month_import_service import (
+            BroadcastMonthImportService,
+        )
+
+        quiet = logging.getLogger("import_benchmark.pipeline")
+        quiet.setLevel(logging.ERROR)
+        progress = LoggingProgressReporter(quiet)
+
+        db = DatabaseConnection(db_path)
+        try:
+            orchestrator = DailyUpdateOrchestrator(
+                MarketSetupService(MarketRepository(db), progress),
+                ImportService(
+                    BroadcastMonthImportService(db), SpotRepository(db), progress
+                ),
+                LanguageAssignmentService(db, progress),
+                progress,
+            )
+            config = DailyUpdateConfig(
+                excel_file=excel_file, force=True, db_path=Path(db_path)
+            )
+            result = orchestrator.execute_daily_update(config)
+        finally:
+            db.close()
+    return result, captured.getvalue()
+
+
+def benchmark_size(
+    base_db: str, rows: int, months: int, change_fraction: float,
+    seed: int, workdir: Path,
+) -> List[ImportRun]:
+    work_db = workdir / f"import_bench_{rows}.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"{work_db}{suffix}"):
+            os.remove(f"{work_db}{suffix}")
+    shutil.copyfile(base_db, work_db)
+
+    initial_rows = build_workbook_rows(base_db, rows, months, seed)
+    workbooks = [
+        ("initial", initial_rows),
+        ("daily", edit_groups(initial_rows, change_fraction, seed)),
+    ]
+
+    runs = []
+    for label, sheet_rows in workbooks:
+        excel_file = workdir / f"commercial_log_{rows}_{label}.xlsx"
+        write_workbook(excel_file, sheet_rows)
+
+        started = time.perf_counter()
+        result, output = run_daily_update(str(work_db), excel_file)
+        elapsed = time.perf_counter() - started
+
+        timer = result.phase_timer
+        run = ImportRun(
+            rows=rows,
+            run=label,
+            success=result.success,
+            total_seconds=round(elapsed, 2),
+            records_imported=(
+                result.import_result.records_imported if result.import_result else 0
+            ),
+            records_deleted=(
+                result.import_result.records_deleted if result.import_result else 0
+            ),
+            phases=[
+                {**asdict(p), "rows_per_second": p.rows_per_second}
+                for p in sorted(timer.phases, key=lambda p: p.started_at)
+            ] if timer else [],
+        )
+        runs.append(run)
+
+        logger.info(
+            f"\n{rows:,} rows / {label}: {run.total_seconds:.1f}s, "
+            f"{run.records_imported:,} imported, {run.records_deleted:,} deleted"
+            f"{'' if run.success else '  FAILED'}"
+        )
+        if timer:
+            for line in timer.summary_lines():
+                logger.info(f"  {line}")
+        if not result.success:
+            logger.error("  " + "; ".join(result.error_messages))
+            logger.error("\n".join(output.splitlines()[-20:]))
+    return runs
+
+
+def print_scaling(runs: List[ImportRun]) -> None:
+    logger.info(f"\n{'rows':>8} {'run':<8} {'seconds':>8} {'insert rows/s':>14} {'sql':>9}")
+    for run in runs:
+        insert = next((p for p in run.phases if p["phase"] == "insert"), None)
+        rate = insert["rows_per_second"] if insert else None
+        sql = sum(p["sql_count"] for p in run.phases)
+        logger.info(
+            f"{run.rows:>8,} {run.run:<8} {run.total_seconds:>8.1f} "
+            f"{(f'{rate:,.0f}' if rate else '-'):>14} {sql:>9,}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the daily import pipeline on synthetic workbooks"
+    )
+    parser.add_argument("--db", required=True, help="Base synthetic database")
+    parser.add_argument(
+        "--generate", choices=sorted(SCALES),
+        help="Create --db at this scale first if it does not exist",
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000],
+        help="Workbook sizes to benchmark (default 10000)",
+    )
+    parser.add_argument(
+        "--months", type=int, default=3,
+        help="Open broadcast months in the workbook (default 3)",
+    )
+    parser.add_argument(
+        "--change-fraction", type=float, default=0.05,
+        help="Share of contract groups edited for the daily run (default 0.05)",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--workdir", type=Path,
+        help="Where DB copies and workbooks go (default: a temp dir)",
+    )
+    parser.add_argument("--json", type=Path, help="Also write raw results here")
+    args = parser.parse_args()
+
+    # Pipeline modules log at INFO; only this script's report should show.
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    if args.generate and not os.path.exists(args.db):
+        logger.info(f"Generating {args.generate} synthetic DB at {args.db}")
+        generate_synthetic_db(args.db, SCALES[args.generate])
+    if not os.path.exists(args.db):
+        logger.error(f"Database not found: {args.db}")
+        return 2
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="import_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    runs: List[ImportRun] = []
+    for rows in args.rows:
+        runs.extend(
+            benchmark_size(
+                args.db, rows, args.months, args.change_fraction,
+                args.seed, workdir,
+            )
+        )
+
+    print_scaling(runs)
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in runs], indent=2))
+        logger.info(f"\nResults written to {args.json}")
+
+    return 0 if all(r.success for r in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Route benchmark harness.
+
+Replays every argument-free GET route (plus routes whose URL arguments can
+be filled from the database) and the sheet/planning exports against a
+synthetic database, recording per route:
+
+    p50_ms / p95_ms   wall-clock latency across --iterations requests
+    sql_count         statements per request (median)
+    rss_growth_mb     how far process RSS rose above its level when the
+                      route's timed requests started (peak - start)
+
+Results are compared with a stored baseline so regressions show up before
+deploy. Exit status is 1 when any route regresses beyond --tolerance.
+
+Usage:
+    # one-off: build a synthetic DB and record a baseline
+    python scripts/generate_synthetic_db.py --output /tmp/bench.db --scale medium
+    python scripts/benchmark_routes.py --db /tmp/bench.db --save-baseline
+
+    # later: compare against the baseline
+    python scripts/benchmark_routes.py --db /tmp/bench.db
+
+    # only the language-block API, 10 iterations
+    python scripts/benchmark_routes.py --db /tmp/bench.db \\
+        --match '^/api/language-blocks' --iterations 10
+
+Never point --db at the live database: the harness refuses the configured
+production path (DB_PATH, DATABASE_PATH, PROD_DB_PATH and the repo default
+data/database/production.db), and --generate refuses to overwrite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = PROJECT_ROOT / "data" / "benchmarks" / "route_baseline.json"
+BENCH_TOKEN = "route-benchmark-token"
+
+# Routes that mutate state, end the session, or stream unbounded output.
+EXCLUDED_PATTERNS = [
+    r"^/static/",
+    r"^/users/logout",
+    r"/delete",
+    r"/reset",
+    r"/run$",
+]
+
+# Exports served with the shared token rather than a session.
+TOKEN_ROUTES = [
+    "/api/revenue/sheet-export",
+    "/api/revenue/planning-export?year={year}",
+]
+
+
+@dataclass
+class RouteResult:
+    """Measurements for one route."""
+
+    path: str
+    status: int
+    p50_ms: float
+    p95_ms: float
+    sql_count: int
+    rss_growth_mb: float
+
+
+@dataclass
+class Regression:
+    """One metric of one route that got worse than the baseline."""
+
+    path: str
+    metric: str
+    baseline: float
+    current: float
+
+
+def production_db_paths() -> List[Path]:
+    """Paths the app would open as its live database."""
+    paths = [PROJECT_ROOT / "data" / "database" / "production.db"]
+    for var in ("DB_PATH", "DATABASE_PATH", "PROD_DB_PATH"):
+        value = os.getenv(var)
+        if value:
+            paths.append(Path(value).expanduser())
+    return [p.resolve() for p in paths]
+
+
+def is_production_db(db_path: str) -> bool:
+    return Path(db_path).expanduser().resolve() in production_db_paths()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; stable for the small samples we take."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class RssSampler:
+    """Polls process RSS on a background thread and keeps the peak.
+
+    The harness runs every route in one process, so the absolute peak
+    mostly reflects earlier routes; growth_bytes is what this block added.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        import psutil
+
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_bytes = 0
+        self.peak_bytes = 0
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_bytes = max(
+                self.peak_bytes, self._process.memory_info().rss
+            )
+            self._stop.wait(self._interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.start_bytes = self._process.memory_info().rss
+        self.peak_bytes = self.start_bytes
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self._process.memory_info().rss)
+
+    @property
+    def growth_bytes(self) -> int:
+        return self.peak_bytes - self.start_bytes
+
+
+# ============================================================================
+# Route discovery
+# ============================================================================
+
+
+def _sample_arguments(db_path: str) -> Dict[str, str]:
+    """Concrete values for common URL arguments, read from the bench DB."""
+    conn = sqlite3.connect(db_path)
+    try:
+        def first(sql: str) -> Optional[str]:
+            row = conn.execute(sql).fetchone()
+            return str(row[0]) if row and row[0] is not None else None
+
+        customer_id = first(
+            "SELECT entity_id FROM entity_metrics "
+            "WHERE entity_type = 'customer' ORDER BY spot_count DESC LIMIT 1"
+        )
+        agency_id = first(
+            "SELECT entity_id FROM entity_metrics "
+            "WHERE entity_type = 'agency' ORDER BY spot_count DESC LIMIT 1"
+        )
+        ae_name = first(
+            "SELECT entity_name FROM revenue_entities "
+            "WHERE entity_type = 'AE' ORDER BY entity_id LIMIT 1"
+        )
+        values = {
+            "customer_id": customer_id,
+            "agency_id": agency_id,
+            "entity_id": customer_id,
+            "entity_type": "customer",
+            "year": str(date.today().year),
+            "ae_name": ae_name,
+            "ae_id": first("SELECT user_id FROM users WHERE role = 'AE' LIMIT 1"),
+            "market_code": first("SELECT market_code FROM markets LIMIT 1"),
+            "language_code": first("SELECT language_code FROM languages LIMIT 1"),
+            "block_id": first("SELECT block_id FROM language_blocks LIMIT 1"),
+            "sector_id": first("SELECT sector_id FROM sectors LIMIT 1"),
+            "contact_id": first("SELECT contact_id FROM entity_contacts LIMIT 1"),
+        }
+        return {k: v for k, v in values.items() if v is not None}
+    finally:
+        conn.close()
+
+
+def discover_routes(app, db_path: str) -> Tuple[List[str], List[str]]:
+    """Return (paths to benchmark, rules skipped for unknown arguments)."""
+    samples = _sample_arguments(db_path)
+    excluded = [re.compile(p) for p in EXCLUDED_PATTERNS]
+    paths: List[str] = []
+    skipped: List[str] = []
+
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if "GET" not in (rule.methods or set()):
+            continue
+        if any(p.search(rule.rule) for p in excluded):
+            continue
+        if rule.rule in {t.split("?")[0] for t in TOKEN_ROUTES}:
+            continue
+        missing = [a for a in rule.arguments if a not in samples]
+        if missing:
+            skipped.append(rule.rule)
+            continue
+        path = rule.rule
+        for arg in rule.arguments:
+            path = re.sub(rf"<(?:[^:<>]+:)?{arg}>", samples[arg], path)
+        paths.append(path)
+
+    return sorted(set(paths)), skipped
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+
+def _login(client, db_path: str) -> None:
+    from scripts.generate_synthetic_db import BENCH_ADMIN_EMAIL
+
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT user_id FROM users WHERE email = ?", (BENCH_ADMIN_EMAIL,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        raise SystemExit(
+            f"{db_path} has no {BENCH_ADMIN_EMAIL} user; "
+            "generate it with scripts/generate_synthetic_db.py"
+        )
+    with client.session_transaction() as session:
+        session["_user_id"] = str(row[0])
+        session["_fresh"] = True
+
+
+def measure_route(client, path: str, iterations: int, headers=None) -> RouteResult:
+    from src.database.connection import StatementCounter
+
+    # Routes print debug output; keep it out of the results table.
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        response = client.get(path, headers=headers)  # warm caches and imports
+    status = response.status_code
+
+    timings: List[float] = []
+    sql_counts: List[int] = []
+    with RssSampler() as sampler, contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            with StatementCounter() as counter:
+                started = time.perf_counter()
+                response = client.get(path, headers=headers)
+                response.get_data()
+                timings.append((time.perf_counter() - started) * 1000)
+            sql_counts.append(counter.count)
+            status = response.status_code
+
+    return RouteResult(
+        path=path,
+        status=status,
+        p50_ms=round(percentile(timings, 50), 2),
+        p95_ms=round(percentile(timings, 95), 2),
+        sql_count=int(statistics.median(sql_counts)),
+        rss_growth_mb=round(sampler.growth_bytes / (1024 * 1024), 1),
+    )
+
+
+def run_benchmark(
+    db_path: str, iterations: int, match: Optional[str] = None
+) -> Tuple[List[RouteResult], List[str]]:
+    os.environ["DB_PATH"] = db_path
+    os.environ["SHEET_EXPORT_TOKEN"] = BENCH_TOKEN
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    from src.web.app import create_app
+
+    app = create_app()
+    app.config["TESTING"] = True
+    client = app.test_client()
+    _login(client, db_path)
+
+    paths, skipped = discover_routes(app, db_path)
+    year = str(date.today().year)
+    token_paths = [p.format(year=year) for p in TOKEN_ROUTES]
+    pattern = re.compile(match) if match else None
+
+    results: List[RouteResult] = []
+    for path in paths + token_paths:
+        if pattern and not pattern.search(path):
+            continue
+        headers = (
+            {"X-SpotOps-Token": BENCH_TOKEN} if path in token_paths else None
+        )
+        try:
+            result = measure_route(client, path, iterations, headers=headers)
+        except Exception as e:
+            logger.warning(f"{path}: request raised {e}")
+            continue
+        results.append(result)
+        logger.info(
+            f"{result.status} {result.p50_ms:>9.1f} {result.p95_ms:>9.1f} "
+            f"{result.sql_count:>6} {result.rss_growth_mb:>8.1f}  {path}"
+        )
+    return results, skipped
+
+
+# ============================================================================
+# Baseline comparison
+# ============================================================================
+
+
+def compare_with_baseline(
+    results: List[RouteResult],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    min_delta_ms: float,
+    min_delta_mb: float = 5.0,
+) -> List[Regression]:
+    """Routes whose latency, SQL count or RSS growth got worse than the
+    baseline.
+
+    Latency and RSS growth must exceed the baseline by both the relative
+    tolerance and an absolute floor, so jitter on fast, small routes is
+    ignored.
+    SQL counts are deterministic and compared exactly.
+    """
+    regressions: List[Regression] = []
+    for result in results:
+        base = baseline.get(result.path)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            before, after = base[metric], getattr(result, metric)
+            if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                regressions.append(Regression(result.path, metric, before, after))
+        if result.sql_count > base["sql_count"]:
+            regressions.append(
+                Regression(
+                    result.path, "sql_count", base["sql_count"], result.sql_count
+                )
+            )
+        # Baselines saved before rss_growth_mb recorded the process peak
+        before = base.get("rss_growth_mb")
+        after = result.rss_growth_mb
+        if (
+            before is not None
+            and after > before * (1 + tolerance)
+            and after - before > min_delta_mb
+        ):
+            regressions.append(
+                Regression(result.path, "rss_growth_mb", before, after)
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text())
+    return {r["path"]: r for r in data.get("routes", [])}
+
+
+def save_baseline(path: Path, results: List[RouteResult], db_path: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "db_path": db_path,
+        "routes": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SpotOps GET routes")
+    parser.add_argument("--db", required=True, help="Synthetic database to replay against")
+    parser.add_argument(
+        "--generate", choices=["small", "medium", "production"],
+        help="Create --db at this scale first if it does not exist",
+    )
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--match", help="Regex; only benchmark matching paths")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true",
+        help="Write results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed relative slowdown before flagging (default 0.25)",
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=25.0,
+        help="Ignore latency changes smaller than this (default 25ms)",
+    )
+    parser.add_argument("--json", type=Path, help="Also write raw results here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if is_production_db(args.db):
+        logger.error(
+            f"Refusing to benchmark {args.db}: it is the configured "
+            "production database. Generate a synthetic one instead."
+        )
+        return 2
+
+    if args.generate and not os.path.exists(args.db):
+        from scripts.generate_synthetic_db import SCALES, generate_synthetic_db
+
+        logger.info(f"Generating {args.generate} synthetic DB at {args.db}")
+        generate_synthetic_db(args.db, SCALES[args.generate])
+
+    if not os.path.exists(args.db):
+        logger.error(f"Database not found: {args.db}")
+        return 2
+
+    logger.info(f"{'code':>4} {'p50 ms':>9} {'p95 ms':>9} {'sql':>6} {'+rss MB':>8}  path")
+    results, skipped = run_benchmark(args.db, args.iterations, args.match)
+
+    if skipped:
+        logger.info(f"\nSkipped {len(skipped)} routes with unresolved URL arguments")
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+    server_errors = [r for r in results if r.status >= 500]
+    for r in server_errors:
+        logger.warning(f"500 from {r.path}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.db)
+        logger.info(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        logger.info(f"\nNo baseline at {args.baseline}; run with --save-baseline")
+        return 0
+
+    regressions = compare_with_baseline(
+        results, baseline, args.tolerance, args.min_delta_ms
+    )
+    if not regressions:
+        logger.info(f"\nNo regressions against {args.baseline}")
+        return 0
+
+    logger.info(f"\n{len(regressions)} regression(s):")
+    for reg in regressions:
+        logger.info(
+            f"  {reg.path}: {reg.metric} {reg.baseline} -> {reg.current}"
+        )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Synthetic production.db generator for benchmarking.
+
+Builds a database with the live schema (latest schema-*.sql export plus
+sql/migrations/) and fills it with realistic cardinalities: several years
+of spots, thousands of customers and aliases, agencies, markets, language
+blocks, AEs, budgets and forecasts. Values are random but seeded, so two
+runs with the same --seed and scale on the same day produce the same data
+(dates are anchored to today so time-windowed signals stay meaningful).
+
+Usage:
+    python scripts/generate_synthetic_db.py --output /tmp/bench.db
+    python scripts/generate_synthetic_db.py --output /tmp/bench.db --scale production
+    python scripts/generate_synthetic_db.py --output /tmp/bench.db --spots-per-year 50000
+
+Never point --output at the live database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import glob
+import importlib.util
+import io
+import logging
+import os
+import random
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+logger = logging.getLogger(__name__)
+
+BENCH_ADMIN_EMAIL = "bench-admin@example.com"
+
+MONTH_ABBR = [
+    "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
+]
+
+MARKETS = [
+    ("NYC", "New York"), ("LAX", "Los Angeles"), ("SFO", "San Francisco"),
+    ("SEA", "Seattle"), ("CVC", "Central Valley"), ("HOU", "Houston"),
+    ("DAL", "Dallas"), ("CMP", "Chicago/Minneapolis"), ("WDC", "Washington DC"),
+    ("MMT", "Multi-Market"), ("SAC", "Sacramento"), ("ADMIN", "Admin"),
+]
+
+# (code, name, group) — codes match LanguageConstants.LANGUAGE_GROUPS
+LANGUAGES = [
+    ("M", "Mandarin", "Chinese"), ("C", "Cantonese", "Chinese"),
+    ("V", "Vietnamese", "Vietnamese"), ("T", "Tagalog", "Filipino"),
+    ("K", "Korean", "Korean"), ("J", "Japanese", "Japanese"),
+    ("SA", "South Asian", "South Asian"), ("HM", "Hmong", "Hmong"),
+    ("E", "English", "English"),
+]
+
+SECTORS = [
+    ("AUTO", "Automotive"), ("CASINO", "Casino & Gaming"),
+    ("FIN", "Financial Services"), ("HEALTH", "Healthcare"),
+    ("GOV", "Government"), ("POLITICAL", "Political"),
+    ("RETAIL", "Retail"), ("TELCO", "Telecommunications"),
+    ("INS", "Insurance"), ("REAL", "Real Estate"),
+    ("EDU", "Education"), ("TRAVEL", "Travel"),
+    ("FOOD", "Food & Beverage"), ("MEDIA", "Media"),
+    ("OUTR", "Outreach"), ("OTHER", "Other"),
+]
+
+REVENUE_TYPES = [
+    ("Internal Ad Sales", 0.82), ("Direct Response Sales", 0.06),
+    ("Paid Programming", 0.04), ("Branded Content", 0.03),
+    ("Other", 0.05),
+]
+
+SPOT_TYPES = [("COM", 0.78), ("BNS", 0.14), ("PRD", 0.04), ("SVC", 0.04)]
+
+# Values must satisfy the language_blocks.day_part CHECK constraint.
+DAY_PARTS = [
+    ("06:00:00", "09:00:00", "Morning"), ("09:00:00", "12:00:00", "Midday"),
+    ("12:00:00", "16:00:00", "Afternoon"), ("16:00:00", "19:00:00", "Early Evening"),
+    ("19:00:00", "23:00:00", "Prime"), ("23:00:00", "23:59:59", "Late Night"),
+]
+
+NAME_PARTS_A = [
+    "Pacific", "Golden", "Lucky", "Summit", "Harbor", "Jade", "Lotus",
+    "Evergreen", "Sunrise", "Phoenix", "Dragon", "Silver", "Coastal",
+    "Metro", "United", "Premier", "Royal", "Bay", "Valley", "Capital",
+]
+NAME_PARTS_B = [
+    "Auto Group", "Casino", "Bank", "Health", "Insurance", "Realty",
+    "Market", "Travel", "Telecom", "Dental", "Law Group", "Motors",
+    "Restaurant", "Credit Union", "Clinic", "Furniture", "Jewelry",
+    "Pharmacy", "Academy", "Media",
+]
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    """Row-count knobs for the generated database."""
+
+    years: int = 5
+    spots_per_year: int = 120_000
+    customers: int = 3_000
+    agencies: int = 250
+    aliases_per_customer: int = 2
+    aes: int = 10
+    contacts_per_entity: float = 1.5
+    activities_per_entity: float = 3.0
+    language_block_fraction: float = 0.6
+
+
+SCALES: Dict[str, SyntheticScale] = {
+    "small": SyntheticScale(
+        years=2, spots_per_year=10_000, customers=300, agencies=30,
+        aes=5,
+    ),
+    "medium": SyntheticScale(),
+    "production": SyntheticScale(
+        years=6, spots_per_year=400_000, customers=9_000, agencies=600,
+        aliases_per_customer=3, aes=12,
+    ),
+}
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=1)[0]
+
+
+def broadcast_month_label(d: date) -> str:
+    """Title-cased Mmm-YY label for the calendar month of d."""
+    return f"{MONTH_ABBR[d.month - 1]}-{d.year % 100:02d}"
+
+
+# ============================================================================
+# Schema
+# ============================================================================
+
+
+def latest_schema_file(root: Path = PROJECT_ROOT) -> Path:
+    """Newest schema-*.sql export in the repo root."""
+    candidates = sorted(glob.glob(str(root / "schema-*.sql")))
+    if not candidates:
+        raise FileNotFoundError(f"No schema-*.sql export found in {root}")
+    return Path(candidates[-1])
+
+
+def apply_schema(db_path: str, root: Path = PROJECT_ROOT) -> List[str]:
+    """Create the schema and apply every migration that applies cleanly.
+
+    Data-fix migrations (e.g. agency merges) expect live rows and fail on
+    an empty database; those are skipped and returned by name.
+    """
+    skipped: List[str] = []
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(latest_schema_file(root).read_text())
+        for path in sorted((root / "sql" / "migrations").glob("*.sql")):
+            try:
+                conn.executescript(path.read_text())
+            except sqlite3.Error as e:
+                conn.rollback()
+                skipped.append(path.name)
+                logger.debug(f"Skipped migration {path.name}: {e}")
+    finally:
+        conn.close()
+
+    for path in sorted((root / "sql" / "migrations").glob("*.py")):
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+            with contextlib.redirect_stdout(io.StringIO()):
+                module.migrate(db_path)
+        except (Exception, SystemExit) as e:
+            skipped.append(path.name)
+            logger.debug(f"Skipped migration {path.name}: {e}")
+    return skipped
+
+
+# ============================================================================
+# Generator
+# ============================================================================
+
+
+class SyntheticDatabaseBuilder:
+    """Fills an empty schema with deterministic synthetic data."""
+
+    def __init__(
+        self,
+        db_path: str,
+        scale: SyntheticScale,
+        seed: int = 42,
+        end_date: Optional[date] = None,
+    ):
+        self.db_path = db_path
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.end_date = end_date or date.today() + timedelta(days=120)
+        self.start_date = date(self.end_date.year - scale.years + 1, 1, 1)
+
+        self.ae_names: List[str] = []
+        self.market_ids: Dict[str, int] = {}
+        self.language_ids: Dict[str, int] = {}
+        self.sector_ids: List[int] = []
+        self.agency_names: Dict[int, str] = {}
+        self.customer_rows: List[tuple] = []
+        self.bill_codes: List[tuple] = []
+
+    def build(self) -> Dict[str, int]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            with conn:
+                self._insert_reference_data(conn)
+                self._insert_language_blocks(conn)
+                self._insert_entities(conn)
+                self._insert_crm_data(conn)
+                self._insert_planning_data(conn)
+            self._insert_spots(conn)
+            with conn:
+                self._insert_month_closures(conn)
+                self._refresh_caches(conn)
+            conn.execute("ANALYZE")
+            return self._counts(conn)
+        finally:
+            conn.close()
+
+    # -- reference data -----------------------------------------------------
+
+    def _insert_reference_data(self, conn: sqlite3.Connection) -> None:
+        for code, name in MARKETS:
+            cur = conn.execute(
+                "INSERT INTO markets (market_name, market_code, region) "
+                "VALUES (?, ?, ?)",
+                (name, code, "US"),
+            )
+            self.market_ids[code] = cur.lastrowid
+
+        for code, name, group in LANGUAGES:
+            cur = conn.execute(
+                "INSERT INTO languages (language_code, language_name, "
+                "language_group) VALUES (?, ?, ?)",
+                (code, name, group),
+            )
+            self.language_ids[code] = cur.lastrowid
+
+        for code, name in SECTORS:
+            cur = conn.execute(
+                "INSERT INTO sectors (sector_code, sector_name, sector_group) "
+                "VALUES (?, ?, ?)",
+                (code, name, "Commercial"),
+            )
+            self.sector_ids.append(cur.lastrowid)
+
+        for i in range(self.scale.aes):
+            first = f"AE{i + 1:02d}"
+            name = f"{first} Seller"
+            self.ae_names.append(name)
+            conn.execute(
+                "INSERT INTO revenue_entities (entity_name, entity_type) "
+                "VALUES (?, 'AE')",
+                (name,),
+            )
+            conn.execute(
+                "INSERT INTO users (first_name, last_name, email, role) "
+                "VALUES (?, 'Seller', ?, 'AE')",
+                (first, f"{first.lower()}@example.com"),
+            )
+        conn.execute(
+            "INSERT INTO revenue_entities (entity_name, entity_type) "
+            "VALUES ('House', 'House')"
+        )
+        conn.execute(
+            "INSERT INTO users (first_name, last_name, email, role) "
+            "VALUES ('Bench', 'Admin', ?, 'admin')",
+            (BENCH_ADMIN_EMAIL,),
+        )
+
+    def _insert_language_blocks(self, conn: sqlite3.Connection) -> None:
+        days = [
+            "monday", "tuesday", "wednesday", "thursday",
+            "friday", "saturday", "sunday",
+        ]
+        lang_codes = [c for c, _, _ in LANGUAGES if c != "E"]
+        for code, _ in MARKETS:
+            if code == "ADMIN":
+                continue
+            cur = conn.execute(
+                "INSERT INTO programming_schedules (schedule_name, "
+                "schedule_version, schedule_type, effective_start_date, "
+                "created_by) VALUES (?, 'v1', 'standard', ?, 'synthetic')",
+                (f"{code} Standard Grid", self.start_date.isoformat()),
+            )
+            schedule_id = cur.lastrowid
+            conn.execute(
+                "INSERT INTO schedule_market_assignments (schedule_id, "
+                "market_id, effective_start_date) VALUES (?, ?, ?)",
+                (schedule_id, self.market_ids[code],
+                 self.start_date.isoformat()),
+            )
+            order = 0
+            for day in days:
+                for start, end, day_part in DAY_PARTS:
+                    lang = self.rng.choice(lang_codes)
+                    order += 1
+                    conn.execute(
+                        "INSERT INTO language_blocks (schedule_id, "
+                        "day_of_week, time_start, time_end, language_id, "
+                        "block_name, block_type, day_part, display_order) "
+                        "VALUES (?, ?, ?, ?, ?, ?, 'Language', ?, ?)",
+                        (schedule_id, day, start, end,
+                         self.language_ids[lang],
+                         f"{lang} {day_part}", day_part, order),
+                    )
+
+    # -- entities -----------------------------------------------------------
+
+    def _unique_name(self, used: set, suffix: str = "") -> str:
+        while True:
+            name = (
+                f"{self.rng.choice(NAME_PARTS_A)} "
+                f"{self.rng.choice(NAME_PARTS_B)}"
+                f" {self.rng.randint(1, 9999)}{suffix}"
+            )
+            if name not in used:
+                used.add(name)
+                return name
+
+    def _insert_entities(self, conn: sqlite3.Connection) -> None:
+        used: set = set()
+        for _ in range(self.scale.agencies):
+            name = self._unique_name(used, " Agency")
+            cur = conn.execute(
+                "INSERT INTO agencies (agency_name, assigned_ae, "
+                "commission_rate) VALUES (?, ?, 15.0)",
+                (name, self.rng.choice(self.ae_names)),
+            )
+            self.agency_names[cur.lastrowid] = name
+            conn.execute(
+                "INSERT INTO entity_aliases (alias_name, entity_type, "
+                "target_entity_id, created_by) VALUES (?, 'agency', ?, "
+                "'synthetic')",
+                (name.upper(), cur.lastrowid),
+            )
+
+        agency_ids = list(self.agency_names)
+        alias_rows = []
+        for _ in range(self.scale.customers):
+            name = self._unique_name(used)
+            agency_id = (
+                self.rng.choice(agency_ids)
+                if agency_ids and self.rng.random() < 0.45 else None
+            )
+            sector_id = (
+                self.rng.choice(self.sector_ids)
+                if self.rng.random() < 0.85 else None
+            )
+            ae = self.rng.choice(self.ae_names)
+            cur = conn.execute(
+                "INSERT INTO customers (normalized_name, sector_id, "
+                "agency_id, assigned_ae, customer_type) "
+                "VALUES (?, ?, ?, ?, 'Regular')",
+                (name, sector_id, agency_id, ae),
+            )
+            customer_id = cur.lastrowid
+            if sector_id:
+                conn.execute(
+                    "INSERT INTO customer_sectors (customer_id, sector_id, "
+                    "is_primary, assigned_by) VALUES (?, ?, 1, 'synthetic')",
+                    (customer_id, sector_id),
+                )
+            weight = self.rng.paretovariate(1.3)
+            self.customer_rows.append((customer_id, agency_id, ae, weight))
+
+            base = (
+                f"{self.agency_names[agency_id]}:{name}"
+                if agency_id else name
+            )
+            variants = [base, base.upper(), f"{base} (WL)", f"{base} - PROMO"]
+            for alias in variants[: self.scale.aliases_per_customer]:
+                alias_rows.append((alias, customer_id))
+                self.bill_codes.append((alias, customer_id, agency_id, ae, weight))
+
+        conn.executemany(
+            "INSERT OR IGNORE INTO entity_aliases (alias_name, entity_type, "
+            "target_entity_id, created_by) VALUES (?, 'customer', ?, "
+            "'synthetic')",
+            alias_rows,
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO raw_customer_inputs (raw_text) VALUES (?)",
+            [(alias,) for alias, _ in alias_rows],
+        )
+
+    def _insert_crm_data(self, conn: sqlite3.Connection) -> None:
+        entities = [("customer", row[0]) for row in self.customer_rows]
+        entities += [("agency", aid) for aid in self.agency_names]
+        today = date.today()
+        contacts, activities = [], []
+        for entity_type, entity_id in entities:
+            n_contacts = int(self.rng.random() * self.scale.contacts_per_entity * 2)
+            for i in range(n_contacts):
+                contacts.append((
+                    entity_type, entity_id, f"Contact {entity_id}-{i}",
+                    f"c{entity_id}.{i}@{entity_type}.example.com",
+                    f"555-{self.rng.randint(1000, 9999)}", 1 if i == 0 else 0,
+                ))
+            n_acts = int(self.rng.random() * self.scale.activities_per_entity * 2)
+            for _ in range(n_acts):
+                kind = self.rng.choice(["note", "call", "email", "meeting", "follow_up"])
+                act_date = today - timedelta(days=self.rng.randint(0, 400))
+                due = (
+                    (today + timedelta(days=self.rng.randint(-30, 30))).isoformat()
+                    if kind == "follow_up" else None
+                )
+                done = 1 if kind == "follow_up" and self.rng.random() < 0.5 else 0
+                activities.append((
+                    entity_type, entity_id, kind, act_date.isoformat(),
+                    f"Synthetic {kind}", "synthetic", due, done,
+                ))
+        conn.executemany(
+            "INSERT INTO entity_contacts (entity_type, entity_id, "
+            "contact_name, email, phone, is_primary, created_by) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'synthetic')",
+            contacts,
+        )
+        conn.executemany(
+            "INSERT INTO entity_activity (entity_type, entity_id, "
+            "activity_type, activity_date, description, created_by, "
+            "due_date, is_completed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            activities,
+        )
+
+    def _insert_planning_data(self, conn: sqlite3.Connection) -> None:
+        budget_rows, forecast_rows = [], []
+        for year in range(self.start_date.year, self.end_date.year + 1):
+            for ae in self.ae_names + ["House"]:
+                for month in range(1, 13):
+                    amount = round(self.rng.uniform(20_000, 120_000), -2)
+                    budget_rows.append((ae, year, month, amount, "synthetic"))
+                    if year >= date.today().year:
+                        forecast_rows.append(
+                            (ae, year, month,
+                             round(amount * self.rng.uniform(0.8, 1.2), -2),
+                             "synthetic")
+                        )
+        conn.executemany(
+            "INSERT INTO budget (ae_name, year, month, budget_amount, source) "
+            "VALUES (?, ?, ?, ?, ?)",
+            budget_rows,
+        )
+        conn.executemany(
+            "INSERT INTO forecast (ae_name, year, month, forecast_amount, "
+            "updated_by) VALUES (?, ?, ?, ?, ?)",
+            forecast_rows,
+        )
+
+    # -- spots --------------------------------------------------------------
+
+    def _insert_spots(self, conn: sqlite3.Connection) -> None:
+        market_codes = [c for c, _ in MARKETS if c != "ADMIN"]
+        lang_codes = [c for c, _, _ in LANGUAGES]
+        weights = [row[4] for row in self.bill_codes]
+        total_days = (self.end_date - self.start_date).days + 1
+        total_spots = self.scale.spots_per_year * self.scale.years
+        batch_id = "synthetic_historical"
+        chunk = 20_000
+
+        cols = (
+            "bill_code, air_date, end_date, day_of_week, time_in, time_out, "
+            "length_seconds, media, language_code, format, line_number, "
+            "spot_type, gross_rate, spot_value, broadcast_month, broker_fees, "
+            "station_net, sales_person, revenue_type, billing_type, "
+            "agency_flag, contract, market_name, customer_id, agency_id, "
+            "market_id, language_id, source_file, is_historical, "
+            "import_batch_id, spot_category"
+        )
+        sql = (
+            f"INSERT INTO spots ({cols}) VALUES "
+            f"({', '.join(['?'] * 31)})"
+        )
+
+        today = date.today()
+        rows = []
+        for n in range(total_spots):
+            bill_code, customer_id, agency_id, ae, _ = self.rng.choices(
+                self.bill_codes, weights=weights, k=1
+            )[0]
+            if self.rng.random() < 0.02:
+                customer_id = None
+            air = self.start_date + timedelta(days=self.rng.randrange(total_days))
+            start, end, _ = self.rng.choice(DAY_PARTS)
+            market = self.rng.choice(market_codes)
+            lang = self.rng.choice(lang_codes)
+            gross = round(self.rng.lognormvariate(4.5, 0.9), 2)
+            broker = round(gross * 0.15, 2) if agency_id else 0.0
+            spot_type = _weighted(self.rng, SPOT_TYPES)
+            category = (
+                "default_english" if lang == "E"
+                else "language_assignment_required"
+            )
+            rows.append((
+                bill_code, air.isoformat(), air.isoformat(),
+                air.strftime("%A").lower(), start, end,
+                self.rng.choice(["00:00:15", "00:00:30", "00:01:00"]),
+                "TV", lang, "Spot", self.rng.randint(1, 40), spot_type,
+                gross, gross, broadcast_month_label(air), broker,
+                round(gross - broker, 2), ae, _weighted(self.rng, REVENUE_TYPES),
+                "Calendar", "Agency" if agency_id else "Direct",
+                f"C{(customer_id or 0) * 10 + air.month % 3:07d}",
+                market, customer_id, agency_id, self.market_ids[market],
+                self.language_ids[lang], "synthetic.xlsx:Commercials",
+                1 if air < date(today.year, 1, 1) else 0, batch_id, category,
+            ))
+            if len(rows) >= chunk:
+                self._flush_spots(conn, sql, rows)
+                rows = []
+                logger.info(f"  spots: {n + 1:,}/{total_spots:,}")
+        if rows:
+            self._flush_spots(conn, sql, rows)
+
+        with conn:
+            conn.execute(
+                "INSERT INTO import_batches (batch_id, import_mode, "
+                "source_file, status, records_imported, completed_at) "
+                "VALUES (?, 'HISTORICAL', 'synthetic.xlsx', 'COMPLETED', ?, "
+                "CURRENT_TIMESTAMP)",
+                (batch_id, total_spots),
+            )
+            conn.execute("""
+                INSERT INTO spot_language_blocks (spot_id, schedule_id,
+                    block_id, customer_intent, assignment_method)
+                SELECT s.spot_id, lb.schedule_id, lb.block_id,
+                       'language_specific', 'auto_computed'
+                FROM spots s
+                JOIN schedule_market_assignments sma
+                  ON sma.market_id = s.market_id
+                JOIN language_blocks lb
+                  ON lb.schedule_id = sma.schedule_id
+                 AND lb.day_of_week = s.day_of_week
+                 AND lb.time_start = s.time_in
+                WHERE (s.spot_id % 100) < ?
+            """, (int(self.scale.language_block_fraction * 100),))
+
+    @staticmethod
+    def _flush_spots(conn: sqlite3.Connection, sql: str, rows: List[tuple]) -> None:
+        from src.services.alias_backfill import bulk_alias_load
+
+        with conn, bulk_alias_load(conn):
+            conn.executemany(sql, rows)
+
+    def _insert_month_closures(self, conn: sqlite3.Connection) -> None:
+        current_year = date.today().year
+        months = [
+            f"{abbr}-{year % 100:02d}"
+            for year in range(self.start_date.year, current_year)
+            for abbr in MONTH_ABBR
+        ]
+        conn.executemany(
+            "INSERT OR IGNORE INTO month_closures (broadcast_month, "
+            "closed_date, closed_by) VALUES (?, date('now'), 'synthetic')",
+            [(m,) for m in months],
+        )
+
+    def _refresh_caches(self, conn: sqlite3.Connection) -> None:
+        from src.database.connection import DatabaseConnection
+        from src.services.entity_metrics_service import EntityMetricsService
+
+        from src.services.language_block_summary import (
+            refresh_block_summary,
+            summary_exists,
+        )
+        from src.services.spot_catalog import refresh_spot_catalog
+
+        service = EntityMetricsService(DatabaseConnection(self.db_path))
+        service.refresh_metrics(conn)
+        service.refresh_signals(conn)
+
+        # Spot-derived tables the imports keep current month by month:
+        # rebuild every month the generated spots cover
+        refresh_spot_catalog(conn, [
+            r[0] for r in conn.execute(
+                "SELECT DISTINCT broadcast_month FROM spots"
+                " WHERE broadcast_month IS NOT NULL"
+            )
+        ])
+        if summary_exists(conn):
+            refresh_block_summary(conn, [
+                r[0] for r in conn.execute(
+                    "SELECT DISTINCT strftime('%Y-%m', air_date) FROM spots"
+                    " WHERE air_date IS NOT NULL"
+                )
+            ])
+
+    @staticmethod
+    def _counts(conn: sqlite3.Connection) -> Dict[str, int]:
+        tables = [
+            "spots", "customers", "agencies", "entity_aliases", "markets",
+            "language_blocks", "spot_language_blocks", "entity_contacts",
+            "entity_activity", "entity_signals", "budget", "forecast",
+            "spot_catalog", "customer_month_revenue",
+            "language_block_revenue_monthly",
+        ]
+        return {
+            t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in tables
+        }
+
+
+def generate_synthetic_db(
+    output: str,
+    scale: SyntheticScale,
+    seed: int = 42,
+    overwrite: bool = False,
+) -> Dict[str, int]:
+    """Create a synthetic database at output and return row counts."""
+    if os.path.exists(output):
+        if not overwrite:
+            raise FileExistsError(
+                f"{output} exists; pass overwrite=True (--force) to replace it"
+            )
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(output + suffix):
+                os.remove(output + suffix)
+
+    skipped = apply_schema(output)
+    if skipped:
+        logger.info(f"Skipped data-fix migrations: {', '.join(skipped)}")
+    return SyntheticDatabaseBuilder(output, scale, seed=seed).build()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic production-scale SpotOps database"
+    )
+    parser.add_argument("--output", required=True, help="Path of the DB to create")
+    parser.add_argument(
+        "--scale", choices=sorted(SCALES), default="medium",
+        help="Preset cardinalities (default: medium)",
+    )
+    parser.add_argument("--years", type=int)
+    parser.add_argument("--spots-per-year", type=int)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--agencies", type=int)
+    parser.add_argument("--aliases-per-customer", type=int)
+    parser.add_argument("--aes", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--force", action="store_true", help="Overwrite an existing output file"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    overrides = {
+        field: getattr(args, field)
+        for field in (
+            "years", "spots_per_year", "customers", "agencies",
+            "aliases_per_customer", "aes",
+        )
+        if getattr(args, field) is not None
+    }
+    scale = replace(SCALES[args.scale], **overrides)
+
+    started = time.perf_counter()
+    counts = generate_synthetic_db(
+        args.output, scale, seed=args.seed, overwrite=args.force
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"Synthetic database written to {args.output} in {elapsed:.1f}s")
+    for table, count in counts.items():
+        print(f"  {table:<30} {count:>12,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,22 +4,39 @@
 Standalone CLI script with no web app dependency.
 Designed to run on a schedule via systemd timer.
 
+Folder listings come from the IO directory index (migration 042) when
+--db (default: $DB_PATH) names a migrated database, refreshing only the
+folders whose mtime changed; otherwise the share is walked.
+
 Usage:
     python3 scripts/scan_insertion_orders.py
     python3 scripts/scan_insertion_orders.py --io-path /custom/path
     python3 scripts/scan_insertion_orders.py --output data/pending_orders.json
+    python3 scripts/scan_insertion_orders.py --db data/database/production.db
 """
 
 import argparse
 import json
 import logging
 import os
+import sqlite3
 import sys
 import tempfile
 from datetime import datetime
+from pathlib import Path
 
 import openpyxl
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.services.io_index import (  # noqa: E402
+    index_exists,
+    list_entries,
+    parse_folder_name,
+    refresh,
+)
+
 DEFAULT_IO_PATH = "/mnt/k-drive/Insertion Orders"
 DEFAULT_OUTPUT = "data/pending_orders.json"
 
@@ -171,18 +188,6 @@ def scan_workbook(filepath, folder_name):
         wb.close()
 
 
-def parse_folder_name(folder_name):
-    """Extract contract number and customer from folder name.
-
-    Folder format: "NNNN Customer Name" where leading digits are the
-    contract number and the rest is the customer name.
-    """
-    parts = folder_name.split(None, 1)
-    if len(parts) == 2 and parts[0].isdigit():
-        return parts[0], parts[1]
-    return "", folder_name
-
-
 def order_from_folder(folder_name):
     """Create a stub order entry from just the folder name.
 
@@ -206,8 +211,30 @@ def order_from_folder(folder_name):
     }
 
 
-def scan_all(io_path):
-    """Walk the insertion orders directory and return orders + errors."""
+def list_folders(io_path, conn=None):
+    """Yield (folder name, folder path, file names) for each folder
+    directly under io_path, by name.
+
+    With conn (a migrated database) the listing comes from the IO
+    directory index, refreshed first; otherwise the share is walked.
+    """
+    if conn is not None and index_exists(conn):
+        refresh(conn, io_path, max_depth=1)
+        conn.commit()
+        for folder in list_entries(conn, io_path, is_dir=True):
+            files = list_entries(conn, folder["path"], is_dir=False)
+            yield folder["name"], folder["path"], [f["name"] for f in files]
+        return
+
+    for entry in sorted(os.listdir(io_path)):
+        folder_path = os.path.join(io_path, entry)
+        if not os.path.isdir(folder_path):
+            continue
+        yield entry, folder_path, sorted(os.listdir(folder_path))
+
+
+def scan_all(io_path, conn=None):
+    """Scan the insertion orders directory and return orders + errors."""
     orders = []
     errors = []
 
@@ -219,13 +246,9 @@ def scan_all(io_path):
         )
         sys.exit(1)
 
-    for entry in sorted(os.listdir(io_path)):
-        folder_path = os.path.join(io_path, entry)
-        if not os.path.isdir(folder_path):
-            continue
-
+    for entry, folder_path, filenames in list_folders(io_path, conn):
         folder_has_order = False
-        for filename in sorted(os.listdir(folder_path)):
+        for filename in filenames:
             if not filename.endswith(".xlsx"):
                 continue
             if filename.startswith("~$"):
@@ -296,10 +319,24 @@ def main():
         default=DEFAULT_OUTPUT,
         help=f"Output JSON path (default: {DEFAULT_OUTPUT})",
     )
+    parser.add_argument(
+        "--db",
+        default=os.getenv("DB_PATH"),
+        help="Database holding the IO directory index (default: $DB_PATH)",
+    )
     args = parser.parse_args()
 
+    conn = None
+    if args.db and os.path.exists(args.db):
+        conn = sqlite3.connect(args.db, timeout=30)
+        conn.row_factory = sqlite3.Row
+
     logger.info("Scanning insertion orders from: %s", args.io_path)
-    orders, errors = scan_all(args.io_path)
+    try:
+        orders, errors = scan_all(args.io_path, conn)
+    finally:
+        if conn is not None:
+            conn.close()
     write_json(args.output, orders, errors)
 
     if errors:
@@ -0,0 +1,27 @@
+-- 028_import_batch_phases.sql
+-- Per-phase timing for each import run (market scan, Excel read,
+-- fingerprinting, delete, insert, customer alignment, language
+-- processing, cache refresh). One row per phase per batch.
+--
+-- batch_id is the import_batches.batch_id of the run, or the daily-update
+-- run id when the import failed before creating a batch. No foreign key,
+-- so those failed runs are still recorded.
+
+CREATE TABLE IF NOT EXISTS import_batch_phases (
+    phase_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    duration_ms REAL NOT NULL,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    rows_per_sec REAL,
+    sql_count INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 1,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_batch_phases_batch
+    ON import_batch_phases(batch_id, sequence);
+CREATE INDEX IF NOT EXISTS idx_import_batch_phases_phase
+    ON import_batch_phases(phase, started_at);
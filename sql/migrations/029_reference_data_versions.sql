@@ -0,0 +1,109 @@
+-- 029_reference_data_versions.sql
+-- Version stamps for the in-process reference data cache
+-- (src/services/reference_data.py). Each web process caches small lookup
+-- lists (sectors, markets, AE names, years, revenue types) and reloads a
+-- list only when the version of a table it was built from has moved.
+--
+-- sectors, markets and AE assignments are bumped by triggers, so every
+-- write path (web routes, CLI, ad-hoc scripts) invalidates the cache.
+-- spots is bumped once per import by the import service rather than per
+-- row, since imports replace hundreds of thousands of spots at a time.
+
+CREATE TABLE IF NOT EXISTS reference_data_versions (
+    source TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO reference_data_versions (source) VALUES
+    ('sectors'), ('markets'), ('ae_assignments'), ('spots');
+
+-- sectors
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_sectors_insert
+AFTER INSERT ON sectors
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'sectors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_sectors_update
+AFTER UPDATE ON sectors
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'sectors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_sectors_delete
+AFTER DELETE ON sectors
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'sectors';
+END;
+
+-- markets
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_markets_insert
+AFTER INSERT ON markets
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'markets';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_markets_update
+AFTER UPDATE ON markets
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'markets';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_markets_delete
+AFTER DELETE ON markets
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'markets';
+END;
+
+-- AE assignments (agencies.assigned_ae / customers.assigned_ae)
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_agency_ae_insert
+AFTER INSERT ON agencies
+WHEN NEW.assigned_ae IS NOT NULL
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'ae_assignments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_agency_ae_update
+AFTER UPDATE OF assigned_ae ON agencies
+WHEN NEW.assigned_ae IS NOT OLD.assigned_ae
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'ae_assignments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_customer_ae_insert
+AFTER INSERT ON customers
+WHEN NEW.assigned_ae IS NOT NULL
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'ae_assignments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_customer_ae_update
+AFTER UPDATE OF assigned_ae ON customers
+WHEN NEW.assigned_ae IS NOT OLD.assigned_ae
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'ae_assignments';
+END;
@@ -0,0 +1,33 @@
+-- 030_background_jobs.sql
+-- Persistent queue for derived-data work that does not need to block an
+-- import or a page request (entity metrics/signals refresh, signal action
+-- sync). Processed by src.services.background_jobs.JobWorker.
+--
+-- job_key deduplicates: at most one QUEUED job per key, so ten imports in
+-- a row still produce a single pending cache rebuild. A job that is
+-- RUNNING does not block a new QUEUED one with the same key, since the
+-- data may have changed after the running job read it.
+
+CREATE TABLE IF NOT EXISTS background_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_type TEXT NOT NULL,
+    job_key TEXT,
+    payload TEXT,
+    status TEXT NOT NULL DEFAULT 'QUEUED'
+        CHECK (status IN ('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    worker TEXT,
+    created_by TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_background_jobs_queued_key
+    ON background_jobs(job_key)
+    WHERE status = 'QUEUED' AND job_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_background_jobs_status
+    ON background_jobs(status, run_after);
@@ -0,0 +1,87 @@
+-- 031_crm_reference_versions.sql
+-- Extends reference_data_versions (029) so the cached manager scoreboard
+-- and weekly activity (ManagerDashboardService) reload when their inputs
+-- change:
+--
+--   ae_assignments   now also bumped when an agency/customer is
+--                    activated or deactivated (scoreboard counts only
+--                    active accounts)
+--   entity_activity  notes, calls, follow-ups (user writes, low volume)
+--   signal_actions   signal workflow status changes
+--   entity_signals   bumped once per refresh by EntityMetricsService
+--                    rather than per row
+
+INSERT OR IGNORE INTO reference_data_versions (source) VALUES
+    ('entity_activity'), ('signal_actions'), ('entity_signals');
+
+-- active flag on accounts
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_agency_active_update
+AFTER UPDATE OF is_active ON agencies
+WHEN NEW.is_active IS NOT OLD.is_active AND NEW.assigned_ae IS NOT NULL
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'ae_assignments';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_customer_active_update
+AFTER UPDATE OF is_active ON customers
+WHEN NEW.is_active IS NOT OLD.is_active AND NEW.assigned_ae IS NOT NULL
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'ae_assignments';
+END;
+
+-- entity_activity
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_activity_insert
+AFTER INSERT ON entity_activity
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'entity_activity';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_activity_update
+AFTER UPDATE ON entity_activity
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'entity_activity';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_activity_delete
+AFTER DELETE ON entity_activity
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'entity_activity';
+END;
+
+-- signal_actions
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_signal_actions_insert
+AFTER INSERT ON signal_actions
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'signal_actions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_signal_actions_update
+AFTER UPDATE ON signal_actions
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'signal_actions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_refdata_signal_actions_delete
+AFTER DELETE ON signal_actions
+BEGIN
+    UPDATE reference_data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'signal_actions';
+END;
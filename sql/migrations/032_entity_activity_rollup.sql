@@ -0,0 +1,100 @@
+-- 032_entity_activity_rollup.sql
+-- One row per (entity_type, entity_id) summarising entity_activity, so
+-- account lists and health scores join a single row instead of running
+-- correlated subqueries or GROUP BYs over the whole activity log:
+--
+--   last_activity_date   latest activity of any type (CRM "last activity")
+--   last_touch_date      latest note/call/email/meeting (health score touch)
+--   next_follow_up_*     earliest open follow-up by due date
+--   open_follow_ups      number of open follow-ups
+--
+-- Overdue status depends on the current date, so it is not stored:
+-- an entity has an overdue follow-up when next_follow_up_date < date('now').
+--
+-- Maintained by the triggers below, which re-summarise only the entity
+-- touched by each insert/update/delete (ActivityService.create_activity,
+-- toggle_completion, and any other writer).
+
+CREATE VIEW IF NOT EXISTS entity_activity_rollup_source AS
+SELECT
+    ea.entity_type,
+    ea.entity_id,
+    MAX(ea.activity_date) AS last_activity_date,
+    MAX(CASE WHEN ea.activity_type IN ('note', 'call', 'email', 'meeting')
+             THEN ea.activity_date END) AS last_touch_date,
+    nf.activity_id AS next_follow_up_id,
+    nf.due_date AS next_follow_up_date,
+    nf.description AS next_follow_up_desc,
+    SUM(CASE WHEN ea.activity_type = 'follow_up' AND ea.is_completed = 0
+             THEN 1 ELSE 0 END) AS open_follow_ups
+FROM entity_activity ea
+LEFT JOIN entity_activity nf ON nf.activity_id = (
+    SELECT f.activity_id
+    FROM entity_activity f
+    WHERE f.entity_type = ea.entity_type
+      AND f.entity_id = ea.entity_id
+      AND f.activity_type = 'follow_up'
+      AND f.is_completed = 0
+    ORDER BY f.due_date IS NULL, f.due_date, f.activity_id
+    LIMIT 1
+)
+GROUP BY ea.entity_type, ea.entity_id;
+
+CREATE TABLE IF NOT EXISTS entity_activity_rollup (
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    last_activity_date TIMESTAMP,
+    last_touch_date TIMESTAMP,
+    next_follow_up_id INTEGER,
+    next_follow_up_date TEXT,
+    next_follow_up_desc TEXT,
+    open_follow_ups INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_activity_rollup_next_follow_up
+    ON entity_activity_rollup(next_follow_up_date)
+    WHERE next_follow_up_date IS NOT NULL;
+
+-- Lets the per-entity next follow-up lookup avoid scanning every open
+-- follow-up in the table
+CREATE INDEX IF NOT EXISTS idx_entity_activity_open_follow_ups
+    ON entity_activity(entity_type, entity_id, due_date)
+    WHERE activity_type = 'follow_up' AND is_completed = 0;
+
+-- Backfill
+
+DELETE FROM entity_activity_rollup;
+INSERT INTO entity_activity_rollup
+SELECT * FROM entity_activity_rollup_source;
+
+-- Maintenance
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_rollup_insert
+AFTER INSERT ON entity_activity
+BEGIN
+    INSERT OR REPLACE INTO entity_activity_rollup
+    SELECT * FROM entity_activity_rollup_source
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_rollup_update
+AFTER UPDATE ON entity_activity
+BEGIN
+    DELETE FROM entity_activity_rollup
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+    INSERT OR REPLACE INTO entity_activity_rollup
+    SELECT * FROM entity_activity_rollup_source
+    WHERE (entity_type = OLD.entity_type AND entity_id = OLD.entity_id)
+       OR (entity_type = NEW.entity_type AND entity_id = NEW.entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_activity_rollup_delete
+AFTER DELETE ON entity_activity
+BEGIN
+    DELETE FROM entity_activity_rollup
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+    INSERT INTO entity_activity_rollup
+    SELECT * FROM entity_activity_rollup_source
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
@@ -0,0 +1,52 @@
+-- 033_entity_health_components.sql
+-- Persisted spot-derived inputs to account health scores
+-- (HealthScoreService): revenue for the last 3 months, the 3 months
+-- before that, and the last 12 months, as of a calendar month.
+--
+-- Written by HealthScoreService.refresh_components(), which the entity
+-- cache job runs after each import (a full pass). Reads ignore rows whose
+-- as_of_month is not the current month and compute entities without a
+-- row on the fly, so a missing or stale row costs speed, not accuracy.
+--
+-- The triggers below drop the rows of entities whose revenue moves
+-- outside an import: spots reassigned to another customer (merges) and
+-- customers moved to another agency.
+
+CREATE TABLE IF NOT EXISTS entity_health_components (
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    as_of_month TEXT NOT NULL,
+    trailing_3m REAL NOT NULL DEFAULT 0,
+    prior_3m REAL NOT NULL DEFAULT 0,
+    trailing_12m REAL NOT NULL DEFAULT 0,
+    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_health_components_month
+    ON entity_health_components(as_of_month);
+
+CREATE TRIGGER IF NOT EXISTS trg_health_components_spot_customer
+AFTER UPDATE OF customer_id ON spots
+WHEN NEW.customer_id IS NOT OLD.customer_id
+BEGIN
+    DELETE FROM entity_health_components
+    WHERE entity_type = 'customer'
+      AND entity_id IN (OLD.customer_id, NEW.customer_id);
+    DELETE FROM entity_health_components
+    WHERE entity_type = 'agency'
+      AND entity_id IN (
+          SELECT agency_id FROM customers
+          WHERE customer_id IN (OLD.customer_id, NEW.customer_id)
+            AND agency_id IS NOT NULL
+      );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_health_components_customer_agency
+AFTER UPDATE OF agency_id ON customers
+WHEN NEW.agency_id IS NOT OLD.agency_id
+BEGIN
+    DELETE FROM entity_health_components
+    WHERE entity_type = 'agency'
+      AND entity_id IN (OLD.agency_id, NEW.agency_id);
+END;
@@ -0,0 +1,9 @@
+-- 034_background_job_progress.sql
+-- Progress and result for background jobs (030) that a user waits on.
+-- Customer/agency merges run as MERGE_ENTITIES jobs; the merge engine
+-- writes progress after each committed chunk of reassigned rows and the
+-- worker stores the handler's return value in result, both as JSON.
+-- The web client polls /api/merge-jobs/<job_id> for them.
+
+ALTER TABLE background_jobs ADD COLUMN progress TEXT;
+ALTER TABLE background_jobs ADD COLUMN result TEXT;
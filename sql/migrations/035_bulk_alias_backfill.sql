@@ -0,0 +1,105 @@
+-- 035_bulk_alias_backfill.sql
+-- Lets bulk writers suspend the per-row alias backfill triggers from
+-- migrations 022/023 and run one set-based backfill instead
+-- (src.services.alias_backfill.bulk_alias_load).
+--
+-- While a row exists in alias_backfill_session:
+--   * customer alias inserts/updates that would have backfilled spots
+--     record (alias_name, target) in alias_backfill_pending instead;
+--     INSERT OR IGNORE keeps the first target, matching the trigger
+--     path, where the first backfill claims the NULL spots
+--   * spot inserts skip the alias lookup; spots above the session's
+--     spot_watermark are backfilled at the end
+--
+-- A session only ever exists inside the writer's open transaction: it
+-- is inserted and deleted before COMMIT, so no other connection sees
+-- the triggers suspended.
+
+CREATE TABLE IF NOT EXISTS alias_backfill_session (
+    session_id TEXT PRIMARY KEY,
+    spot_watermark INTEGER NOT NULL,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS alias_backfill_pending (
+    alias_name TEXT PRIMARY KEY,
+    target_entity_id INTEGER NOT NULL
+);
+
+-- 022: alias insert/update backfill, now skipped during a session
+
+DROP TRIGGER IF EXISTS trg_backfill_spots_on_alias_insert;
+CREATE TRIGGER trg_backfill_spots_on_alias_insert
+AFTER INSERT ON entity_aliases
+WHEN NEW.entity_type = 'customer' AND NEW.is_active = 1
+  AND NOT EXISTS (SELECT 1 FROM alias_backfill_session)
+BEGIN
+    UPDATE spots
+    SET customer_id = NEW.target_entity_id
+    WHERE bill_code = NEW.alias_name
+      AND customer_id IS NULL;
+END;
+
+DROP TRIGGER IF EXISTS trg_backfill_spots_on_alias_update;
+CREATE TRIGGER trg_backfill_spots_on_alias_update
+AFTER UPDATE ON entity_aliases
+WHEN NEW.entity_type = 'customer'
+  AND NEW.is_active = 1
+  AND (OLD.is_active = 0
+       OR OLD.target_entity_id != NEW.target_entity_id)
+  AND NOT EXISTS (SELECT 1 FROM alias_backfill_session)
+BEGIN
+    UPDATE spots
+    SET customer_id = NEW.target_entity_id
+    WHERE bill_code = NEW.alias_name
+      AND customer_id IS NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_defer_backfill_on_alias_insert
+AFTER INSERT ON entity_aliases
+WHEN NEW.entity_type = 'customer' AND NEW.is_active = 1
+  AND EXISTS (SELECT 1 FROM alias_backfill_session)
+BEGIN
+    INSERT OR IGNORE INTO alias_backfill_pending (alias_name, target_entity_id)
+    VALUES (NEW.alias_name, NEW.target_entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_defer_backfill_on_alias_update
+AFTER UPDATE ON entity_aliases
+WHEN NEW.entity_type = 'customer'
+  AND NEW.is_active = 1
+  AND (OLD.is_active = 0
+       OR OLD.target_entity_id != NEW.target_entity_id)
+  AND EXISTS (SELECT 1 FROM alias_backfill_session)
+BEGIN
+    INSERT OR IGNORE INTO alias_backfill_pending (alias_name, target_entity_id)
+    VALUES (NEW.alias_name, NEW.target_entity_id);
+END;
+
+-- 023: alias lookup on spot insert, now skipped during a session
+
+DROP TRIGGER IF EXISTS trg_set_customer_on_spot_insert;
+CREATE TRIGGER trg_set_customer_on_spot_insert
+AFTER INSERT ON spots
+WHEN NEW.customer_id IS NULL
+  AND NOT EXISTS (SELECT 1 FROM alias_backfill_session)
+BEGIN
+    UPDATE spots
+    SET customer_id = (
+        SELECT target_entity_id
+        FROM entity_aliases
+        WHERE alias_name = NEW.bill_code
+          AND entity_type = 'customer'
+          AND is_active = 1
+        LIMIT 1
+    )
+    WHERE spot_id = NEW.spot_id
+      AND customer_id IS NULL
+      AND EXISTS (
+        SELECT 1
+        FROM entity_aliases
+        WHERE alias_name = NEW.bill_code
+          AND entity_type = 'customer'
+          AND is_active = 1
+    );
+END;
@@ -0,0 +1,416 @@
+-- 036_entity_directory.sql
+-- One row per agency and customer holding everything the entity list
+-- pages show: address, AE, sector(s), agency, contact stats, alias and
+-- client counts, cached spot metrics (entity_metrics) and signals
+-- (entity_signals, as a JSON array in priority order). The address
+-- book, stale customer report and customer sector manager filter, sort
+-- and page this table instead of re-aggregating spots and merging half
+-- a dozen lookups per request.
+--
+--   sector_name/sector_ids/sector_count  agencies: distinct sectors of
+--                                        their active clients
+--   client_count                         agencies: active clients
+--   alias_count                          active aliases pointing here
+--   agency_booked                        customers: every spot booked
+--                                        through an agency
+--   worldlink_client                     customers: WorldLink broker
+--                                        client (by name or alias)
+--   sector_assigned_by/_date             customers: primary
+--                                        customer_sectors row
+--
+-- Maintained by the triggers below, which re-read only the entities a
+-- write touches, so it stays current whichever code path writes
+-- (web routes, imports, merges, the entity cache job, canon tools).
+
+CREATE VIEW IF NOT EXISTS entity_directory_source AS
+SELECT
+    'agency' AS entity_type,
+    a.agency_id AS entity_id,
+    a.agency_name AS entity_name,
+    a.address, a.city, a.state, a.zip,
+    a.notes, a.assigned_ae, a.is_active,
+    a.created_date, a.updated_date,
+    NULL AS sector_id,
+    (SELECT GROUP_CONCAT(DISTINCT s.sector_name)
+     FROM customers c JOIN sectors s ON c.sector_id = s.sector_id
+     WHERE c.agency_id = a.agency_id AND c.is_active = 1) AS sector_name,
+    NULL AS sector_code,
+    (SELECT COUNT(DISTINCT c.sector_id)
+     FROM customers c JOIN sectors s ON c.sector_id = s.sector_id
+     WHERE c.agency_id = a.agency_id AND c.is_active = 1) AS sector_count,
+    COALESCE(
+        (SELECT GROUP_CONCAT(DISTINCT CAST(s.sector_id AS TEXT))
+         FROM customers c JOIN sectors s ON c.sector_id = s.sector_id
+         WHERE c.agency_id = a.agency_id AND c.is_active = 1),
+        '') AS sector_ids,
+    NULL AS sector_assigned_by,
+    NULL AS sector_assigned_date,
+    NULL AS agency_id,
+    NULL AS agency_name,
+    (SELECT COUNT(*) FROM entity_contacts ec
+     WHERE ec.entity_type = 'agency' AND ec.entity_id = a.agency_id
+       AND ec.is_active = 1) AS contact_count,
+    (SELECT MAX(CASE WHEN ec.is_primary = 1 THEN ec.contact_name END)
+     FROM entity_contacts ec
+     WHERE ec.entity_type = 'agency' AND ec.entity_id = a.agency_id
+       AND ec.is_active = 1) AS primary_contact,
+    (SELECT COUNT(*) FROM customers c
+     WHERE c.agency_id = a.agency_id AND c.is_active = 1) AS client_count,
+    (SELECT COUNT(*) FROM entity_aliases ea
+     WHERE ea.target_entity_id = a.agency_id AND ea.entity_type = 'agency'
+       AND ea.is_active = 1) AS alias_count,
+    COALESCE(m.markets, '') AS markets,
+    m.last_active,
+    COALESCE(m.total_revenue, 0) AS total_revenue,
+    COALESCE(m.spot_count, 0) AS spot_count,
+    0 AS agency_booked,
+    0 AS worldlink_client,
+    (SELECT json_group_array(json_object(
+                'signal_type', sg.signal_type,
+                'signal_label', sg.signal_label,
+                'signal_priority', sg.signal_priority))
+     FROM (SELECT * FROM entity_signals es
+           WHERE es.entity_type = 'agency' AND es.entity_id = a.agency_id
+           ORDER BY es.signal_priority) sg) AS signals,
+    (SELECT MIN(es.signal_priority) FROM entity_signals es
+     WHERE es.entity_type = 'agency'
+       AND es.entity_id = a.agency_id) AS top_signal_priority
+FROM agencies a
+LEFT JOIN entity_metrics m
+    ON m.entity_type = 'agency' AND m.entity_id = a.agency_id
+UNION ALL
+SELECT
+    'customer' AS entity_type,
+    c.customer_id AS entity_id,
+    c.normalized_name AS entity_name,
+    c.address, c.city, c.state, c.zip,
+    c.notes, c.assigned_ae, c.is_active,
+    c.created_date, c.updated_date,
+    c.sector_id,
+    s.sector_name,
+    s.sector_code,
+    (SELECT COUNT(*) FROM customer_sectors cs
+     WHERE cs.customer_id = c.customer_id) AS sector_count,
+    COALESCE(
+        (SELECT GROUP_CONCAT(cs.sector_id) FROM customer_sectors cs
+         WHERE cs.customer_id = c.customer_id),
+        '') AS sector_ids,
+    ps.assigned_by AS sector_assigned_by,
+    ps.assigned_date AS sector_assigned_date,
+    c.agency_id,
+    ag.agency_name,
+    (SELECT COUNT(*) FROM entity_contacts ec
+     WHERE ec.entity_type = 'customer' AND ec.entity_id = c.customer_id
+       AND ec.is_active = 1) AS contact_count,
+    (SELECT MAX(CASE WHEN ec.is_primary = 1 THEN ec.contact_name END)
+     FROM entity_contacts ec
+     WHERE ec.entity_type = 'customer' AND ec.entity_id = c.customer_id
+       AND ec.is_active = 1) AS primary_contact,
+    0 AS client_count,
+    (SELECT COUNT(*) FROM entity_aliases ea
+     WHERE ea.target_entity_id = c.customer_id
+       AND ea.entity_type = 'customer' AND ea.is_active = 1) AS alias_count,
+    COALESCE(m.markets, '') AS markets,
+    m.last_active,
+    COALESCE(m.total_revenue, 0) AS total_revenue,
+    COALESCE(m.spot_count, 0) AS spot_count,
+    COALESCE(m.agency_spot_count = m.spot_count, 0) AS agency_booked,
+    (c.normalized_name LIKE '%WorldLink%'
+     OR EXISTS (SELECT 1 FROM entity_aliases ea
+                WHERE ea.target_entity_id = c.customer_id
+                  AND ea.entity_type = 'customer' AND ea.is_active = 1
+                  AND ea.alias_name LIKE 'WorldLink%')) AS worldlink_client,
+    (SELECT json_group_array(json_object(
+                'signal_type', sg.signal_type,
+                'signal_label', sg.signal_label,
+                'signal_priority', sg.signal_priority))
+     FROM (SELECT * FROM entity_signals es
+           WHERE es.entity_type = 'customer'
+             AND es.entity_id = c.customer_id
+           ORDER BY es.signal_priority) sg) AS signals,
+    (SELECT MIN(es.signal_priority) FROM entity_signals es
+     WHERE es.entity_type = 'customer'
+       AND es.entity_id = c.customer_id) AS top_signal_priority
+FROM customers c
+LEFT JOIN sectors s ON c.sector_id = s.sector_id
+LEFT JOIN agencies ag ON c.agency_id = ag.agency_id
+LEFT JOIN customer_sectors ps
+    ON ps.customer_id = c.customer_id AND ps.is_primary = 1
+LEFT JOIN entity_metrics m
+    ON m.entity_type = 'customer' AND m.entity_id = c.customer_id;
+
+CREATE TABLE IF NOT EXISTS entity_directory (
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    entity_name TEXT NOT NULL,
+    address TEXT,
+    city TEXT,
+    state TEXT,
+    zip TEXT,
+    notes TEXT,
+    assigned_ae TEXT,
+    is_active INTEGER,
+    created_date TIMESTAMP,
+    updated_date TIMESTAMP,
+    sector_id INTEGER,
+    sector_name TEXT,
+    sector_code TEXT,
+    sector_count INTEGER NOT NULL DEFAULT 0,
+    sector_ids TEXT NOT NULL DEFAULT '',
+    sector_assigned_by TEXT,
+    sector_assigned_date TIMESTAMP,
+    agency_id INTEGER,
+    agency_name TEXT,
+    contact_count INTEGER NOT NULL DEFAULT 0,
+    primary_contact TEXT,
+    client_count INTEGER NOT NULL DEFAULT 0,
+    alias_count INTEGER NOT NULL DEFAULT 0,
+    markets TEXT NOT NULL DEFAULT '',
+    last_active TEXT,
+    total_revenue REAL NOT NULL DEFAULT 0,
+    spot_count INTEGER NOT NULL DEFAULT 0,
+    agency_booked INTEGER NOT NULL DEFAULT 0,
+    worldlink_client INTEGER NOT NULL DEFAULT 0,
+    signals TEXT NOT NULL DEFAULT '[]',
+    top_signal_priority INTEGER,
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_entity_directory_name
+    ON entity_directory(entity_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_entity_directory_active
+    ON entity_directory(is_active, entity_type);
+CREATE INDEX IF NOT EXISTS idx_entity_directory_sector
+    ON entity_directory(sector_id);
+CREATE INDEX IF NOT EXISTS idx_entity_directory_last_active
+    ON entity_directory(last_active);
+
+-- Lookups the per-entity refresh relies on
+CREATE INDEX IF NOT EXISTS idx_entity_directory_customers_agency_active
+    ON customers(agency_id, is_active);
+
+-- Backfill
+
+DELETE FROM entity_directory;
+INSERT INTO entity_directory
+SELECT * FROM entity_directory_source;
+
+-- Maintenance: customers and agencies
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_customer_insert
+AFTER INSERT ON customers
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = 'customer' AND entity_id = NEW.customer_id)
+       OR (entity_type = 'agency' AND entity_id = NEW.agency_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_customer_update
+AFTER UPDATE ON customers
+BEGIN
+    DELETE FROM entity_directory
+    WHERE entity_type = 'customer' AND entity_id = OLD.customer_id;
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = 'customer'
+           AND entity_id IN (OLD.customer_id, NEW.customer_id))
+       OR (entity_type = 'agency'
+           AND entity_id IN (OLD.agency_id, NEW.agency_id));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_customer_delete
+AFTER DELETE ON customers
+BEGIN
+    DELETE FROM entity_directory
+    WHERE entity_type = 'customer' AND entity_id = OLD.customer_id;
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = 'agency' AND entity_id = OLD.agency_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_agency_insert
+AFTER INSERT ON agencies
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = 'agency' AND entity_id = NEW.agency_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_agency_update
+AFTER UPDATE ON agencies
+BEGIN
+    DELETE FROM entity_directory
+    WHERE entity_type = 'agency' AND entity_id = OLD.agency_id;
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = 'agency'
+      AND entity_id IN (OLD.agency_id, NEW.agency_id);
+END;
+
+-- Clients carry their agency's name
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_agency_rename
+AFTER UPDATE OF agency_name ON agencies
+WHEN NEW.agency_name IS NOT OLD.agency_name
+BEGIN
+    UPDATE entity_directory
+    SET agency_name = NEW.agency_name
+    WHERE entity_type = 'customer' AND agency_id = NEW.agency_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_agency_delete
+AFTER DELETE ON agencies
+BEGIN
+    DELETE FROM entity_directory
+    WHERE entity_type = 'agency' AND entity_id = OLD.agency_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_sector_update
+AFTER UPDATE OF sector_name, sector_code ON sectors
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = 'customer'
+           AND entity_id IN (SELECT customer_id FROM customers
+                             WHERE sector_id = NEW.sector_id))
+       OR (entity_type = 'agency'
+           AND entity_id IN (SELECT agency_id FROM customers
+                             WHERE sector_id = NEW.sector_id));
+END;
+
+-- Maintenance: per-entity child rows
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_contact_insert
+AFTER INSERT ON entity_contacts
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_contact_update
+AFTER UPDATE ON entity_contacts
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = OLD.entity_type AND entity_id = OLD.entity_id)
+       OR (entity_type = NEW.entity_type AND entity_id = NEW.entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_contact_delete
+AFTER DELETE ON entity_contacts
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_customer_sector_insert
+AFTER INSERT ON customer_sectors
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = 'customer' AND entity_id = NEW.customer_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_customer_sector_update
+AFTER UPDATE ON customer_sectors
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = 'customer'
+      AND entity_id IN (OLD.customer_id, NEW.customer_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_customer_sector_delete
+AFTER DELETE ON customer_sectors
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = 'customer' AND entity_id = OLD.customer_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_alias_insert
+AFTER INSERT ON entity_aliases
+WHEN NEW.is_active = 1
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = NEW.entity_type
+      AND entity_id = NEW.target_entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_alias_update
+AFTER UPDATE OF alias_name, entity_type, target_entity_id, is_active
+ON entity_aliases
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = OLD.entity_type
+           AND entity_id = OLD.target_entity_id)
+       OR (entity_type = NEW.entity_type
+           AND entity_id = NEW.target_entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_alias_delete
+AFTER DELETE ON entity_aliases
+WHEN OLD.is_active = 1
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = OLD.entity_type
+      AND entity_id = OLD.target_entity_id;
+END;
+
+-- Maintenance: entity caches. The entity cache job rewrites both
+-- tables wholesale; each row re-reads one entity by primary key.
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_metrics_insert
+AFTER INSERT ON entity_metrics
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_metrics_update
+AFTER UPDATE ON entity_metrics
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = OLD.entity_type AND entity_id = OLD.entity_id)
+       OR (entity_type = NEW.entity_type AND entity_id = NEW.entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_metrics_delete
+AFTER DELETE ON entity_metrics
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_signal_insert
+AFTER INSERT ON entity_signals
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_signal_update
+AFTER UPDATE ON entity_signals
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE (entity_type = OLD.entity_type AND entity_id = OLD.entity_id)
+       OR (entity_type = NEW.entity_type AND entity_id = NEW.entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_signal_delete
+AFTER DELETE ON entity_signals
+BEGIN
+    INSERT OR REPLACE INTO entity_directory
+    SELECT * FROM entity_directory_source
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
@@ -0,0 +1,116 @@
+-- 037_entity_directory_filters.sql
+-- Indexes for filtering and paging the address book server-side
+-- (src.services.entity_directory.query_directory).
+--
+-- entity_directory keeps sectors, markets and signals as lists
+-- (sector_ids "3,7", markets "SEA,SFO", signals JSON). entity_directory_tags
+-- holds one row per list element so "entities in market X" is an index
+-- lookup rather than a scan that splits every row:
+--
+--   kind = 'sector'  value = sector_id (customer_sectors; for agencies,
+--                    the sectors of their active clients)
+--   kind = 'market'  value = market name (entity_metrics.markets)
+--   kind = 'signal'  value = signal_type (entity_signals)
+--
+-- Maintained from entity_directory's own changes by the triggers below.
+-- INSERT OR REPLACE into entity_directory does not fire DELETE triggers,
+-- so the insert trigger clears the entity's old tags first.
+
+CREATE TABLE IF NOT EXISTS entity_directory_tags (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, value, entity_type, entity_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_entity_directory_tags_entity
+    ON entity_directory_tags(entity_type, entity_id);
+
+-- Default sort (name) and its keyset continuation
+CREATE INDEX IF NOT EXISTS idx_entity_directory_name_key
+    ON entity_directory(lower(entity_name), entity_type, entity_id);
+CREATE INDEX IF NOT EXISTS idx_entity_directory_ae
+    ON entity_directory(assigned_ae);
+
+-- Backfill
+
+DELETE FROM entity_directory_tags;
+
+INSERT OR IGNORE INTO entity_directory_tags (kind, value, entity_type, entity_id)
+SELECT 'sector', j.value, d.entity_type, d.entity_id
+FROM entity_directory d, json_each('[' || d.sector_ids || ']') j
+WHERE d.sector_ids != '';
+
+INSERT OR IGNORE INTO entity_directory_tags (kind, value, entity_type, entity_id)
+SELECT 'market', j.value, d.entity_type, d.entity_id
+FROM entity_directory d,
+     json_each('["' || replace(replace(replace(d.markets,
+         '\', '\\'), '"', '\"'), ',', '","') || '"]') j
+WHERE d.markets != '';
+
+INSERT OR IGNORE INTO entity_directory_tags (kind, value, entity_type, entity_id)
+SELECT 'signal', json_extract(j.value, '$.signal_type'),
+       d.entity_type, d.entity_id
+FROM entity_directory d, json_each(d.signals) j;
+
+-- Maintenance
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_tags_insert
+AFTER INSERT ON entity_directory
+BEGIN
+    DELETE FROM entity_directory_tags
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+
+    INSERT OR IGNORE INTO entity_directory_tags
+        (kind, value, entity_type, entity_id)
+    SELECT 'sector', j.value, NEW.entity_type, NEW.entity_id
+    FROM json_each('[' || NEW.sector_ids || ']') j
+    WHERE NEW.sector_ids != '';
+
+    INSERT OR IGNORE INTO entity_directory_tags
+        (kind, value, entity_type, entity_id)
+    SELECT 'market', j.value, NEW.entity_type, NEW.entity_id
+    FROM json_each('["' || replace(replace(replace(NEW.markets,
+             '\', '\\'), '"', '\"'), ',', '","') || '"]') j
+    WHERE NEW.markets != '';
+
+    INSERT OR IGNORE INTO entity_directory_tags
+        (kind, value, entity_type, entity_id)
+    SELECT 'signal', json_extract(j.value, '$.signal_type'),
+           NEW.entity_type, NEW.entity_id
+    FROM json_each(NEW.signals) j;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_tags_update
+AFTER UPDATE OF sector_ids, markets, signals ON entity_directory
+BEGIN
+    DELETE FROM entity_directory_tags
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+
+    INSERT OR IGNORE INTO entity_directory_tags
+        (kind, value, entity_type, entity_id)
+    SELECT 'sector', j.value, NEW.entity_type, NEW.entity_id
+    FROM json_each('[' || NEW.sector_ids || ']') j
+    WHERE NEW.sector_ids != '';
+
+    INSERT OR IGNORE INTO entity_directory_tags
+        (kind, value, entity_type, entity_id)
+    SELECT 'market', j.value, NEW.entity_type, NEW.entity_id
+    FROM json_each('["' || replace(replace(replace(NEW.markets,
+             '\', '\\'), '"', '\"'), ',', '","') || '"]') j
+    WHERE NEW.markets != '';
+
+    INSERT OR IGNORE INTO entity_directory_tags
+        (kind, value, entity_type, entity_id)
+    SELECT 'signal', json_extract(j.value, '$.signal_type'),
+           NEW.entity_type, NEW.entity_id
+    FROM json_each(NEW.signals) j;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_directory_tags_delete
+AFTER DELETE ON entity_directory
+BEGIN
+    DELETE FROM entity_directory_tags
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
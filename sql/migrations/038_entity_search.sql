@@ -0,0 +1,303 @@
+-- 038_entity_search.sql
+-- Full-text index for entity lookups (src.services.entity_search).
+--
+-- One FTS5 row per agency and customer with its name, active aliases,
+-- active contacts (name, title, email, phone), addresses (own columns
+-- plus active entity_addresses) and notes. The trigram tokenizer makes
+-- any substring of three or more characters an index lookup, and lets
+-- search_entities() rank near-misses by shared trigrams.
+--
+--   rowid = entity_id * 2 + (entity_type = 'agency')
+--
+-- List columns separate their items with newlines so a phrase never
+-- matches across two aliases or contacts. Maintained by the triggers
+-- below, which re-read only the entities a write touches.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS entity_search USING fts5(
+    entity_type UNINDEXED,
+    entity_id UNINDEXED,
+    is_active UNINDEXED,
+    name,
+    aliases,
+    contacts,
+    addresses,
+    notes,
+    tokenize = 'trigram'
+);
+
+CREATE VIEW IF NOT EXISTS entity_search_source AS
+SELECT
+    a.agency_id * 2 + 1 AS search_rowid,
+    'agency' AS entity_type,
+    a.agency_id AS entity_id,
+    a.is_active,
+    a.agency_name AS name,
+    (SELECT GROUP_CONCAT(ea.alias_name, char(10))
+     FROM entity_aliases ea
+     WHERE ea.entity_type = 'agency' AND ea.target_entity_id = a.agency_id
+       AND ea.is_active = 1) AS aliases,
+    (SELECT GROUP_CONCAT(TRIM(ec.contact_name
+                              || ' ' || COALESCE(ec.contact_title, '')
+                              || ' ' || COALESCE(ec.email, '')
+                              || ' ' || COALESCE(ec.phone, '')), char(10))
+     FROM entity_contacts ec
+     WHERE ec.entity_type = 'agency' AND ec.entity_id = a.agency_id
+       AND ec.is_active = 1) AS contacts,
+    (SELECT GROUP_CONCAT(line, char(10)) FROM (
+         SELECT TRIM(COALESCE(a.address, '') || ' ' || COALESCE(a.city, '')
+                     || ' ' || COALESCE(a.state, '')
+                     || ' ' || COALESCE(a.zip, '')) AS line
+         UNION ALL
+         SELECT TRIM(COALESCE(ad.address, '') || ' ' || COALESCE(ad.city, '')
+                     || ' ' || COALESCE(ad.state, '')
+                     || ' ' || COALESCE(ad.zip, ''))
+         FROM entity_addresses ad
+         WHERE ad.entity_type = 'agency' AND ad.entity_id = a.agency_id
+           AND ad.is_active = 1)
+     WHERE line != '') AS addresses,
+    a.notes
+FROM agencies a
+UNION ALL
+SELECT
+    c.customer_id * 2 AS search_rowid,
+    'customer' AS entity_type,
+    c.customer_id AS entity_id,
+    c.is_active,
+    c.normalized_name AS name,
+    (SELECT GROUP_CONCAT(ea.alias_name, char(10))
+     FROM entity_aliases ea
+     WHERE ea.entity_type = 'customer'
+       AND ea.target_entity_id = c.customer_id
+       AND ea.is_active = 1) AS aliases,
+    (SELECT GROUP_CONCAT(TRIM(ec.contact_name
+                              || ' ' || COALESCE(ec.contact_title, '')
+                              || ' ' || COALESCE(ec.email, '')
+                              || ' ' || COALESCE(ec.phone, '')), char(10))
+     FROM entity_contacts ec
+     WHERE ec.entity_type = 'customer' AND ec.entity_id = c.customer_id
+       AND ec.is_active = 1) AS contacts,
+    (SELECT GROUP_CONCAT(line, char(10)) FROM (
+         SELECT TRIM(COALESCE(c.address, '') || ' ' || COALESCE(c.city, '')
+                     || ' ' || COALESCE(c.state, '')
+                     || ' ' || COALESCE(c.zip, '')) AS line
+         UNION ALL
+         SELECT TRIM(COALESCE(ad.address, '') || ' ' || COALESCE(ad.city, '')
+                     || ' ' || COALESCE(ad.state, '')
+                     || ' ' || COALESCE(ad.zip, ''))
+         FROM entity_addresses ad
+         WHERE ad.entity_type = 'customer' AND ad.entity_id = c.customer_id
+           AND ad.is_active = 1)
+     WHERE line != '') AS addresses,
+    c.notes
+FROM customers c;
+
+-- Per-entity alias lookups (here and in entity_directory_source)
+CREATE INDEX IF NOT EXISTS idx_entity_aliases_target
+    ON entity_aliases(entity_type, target_entity_id);
+
+-- Backfill
+
+DELETE FROM entity_search;
+INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                           name, aliases, contacts, addresses, notes)
+SELECT search_rowid, entity_type, entity_id, is_active,
+       name, aliases, contacts, addresses, notes
+FROM entity_search_source;
+
+-- Maintenance: entities
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_customer_insert
+AFTER INSERT ON customers
+BEGIN
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = 'customer' AND entity_id = NEW.customer_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_customer_update
+AFTER UPDATE OF customer_id, normalized_name, address, city, state, zip,
+                notes, is_active ON customers
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid IN (OLD.customer_id * 2, NEW.customer_id * 2);
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = 'customer' AND entity_id = NEW.customer_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_customer_delete
+AFTER DELETE ON customers
+BEGIN
+    DELETE FROM entity_search WHERE rowid = OLD.customer_id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_agency_insert
+AFTER INSERT ON agencies
+BEGIN
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = 'agency' AND entity_id = NEW.agency_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_agency_update
+AFTER UPDATE OF agency_id, agency_name, address, city, state, zip,
+                notes, is_active ON agencies
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid IN (OLD.agency_id * 2 + 1, NEW.agency_id * 2 + 1);
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = 'agency' AND entity_id = NEW.agency_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_agency_delete
+AFTER DELETE ON agencies
+BEGIN
+    DELETE FROM entity_search WHERE rowid = OLD.agency_id * 2 + 1;
+END;
+
+-- Maintenance: aliases, contacts and addresses refresh their entity
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_alias_insert
+AFTER INSERT ON entity_aliases
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid = NEW.target_entity_id * 2
+                  + (NEW.entity_type = 'agency');
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = NEW.entity_type
+      AND entity_id = NEW.target_entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_alias_update
+AFTER UPDATE OF alias_name, entity_type, target_entity_id, is_active
+ON entity_aliases
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid IN (OLD.target_entity_id * 2 + (OLD.entity_type = 'agency'),
+                    NEW.target_entity_id * 2 + (NEW.entity_type = 'agency'));
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE (entity_type = OLD.entity_type
+           AND entity_id = OLD.target_entity_id)
+       OR (entity_type = NEW.entity_type
+           AND entity_id = NEW.target_entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_alias_delete
+AFTER DELETE ON entity_aliases
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid = OLD.target_entity_id * 2
+                  + (OLD.entity_type = 'agency');
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = OLD.entity_type
+      AND entity_id = OLD.target_entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_contact_insert
+AFTER INSERT ON entity_contacts
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid = NEW.entity_id * 2 + (NEW.entity_type = 'agency');
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_contact_update
+AFTER UPDATE OF entity_type, entity_id, contact_name, contact_title,
+                email, phone, is_active ON entity_contacts
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid IN (OLD.entity_id * 2 + (OLD.entity_type = 'agency'),
+                    NEW.entity_id * 2 + (NEW.entity_type = 'agency'));
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE (entity_type = OLD.entity_type AND entity_id = OLD.entity_id)
+       OR (entity_type = NEW.entity_type AND entity_id = NEW.entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_contact_delete
+AFTER DELETE ON entity_contacts
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid = OLD.entity_id * 2 + (OLD.entity_type = 'agency');
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_address_insert
+AFTER INSERT ON entity_addresses
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid = NEW.entity_id * 2 + (NEW.entity_type = 'agency');
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = NEW.entity_type AND entity_id = NEW.entity_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_address_update
+AFTER UPDATE OF entity_type, entity_id, address, city, state, zip,
+                is_active ON entity_addresses
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid IN (OLD.entity_id * 2 + (OLD.entity_type = 'agency'),
+                    NEW.entity_id * 2 + (NEW.entity_type = 'agency'));
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE (entity_type = OLD.entity_type AND entity_id = OLD.entity_id)
+       OR (entity_type = NEW.entity_type AND entity_id = NEW.entity_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_search_address_delete
+AFTER DELETE ON entity_addresses
+BEGIN
+    DELETE FROM entity_search
+    WHERE rowid = OLD.entity_id * 2 + (OLD.entity_type = 'agency');
+    INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                               name, aliases, contacts, addresses, notes)
+    SELECT search_rowid, entity_type, entity_id, is_active,
+           name, aliases, contacts, addresses, notes
+    FROM entity_search_source
+    WHERE entity_type = OLD.entity_type AND entity_id = OLD.entity_id;
+END;
@@ -0,0 +1,98 @@
+-- 039_entity_signal_queue.sql
+-- Dirty-entity queue for incremental entity_signals refreshes
+-- (EntityMetricsService.refresh_changed_signals).
+--
+-- refresh_signals() recomputes every agency and customer from all spots
+-- and diffs every signal against signal_actions. Most entities have not
+-- changed since the last run, so writes that move revenue now record the
+-- entities they touch here and the refresh recomputes only those:
+--
+--   imports     the import service queues every customer/agency with
+--               spots in the replaced months, before and after the
+--               write (set-based, once per import)
+--   merges,     the triggers below: spots moved to another customer or
+--   aliases     agency, customers moved to another agency, entities
+--               (de)activated
+--
+-- Signals also age without any write (trailing windows move with the
+-- calendar), so the refresh sweeps once a day: entities with spots on a
+-- window boundary that moved since the last sweep, plus every gone_quiet
+-- signal, and a full refresh when the month changes.
+-- entity_signal_sweep records the last sweep date.
+--
+-- Each newly dirty entity also queues one refresh_signals background job
+-- (deduplicated by job_key), so the worker drains the queue after
+-- whichever write path filled it.
+
+CREATE TABLE IF NOT EXISTS entity_signal_dirty (
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity_type, entity_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS entity_signal_sweep (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    swept_on DATE
+);
+
+INSERT OR IGNORE INTO entity_signal_sweep (id, swept_on) VALUES (1, NULL);
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_signal_dirty_job
+AFTER INSERT ON entity_signal_dirty
+BEGIN
+    INSERT OR IGNORE INTO background_jobs (job_type, job_key, created_by)
+    VALUES ('refresh_signals', 'entity_signals', 'signal_queue');
+END;
+
+-- Spots moved between customers (merges, alias backfill, customer
+-- alignment). Agencies are dirtied through customers.agency_id because
+-- renewal_gap reads agency revenue through the agency's clients.
+CREATE TRIGGER IF NOT EXISTS trg_entity_signal_dirty_spot_customer
+AFTER UPDATE OF customer_id ON spots
+WHEN NEW.customer_id IS NOT OLD.customer_id
+BEGIN
+    INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+    SELECT 'customer', customer_id FROM customers
+    WHERE customer_id IN (OLD.customer_id, NEW.customer_id);
+    INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+    SELECT 'agency', agency_id FROM customers
+    WHERE customer_id IN (OLD.customer_id, NEW.customer_id)
+      AND agency_id IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_signal_dirty_spot_agency
+AFTER UPDATE OF agency_id ON spots
+WHEN NEW.agency_id IS NOT OLD.agency_id
+BEGIN
+    INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+    SELECT 'agency', agency_id FROM agencies
+    WHERE agency_id IN (OLD.agency_id, NEW.agency_id);
+END;
+
+-- Customers moved between agencies (agency merges)
+CREATE TRIGGER IF NOT EXISTS trg_entity_signal_dirty_customer_agency
+AFTER UPDATE OF agency_id ON customers
+WHEN NEW.agency_id IS NOT OLD.agency_id
+BEGIN
+    INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+    SELECT 'agency', agency_id FROM agencies
+    WHERE agency_id IN (OLD.agency_id, NEW.agency_id);
+END;
+
+-- renewal_gap only covers active entities
+CREATE TRIGGER IF NOT EXISTS trg_entity_signal_dirty_customer_active
+AFTER UPDATE OF is_active ON customers
+WHEN NEW.is_active IS NOT OLD.is_active
+BEGIN
+    INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+    VALUES ('customer', NEW.customer_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_entity_signal_dirty_agency_active
+AFTER UPDATE OF is_active ON agencies
+WHEN NEW.is_active IS NOT OLD.is_active
+BEGIN
+    INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+    VALUES ('agency', NEW.agency_id);
+END;
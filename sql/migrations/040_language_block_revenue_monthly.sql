@@ -0,0 +1,109 @@
+-- 040_language_block_revenue_monthly.sql
+-- Physical copy of the language_block_revenue_summary view, one row per
+-- (block, market, year_month), for the /api/language-blocks endpoints.
+--
+-- The view aggregates spots_with_language_blocks_enhanced (spots joined
+-- to customers, markets, languages, schedules and blocks) with
+-- COUNT(DISTINCT ...), and every endpoint re-evaluated it, several
+-- times for /insights and /report. The endpoints now read this table
+-- (see src/services/language_block_summary.py) and fall back to the
+-- view without it.
+--
+-- Rows are recomputed a month at a time from the months queued in
+-- language_block_summary_dirty:
+--
+--   imports      queue the calendar months of every spot in the
+--                replaced broadcast months, before and after the write
+--   assignments  the spot_language_blocks triggers below queue the
+--                month of each spot (re)assigned to a block
+--   blocks       edits to a language block queue the months it has
+--                spots in
+--
+-- Each newly queued month also queues one refresh_block_summary
+-- background job (deduplicated by job_key) which drains the queue.
+
+CREATE TABLE IF NOT EXISTS language_block_revenue_monthly (
+    block_id INTEGER NOT NULL,
+    block_name TEXT,
+    language_id INTEGER,
+    language_name TEXT,
+    schedule_id INTEGER,
+    schedule_name TEXT,
+    market_code TEXT,
+    market_display_name TEXT,
+    block_type TEXT,
+    day_part TEXT,
+    time_start TIME,
+    time_end TIME,
+    total_spots INTEGER NOT NULL DEFAULT 0,
+    unique_customers INTEGER NOT NULL DEFAULT 0,
+    total_revenue REAL,
+    avg_spot_revenue REAL,
+    first_air_date DATE,
+    last_air_date DATE,
+    year TEXT,
+    year_month TEXT,
+    is_active BOOLEAN
+);
+
+CREATE INDEX IF NOT EXISTS idx_lb_revenue_monthly_year_month
+    ON language_block_revenue_monthly(year_month, block_id, market_code);
+
+CREATE INDEX IF NOT EXISTS idx_lb_revenue_monthly_year
+    ON language_block_revenue_monthly(year);
+
+CREATE TABLE IF NOT EXISTS language_block_summary_dirty (
+    year_month TEXT PRIMARY KEY,
+    queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+-- Backfill
+
+DELETE FROM language_block_revenue_monthly;
+INSERT INTO language_block_revenue_monthly
+SELECT * FROM language_block_revenue_summary;
+
+-- Maintenance
+
+CREATE TRIGGER IF NOT EXISTS trg_block_summary_dirty_job
+AFTER INSERT ON language_block_summary_dirty
+BEGIN
+    INSERT OR IGNORE INTO background_jobs (job_type, job_key, created_by)
+    VALUES ('refresh_block_summary', 'language_block_summary',
+            'block_summary_queue');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_block_summary_dirty_assign
+AFTER INSERT ON spot_language_blocks
+BEGIN
+    INSERT OR IGNORE INTO language_block_summary_dirty (year_month)
+    SELECT strftime('%Y-%m', air_date) FROM spots
+    WHERE spot_id = NEW.spot_id AND air_date IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_block_summary_dirty_reassign
+AFTER UPDATE OF spot_id, block_id ON spot_language_blocks
+WHEN NEW.block_id IS NOT OLD.block_id OR NEW.spot_id IS NOT OLD.spot_id
+BEGIN
+    INSERT OR IGNORE INTO language_block_summary_dirty (year_month)
+    SELECT strftime('%Y-%m', air_date) FROM spots
+    WHERE spot_id IN (OLD.spot_id, NEW.spot_id) AND air_date IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_block_summary_dirty_unassign
+AFTER DELETE ON spot_language_blocks
+BEGIN
+    INSERT OR IGNORE INTO language_block_summary_dirty (year_month)
+    SELECT strftime('%Y-%m', air_date) FROM spots
+    WHERE spot_id = OLD.spot_id AND air_date IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_block_summary_dirty_block
+AFTER UPDATE ON language_blocks
+BEGIN
+    INSERT OR IGNORE INTO language_block_summary_dirty (year_month)
+    SELECT DISTINCT strftime('%Y-%m', s.air_date)
+    FROM spot_language_blocks slb
+    JOIN spots s ON s.spot_id = slb.spot_id
+    WHERE slb.block_id = NEW.block_id AND s.air_date IS NOT NULL;
+END;
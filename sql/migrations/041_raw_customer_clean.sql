@@ -0,0 +1,147 @@
+-- 041_raw_customer_clean.sql
+-- One row per raw_customer_inputs.raw_text with its cleaned text and the
+-- bill code segments the canon tools match on:
+--
+--   cleaned        v_raw_clean.cleaned (text_strips needles removed,
+--                  runs of spaces collapsed)
+--   agency1        segment before the first ':' (NULL without one)
+--   agency2        second segment, when followed by another ':'
+--   customer_tail  last segment as the customer preview sees it: after
+--                  the second ':' (or the first, or the whole text),
+--                  with a trailing PROD/PRODUCTION suffix removed
+--
+-- The canon tool previews re-ran v_raw_clean (five REPLACEs with
+-- text_strips subqueries per row) on every call and matched it with
+-- leading-wildcard LIKEs; they now count index hits on the NOCASE
+-- segment indexes. v_raw_clean reads this table, so
+-- v_normalized_candidates and v_customer_normalization_audit stop
+-- re-cleaning every input as well. raw_customer_clean_source holds the
+-- original cleaning logic.
+--
+-- Maintained by the triggers below: raw_customer_inputs writes
+-- (daily/closed imports add new bill codes) recompute their row, and
+-- text_strips writes recompute every row.
+
+CREATE VIEW IF NOT EXISTS raw_customer_clean_source AS
+WITH stripped AS (
+  SELECT
+    r.raw_text,
+    TRIM(
+      REPLACE(
+      REPLACE(
+      REPLACE(
+      REPLACE(
+      REPLACE(r.raw_text,
+        (SELECT needle FROM text_strips WHERE needle=' (Broker Fees  - DO NOT INVOICE)'), ''),
+        (SELECT needle FROM text_strips WHERE needle=' (Broker Fees - DO NOT INVOICE)'), ''),
+        (SELECT needle FROM text_strips WHERE needle=' (Broker Costs - DO NOT INVOICE)'), ''),
+        (SELECT needle FROM text_strips WHERE needle=' (BROKER COSTS - DO NOT INVOICE)'), ''),
+        (SELECT needle FROM text_strips WHERE needle=' CREDIT MEMO'), '')
+    ) AS cleaned
+  FROM raw_customer_inputs r
+),
+collapsed AS (
+  SELECT
+    raw_text,
+    TRIM(
+      REPLACE(REPLACE(REPLACE(cleaned, '  ', ' '), '  ', ' '), '  ', ' ')
+    ) AS cleaned
+  FROM stripped
+),
+split AS (
+  SELECT raw_text, cleaned,
+         INSTR(cleaned, ':') AS pos1,
+         SUBSTR(cleaned, INSTR(cleaned, ':') + 1) AS rest
+  FROM collapsed
+)
+SELECT
+  raw_text,
+  cleaned,
+  CASE WHEN pos1 > 0 THEN SUBSTR(cleaned, 1, pos1 - 1) END AS agency1,
+  CASE WHEN pos1 > 0 AND INSTR(rest, ':') > 0
+       THEN SUBSTR(rest, 1, INSTR(rest, ':') - 1) END AS agency2,
+  RTRIM(
+    REPLACE(REPLACE(REPLACE(REPLACE(
+      CASE
+        WHEN pos1 = 0 THEN cleaned
+        ELSE SUBSTR(cleaned, pos1 + 1 + INSTR(rest, ':'))
+      END || '|',
+      ' PRODUCTION|','|'),' PROD|','|'),'- PRODUCTION|','|'),'- PROD|','|'
+    ),'|'
+  ) AS customer_tail
+FROM split;
+
+CREATE TABLE IF NOT EXISTS raw_customer_clean (
+  raw_text TEXT PRIMARY KEY,
+  cleaned TEXT,
+  agency1 TEXT,
+  agency2 TEXT,
+  customer_tail TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_raw_customer_clean_agency1
+    ON raw_customer_clean(agency1 COLLATE NOCASE)
+    WHERE agency1 IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_raw_customer_clean_agency2
+    ON raw_customer_clean(agency2 COLLATE NOCASE)
+    WHERE agency2 IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_raw_customer_clean_customer_tail
+    ON raw_customer_clean(customer_tail COLLATE NOCASE);
+
+-- Backfill
+
+DELETE FROM raw_customer_clean;
+INSERT INTO raw_customer_clean
+SELECT * FROM raw_customer_clean_source;
+
+-- Normalization views read the table
+
+DROP VIEW IF EXISTS v_raw_clean;
+CREATE VIEW v_raw_clean AS
+SELECT raw_text, cleaned FROM raw_customer_clean;
+
+-- Maintenance
+
+CREATE TRIGGER IF NOT EXISTS trg_raw_customer_clean_insert
+AFTER INSERT ON raw_customer_inputs
+BEGIN
+    INSERT OR REPLACE INTO raw_customer_clean
+    SELECT * FROM raw_customer_clean_source WHERE raw_text = NEW.raw_text;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_raw_customer_clean_update
+AFTER UPDATE OF raw_text ON raw_customer_inputs
+BEGIN
+    DELETE FROM raw_customer_clean WHERE raw_text = OLD.raw_text;
+    INSERT OR REPLACE INTO raw_customer_clean
+    SELECT * FROM raw_customer_clean_source WHERE raw_text = NEW.raw_text;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_raw_customer_clean_delete
+AFTER DELETE ON raw_customer_inputs
+BEGIN
+    DELETE FROM raw_customer_clean WHERE raw_text = OLD.raw_text;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_raw_customer_clean_strips_insert
+AFTER INSERT ON text_strips
+BEGIN
+    DELETE FROM raw_customer_clean;
+    INSERT INTO raw_customer_clean SELECT * FROM raw_customer_clean_source;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_raw_customer_clean_strips_update
+AFTER UPDATE ON text_strips
+BEGIN
+    DELETE FROM raw_customer_clean;
+    INSERT INTO raw_customer_clean SELECT * FROM raw_customer_clean_source;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_raw_customer_clean_strips_delete
+AFTER DELETE ON text_strips
+BEGIN
+    DELETE FROM raw_customer_clean;
+    INSERT INTO raw_customer_clean SELECT * FROM raw_customer_clean_source;
+END;
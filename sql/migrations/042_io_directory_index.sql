@@ -0,0 +1,31 @@
+-- 042_io_directory_index.sql
+-- Directory index of the insertion-order share (K drive), one row per
+-- folder and file, so the pending-orders panel, the IO browser and the
+-- scanner stop listing and stat-ing the whole tree (a network round trip
+-- per call on the mounted share) on every request:
+--
+--   path              absolute path on the share
+--   parent            containing directory
+--   is_dir            1 for folders
+--   mtime             files: modification time; folders: the folder's
+--                     mtime when its listing was last indexed
+--   size              file size in bytes (NULL for folders)
+--   contract/customer folders: parse_folder_name() of the folder name
+--
+-- Refreshed incrementally by src/services/io_index.py: a folder is
+-- relisted only when its mtime differs from the indexed one.
+
+CREATE TABLE IF NOT EXISTS io_directory_index (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    mtime REAL,
+    size INTEGER,
+    contract TEXT,
+    customer TEXT,
+    indexed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_io_directory_index_parent
+    ON io_directory_index(parent, is_dir, name);
@@ -0,0 +1,96 @@
+-- 043_spot_catalog.sql
+-- Small spot-derived tables for pages that only need what data exists
+-- or a year of revenue per customer, so they stop scanning spots on
+-- every request (see src/services/spot_catalog.py):
+--
+--   spot_catalog            one row per (broadcast_month, sales_person)
+--                           with its spot count: available years,
+--                           months and AE names ('' for no AE)
+--   customer_month_revenue  non-Trade gross (cents) and spot count per
+--                           (broadcast_month, customer) for resolved
+--                           spots: the Revenue Classification Manager
+--                           joins it to customers for class, sector and
+--                           AE, so edits to those apply immediately
+--
+-- Imports recompute the broadcast months they replace, inside the
+-- import transaction (refresh_spot_catalog). spots has no insert or
+-- delete triggers here for the same reason as migration 029; the one
+-- trigger below moves revenue when an existing spot changes customer,
+-- month, rate or revenue type outside an import (merges, alias
+-- backfills, customer resolution). Spots inserted by the current
+-- bulk alias session (migration 035) are skipped: the import that
+-- inserted them recomputes their months.
+
+CREATE TABLE IF NOT EXISTS spot_catalog (
+    broadcast_month TEXT NOT NULL,
+    sales_person TEXT NOT NULL,
+    spot_count INTEGER NOT NULL,
+    PRIMARY KEY (broadcast_month, sales_person)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS customer_month_revenue (
+    broadcast_month TEXT NOT NULL,
+    customer_id INTEGER NOT NULL,
+    gross_cents INTEGER NOT NULL DEFAULT 0,
+    spot_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (broadcast_month, customer_id)
+) WITHOUT ROWID;
+
+-- Backfill
+
+DELETE FROM spot_catalog;
+INSERT INTO spot_catalog (broadcast_month, sales_person, spot_count)
+SELECT broadcast_month, COALESCE(sales_person, ''), COUNT(*)
+FROM spots
+WHERE broadcast_month IS NOT NULL
+GROUP BY broadcast_month, COALESCE(sales_person, '');
+
+DELETE FROM customer_month_revenue;
+INSERT INTO customer_month_revenue
+    (broadcast_month, customer_id, gross_cents, spot_count)
+SELECT broadcast_month, customer_id,
+       SUM(CAST(ROUND(COALESCE(gross_rate, 0) * 100) AS INTEGER)), COUNT(*)
+FROM spots
+WHERE broadcast_month IS NOT NULL
+  AND customer_id IS NOT NULL
+  AND (revenue_type != 'Trade' OR revenue_type IS NULL)
+GROUP BY broadcast_month, customer_id;
+
+-- Maintenance
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_month_revenue_spot_update
+AFTER UPDATE OF customer_id, broadcast_month, gross_rate, revenue_type
+ON spots
+WHEN (OLD.customer_id IS NOT NEW.customer_id
+      OR OLD.broadcast_month IS NOT NEW.broadcast_month
+      OR OLD.gross_rate IS NOT NEW.gross_rate
+      OR OLD.revenue_type IS NOT NEW.revenue_type)
+  AND NOT EXISTS (
+      SELECT 1 FROM alias_backfill_session
+      WHERE NEW.spot_id > spot_watermark
+  )
+BEGIN
+    UPDATE customer_month_revenue
+    SET gross_cents = gross_cents
+            - CAST(ROUND(COALESCE(OLD.gross_rate, 0) * 100) AS INTEGER),
+        spot_count = spot_count - 1
+    WHERE broadcast_month = OLD.broadcast_month
+      AND customer_id = OLD.customer_id
+      AND (OLD.revenue_type != 'Trade' OR OLD.revenue_type IS NULL);
+
+    DELETE FROM customer_month_revenue
+    WHERE broadcast_month = OLD.broadcast_month
+      AND customer_id = OLD.customer_id
+      AND spot_count <= 0;
+
+    INSERT INTO customer_month_revenue
+        (broadcast_month, customer_id, gross_cents, spot_count)
+    SELECT NEW.broadcast_month, NEW.customer_id,
+           CAST(ROUND(COALESCE(NEW.gross_rate, 0) * 100) AS INTEGER), 1
+    WHERE NEW.broadcast_month IS NOT NULL
+      AND NEW.customer_id IS NOT NULL
+      AND (NEW.revenue_type != 'Trade' OR NEW.revenue_type IS NULL)
+    ON CONFLICT (broadcast_month, customer_id) DO UPDATE SET
+        gross_cents = gross_cents + excluded.gross_cents,
+        spot_count = spot_count + 1;
+END;
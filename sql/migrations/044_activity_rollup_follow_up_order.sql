@@ -0,0 +1,41 @@
+-- 044_activity_rollup_follow_up_order.sql
+-- Restores the CRM account list's next follow-up order from before
+-- migration 032: open follow-ups with no due date come first (SQLite
+-- sorts NULL before any date), then the earliest due date. Migration
+-- 032 had moved undated follow-ups last.
+--
+-- next_follow_up_date is therefore no longer the earliest open due
+-- date, so overdue status is read from the open follow-up index
+-- (idx_entity_activity_open_follow_ups) instead of the rollup.
+
+DROP VIEW IF EXISTS entity_activity_rollup_source;
+CREATE VIEW entity_activity_rollup_source AS
+SELECT
+    ea.entity_type,
+    ea.entity_id,
+    MAX(ea.activity_date) AS last_activity_date,
+    MAX(CASE WHEN ea.activity_type IN ('note', 'call', 'email', 'meeting')
+             THEN ea.activity_date END) AS last_touch_date,
+    nf.activity_id AS next_follow_up_id,
+    nf.due_date AS next_follow_up_date,
+    nf.description AS next_follow_up_desc,
+    SUM(CASE WHEN ea.activity_type = 'follow_up' AND ea.is_completed = 0
+             THEN 1 ELSE 0 END) AS open_follow_ups
+FROM entity_activity ea
+LEFT JOIN entity_activity nf ON nf.activity_id = (
+    SELECT f.activity_id
+    FROM entity_activity f
+    WHERE f.entity_type = ea.entity_type
+      AND f.entity_id = ea.entity_id
+      AND f.activity_type = 'follow_up'
+      AND f.is_completed = 0
+    ORDER BY f.due_date IS NOT NULL, f.due_date, f.activity_id
+    LIMIT 1
+)
+GROUP BY ea.entity_type, ea.entity_id;
+
+-- Backfill
+
+DELETE FROM entity_activity_rollup;
+INSERT INTO entity_activity_rollup
+SELECT * FROM entity_activity_rollup_source;
@@ -1,17 +1,72 @@
 """Database connection and transaction management - ENHANCED."""
 
+import os
 import sqlite3
 from contextlib import contextmanager
 import logging
+from typing import Callable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Process-wide statement observers (benchmarks, import phase timing).
+# Empty in normal operation, so connections pay nothing for the hook.
+_trace_callbacks: List[Callable[[str], None]] = []
+
+
+def add_trace_callback(callback: Callable[[str], None]) -> None:
+    """Register a callback invoked with every SQL statement executed."""
+    _trace_callbacks.append(callback)
+
+
+def remove_trace_callback(callback: Callable[[str], None]) -> None:
+    """Unregister a callback added with add_trace_callback()."""
+    try:
+        _trace_callbacks.remove(callback)
+    except ValueError:
+        pass
+
+
+def _dispatch_trace(statement: str) -> None:
+    for callback in list(_trace_callbacks):
+        callback(statement)
+
+
+def _attach_tracing(conn: sqlite3.Connection) -> None:
+    if _trace_callbacks:
+        conn.set_trace_callback(_dispatch_trace)
+
+
+class StatementCounter:
+    """Counts SQL statements run through DatabaseConnection while active.
+
+    Usage:
+        with StatementCounter() as counter:
+            service.do_work()
+        print(counter.count)
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_statement(self, statement: str) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "StatementCounter":
+        add_trace_callback(self._on_statement)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        remove_trace_callback(self._on_statement)
+
 
 class DatabaseConnection:
     """ENHANCED: Manages database connections with proper transaction handling and SQLite optimization."""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, read_replica_path: Optional[str] = None):
         self.db_path = db_path
+        # Snapshot of db_path refreshed after each committed import; see
+        # refresh_read_replica(). None disables replica routing.
+        self.read_replica_path = read_replica_path
         self._connection = None
         self._is_configured = False
 
@@ -22,6 +77,7 @@ class DatabaseConnection:
 
         # CRITICAL: Apply optimal settings to EVERY connection
         self._apply_sqlite_settings(conn)
+        _attach_tracing(conn)
 
         return conn
 
@@ -73,9 +129,24 @@ class DatabaseConnection:
             conn.close()
 
     @contextmanager
-    def connection_ro(self):
-        """Context manager for read-only connection."""
-        uri = f"file:{self.db_path}?mode=ro"
+    def connection_ro(self, replica: bool = False):
+        """Context manager for read-only connection.
+
+        With replica=True the connection opens the read replica snapshot
+        when one is configured and exists, so analytics never share the
+        primary's page cache or wait on an import's write lock. Replica
+        data is as of the last committed import: only use it for
+        spot-derived reads, never to read back a user's own writes.
+        Falls back to the primary otherwise.
+        """
+        if replica and self.read_replica_path and os.path.exists(
+            self.read_replica_path
+        ):
+            # The snapshot file is only ever replaced, never written in
+            # place, so immutable=1 (no locking) is safe.
+            uri = f"file:{self.read_replica_path}?mode=ro&immutable=1"
+        else:
+            uri = f"file:{self.db_path}?mode=ro"
         conn = sqlite3.connect(uri, uri=True, timeout=5.0)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA busy_timeout=30000")
@@ -83,11 +154,57 @@ class DatabaseConnection:
         conn.execute("PRAGMA cache_size=10000")
         conn.execute("PRAGMA temp_store=MEMORY")
         conn.execute("PRAGMA query_only = 1")
+        _attach_tracing(conn)
         try:
             yield conn
         finally:
             conn.close()
 
+    def refresh_read_replica(self) -> bool:
+        """Rebuild the read replica snapshot from the primary.
+
+        Writes a consistent copy with VACUUM INTO next to the replica and
+        atomically renames it into place, so readers see either the old
+        or the new snapshot, never a partial one. Open replica connections
+        keep reading the old file until they close.
+
+        Returns False (and logs) when no replica is configured or the copy
+        fails; the primary is never affected.
+        """
+        if not self.read_replica_path:
+            return False
+
+        tmp_path = f"{self.read_replica_path}.tmp"
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            src = sqlite3.connect(self.db_path, timeout=30.0)
+            try:
+                src.execute("PRAGMA busy_timeout=30000")
+                src.execute("VACUUM INTO ?", (tmp_path,))
+            finally:
+                src.close()
+
+            # Readers open the snapshot read-only; a WAL-mode file would
+            # need a writable -shm beside it.
+            snap = sqlite3.connect(tmp_path)
+            try:
+                snap.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                snap.close()
+
+            os.replace(tmp_path, self.read_replica_path)
+            logger.info(f"Read replica refreshed: {self.read_replica_path}")
+            return True
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Read replica refresh failed: {e}")
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
     def close(self):
         """Close database connection - handles already closed connections."""
         if self._connection:
@@ -9,6 +9,9 @@ month closures and simplifies the data model.
 
 Uses shared utilities from src/utils/ to eliminate code duplication.
 
+Every section is sliced from one RevenueCube (utils/revenue_cube.py),
+so a report reads spots once whatever the year range.
+
 Key Changes from Previous Version:
 - Queries spots.language_code directly (no JOIN to spot_language_assignments)
 - Applies language grouping logic in SQL
@@ -28,6 +31,12 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from utils.date_range_utils import DateRangeUtils
 from utils.language_constants import LanguageConstants
 from utils.query_builders import BroadcastMonthQueryBuilder
+from utils.revenue_cube import (
+    INTERNAL_AD_SALES,
+    REPORT_SPOT_TYPES,
+    CubeCell,
+    RevenueCube,
+)
 
 
 @dataclass
@@ -81,6 +90,7 @@ class MarketAnalysisEngine:
     def __init__(self, db_path: str = "data/database/production.db"):
         self.db_path = db_path
         self.db_connection = None
+        self._revenue_cube = None
 
     def __enter__(self):
         self.db_connection = sqlite3.connect(self.db_path)
@@ -90,21 +100,21 @@ class MarketAnalysisEngine:
         if self.db_connection:
             self.db_connection.close()
 
-    def _build_language_group_case(self) -> str:
-        """Build SQL CASE statement for language grouping."""
-        return LanguageConstants.build_language_case_sql(
-            table_alias="s",
-            else_label="Other",
-        )
-
-    def _build_market_case(self) -> str:
-        """Build SQL CASE statement for market consolidation (CHI+CMP+MSP -> CMP)."""
-        return """
-            CASE 
-                WHEN UPPER(COALESCE(s.market_name, 'Unknown')) IN ('CHI', 'CMP', 'MSP') THEN 'CMP'
-                ELSE COALESCE(s.market_name, 'Unknown')
-            END
-        """
+    def _cube(self) -> RevenueCube:
+        """Spot totals for every section, read in one pass per engine."""
+        if self._revenue_cube is None:
+            self._revenue_cube = RevenueCube.from_connection(self.db_connection)
+        return self._revenue_cube
+
+    def _report_cells(self, year_suffixes: List[str]) -> List[CubeCell]:
+        """Internal Ad Sales COM/BNS spots with a language code."""
+        return [
+            c for c in self._cube().select(
+                year_suffixes, revenue_type=INTERNAL_AD_SALES,
+                spot_types=REPORT_SPOT_TYPES,
+            )
+            if c.language_code
+        ]
 
     def parse_year_range(self, year_input: str) -> Tuple[List[str], List[str]]:
         """Parse year input using shared utility."""
@@ -117,47 +127,28 @@ class MarketAnalysisEngine:
     def get_language_performance_summary(
         self, year_input: str = "2024"
     ) -> List[LanguageResult]:
-        """Get language performance summary querying spots.language_code directly."""
+        """Get language performance summary from spots.language_code."""
         full_years, year_suffixes = self.parse_year_range(year_input)
-        year_filter, year_params = self.build_year_filter(year_suffixes)
-
-        language_group = self._build_language_group_case()
-
-        query = f"""
-        SELECT 
-            {language_group} as language_group,
-            SUM(COALESCE(s.gross_rate, 0)) as revenue,
-            COUNT(CASE WHEN s.spot_type != 'BNS' OR s.spot_type IS NULL THEN 1 END) as paid_spots,
-            COUNT(CASE WHEN s.spot_type = 'BNS' THEN 1 END) as bonus_spots,
-            COUNT(*) as total_spots
-        FROM spots s
-        WHERE {year_filter}
-        AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-        AND s.revenue_type = 'Internal Ad Sales'
-        AND s.spot_type IN ('COM', 'BNS')
-        AND s.language_code IS NOT NULL
-        AND TRIM(s.language_code) != ''
-        GROUP BY {language_group}
-        HAVING SUM(COALESCE(s.gross_rate, 0)) > 0 OR COUNT(*) > 0
-        ORDER BY SUM(COALESCE(s.gross_rate, 0)) DESC
-        """
-
-        cursor = self.db_connection.cursor()
-        cursor.execute(query, year_params)
+        cube = self._cube()
+        groups = cube.group(
+            self._report_cells(year_suffixes),
+            lambda c: cube.language_group(c.language_code),
+        )
 
         results = []
         total_revenue = 0
 
-        for row in cursor.fetchall():
-            language, revenue, paid_spots, bonus_spots, total_spots = row
+        for language, totals in groups.items():
+            revenue = totals["revenue"]
+            total_spots = totals["total_spots"]
             total_revenue += revenue
             results.append(
                 LanguageResult(
                     name=language,
                     revenue=revenue,
                     percentage=0,
-                    paid_spots=paid_spots,
-                    bonus_spots=bonus_spots,
+                    paid_spots=totals["paid_spots"],
+                    bonus_spots=totals["bonus_spots"],
                     total_spots=total_spots,
                     avg_per_spot=revenue / total_spots if total_spots > 0 else 0,
                 )
@@ -175,40 +166,23 @@ class MarketAnalysisEngine:
     ) -> List[MarketLanguageResult]:
         """Get language performance broken down by market."""
         full_years, year_suffixes = self.parse_year_range(year_input)
-        year_filter, year_params = self.build_year_filter(year_suffixes)
-
-        language_group = self._build_language_group_case()
-        market_case = self._build_market_case()
-
-        query = f"""
-        SELECT 
-            {language_group} as language_group,
-            {market_case} as market,
-            SUM(COALESCE(s.gross_rate, 0)) as revenue,
-            COUNT(CASE WHEN s.spot_type != 'BNS' OR s.spot_type IS NULL THEN 1 END) as paid_spots,
-            COUNT(CASE WHEN s.spot_type = 'BNS' THEN 1 END) as bonus_spots,
-            COUNT(*) as total_spots
-        FROM spots s
-        WHERE {year_filter}
-        AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-        AND s.revenue_type = 'Internal Ad Sales'
-        AND s.spot_type IN ('COM', 'BNS')
-        AND s.language_code IS NOT NULL
-        AND TRIM(s.language_code) != ''
-        GROUP BY {language_group}, {market_case}
-        HAVING SUM(COALESCE(s.gross_rate, 0)) > 0 OR COUNT(*) > 0
-        ORDER BY {language_group}, SUM(COALESCE(s.gross_rate, 0)) DESC
-        """
-
-        cursor = self.db_connection.cursor()
-        cursor.execute(query, year_params)
+        cube = self._cube()
+        groups = cube.group(
+            self._report_cells(year_suffixes),
+            lambda c: (cube.language_group(c.language_code),
+                       cube.market_group(c.market_name)),
+        )
 
         results = []
         language_totals = {}
         market_totals = {}
 
-        for row in cursor.fetchall():
-            language, market, revenue, paid_spots, bonus_spots, total_spots = row
+        # By language, then revenue descending (group() is stable)
+        for (language, market), totals in sorted(
+            groups.items(), key=lambda kv: kv[0][0]
+        ):
+            revenue = totals["revenue"]
+            total_spots = totals["total_spots"]
 
             if language not in language_totals:
                 language_totals[language] = 0
@@ -225,8 +199,8 @@ class MarketAnalysisEngine:
                     revenue=revenue,
                     percentage_of_language=0,
                     percentage_of_market=0,
-                    paid_spots=paid_spots,
-                    bonus_spots=bonus_spots,
+                    paid_spots=totals["paid_spots"],
+                    bonus_spots=totals["bonus_spots"],
                     total_spots=total_spots,
                     avg_per_spot=revenue / total_spots if total_spots > 0 else 0,
                 )
@@ -293,61 +267,34 @@ class MarketAnalysisEngine:
     def get_revenue_context(self, year_input: str = "2024") -> Dict[str, float]:
         """Get revenue totals at each filter level for context."""
         full_years, year_suffixes = self.parse_year_range(year_input)
-        year_filter, year_params = self.build_year_filter(year_suffixes)
-
-        cursor = self.db_connection.cursor()
+        cube = self._cube()
+        cells = cube.select(year_suffixes)
 
         # Total gross (excluding Trade)
-        cursor.execute(
-            f"""
-            SELECT SUM(COALESCE(gross_rate, 0))
-            FROM spots s
-            WHERE {year_filter}
-            AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-        """,
-            year_params,
-        )
-        total_gross = cursor.fetchone()[0] or 0
+        total_gross = cube.totals(cells)["revenue"]
 
         # Internal Ad Sales only
-        cursor.execute(
-            f"""
-            SELECT SUM(COALESCE(gross_rate, 0))
-            FROM spots s
-            WHERE {year_filter}
-            AND revenue_type = 'Internal Ad Sales'
-        """,
-            year_params,
-        )
-        internal_ad_sales = cursor.fetchone()[0] or 0
+        internal_ad_sales = cube.totals(
+            c for c in cells if c.revenue_type == INTERNAL_AD_SALES
+        )["revenue"]
 
         # Internal Ad Sales + COM/BNS (what the report analyzes)
-        cursor.execute(
-            f"""
-            SELECT SUM(COALESCE(gross_rate, 0))
-            FROM spots s
-            WHERE {year_filter}
-            AND revenue_type = 'Internal Ad Sales'
-            AND spot_type IN ('COM', 'BNS')
-        """,
-            year_params,
-        )
-        report_scope = cursor.fetchone()[0] or 0
+        report_scope = cube.totals(
+            c for c in cells
+            if c.revenue_type == INTERNAL_AD_SALES
+            and c.spot_type in REPORT_SPOT_TYPES
+        )["revenue"]
 
         # Other revenue types breakdown
-        cursor.execute(
-            f"""
-            SELECT revenue_type, SUM(COALESCE(gross_rate, 0)) as revenue
-            FROM spots s
-            WHERE {year_filter}
-            AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-            AND revenue_type != 'Internal Ad Sales'
-            GROUP BY revenue_type
-            ORDER BY revenue DESC
-        """,
-            year_params,
-        )
-        other_types = {row[0]: row[1] for row in cursor.fetchall()}
+        other_types = {
+            revenue_type: totals["revenue"]
+            for revenue_type, totals in cube.group(
+                (c for c in cells
+                 if c.revenue_type is not None
+                 and c.revenue_type != INTERNAL_AD_SALES),
+                lambda c: c.revenue_type,
+            ).items()
+        }
 
         return {
             "total_gross": total_gross,
@@ -362,31 +309,21 @@ class MarketAnalysisEngine:
     ) -> Dict[str, Any]:
         """Get raw language code distribution for diagnostics."""
         full_years, year_suffixes = self.parse_year_range(year_input)
-        year_filter, year_params = self.build_year_filter(year_suffixes)
-
-        query = f"""
-        SELECT 
-            UPPER(TRIM(s.language_code)) as code,
-            COUNT(*) as spots,
-            SUM(COALESCE(s.gross_rate, 0)) as revenue
-        FROM spots s
-        WHERE {year_filter}
-        AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-        AND s.revenue_type = 'Internal Ad Sales'
-        AND s.spot_type IN ('COM', 'BNS')
-        GROUP BY UPPER(TRIM(s.language_code))
-        ORDER BY SUM(COALESCE(s.gross_rate, 0)) DESC
-        """
-
-        cursor = self.db_connection.cursor()
-        cursor.execute(query, year_params)
+        cube = self._cube()
+        groups = cube.group(
+            cube.select(
+                year_suffixes, revenue_type=INTERNAL_AD_SALES,
+                spot_types=REPORT_SPOT_TYPES,
+            ),
+            lambda c: c.language_code,
+        )
 
         results = {}
         total_spots = 0
         total_revenue = 0
 
-        for row in cursor.fetchall():
-            code, spots, revenue = row
+        for code, totals in groups.items():
+            spots, revenue = totals["total_spots"], totals["revenue"]
             code = code if code else "NULL/EMPTY"
             results[code] = {"spots": spots, "revenue": revenue}
             total_spots += spots
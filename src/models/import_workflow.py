@@ -7,9 +7,12 @@ making data flow explicit and testable.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from src.services.import_phase_timer import ImportPhaseTimer
+
 
 # ============================================================================
 # Excel Analysis Models
@@ -131,6 +134,8 @@ class ImportContext:
     closed_by: Optional[str] = None
     dry_run: bool = False
     import_strategy: str = "diff"
+    phase_timer: Optional["ImportPhaseTimer"] = None
+    refresh_read_replica: bool = True
 
     @property
     def months_to_process(self) -> List[str]:
@@ -445,6 +445,40 @@ class PlanningSummary:
         }
 
 
+@dataclass
+class PlanningYearGrid:
+    """Booked, budget and forecast for every AE name and month of one year.
+
+    Per-name values are keyed by AE name, then month number; missing
+    entries mean no spots / no budget row / no forecast row.
+    """
+
+    year: int
+    booked: Dict[str, Dict[int, Decimal]] = field(default_factory=dict)
+    budget: Dict[str, Dict[int, Decimal]] = field(default_factory=dict)
+    forecast: Dict[str, Dict[int, Decimal]] = field(default_factory=dict)
+    # Company-wide: every non-Trade spot / every budget row
+    total_booked: Dict[int, Decimal] = field(default_factory=dict)
+    total_budget: Dict[int, Decimal] = field(default_factory=dict)
+
+    def booked_for(self, ae_name: str, month: int) -> Decimal:
+        return self.booked.get(ae_name, {}).get(month, Decimal("0"))
+
+    def budget_for(self, ae_name: str, month: int) -> Decimal:
+        return self.budget.get(ae_name, {}).get(month, Decimal("0"))
+
+    def forecast_entered(self, ae_name: str, month: int) -> Decimal:
+        """Entered forecast, defaulting to budget when none was entered"""
+        entered = self.forecast.get(ae_name, {}).get(month)
+        return entered if entered is not None else self.budget_for(ae_name, month)
+
+    def effective_forecast(self, ae_name: str, month: int) -> Decimal:
+        """max(forecast entered, booked), as the planning tool shows it"""
+        return max(
+            self.forecast_entered(ae_name, month), self.booked_for(ae_name, month)
+        )
+
+
 # ============================================================================
 # Command Objects (for updates)
 # ============================================================================
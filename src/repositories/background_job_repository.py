@@ -0,0 +1,313 @@
+"""
+Background Job Repository - Data access layer for background_jobs table.
+
+Handles all SQL for the persistent job queue (migration 030, progress
+and result columns from migration 034).
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+# ============================================================================
+# Value Objects
+# ============================================================================
+
+
+class JobStatus(Enum):
+    """Lifecycle of a background job."""
+
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+@dataclass(frozen=True)
+class BackgroundJob:
+    """Immutable record of a background job."""
+
+    job_id: int
+    job_type: str
+    job_key: Optional[str]
+    payload: Dict[str, Any]
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_after: str
+    created_at: str
+    last_error: Optional[str] = None
+    worker: Optional[str] = None
+    created_by: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+
+
+# ============================================================================
+# Repository
+# ============================================================================
+
+
+class BackgroundJobRepository:
+    """
+    Data access layer for background_jobs table.
+
+    Connections are passed in - this class doesn't manage connections.
+    Claiming and finishing jobs must run inside a write transaction
+    (DatabaseConnection.transaction()) so two workers never claim the
+    same job.
+    """
+
+    def table_exists(self, conn: sqlite3.Connection) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'background_jobs'"
+        ).fetchone()
+        return row is not None
+
+    def enqueue(
+        self,
+        job_type: str,
+        conn: sqlite3.Connection,
+        job_key: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        max_attempts: int = 3,
+        created_by: Optional[str] = None,
+    ) -> int:
+        """Queue a job, or return the id of the queued job with the same key."""
+        if job_key is not None:
+            existing = self._queued_job_id(job_key, conn)
+            if existing is not None:
+                return existing
+
+        try:
+            cursor = conn.execute(
+                """
+                INSERT INTO background_jobs
+                    (job_type, job_key, payload, max_attempts, created_by)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    job_type,
+                    job_key,
+                    json.dumps(payload) if payload else None,
+                    max_attempts,
+                    created_by,
+                ),
+            )
+            return cursor.lastrowid
+        except sqlite3.IntegrityError:
+            # Lost a race with another writer queueing the same key
+            existing = self._queued_job_id(job_key, conn)
+            if existing is None:
+                raise
+            return existing
+
+    def claim_next(
+        self, worker: str, conn: sqlite3.Connection
+    ) -> Optional[BackgroundJob]:
+        """Mark the oldest runnable job RUNNING and return it."""
+        row = conn.execute(
+            """
+            SELECT job_id FROM background_jobs
+            WHERE status = 'QUEUED' AND run_after <= CURRENT_TIMESTAMP
+            ORDER BY run_after, job_id
+            LIMIT 1
+            """
+        ).fetchone()
+        if not row:
+            return None
+
+        job_id = row[0]
+        conn.execute(
+            """
+            UPDATE background_jobs
+            SET status = 'RUNNING',
+                attempts = attempts + 1,
+                worker = ?,
+                started_at = CURRENT_TIMESTAMP,
+                finished_at = NULL
+            WHERE job_id = ? AND status = 'QUEUED'
+            """,
+            (worker, job_id),
+        )
+        return self.get_job(job_id, conn)
+
+    def has_progress_columns(self, conn: sqlite3.Connection) -> bool:
+        """True once migration 034 (progress, result) has been applied."""
+        columns = {
+            r[1] for r in conn.execute("PRAGMA table_info(background_jobs)")
+        }
+        return {"progress", "result"} <= columns
+
+    def mark_succeeded(
+        self,
+        job_id: int,
+        conn: sqlite3.Connection,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        conn.execute(
+            """
+            UPDATE background_jobs
+            SET status = 'SUCCEEDED',
+                last_error = NULL,
+                finished_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+            """,
+            (job_id,),
+        )
+        if result is not None and self.has_progress_columns(conn):
+            conn.execute(
+                "UPDATE background_jobs SET result = ? WHERE job_id = ?",
+                (json.dumps(result), job_id),
+            )
+
+    def set_progress(
+        self,
+        job_id: int,
+        progress: Dict[str, Any],
+        conn: sqlite3.Connection,
+    ) -> bool:
+        """Record progress for a running job. False without migration 034."""
+        if not self.has_progress_columns(conn):
+            return False
+        conn.execute(
+            "UPDATE background_jobs SET progress = ? WHERE job_id = ?",
+            (json.dumps(progress), job_id),
+        )
+        return True
+
+    def mark_failed(
+        self,
+        job_id: int,
+        error: str,
+        retry_delay_seconds: Optional[int],
+        conn: sqlite3.Connection,
+    ) -> None:
+        """Requeue after retry_delay_seconds, or fail for good if None.
+
+        If a newer job with the same key was queued while this one ran,
+        that job already covers the retry, so this one is failed instead.
+        """
+        if retry_delay_seconds is not None:
+            conn.execute(
+                """
+                UPDATE background_jobs
+                SET status = CASE WHEN job_key IS NOT NULL AND EXISTS (
+                        SELECT 1 FROM background_jobs q
+                        WHERE q.job_key = background_jobs.job_key
+                          AND q.status = 'QUEUED'
+                    ) THEN 'FAILED' ELSE 'QUEUED' END,
+                    last_error = ?,
+                    run_after = datetime('now', ?),
+                    finished_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+                """,
+                (error, f"+{int(retry_delay_seconds)} seconds", job_id),
+            )
+        else:
+            conn.execute(
+                """
+                UPDATE background_jobs
+                SET status = 'FAILED',
+                    last_error = ?,
+                    finished_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+                """,
+                (error, job_id),
+            )
+
+    def requeue_stale(
+        self, older_than_minutes: int, conn: sqlite3.Connection
+    ) -> int:
+        """Requeue RUNNING jobs whose worker died mid-run.
+
+        A stale job whose key already has a QUEUED job is failed instead;
+        the queued job does the same work.
+        """
+        cutoff = f"-{int(older_than_minutes)} minutes"
+        cursor = conn.execute(
+            """
+            UPDATE OR IGNORE background_jobs
+            SET status = 'QUEUED',
+                last_error = 'worker stopped while running'
+            WHERE status = 'RUNNING'
+              AND started_at < datetime('now', ?)
+            """,
+            (cutoff,),
+        )
+        conn.execute(
+            """
+            UPDATE background_jobs
+            SET status = 'FAILED',
+                last_error = 'worker stopped while running',
+                finished_at = CURRENT_TIMESTAMP
+            WHERE status = 'RUNNING'
+              AND started_at < datetime('now', ?)
+            """,
+            (cutoff,),
+        )
+        return cursor.rowcount
+
+    def get_job(
+        self, job_id: int, conn: sqlite3.Connection
+    ) -> Optional[BackgroundJob]:
+        row = conn.execute(
+            "SELECT * FROM background_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_recent(
+        self, limit: int, conn: sqlite3.Connection
+    ) -> List[BackgroundJob]:
+        rows = conn.execute(
+            "SELECT * FROM background_jobs ORDER BY job_id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def get_status_counts(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) FROM background_jobs GROUP BY status"
+        ).fetchall()
+        counts = {s.value: 0 for s in JobStatus}
+        counts.update({r[0]: r[1] for r in rows})
+        return counts
+
+    def _queued_job_id(
+        self, job_key: str, conn: sqlite3.Connection
+    ) -> Optional[int]:
+        row = conn.execute(
+            "SELECT job_id FROM background_jobs "
+            "WHERE job_key = ? AND status = 'QUEUED'",
+            (job_key,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _row_to_job(self, row: sqlite3.Row) -> BackgroundJob:
+        extra = row.keys()
+        progress = row["progress"] if "progress" in extra else None
+        result = row["result"] if "result" in extra else None
+        return BackgroundJob(
+            job_id=row["job_id"],
+            job_type=row["job_type"],
+            job_key=row["job_key"],
+            payload=json.loads(row["payload"]) if row["payload"] else {},
+            status=JobStatus(row["status"]),
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_after=row["run_after"],
+            created_at=row["created_at"],
+            last_error=row["last_error"],
+            worker=row["worker"],
+            created_by=row["created_by"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            progress=json.loads(progress) if progress else {},
+            result=json.loads(result) if result else None,
+        )
@@ -6,10 +6,13 @@ Handles all SQL operations related to import batch tracking.
 """
 
 import sqlite3
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+if TYPE_CHECKING:
+    from src.services.import_phase_timer import PhaseTiming
+
 
 # ============================================================================
 # Value Objects
@@ -225,3 +228,91 @@ class ImportBatchRepository:
         )
 
         return cursor.rowcount
+
+    # ========================================================================
+    # Phase timings (import_batch_phases, migration 028)
+    # ========================================================================
+
+    def record_phases(
+        self, batch_id: str, phases: List["PhaseTiming"], conn: sqlite3.Connection
+    ) -> int:
+        """
+        Store per-phase timings for an import batch.
+
+        Args:
+            batch_id: The batch the phases belong to
+            phases: PhaseTiming entries from ImportPhaseTimer
+            conn: Active database connection
+
+        Returns:
+            Number of phase rows written
+        """
+        ordered = sorted(phases, key=lambda p: p.started_at)
+        conn.executemany(
+            """
+            INSERT INTO import_batch_phases
+            (batch_id, sequence, phase, started_at, duration_ms,
+             rows_processed, rows_per_sec, sql_count, succeeded)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
+                (
+                    batch_id,
+                    seq,
+                    p.phase,
+                    p.started_at,
+                    round(p.duration_seconds * 1000, 1),
+                    p.rows,
+                    round(p.rows_per_second, 1) if p.rows_per_second else None,
+                    p.sql_count,
+                    1 if p.succeeded else 0,
+                )
+                for seq, p in enumerate(ordered, start=1)
+            ],
+        )
+        return len(ordered)
+
+    def get_phase_trends(
+        self, limit: int, conn: sqlite3.Connection
+    ) -> Dict[str, List[dict]]:
+        """
+        Get phase timings for the most recent batches that recorded any.
+
+        Args:
+            limit: Number of batches to include
+            conn: Active database connection
+
+        Returns:
+            Dict of batch_id -> list of phase dicts in execution order,
+            newest batch first
+        """
+        cursor = conn.execute(
+            """
+            SELECT p.batch_id, p.phase, p.duration_ms, p.rows_processed,
+                   p.rows_per_sec, p.sql_count, p.succeeded
+            FROM import_batch_phases p
+            JOIN (
+                SELECT batch_id, MIN(started_at) AS first_started
+                FROM import_batch_phases
+                GROUP BY batch_id
+                ORDER BY first_started DESC
+                LIMIT ?
+            ) recent ON recent.batch_id = p.batch_id
+            ORDER BY recent.first_started DESC, p.sequence
+        """,
+            (limit,),
+        )
+
+        trends: Dict[str, List[dict]] = {}
+        for row in cursor.fetchall():
+            trends.setdefault(row[0], []).append(
+                {
+                    "phase": row[1],
+                    "duration_ms": row[2],
+                    "rows_processed": row[3],
+                    "rows_per_sec": row[4],
+                    "sql_count": row[5],
+                    "succeeded": bool(row[6]),
+                }
+            )
+        return trends
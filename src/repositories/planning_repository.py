@@ -24,6 +24,7 @@ from src.models.planning import (
     Money,
     ForecastUpdate,
     ForecastChange,
+    PlanningYearGrid,
 )
 
 logger = logging.getLogger(__name__)
@@ -888,6 +889,65 @@ class PlanningRepository(BaseService):
                 "booked": booked_total,
             }
 
+    def get_year_grid(self, year: int) -> PlanningYearGrid:
+        """Get booked, budget and forecast for all AEs and months of a year.
+
+        Booked uses get_all_booked_revenue (WorldLink/House handling as in
+        get_booked_revenue); budget, forecast and the company-wide booked
+        total are one grouped query each.
+        """
+        periods = PlanningPeriod.full_year(year)
+        grid = PlanningYearGrid(year=year)
+
+        for ae_name, by_period in self.get_all_booked_revenue(periods).items():
+            grid.booked[ae_name] = {p.month: v for p, v in by_period.items()}
+
+        with self.safe_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT ae_name, month, budget_amount
+                FROM budget
+                WHERE year = ?
+            """,
+                (year,),
+            )
+            for row in cursor.fetchall():
+                amount = Decimal(str(row["budget_amount"]))
+                grid.budget.setdefault(row["ae_name"], {})[row["month"]] = amount
+                grid.total_budget[row["month"]] = (
+                    grid.total_budget.get(row["month"], Decimal("0")) + amount
+                )
+
+            cursor = conn.execute(
+                """
+                SELECT ae_name, month, forecast_amount
+                FROM forecast
+                WHERE year = ?
+            """,
+                (year,),
+            )
+            for row in cursor.fetchall():
+                grid.forecast.setdefault(row["ae_name"], {})[row["month"]] = (
+                    Decimal(str(row["forecast_amount"]))
+                )
+
+            placeholders = ",".join("?" for _ in periods)
+            cursor = conn.execute(
+                f"""
+                SELECT broadcast_month, COALESCE(SUM(gross_rate), 0) AS booked
+                FROM spots
+                WHERE broadcast_month IN ({placeholders})
+                  AND (revenue_type != 'Trade' OR revenue_type IS NULL)
+                GROUP BY broadcast_month
+            """,
+                [p.broadcast_month for p in periods],
+            )
+            for row in cursor.fetchall():
+                period = PlanningPeriod.from_broadcast_month(row["broadcast_month"])
+                grid.total_booked[period.month] = Decimal(str(row["booked"]))
+
+        return grid
+
     # =========================================================================
     # Helpers
     # =========================================================================
@@ -12,6 +12,7 @@ from decimal import Decimal
 
 from src.database.connection import DatabaseConnection
 from src.services.base_service import BaseService
+from src.services.reference_data import get_reference_data
 from src.models.planning import (
     SectorExpectation,
     EntitySectorExpectations,
@@ -327,7 +328,13 @@ class SectorExpectationRepository(BaseService):
     # =========================================================================
 
     def get_all_sectors(self) -> List[Dict[str, Any]]:
-        """Get all active sectors for dropdown population."""
+        """Get all active sectors for dropdown population (cached)."""
+        return get_reference_data().get(
+            self.db_connection, "planning.sectors", ("sectors",),
+            self._query_all_sectors,
+        )
+
+    def _query_all_sectors(self) -> List[Dict[str, Any]]:
         with self.safe_connection() as conn:
             cursor = conn.execute("""
                 SELECT sector_id, sector_code, sector_name
@@ -2,6 +2,9 @@
 
 Extracted from address_book.py routes. All methods accept a conn parameter
 (sqlite3.Connection with Row factory) and return plain dicts.
+
+Writes to entity_activity keep entity_activity_rollup (migration 032)
+current through triggers; account lists and health scores read the rollup.
 """
 
 import logging
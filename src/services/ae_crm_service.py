@@ -35,29 +35,9 @@ class AeCrmService(BaseService):
                 es.signal_label,
                 es.signal_priority,
                 COALESCE(es.trailing_revenue, 0) AS trailing_revenue,
-                (SELECT MAX(ea.activity_date)
-                 FROM entity_activity ea
-                 WHERE ea.entity_type = e.entity_type
-                   AND ea.entity_id = e.entity_id
-                ) AS last_activity_date,
-                (SELECT ea.due_date
-                 FROM entity_activity ea
-                 WHERE ea.entity_type = e.entity_type
-                   AND ea.entity_id = e.entity_id
-                   AND ea.activity_type = 'follow_up'
-                   AND ea.is_completed = 0
-                 ORDER BY ea.due_date ASC
-                 LIMIT 1
-                ) AS next_follow_up_date,
-                (SELECT ea.description
-                 FROM entity_activity ea
-                 WHERE ea.entity_type = e.entity_type
-                   AND ea.entity_id = e.entity_id
-                   AND ea.activity_type = 'follow_up'
-                   AND ea.is_completed = 0
-                 ORDER BY ea.due_date ASC
-                 LIMIT 1
-                ) AS next_follow_up_desc
+                r.last_activity_date,
+                r.next_follow_up_date,
+                r.next_follow_up_desc
             FROM (
                 SELECT 'agency' AS entity_type,
                        agency_id AS entity_id,
@@ -74,6 +54,9 @@ class AeCrmService(BaseService):
             LEFT JOIN entity_signals es
                 ON es.entity_type = e.entity_type
                AND es.entity_id = e.entity_id
+            LEFT JOIN entity_activity_rollup r
+                ON r.entity_type = e.entity_type
+               AND r.entity_id = e.entity_id
             WHERE 1=1 {ae_filter}
             ORDER BY
                 CASE WHEN es.signal_priority IS NOT NULL
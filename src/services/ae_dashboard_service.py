@@ -9,6 +9,8 @@ import logging
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
 from src.services.base_service import BaseService
+from src.services.reference_data import get_reference_data
+from src.services.spot_catalog import ae_names, available_years
 from src.utils.query_builders import CustomerNormalizationQueryBuilder
 
 logger = logging.getLogger(__name__)
@@ -448,18 +450,20 @@ class AEDashboardService(BaseService):
         }
 
     def _get_ae_list(self, conn) -> List[str]:
-        """Get list of all AEs with revenue"""
-        cursor = conn.execute("""
-            SELECT DISTINCT COALESCE(sales_person, 'Unknown') as ae
-            FROM spots
-            WHERE sales_person IS NOT NULL
-            ORDER BY ae
-        """)
-
-        return [row[0] for row in cursor.fetchall()]
+        """Get list of all AEs with revenue (cached per process)"""
+        return get_reference_data().get(
+            self.db_connection, "ae_dashboard.ae_list", ("spots",),
+            lambda: ae_names(conn), conn=conn,
+        )
 
     def _get_sector_list(self, conn) -> List[str]:
-        """Get list of all sectors"""
+        """Get list of all sectors (cached per process)"""
+        return get_reference_data().get(
+            self.db_connection, "ae_dashboard.sectors", ("sectors",),
+            lambda: self._query_sector_list(conn), conn=conn,
+        )
+
+    def _query_sector_list(self, conn) -> List[str]:
         cursor = conn.execute("""
             SELECT DISTINCT sector_name
             FROM sectors
@@ -470,10 +474,8 @@ class AEDashboardService(BaseService):
         return [row[0] for row in cursor.fetchall()]
 
     def _get_available_years(self, conn) -> List[int]:
-        """Get list of years that have data, sorted descending"""
-        cursor = conn.execute("""
-            SELECT DISTINCT CAST('20' || SUBSTR(broadcast_month, -2) AS INTEGER) as year
-            FROM spots
-            ORDER BY year DESC
-        """)
-        return [row[0] for row in cursor.fetchall()]
+        """Get list of years that have data, sorted descending (cached)"""
+        return get_reference_data().get(
+            self.db_connection, "ae_dashboard.years", ("spots",),
+            lambda: available_years(conn)[::-1], conn=conn,
+        )
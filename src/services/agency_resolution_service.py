@@ -10,6 +10,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from src.database.connection import DatabaseConnection
+from src.services.entity_search import search_entities, search_index_exists
 
 
 @dataclass
@@ -281,8 +282,21 @@ class AgencyResolutionService:
         }
 
     def search_agencies(self, query: str, limit: int = 15) -> List[Dict]:
-        """Search existing agencies for manual linking."""
+        """Search existing agencies for manual linking.
+
+        Ranked by the entity_search index when present; otherwise a
+        name substring match.
+        """
         with self._db_ro() as db:
+            if search_index_exists(db):
+                hits = search_entities(
+                    db, query, entity_type="agency", limit=limit
+                )
+                return [
+                    {"agency_id": h["entity_id"],
+                     "agency_name": h["entity_name"]}
+                    for h in hits
+                ]
             rows = db.execute("""
                 SELECT agency_id, agency_name
                 FROM agencies
@@ -478,95 +492,15 @@ class AgencyResolutionService:
         - Creates alias from source's agency_name -> target
         - Deactivates source agency
 
-        Returns stats on what was moved.
+        Returns stats on what was moved. Runs inline via MergeEngine
+        (customers move in short chunked transactions); web routes queue
+        it as a background job instead.
         """
-        if source_id == target_id:
-            return {"success": False, "error": "Cannot merge agency into itself"}
-
-        with self._db_rw() as db:
-            # Verify both exist
-            source = db.execute("""
-                SELECT agency_id, agency_name FROM agencies
-                WHERE agency_id = ? AND is_active = 1
-            """, [source_id]).fetchone()
-
-            target = db.execute("""
-                SELECT agency_id, agency_name FROM agencies
-                WHERE agency_id = ? AND is_active = 1
-            """, [target_id]).fetchone()
-
-            if not source:
-                return {"success": False, "error": f"Source agency {source_id} not found"}
-            if not target:
-                return {"success": False, "error": f"Target agency {target_id} not found"}
+        from src.services.merge_engine import MergeEngine
 
-            # 1. Move aliases from source to target
-            aliases_moved = db.execute("""
-                UPDATE entity_aliases
-                SET target_entity_id = ?,
-                    updated_date = CURRENT_TIMESTAMP,
-                    notes = COALESCE(notes, '') || ' | Merged from agency ' || ? || ' by ' || ?
-                WHERE target_entity_id = ?
-                AND entity_type = 'agency'
-                AND is_active = 1
-            """, [target_id, source_id, merged_by, source_id]).rowcount
-
-            # 2. Create alias from source's agency_name -> target
-            existing_alias = db.execute("""
-                SELECT alias_id FROM entity_aliases
-                WHERE alias_name = ? AND entity_type = 'agency'
-            """, [source["agency_name"]]).fetchone()
-
-            alias_created = False
-            if not existing_alias and source["agency_name"] != target["agency_name"]:
-                db.execute("""
-                    INSERT INTO entity_aliases
-                    (alias_name, entity_type, target_entity_id, confidence_score,
-                    created_by, notes, is_active)
-                    VALUES (?, 'agency', ?, 100, ?,
-                            'Created via merge from agency ' || ?, 1)
-                """, [source["agency_name"], target_id, merged_by, source_id])
-                alias_created = True
-
-            # 3. Update all customers from source -> target
-            customers_moved = db.execute("""
-                UPDATE customers
-                SET agency_id = ?
-                WHERE agency_id = ?
-            """, [target_id, source_id]).rowcount
-
-            # 4. Deactivate source agency
-            db.execute("""
-                UPDATE agencies
-                SET is_active = 0,
-                    updated_date = CURRENT_TIMESTAMP,
-                    notes = COALESCE(notes, '') || ' | Merged into agency ' || ? || ' by ' || ? || ' at ' || datetime('now')
-                WHERE agency_id = ?
-            """, [target_id, merged_by, source_id])
-
-            # 5. Log to audit
-            db.execute("""
-                INSERT INTO canon_audit (actor, action, key, value, extra)
-                VALUES (?, 'MERGE', ?, ?, ?)
-            """, [
-                merged_by,
-                f"agency:{source_id}",
-                f"agency:{target_id}",
-                f"source_name={source['agency_name']}|target_name={target['agency_name']}|aliases={aliases_moved}|customers={customers_moved}"
-            ])
-
-            db.commit()
-
-        return {
-            "success": True,
-            "source_id": source_id,
-            "source_name": source["agency_name"],
-            "target_id": target_id,
-            "target_name": target["agency_name"],
-            "aliases_moved": aliases_moved,
-            "alias_created": alias_created,
-            "customers_moved": customers_moved,
-        }
+        return MergeEngine(self.db).merge(
+            "agency", source_id, target_id, merged_by=merged_by
+        )
 
     def rename_agency(
         self,
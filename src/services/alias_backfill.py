@@ -0,0 +1,136 @@
+"""Set-based alias backfill for bulk alias and spot writes.
+
+The triggers from migrations 022/023 keep spots.customer_id in step with
+customer aliases one row at a time: every alias insert/update runs an
+UPDATE spots ... WHERE bill_code = ?, and every spot inserted without a
+customer looks its bill_code up in entity_aliases. Writing thousands of
+aliases or spots multiplies that into thousands of small statements.
+
+bulk_alias_load() suspends those triggers for the current transaction
+and backfills once, with two joins, when the block exits:
+
+    with db.transaction() as conn, bulk_alias_load(conn) as stats:
+        conn.executemany("INSERT INTO entity_aliases ...", rows)
+    logger.info(f"Backfilled {stats['spots_backfilled']} spots")
+
+The block must run inside a single write transaction and must not
+commit: the session row that suspends the triggers is visible to
+every connection once committed. Without migration 035 the block is a
+no-op and the triggers run per row as before.
+
+The result matches the trigger path except when a session inserts
+spots and then deactivates or repoints the alias for their bill code:
+those spots take the alias state at the end of the block rather than
+at insert time. Bulk loads write each alias once, so this does not
+arise for them.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def session_table_exists(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'alias_backfill_session'"
+    ).fetchone()
+    return row is not None
+
+
+@contextmanager
+def bulk_alias_load(conn: sqlite3.Connection) -> Iterator[Dict[str, int]]:
+    """Suspend per-row alias backfill on conn, backfill once on exit.
+
+    Yields a stats dict that holds spots_backfilled after the block.
+    Nested blocks on the same transaction leave the work to the
+    outermost one.
+    """
+    stats = {"spots_backfilled": 0}
+    if not session_table_exists(conn):
+        yield stats
+        return
+    if conn.execute(
+        "SELECT 1 FROM alias_backfill_session LIMIT 1"
+    ).fetchone():
+        yield stats
+        return
+
+    session_id = uuid.uuid4().hex
+    conn.execute(
+        """
+        INSERT INTO alias_backfill_session (session_id, spot_watermark)
+        SELECT ?, COALESCE(MAX(spot_id), 0) FROM spots
+        """,
+        (session_id,),
+    )
+    try:
+        yield stats
+        watermark = conn.execute(
+            "SELECT spot_watermark FROM alias_backfill_session "
+            "WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()[0]
+        stats["spots_backfilled"] = backfill_spots(conn, watermark)
+    finally:
+        conn.execute(
+            "DELETE FROM alias_backfill_session WHERE session_id = ?",
+            (session_id,),
+        )
+        conn.execute("DELETE FROM alias_backfill_pending")
+
+
+def backfill_spots(conn: sqlite3.Connection, spot_watermark: int) -> int:
+    """Apply the backfill the suspended triggers would have done.
+
+    Spots that existed before the session take the first target each
+    deferred alias write recorded (trg_backfill_spots_on_alias_*);
+    spots inserted after spot_watermark look up their alias
+    (trg_set_customer_on_spot_insert). Returns the spots updated.
+    """
+    from_aliases = conn.execute(
+        """
+        UPDATE spots
+        SET customer_id = (
+            SELECT p.target_entity_id
+            FROM alias_backfill_pending p
+            WHERE p.alias_name = spots.bill_code
+        )
+        WHERE spot_id <= ?
+          AND customer_id IS NULL
+          AND bill_code IN (SELECT alias_name FROM alias_backfill_pending)
+        """,
+        (spot_watermark,),
+    ).rowcount
+    from_new_spots = conn.execute(
+        """
+        UPDATE spots
+        SET customer_id = (
+            SELECT ea.target_entity_id
+            FROM entity_aliases ea
+            WHERE ea.alias_name = spots.bill_code
+              AND ea.entity_type = 'customer'
+              AND ea.is_active = 1
+        )
+        WHERE spot_id > ?
+          AND customer_id IS NULL
+          AND bill_code IN (
+              SELECT alias_name FROM entity_aliases
+              WHERE entity_type = 'customer' AND is_active = 1
+          )
+        """,
+        (spot_watermark,),
+    ).rowcount
+    total = from_aliases + from_new_spots
+    if total:
+        logger.info(
+            f"Alias backfill: {from_aliases} spots from new aliases, "
+            f"{from_new_spots} new spots resolved"
+        )
+    return total
@@ -0,0 +1,294 @@
+"""Persistent background jobs for derived-data work.
+
+Imports and page requests used to rebuild derived caches inline: the
+import rebuilt entity_metrics/entity_signals (and synced signal actions)
+before returning, and the address book recomputed everything on page
+load when entity_metrics was empty. They now queue a job instead:
+
+    enqueue_job(db, REFRESH_ENTITY_CACHES, job_key="entity_caches")
+
+and a JobWorker drains background_jobs (migration 030) in the web
+process (started from src/web/asgi.py) or from the command line:
+
+    python -m src.services.background_jobs --db data/database/production.db
+
+Jobs are deduplicated by job_key, retried with exponential backoff up to
+max_attempts, and visible at /health/jobs. Without migration 030,
+enqueue_job() returns None and callers fall back to running the work
+inline, exactly as before.
+
+Signals are refreshed incrementally: writes queue the entities they
+touch in entity_signal_dirty (migration 039), which also queues a
+REFRESH_SIGNALS job, and that job (or the next entity cache rebuild)
+recomputes only those entities plus a daily sweep of aged windows.
+language_block_revenue_monthly (migration 040) works the same way:
+queued months queue a REFRESH_BLOCK_SUMMARY job that recomputes them.
+
+Customer/agency merges also run here (MERGE_ENTITIES, see merge_engine)
+so the web request does not hold a write transaction while spots move.
+With migration 034 a handler can record progress via report_progress()
+and its return value is stored as the job's result.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from src.database.connection import DatabaseConnection
+from src.repositories.background_job_repository import (
+    BackgroundJob,
+    BackgroundJobRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+REFRESH_ENTITY_CACHES = "refresh_entity_caches"
+REFRESH_SIGNALS = "refresh_signals"
+MERGE_ENTITIES = "merge_entities"
+REFRESH_BLOCK_SUMMARY = "refresh_block_summary"
+
+RETRY_BASE_SECONDS = 30
+STALE_RUNNING_MINUTES = 60
+
+JobHandler = Callable[[DatabaseConnection, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# Job being run by the worker on this thread, for report_progress()
+_current = threading.local()
+
+
+def _refresh_entity_caches(db: DatabaseConnection, payload: Dict[str, Any]) -> None:
+    """Rebuild entity_metrics and health score components, and refresh
+    the signals of queued entities."""
+    from src.services.entity_metrics_service import EntityMetricsService
+    from src.services.health_score_service import HealthScoreService
+
+    metrics_service = EntityMetricsService(db)
+    with db.transaction() as conn:
+        metrics_service.refresh_metrics(conn)
+        metrics_service.refresh_changed_signals(conn)
+    with db.transaction() as conn:
+        HealthScoreService(db).refresh_components(conn)
+
+
+def _refresh_signals(
+    db: DatabaseConnection, payload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Recompute signals for queued entities (and the daily sweep)."""
+    from src.services.entity_metrics_service import EntityMetricsService
+
+    with db.transaction() as conn:
+        return EntityMetricsService(db).refresh_changed_signals(conn)
+
+
+def _refresh_block_summary(
+    db: DatabaseConnection, payload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Recompute the queued months of the language block summary."""
+    from src.services.language_block_summary import refresh_block_summary
+
+    with db.transaction() as conn:
+        return refresh_block_summary(conn)
+
+
+def _merge_entities(
+    db: DatabaseConnection, payload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge payload's source customer/agency into its target."""
+    from src.services.merge_engine import MergeEngine
+
+    return MergeEngine(db).merge(
+        payload["entity_type"],
+        payload["source_id"],
+        payload["target_id"],
+        merged_by=payload.get("merged_by") or "web_user",
+        progress=lambda p: report_progress(db, p),
+    )
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    REFRESH_ENTITY_CACHES: _refresh_entity_caches,
+    REFRESH_SIGNALS: _refresh_signals,
+    MERGE_ENTITIES: _merge_entities,
+    REFRESH_BLOCK_SUMMARY: _refresh_block_summary,
+}
+
+
+def register_job_handler(job_type: str, handler: JobHandler) -> None:
+    """Register handler(db, payload) for job_type."""
+    JOB_HANDLERS[job_type] = handler
+
+
+def report_progress(db: DatabaseConnection, progress: Dict[str, Any]) -> None:
+    """Record progress for the job running on this thread.
+
+    A no-op outside a worker or without migration 034. Progress is
+    advisory, so a failed write is logged and otherwise ignored.
+    """
+    job_id = getattr(_current, "job_id", None)
+    if job_id is None:
+        return
+    try:
+        with db.transaction() as conn:
+            BackgroundJobRepository().set_progress(job_id, progress, conn)
+    except Exception as e:
+        logger.warning(f"Could not record progress for job {job_id}: {e}")
+
+
+def enqueue_job(
+    db: DatabaseConnection,
+    job_type: str,
+    job_key: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    max_attempts: int = 3,
+    created_by: Optional[str] = None,
+) -> Optional[int]:
+    """Queue a job in its own transaction.
+
+    Returns the job id (an existing one if a job with job_key is already
+    queued), or None when background_jobs does not exist or the queue
+    cannot be written, in which case the caller should do the work inline.
+    """
+    repo = BackgroundJobRepository()
+    try:
+        with db.transaction() as conn:
+            if not repo.table_exists(conn):
+                return None
+            return repo.enqueue(
+                job_type, conn, job_key=job_key, payload=payload,
+                max_attempts=max_attempts, created_by=created_by,
+            )
+    except Exception as e:
+        logger.warning(f"Could not queue {job_type} job: {e}")
+        return None
+
+
+class JobWorker:
+    """Claims and runs queued jobs one at a time."""
+
+    def __init__(
+        self,
+        db: DatabaseConnection,
+        handlers: Optional[Dict[str, JobHandler]] = None,
+        poll_interval: float = 5.0,
+        worker_id: Optional[str] = None,
+    ):
+        self.db = db
+        self.handlers = handlers if handlers is not None else JOB_HANDLERS
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.repo = BackgroundJobRepository()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[BackgroundJob]:
+        """Run the next runnable job, if any. Returns the job it ran."""
+        with self.db.transaction() as conn:
+            if not self.repo.table_exists(conn):
+                return None
+            job = self.repo.claim_next(self.worker_id, conn)
+        if job is None:
+            return None
+
+        handler = self.handlers.get(job.job_type)
+        _current.job_id = job.job_id
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job type {job.job_type!r}")
+            logger.info(f"Running job {job.job_id} ({job.job_type})")
+            result = handler(self.db, job.payload)
+        except Exception as e:
+            retry = (
+                RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+                if handler is not None and job.attempts < job.max_attempts
+                else None
+            )
+            logger.error(
+                f"Job {job.job_id} ({job.job_type}) failed on attempt "
+                f"{job.attempts}/{job.max_attempts}: {e}"
+            )
+            with self.db.transaction() as conn:
+                self.repo.mark_failed(job.job_id, str(e), retry, conn)
+        else:
+            with self.db.transaction() as conn:
+                self.repo.mark_succeeded(job.job_id, conn, result=result)
+        finally:
+            _current.job_id = None
+        return job
+
+    def run_until_empty(self) -> int:
+        """Run runnable jobs until none are left. Returns the count run."""
+        count = 0
+        while not self._stop.is_set() and self.run_once() is not None:
+            count += 1
+        return count
+
+    def recover_stale(self) -> int:
+        """Requeue jobs left RUNNING by a worker that died."""
+        with self.db.transaction() as conn:
+            if not self.repo.table_exists(conn):
+                return 0
+            return self.repo.requeue_stale(STALE_RUNNING_MINUTES, conn)
+
+    def start(self) -> "JobWorker":
+        """Run the worker loop in a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="job-worker", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        try:
+            self.recover_stale()
+        except Exception as e:
+            logger.error(f"Job worker could not recover stale jobs: {e}")
+        while not self._stop.is_set():
+            try:
+                self.run_until_empty()
+            except Exception as e:
+                # Queue unreachable (locked DB, disk); try again next poll
+                logger.error(f"Job worker poll failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Run queued background jobs (entity cache refresh, ...)"
+    )
+    parser.add_argument("--db", help="Database path (default: DB_PATH env)")
+    parser.add_argument(
+        "--loop", action="store_true",
+        help="Keep polling instead of exiting once the queue is empty",
+    )
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    db_path = args.db or os.environ.get("DB_PATH") or os.environ.get("DATABASE_PATH")
+    if not db_path:
+        parser.error("--db or DB_PATH is required")
+
+    worker = JobWorker(DatabaseConnection(db_path), poll_interval=args.poll_interval)
+    if args.loop:
+        worker._loop()
+        return 0
+    worker.recover_stale()
+    ran = worker.run_until_empty()
+    logger.info(f"Ran {ran} job(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
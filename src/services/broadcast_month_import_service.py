@@ -12,6 +12,7 @@ Enhanced with:
 - Progress bars and clean output
 """
 
+import os
 import re
 import sys
 import logging
@@ -61,6 +62,16 @@ from src.services.import_diff import (
     build_excel_fingerprints,
     compare_fingerprints,
 )
+from src.services.import_phase_timer import ImportPhaseTimer
+from src.services.alias_backfill import bulk_alias_load
+from src.services.background_jobs import REFRESH_ENTITY_CACHES, enqueue_job
+from src.services.entity_metrics_service import queue_signal_refresh
+from src.services.language_block_summary import (
+    queue_block_summary_refresh,
+    refresh_queued_block_summary,
+)
+from src.services.reference_data import bump_version
+from src.services.spot_catalog import refresh_spot_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -295,19 +306,37 @@ class BroadcastMonthImportService(BaseService):
         closed_by: Optional[str] = None,
         dry_run: bool = False,
         import_strategy: str = "diff",
+        phase_timer: Optional[ImportPhaseTimer] = None,
+        refresh_read_replica: bool = True,
     ) -> ImportResult:
         """
         Orchestrates the complete import workflow.
 
         Each step delegates to a focused method with single responsibility.
+
+        Phase timings (entity cache, Excel read, fingerprinting, delete,
+        insert, customer alignment, cache refresh) are collected on
+        ``phase_timer``. Callers that time surrounding phases (the daily
+        update) pass their own timer and persist it themselves; otherwise
+        a timer is created here and written to import_batch_phases.
+
+        After a committed import the read replica snapshot (if configured)
+        is rebuilt. Callers that write more import data afterwards pass
+        refresh_read_replica=False and refresh it themselves.
         """
         start_time = datetime.now()
         batch_id = self._generate_batch_id(import_mode, start_time)
         result = ImportResult.create_empty(batch_id, import_mode)
 
+        owns_timer = phase_timer is None
+        timer = (phase_timer or ImportPhaseTimer()).start()
+        batch_started = False
+
         try:
             # Step 1: Analyze Excel file
-            excel_analysis = self._analyze_excel_file(excel_file)
+            with timer.phase("excel_analysis") as phase:
+                excel_analysis = self._analyze_excel_file(excel_file)
+                phase.rows = sum(excel_analysis.month_record_counts.values())
             if not excel_analysis.has_data:
                 raise BroadcastMonthImportError(
                     "No broadcast months found in Excel file"
@@ -325,6 +354,8 @@ class BroadcastMonthImportService(BaseService):
                 closed_by=closed_by,
                 dry_run=dry_run,
                 import_strategy=import_strategy,
+                phase_timer=timer,
+                refresh_read_replica=refresh_read_replica,
             )
 
             # Step 4: Determine which months to process based on mode
@@ -354,6 +385,7 @@ class BroadcastMonthImportService(BaseService):
                 return result
 
             # Step 7: Execute the actual import
+            batch_started = True
             result = self._execute_import_workflow(context, result)
 
         except BroadcastMonthImportError:
@@ -363,6 +395,11 @@ class BroadcastMonthImportService(BaseService):
             tqdm.write(f"❌ {error_msg}")
             result.add_error(error_msg)
             self._fail_import_batch(batch_id, str(e))
+        finally:
+            if owns_timer:
+                timer.stop()
+                if batch_started:
+                    timer.persist(self.db_connection, batch_id)
 
         result.duration_seconds = (datetime.now() - start_time).total_seconds()
         return result
@@ -654,12 +691,15 @@ class BroadcastMonthImportService(BaseService):
         if context.import_strategy == "diff":
             return self._execute_diff_workflow(context, result)
 
+        timer = context.phase_timer or ImportPhaseTimer()
+
         # Full-flush path (legacy)
         # Build entity cache for performance
         tqdm.write("🚀 Phase 1: Building high-performance entity cache...")
-        self.batch_resolver.build_entity_cache_from_excel(
-            context.excel_analysis.file_path
-        )
+        with timer.phase("entity_cache"):
+            self.batch_resolver.build_entity_cache_from_excel(
+                context.excel_analysis.file_path
+            )
         cache_stats = self.batch_resolver.get_performance_stats()
         tqdm.write(
             f"✅ Cache ready: {cache_stats['cache_size']} entities "
@@ -676,18 +716,27 @@ class BroadcastMonthImportService(BaseService):
 
         try:
             with self.safe_transaction() as conn:
+                # Entities losing spots need their signals recomputed,
+                # and months losing spots their block summary rows
+                queue_signal_refresh(conn, context.months_to_process)
+                queue_block_summary_refresh(conn, context.months_to_process)
+
                 # Delete existing data
-                result.records_deleted = self._delete_months_with_progress(
-                    context.months_to_process, conn
-                )
+                with timer.phase("delete") as phase:
+                    result.records_deleted = self._delete_months_with_progress(
+                        context.months_to_process, conn
+                    )
+                    phase.rows = result.records_deleted
 
-                # Import new data
-                result.records_imported = self._import_excel_data_with_progress(
-                    context.excel_analysis.file_path,
-                    context.batch_id,
-                    conn,
-                    context.months_to_process,
-                )
+                # Import new data (reads the workbook as it goes)
+                with timer.phase("insert") as phase:
+                    result.records_imported = self._import_excel_data_with_progress(
+                        context.excel_analysis.file_path,
+                        context.batch_id,
+                        conn,
+                        context.months_to_process,
+                    )
+                    phase.rows = result.records_imported
 
                 # Log net change
                 if context.is_weekly_update_mode:
@@ -698,7 +747,8 @@ class BroadcastMonthImportService(BaseService):
                     )
 
                 # Validate and correct customer alignment
-                self._validate_and_correct_customers(context.batch_id, conn)
+                with timer.phase("customer_alignment"):
+                    self._validate_and_correct_customers(context.batch_id, conn)
 
                 # Close months for HISTORICAL mode
                 if context.is_historical_mode:
@@ -706,6 +756,11 @@ class BroadcastMonthImportService(BaseService):
                         context.months_to_process, context.closed_by, conn
                     )
 
+                # ...as do entities and months gaining them
+                queue_signal_refresh(conn, context.months_to_process)
+                queue_block_summary_refresh(conn, context.months_to_process)
+                refresh_spot_catalog(conn, context.months_to_process)
+
                 # Complete batch record
                 self._complete_import_batch(context.batch_id, result, conn)
 
@@ -722,7 +777,9 @@ class BroadcastMonthImportService(BaseService):
         # Refresh cache tables outside the import transaction.
         # These are denormalized caches — a failure here must never
         # roll back committed import data.
-        self._refresh_cache_tables()
+        with timer.phase("cache_refresh"):
+            self._refresh_cache_tables()
+        self._refresh_read_replica(context, timer)
 
         return result
 
@@ -739,11 +796,14 @@ class BroadcastMonthImportService(BaseService):
         Excel and DB to only write groups that actually changed.
         Falls back to full-flush if >80% of overlapping groups changed.
         """
+        timer = context.phase_timer or ImportPhaseTimer()
+
         # Build entity cache for performance
         tqdm.write("Phase 1: Building high-performance entity cache...")
-        self.batch_resolver.build_entity_cache_from_excel(
-            context.excel_analysis.file_path
-        )
+        with timer.phase("entity_cache"):
+            self.batch_resolver.build_entity_cache_from_excel(
+                context.excel_analysis.file_path
+            )
         cache_stats = self.batch_resolver.get_performance_stats()
         tqdm.write(
             f"Cache ready: {cache_stats['cache_size']} entities "
@@ -761,32 +821,37 @@ class BroadcastMonthImportService(BaseService):
         try:
             # Read ALL Excel sheets and tag each row with sheet name
             tqdm.write("Phase 2: Reading Excel data for diff...")
-            with suppress_verbose_logging(), suppress_stdout_stderr():
-                sheets, workbook = get_all_import_worksheets(
-                    context.excel_analysis.file_path
-                )
+            with timer.phase("excel_read") as phase:
+                with suppress_verbose_logging(), suppress_stdout_stderr():
+                    sheets, workbook = get_all_import_worksheets(
+                        context.excel_analysis.file_path
+                    )
 
-            all_rows: List[tuple] = []
-            for worksheet, sheet_name in sheets:
-                for row in worksheet.iter_rows(min_row=2, values_only=True):
-                    if any(row):
-                        # Tag with sheet name as extra element
-                        all_rows.append(tuple(row) + (sheet_name,))
-            workbook.close()
+                all_rows: List[tuple] = []
+                for worksheet, sheet_name in sheets:
+                    for row in worksheet.iter_rows(min_row=2, values_only=True):
+                        if any(row):
+                            # Tag with sheet name as extra element
+                            all_rows.append(tuple(row) + (sheet_name,))
+                workbook.close()
+                phase.rows = len(all_rows)
 
             tqdm.write(f"Read {len(all_rows):,} rows from Excel")
 
             # Build Excel fingerprints — filter to open months only
-            excel_fps, grouped_rows, months_found = build_excel_fingerprints(all_rows)
+            with timer.phase("fingerprint_excel", rows=len(all_rows)):
+                excel_fps, grouped_rows, months_found = build_excel_fingerprints(
+                    all_rows
+                )
 
-            # Remove fingerprints for closed months (they're in Excel but shouldn't be compared)
-            open_months_set = set(context.months_to_process)
-            excel_fps = {
-                k: v for k, v in excel_fps.items() if k[2] in open_months_set
-            }
-            grouped_rows = {
-                k: v for k, v in grouped_rows.items() if k[2] in open_months_set
-            }
+                # Remove fingerprints for closed months (they're in Excel but shouldn't be compared)
+                open_months_set = set(context.months_to_process)
+                excel_fps = {
+                    k: v for k, v in excel_fps.items() if k[2] in open_months_set
+                }
+                grouped_rows = {
+                    k: v for k, v in grouped_rows.items() if k[2] in open_months_set
+                }
 
             tqdm.write(
                 f"Excel fingerprints: {len(excel_fps):,} contract groups "
@@ -794,9 +859,16 @@ class BroadcastMonthImportService(BaseService):
             )
 
             with self.safe_transaction() as conn:
+                # Entities losing spots need their signals recomputed,
+                # and months losing spots their block summary rows
+                queue_signal_refresh(conn, context.months_to_process)
+                queue_block_summary_refresh(conn, context.months_to_process)
+
                 # Build DB fingerprints and compare
-                db_fps = build_db_fingerprints(context.months_to_process, conn)
-                diff = compare_fingerprints(excel_fps, db_fps)
+                with timer.phase("fingerprint_db") as phase:
+                    db_fps = build_db_fingerprints(context.months_to_process, conn)
+                    diff = compare_fingerprints(excel_fps, db_fps)
+                    phase.rows = len(db_fps)
 
                 tqdm.write(
                     f"Diff result: {len(diff.unchanged)} unchanged, "
@@ -812,15 +884,21 @@ class BroadcastMonthImportService(BaseService):
                     self._send_fallback_alert(context)
 
                     # Full-flush fallback
-                    result.records_deleted = self._delete_months_with_progress(
-                        context.months_to_process, conn
-                    )
-                    result.records_imported = self._import_excel_data_with_progress(
-                        context.excel_analysis.file_path,
-                        context.batch_id,
-                        conn,
-                        context.months_to_process,
-                    )
+                    with timer.phase("delete") as phase:
+                        result.records_deleted = self._delete_months_with_progress(
+                            context.months_to_process, conn
+                        )
+                        phase.rows = result.records_deleted
+                    with timer.phase("insert") as phase:
+                        result.records_imported = (
+                            self._import_excel_data_with_progress(
+                                context.excel_analysis.file_path,
+                                context.batch_id,
+                                conn,
+                                context.months_to_process,
+                            )
+                        )
+                        phase.rows = result.records_imported
                 else:
                     # Surgical diff-based changes
                     total_deleted, total_imported = self._apply_diff(
@@ -849,7 +927,8 @@ class BroadcastMonthImportService(BaseService):
                     )
 
                 # Validate and correct customer alignment
-                self._validate_and_correct_customers(context.batch_id, conn)
+                with timer.phase("customer_alignment"):
+                    self._validate_and_correct_customers(context.batch_id, conn)
 
                 # Close months for HISTORICAL mode
                 if context.is_historical_mode:
@@ -857,6 +936,11 @@ class BroadcastMonthImportService(BaseService):
                         context.months_to_process, context.closed_by, conn
                     )
 
+                # ...as do entities and months gaining them
+                queue_signal_refresh(conn, context.months_to_process)
+                queue_block_summary_refresh(conn, context.months_to_process)
+                refresh_spot_catalog(conn, context.months_to_process)
+
                 # Complete batch record
                 self._complete_import_batch(context.batch_id, result, conn)
 
@@ -871,7 +955,9 @@ class BroadcastMonthImportService(BaseService):
             raise BroadcastMonthImportError(error_msg)
 
         # Refresh cache tables outside the import transaction
-        self._refresh_cache_tables()
+        with timer.phase("cache_refresh"):
+            self._refresh_cache_tables()
+        self._refresh_read_replica(context, timer)
 
         return result
 
@@ -902,95 +988,110 @@ class BroadcastMonthImportService(BaseService):
         unmatched_agencies: Set[str] = set()
         sheet_source_stats: Dict[str, int] = {}
         skipped_rows = 0
+        timer = context.phase_timer or ImportPhaseTimer()
 
         # Delete changed + removed groups
         groups_to_delete = diff.changed | diff.removed
-        if groups_to_delete:
-            tqdm.write(f"Deleting {len(groups_to_delete)} changed/removed groups...")
-            with tqdm(
-                total=len(groups_to_delete),
-                desc="Deleting groups",
-                unit=" groups",
-            ) as pbar:
-                for bill_code, contract, broadcast_month in groups_to_delete:
-                    if not contract:
-                        # Handle NULL/empty contract
-                        cursor = conn.execute(
-                            "DELETE FROM spots WHERE bill_code = ? "
-                            "AND (contract IS NULL OR contract = '') "
-                            "AND broadcast_month = ?",
-                            (bill_code, broadcast_month),
-                        )
-                    else:
-                        cursor = conn.execute(
-                            "DELETE FROM spots WHERE bill_code = ? "
-                            "AND contract = ? AND broadcast_month = ?",
-                            (bill_code, contract, broadcast_month),
-                        )
-                    total_deleted += cursor.rowcount
-                    pbar.update(1)
+        with timer.phase("delete") as phase:
+            if groups_to_delete:
+                tqdm.write(
+                    f"Deleting {len(groups_to_delete)} changed/removed groups..."
+                )
+                with tqdm(
+                    total=len(groups_to_delete),
+                    desc="Deleting groups",
+                    unit=" groups",
+                ) as pbar:
+                    for bill_code, contract, broadcast_month in groups_to_delete:
+                        if not contract:
+                            # Handle NULL/empty contract
+                            cursor = conn.execute(
+                                "DELETE FROM spots WHERE bill_code = ? "
+                                "AND (contract IS NULL OR contract = '') "
+                                "AND broadcast_month = ?",
+                                (bill_code, broadcast_month),
+                            )
+                        else:
+                            cursor = conn.execute(
+                                "DELETE FROM spots WHERE bill_code = ? "
+                                "AND contract = ? AND broadcast_month = ?",
+                                (bill_code, contract, broadcast_month),
+                            )
+                        total_deleted += cursor.rowcount
+                        pbar.update(1)
+            phase.rows = total_deleted
 
         # Insert changed + new groups
-        groups_to_insert = diff.changed | diff.added
-        if groups_to_insert:
-            tqdm.write(f"Inserting {len(groups_to_insert)} changed/new groups...")
-
-            # Count total rows to insert
-            total_rows = sum(
-                len(grouped_rows[key])
-                for key in groups_to_insert
-                if key in grouped_rows
-            )
+        with timer.phase("insert") as phase:
+            groups_to_insert = diff.changed | diff.added
+            if groups_to_insert:
+                tqdm.write(
+                    f"Inserting {len(groups_to_insert)} changed/new groups..."
+                )
 
-            with tqdm(
-                total=total_rows, desc="Inserting rows", unit=" rows"
-            ) as pbar:
-                for key in groups_to_insert:
-                    rows = grouped_rows.get(key, [])
-                    for raw_row in rows:
-                        # Extract sheet_name tag (last element if string)
-                        if raw_row and isinstance(raw_row[-1], str):
-                            sheet_name = raw_row[-1]
-                            row = raw_row[:-1]
-                        else:
-                            sheet_name = ""
-                            row = raw_row
-
-                        spot_data = self._process_single_row(
-                            row=row,
-                            current_sheet_name=sheet_name,
-                            filename=filename,
-                            batch_id=context.batch_id,
-                            allowed_months=context.months_to_process,
-                            month_col_index=month_col_index,
-                            conn=conn,
-                            unmatched_customers=unmatched_customers,
-                            unmatched_agencies=unmatched_agencies,
-                            sheet_source_stats=sheet_source_stats,
-                        )
+                # Count total rows to insert
+                total_rows = sum(
+                    len(grouped_rows[key])
+                    for key in groups_to_insert
+                    if key in grouped_rows
+                )
 
-                        if spot_data is None:
-                            pbar.update(1)
-                            continue
+                # Same deferred alias backfill as the full-flush insert
+                with bulk_alias_load(conn) as backfill, tqdm(
+                    total=total_rows, desc="Inserting rows", unit=" rows"
+                ) as pbar:
+                    for key in groups_to_insert:
+                        rows = grouped_rows.get(key, [])
+                        for raw_row in rows:
+                            # Extract sheet_name tag (last element if string)
+                            if raw_row and isinstance(raw_row[-1], str):
+                                sheet_name = raw_row[-1]
+                                row = raw_row[:-1]
+                            else:
+                                sheet_name = ""
+                                row = raw_row
 
-                        try:
-                            fields = list(spot_data.keys())
-                            placeholders = ", ".join(["?"] * len(fields))
-                            field_names = ", ".join(fields)
-                            values = [spot_data[field] for field in fields]
-
-                            conn.execute(
-                                f"INSERT INTO spots ({field_names}) VALUES ({placeholders})",
-                                values,
+                            spot_data = self._process_single_row(
+                                row=row,
+                                current_sheet_name=sheet_name,
+                                filename=filename,
+                                batch_id=context.batch_id,
+                                allowed_months=context.months_to_process,
+                                month_col_index=month_col_index,
+                                conn=conn,
+                                unmatched_customers=unmatched_customers,
+                                unmatched_agencies=unmatched_agencies,
+                                sheet_source_stats=sheet_source_stats,
                             )
-                            total_imported += 1
-                        except Exception as row_error:
-                            skipped_rows += 1
-                            if skipped_rows <= 5:
-                                tqdm.write(
-                                    f"Skipped row: {str(row_error)[:100]}"
+
+                            if spot_data is None:
+                                pbar.update(1)
+                                continue
+
+                            try:
+                                fields = list(spot_data.keys())
+                                placeholders = ", ".join(["?"] * len(fields))
+                                field_names = ", ".join(fields)
+                                values = [spot_data[field] for field in fields]
+
+                                conn.execute(
+                                    f"INSERT INTO spots ({field_names}) VALUES ({placeholders})",
+                                    values,
                                 )
-                        pbar.update(1)
+                                total_imported += 1
+                            except Exception as row_error:
+                                skipped_rows += 1
+                                if skipped_rows <= 5:
+                                    tqdm.write(
+                                        f"Skipped row: {str(row_error)[:100]}"
+                                    )
+                            pbar.update(1)
+                if backfill["spots_backfilled"]:
+                    tqdm.write(
+                        f"Resolved {backfill['spots_backfilled']:,} spots "
+                        "via aliases"
+                    )
+            phase.rows = total_imported
 
         if skipped_rows:
             tqdm.write(f"Skipped: {skipped_rows:,} rows (constraint violations)")
@@ -1039,17 +1140,52 @@ class BroadcastMonthImportService(BaseService):
             # Never let notification failure affect the import
             pass
 
+    def _refresh_read_replica(
+        self, context: ImportContext, timer: ImportPhaseTimer
+    ) -> None:
+        """Rebuild the read replica snapshot once import data is committed."""
+        if not (context.refresh_read_replica and self.db_connection.read_replica_path):
+            return
+        with timer.phase("replica_refresh"):
+            # The snapshot must carry this import's block revenue, not
+            # wait for the REFRESH_BLOCK_SUMMARY job
+            refresh_queued_block_summary(self.db_connection)
+            if self.db_connection.refresh_read_replica():
+                tqdm.write("✅ Read replica snapshot refreshed")
+            else:
+                tqdm.write("⚠️ Read replica refresh failed (import data is safe)")
+
     def _refresh_cache_tables(self):
-        """Refresh denormalized cache tables in a separate transaction."""
+        """Queue a rebuild of the denormalized cache tables.
+
+        The job worker (src.services.background_jobs) rebuilds
+        entity_metrics and the health score components after the import
+        returns, and recomputes entity_signals for the entities the
+        import queued. Without the background_jobs table the
+        rebuild runs inline, in a separate transaction, as before.
+        """
+        job_id = enqueue_job(
+            self.db_connection,
+            REFRESH_ENTITY_CACHES,
+            job_key="entity_caches",
+            created_by="import",
+        )
+        if job_id is not None:
+            tqdm.write(f"✅ Entity metrics/signals refresh queued (job {job_id})")
+            return
+
         from src.services.entity_metrics_service import EntityMetricsService
+        from src.services.health_score_service import HealthScoreService
 
         metrics_service = EntityMetricsService(self.db_connection)
         try:
             with self.safe_transaction() as conn:
                 metrics_service.refresh_metrics(conn)
                 tqdm.write("✅ Entity metrics cache refreshed")
-                metrics_service.refresh_signals(conn)
+                metrics_service.refresh_changed_signals(conn)
                 tqdm.write("✅ Entity signals cache refreshed")
+                HealthScoreService(self.db_connection).refresh_components(conn)
+                tqdm.write("✅ Health score components refreshed")
         except Exception as e:
             tqdm.write(
                 f"⚠️ Cache refresh failed (import data is safe): {e}"
@@ -1334,7 +1470,9 @@ class BroadcastMonthImportService(BaseService):
                 if v == "broadcast_month"
             ]
 
-            with tqdm(
+            # Unresolved spots get their customer from entity_aliases in
+            # one join at the end rather than a trigger lookup per row
+            with bulk_alias_load(conn) as backfill, tqdm(
                 total=total_records, desc="Processing Excel rows", unit=" rows"
             ) as pbar:
                 for worksheet, current_sheet_name in sheets:
@@ -1395,6 +1533,10 @@ class BroadcastMonthImportService(BaseService):
                             continue
 
             workbook.close()
+            if backfill["spots_backfilled"]:
+                tqdm.write(
+                    f"Resolved {backfill['spots_backfilled']:,} spots via aliases"
+                )
 
             # Log completion statistics
             final_stats = self.batch_resolver.get_performance_stats()
@@ -1497,6 +1639,10 @@ class BroadcastMonthImportService(BaseService):
         except Exception as e:
             logger.error(f"Failed to update batch completion: {e}")
 
+        # Spot-derived dropdowns (AE names, years, revenue types) reload
+        # once this import commits.
+        bump_version(conn, "spots")
+
     def _fail_import_batch(self, batch_id: str, error_message: str) -> None:
         """Mark import batch as failed."""
         try:
@@ -1647,7 +1793,9 @@ if __name__ == "__main__":
         print(f"Database not found: {args.db_path}")
         sys.exit(1)
 
-    db_connection = DatabaseConnection(args.db_path)
+    db_connection = DatabaseConnection(
+        args.db_path, read_replica_path=os.environ.get("READ_REPLICA_PATH")
+    )
     service = BroadcastMonthImportService(db_connection)
 
     try:
@@ -1,14 +1,24 @@
+import html
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-from revenue_diff_tools import (
-    load_and_normalize_excel,
-    compare_rows,
-    compare_aggregates_fixed,
-    generate_report_final,
-    generate_email_safe_html_report,
+
+from src.services.commercial_log_snapshot import (
+    diff_snapshots,
+    ensure_snapshot,
+    open_store,
+    prune_snapshots,
 )
 
+# Added/removed lines listed in a report; the counts cover all of them
+MAX_REPORT_LINES = 200
+
+_AGGREGATE_SECTIONS = [
+    ("by_ae", "By AE"),
+    ("by_bill_code", "By Bill Code"),
+    ("by_month", "By Broadcast Month"),
+]
+
 
 def get_daily_file_paths(base_dir: Path, suffix: str = ".xlsx") -> tuple[str, str]:
     today = datetime.today()
@@ -19,30 +29,158 @@ def get_daily_file_paths(base_dir: Path, suffix: str = ".xlsx") -> tuple[str, st
     return str(f1), str(f2)
 
 
+def _money(value: float) -> str:
+    return f"-${abs(value):,.2f}" if value < 0 else f"${value:,.2f}"
+
+
+def _signed(value: float) -> str:
+    return f"+{_money(value)}" if value > 0 else _money(value)
+
+
+def _line_count(lines: list) -> int:
+    return sum(line["count"] for line in lines)
+
+
+def generate_markdown_report(deltas: dict, path: str) -> None:
+    total = deltas["total_diff"]
+    out = [
+        "# Revenue Change Report",
+        "",
+        f"{deltas['old_file']} → {deltas['new_file']}",
+        "",
+        f"**Total gross:** {_money(total['old'])} → {_money(total['new'])}"
+        f" ({_signed(total['diff'])})",
+    ]
+
+    for key, title in _AGGREGATE_SECTIONS:
+        out += ["", f"## {title}", ""]
+        if not deltas[key]:
+            out.append("No changes.")
+            continue
+        out += ["| | Previous | Current | Change |", "|---|---:|---:|---:|"]
+        out += [
+            f"| {d['key'] or '(blank)'} | {_money(d['old'])} | {_money(d['new'])}"
+            f" | {_signed(d['diff'])} |"
+            for d in deltas[key]
+        ]
+
+    for key, title in (("added", "Added Lines"), ("removed", "Removed Lines")):
+        lines = deltas["row_diffs"][key]
+        out += ["", f"## {title} ({_line_count(lines):,})", ""]
+        if not lines:
+            out.append("None.")
+            continue
+        out += [
+            "| Bill Code | Air Date | Month | AE | Gross | Lines |",
+            "|---|---|---|---|---:|---:|",
+        ]
+        out += [
+            f"| {line['bill_code']} | {line['air_date']} | {line['broadcast_month']}"
+            f" | {line['sales_person']} | {_money(line['gross'])} | {line['count']} |"
+            for line in lines[:MAX_REPORT_LINES]
+        ]
+        if len(lines) > MAX_REPORT_LINES:
+            out.append(f"\n…and {len(lines) - MAX_REPORT_LINES:,} more.")
+
+    Path(path).write_text("\n".join(out) + "\n", encoding="utf-8")
+
+
+def generate_email_safe_html_report(deltas: dict, path: str) -> None:
+    """Same content as the markdown report, as inline-styled tables that
+    survive email clients."""
+    cell = 'style="border:1px solid #ccc;padding:4px 8px;"'
+    num = 'style="border:1px solid #ccc;padding:4px 8px;text-align:right;"'
+    esc = lambda value: html.escape(str(value))  # noqa: E731
+
+    def table(headers, rows, numeric_from):
+        head = "".join(f"<th {cell}>{esc(h)}</th>" for h in headers)
+        body = "".join(
+            "<tr>"
+            + "".join(
+                f"<td {num if i >= numeric_from else cell}>{esc(v)}</td>"
+                for i, v in enumerate(row)
+            )
+            + "</tr>"
+            for row in rows
+        )
+        return (
+            '<table style="border-collapse:collapse;font-family:Arial,sans-serif;'
+            f'font-size:13px;"><tr>{head}</tr>{body}</table>'
+        )
+
+    total = deltas["total_diff"]
+    out = [
+        '<html><body style="font-family:Arial,sans-serif;">',
+        "<h2>Revenue Change Report</h2>",
+        f"<p>{esc(deltas['old_file'])} &rarr; {esc(deltas['new_file'])}</p>",
+        f"<p><b>Total gross:</b> {esc(_money(total['old']))} &rarr; "
+        f"{esc(_money(total['new']))} ({esc(_signed(total['diff']))})</p>",
+    ]
+
+    for key, title in _AGGREGATE_SECTIONS:
+        out.append(f"<h3>{esc(title)}</h3>")
+        if not deltas[key]:
+            out.append("<p>No changes.</p>")
+            continue
+        out.append(table(
+            ["", "Previous", "Current", "Change"],
+            [
+                (d["key"] or "(blank)", _money(d["old"]), _money(d["new"]),
+                 _signed(d["diff"]))
+                for d in deltas[key]
+            ],
+            1,
+        ))
+
+    for key, title in (("added", "Added Lines"), ("removed", "Removed Lines")):
+        lines = deltas["row_diffs"][key]
+        out.append(f"<h3>{esc(title)} ({_line_count(lines):,})</h3>")
+        if not lines:
+            out.append("<p>None.</p>")
+            continue
+        out.append(table(
+            ["Bill Code", "Air Date", "Month", "AE", "Gross", "Lines"],
+            [
+                (line["bill_code"], line["air_date"], line["broadcast_month"],
+                 line["sales_person"], _money(line["gross"]), line["count"])
+                for line in lines[:MAX_REPORT_LINES]
+            ],
+            4,
+        ))
+        if len(lines) > MAX_REPORT_LINES:
+            out.append(f"<p>…and {len(lines) - MAX_REPORT_LINES:,} more.</p>")
+
+    out.append("</body></html>")
+    Path(path).write_text("\n".join(out), encoding="utf-8")
+
+
 def run_daily_report(base_dir: str, output_dir: str) -> None:
+    """Diff today's Commercial Log against yesterday's.
+
+    Each log is streamed once into the snapshot store kept in output_dir;
+    yesterday's is normally already there from the previous run, so only
+    today's workbook is read.
+    """
     old_file, new_file = get_daily_file_paths(Path(base_dir))
     out_dir = Path(output_dir) / datetime.today().strftime("%Y-%m-%d")
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    conn = open_store(output_dir)
     try:
-        df_old = load_and_normalize_excel(old_file)
-        df_new = load_and_normalize_excel(new_file)
-    except Exception as e:
-        print(f"File loading error: {e}")
-        return
-
-    row_diffs = compare_rows(df_old, df_new)
-    agg_diffs = compare_aggregates_fixed(df_old, df_new)
-
-    deltas = {
-        "total_diff": agg_diffs["total_diff"],
-        "by_ae": agg_diffs["by_ae"],
-        "by_bill_code": agg_diffs["by_bill_code"],
-        "by_month": agg_diffs["by_month"],
-        "row_diffs": row_diffs,
-    }
-
-    generate_report_final(deltas, str(out_dir / "revenue_change_report.md"))
+        try:
+            ensure_snapshot(conn, old_file)
+            ensure_snapshot(conn, new_file)
+        except Exception as e:
+            print(f"File loading error: {e}")
+            return
+
+        deltas = diff_snapshots(conn, old_file, new_file)
+        # Tomorrow only needs today's snapshot
+        prune_snapshots(conn, keep=[Path(old_file).name, Path(new_file).name])
+    finally:
+        conn.close()
+
+    generate_markdown_report(deltas, str(out_dir / "revenue_change_report.md"))
     generate_email_safe_html_report(deltas, str(out_dir / "revenue_change_report.html"))
 
     print(f"Reports saved to: {out_dir.resolve()}")
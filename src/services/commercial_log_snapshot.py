@@ -0,0 +1,336 @@
+"""Per-file snapshots of the daily Commercial Log for the change report.
+
+Each processed workbook is streamed once, row by row, into a small SQLite
+store (one per report output directory):
+
+    snapshot_rows        one row per spot line: a fingerprint of the
+                         line's cells plus the fields the report shows
+    snapshot_aggregates  gross revenue (cents) and line counts: total,
+                         by AE, by bill code and by broadcast month
+
+diff_snapshots() compares two stored files with SQL, so the next day's
+report parses only the new workbook and never holds either in memory.
+Rows follow the import's rules (src/services/import_diff.py): Trade
+lines and lines without a broadcast month are skipped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from src.services.import_integration_utilities import (
+    _parse_month_value,
+    get_all_import_worksheets,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DB_NAME = "commercial_log_snapshots.db"
+
+# Column indices matching EXCEL_COLUMN_POSITIONS
+_COL_BILL_CODE = 0
+_COL_AIR_DATE = 1
+_COL_GROSS_RATE = 15
+_COL_BROADCAST_MONTH = 18
+_COL_SALES_PERSON = 22
+_COL_REVENUE_TYPE = 23
+_ROW_WIDTH = 29  # bill_code .. market_name
+
+_BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot_files (
+    file_name TEXT PRIMARY KEY,
+    file_mtime REAL NOT NULL,
+    file_size INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    file_name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    sheet TEXT,
+    bill_code TEXT,
+    air_date TEXT,
+    broadcast_month TEXT,
+    sales_person TEXT,
+    gross_cents INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshot_rows_file_fingerprint
+    ON snapshot_rows(file_name, fingerprint);
+CREATE TABLE IF NOT EXISTS snapshot_aggregates (
+    file_name TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    gross_cents INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (file_name, dimension, key)
+);
+"""
+
+# dimension -> snapshot_rows column
+AGGREGATE_DIMENSIONS = {
+    "by_ae": "sales_person",
+    "by_bill_code": "bill_code",
+    "by_month": "broadcast_month",
+}
+
+
+def open_store(output_dir: str) -> sqlite3.Connection:
+    """Open (creating if needed) the snapshot store in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(output_dir, SNAPSHOT_DB_NAME))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def _cents(value: Any) -> int:
+    try:
+        return round(float(value) * 100) if value is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_log_rows(file_path: str) -> Iterator[Tuple]:
+    """Stream snapshot_rows tuples (without file_name) from a workbook."""
+    sheets, workbook = get_all_import_worksheets(file_path)
+    try:
+        for worksheet, sheet_name in sheets:
+            for row in worksheet.iter_rows(min_row=2, values_only=True):
+                if not row or len(row) <= _COL_BROADCAST_MONTH:
+                    continue
+                month = _parse_month_value(row[_COL_BROADCAST_MONTH])
+                if not month:
+                    continue
+                rev_type = (
+                    row[_COL_REVENUE_TYPE] if len(row) > _COL_REVENUE_TYPE else None
+                )
+                if rev_type and str(rev_type).strip() == "Trade":
+                    continue
+
+                cells = [_cell_text(v) for v in row[:_ROW_WIDTH]]
+                fingerprint = hashlib.blake2b(
+                    "\x1f".join([sheet_name] + cells).encode("utf-8"),
+                    digest_size=8,
+                ).hexdigest()
+                sales_person = (
+                    cells[_COL_SALES_PERSON] if len(cells) > _COL_SALES_PERSON else ""
+                )
+                yield (
+                    fingerprint,
+                    sheet_name,
+                    cells[_COL_BILL_CODE],
+                    cells[_COL_AIR_DATE],
+                    month,
+                    sales_person,
+                    _cents(row[_COL_GROSS_RATE]),
+                )
+    finally:
+        workbook.close()
+
+
+def _batches(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch: List[Tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def has_snapshot(conn: sqlite3.Connection, file_path: str) -> bool:
+    """True when file_path's snapshot is stored and the file is unchanged."""
+    st = os.stat(file_path)
+    row = conn.execute(
+        "SELECT file_mtime, file_size FROM snapshot_files WHERE file_name = ?",
+        [os.path.basename(file_path)],
+    ).fetchone()
+    return (
+        row is not None
+        and row["file_mtime"] == st.st_mtime
+        and row["file_size"] == st.st_size
+    )
+
+
+def store_snapshot(conn: sqlite3.Connection, file_path: str) -> int:
+    """Stream file_path into the store, replacing any earlier snapshot of
+    the same file name. Returns the number of rows stored."""
+    file_name = os.path.basename(file_path)
+    st = os.stat(file_path)
+
+    with conn:
+        delete_snapshot(conn, file_name)
+        rows = 0
+        for batch in _batches(iter_log_rows(file_path), _BATCH_SIZE):
+            conn.executemany(
+                "INSERT INTO snapshot_rows (file_name, fingerprint, sheet,"
+                " bill_code, air_date, broadcast_month, sales_person,"
+                " gross_cents) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(file_name,) + r for r in batch],
+            )
+            rows += len(batch)
+
+        conn.execute(
+            """
+            INSERT INTO snapshot_aggregates
+            SELECT file_name, 'total', '', SUM(gross_cents), COUNT(*)
+            FROM snapshot_rows WHERE file_name = ?
+            GROUP BY file_name
+            """,
+            [file_name],
+        )
+        for dimension, column in AGGREGATE_DIMENSIONS.items():
+            conn.execute(
+                f"""
+                INSERT INTO snapshot_aggregates
+                SELECT file_name, ?, COALESCE({column}, ''),
+                       SUM(gross_cents), COUNT(*)
+                FROM snapshot_rows WHERE file_name = ?
+                GROUP BY COALESCE({column}, '')
+                """,
+                [dimension, file_name],
+            )
+        conn.execute(
+            "INSERT INTO snapshot_files (file_name, file_mtime, file_size,"
+            " row_count) VALUES (?, ?, ?, ?)",
+            [file_name, st.st_mtime, st.st_size, rows],
+        )
+
+    logger.info("Stored snapshot of %s: %d rows", file_name, rows)
+    return rows
+
+
+def ensure_snapshot(conn: sqlite3.Connection, file_path: str) -> None:
+    """Store file_path's snapshot unless an up-to-date one exists."""
+    if not has_snapshot(conn, file_path):
+        store_snapshot(conn, file_path)
+
+
+def delete_snapshot(conn: sqlite3.Connection, file_name: str) -> None:
+    for table in ("snapshot_rows", "snapshot_aggregates", "snapshot_files"):
+        conn.execute(f"DELETE FROM {table} WHERE file_name = ?", [file_name])
+
+
+def prune_snapshots(conn: sqlite3.Connection, keep: Iterable[str]) -> None:
+    """Drop every snapshot except the file names in keep."""
+    keep = set(keep)
+    with conn:
+        for row in conn.execute("SELECT file_name FROM snapshot_files").fetchall():
+            if row["file_name"] not in keep:
+                delete_snapshot(conn, row["file_name"])
+
+
+_ROW_DIFF = """
+SELECT s.sheet, s.bill_code, s.air_date, s.broadcast_month, s.sales_person,
+       s.gross_cents, a.n - COALESCE(b.n, 0) AS line_count
+FROM (
+    SELECT fingerprint, MIN(rowid) AS first_rowid, COUNT(*) AS n
+    FROM snapshot_rows WHERE file_name = :a
+    GROUP BY fingerprint
+) a
+LEFT JOIN (
+    SELECT fingerprint, COUNT(*) AS n
+    FROM snapshot_rows WHERE file_name = :b
+    GROUP BY fingerprint
+) b ON b.fingerprint = a.fingerprint
+JOIN snapshot_rows s ON s.rowid = a.first_rowid
+WHERE a.n > COALESCE(b.n, 0)
+ORDER BY s.broadcast_month, s.bill_code, s.air_date
+"""
+
+_AGGREGATE_DIFF = """
+SELECT key,
+       SUM(CASE WHEN file_name = :old THEN gross_cents ELSE 0 END) AS old_cents,
+       SUM(CASE WHEN file_name = :new THEN gross_cents ELSE 0 END) AS new_cents
+FROM snapshot_aggregates
+WHERE file_name IN (:old, :new) AND dimension = :dimension
+GROUP BY key
+HAVING old_cents != new_cents
+ORDER BY ABS(new_cents - old_cents) DESC, key
+"""
+
+
+def _row_lines(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "sheet": r["sheet"],
+            "bill_code": r["bill_code"],
+            "air_date": r["air_date"],
+            "broadcast_month": r["broadcast_month"],
+            "sales_person": r["sales_person"],
+            "gross": r["gross_cents"] / 100,
+            "count": r["line_count"],
+        }
+        for r in rows
+    ]
+
+
+def diff_snapshots(
+    conn: sqlite3.Connection, old_file: str, new_file: str
+) -> Dict[str, Any]:
+    """Aggregate and line-level differences between two stored files.
+
+    Returns total_diff (old/new/diff gross), by_ae, by_bill_code and
+    by_month (changed keys, largest change first) and row_diffs (lines
+    only in the new file, "added", or only in the old one, "removed").
+    """
+    names = {"old": os.path.basename(old_file), "new": os.path.basename(new_file)}
+
+    def aggregate(dimension: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "key": r["key"],
+                "old": r["old_cents"] / 100,
+                "new": r["new_cents"] / 100,
+                "diff": (r["new_cents"] - r["old_cents"]) / 100,
+            }
+            for r in conn.execute(
+                _AGGREGATE_DIFF, dict(names, dimension=dimension)
+            ).fetchall()
+        ]
+
+    totals = {
+        r["file_name"]: r["gross_cents"]
+        for r in conn.execute(
+            "SELECT file_name, gross_cents FROM snapshot_aggregates"
+            " WHERE dimension = 'total' AND file_name IN (?, ?)",
+            [names["old"], names["new"]],
+        ).fetchall()
+    }
+    old_total = totals.get(names["old"], 0)
+    new_total = totals.get(names["new"], 0)
+
+    added = _row_lines(
+        conn.execute(_ROW_DIFF, {"a": names["new"], "b": names["old"]}).fetchall()
+    )
+    removed = _row_lines(
+        conn.execute(_ROW_DIFF, {"a": names["old"], "b": names["new"]}).fetchall()
+    )
+
+    return {
+        "old_file": names["old"],
+        "new_file": names["new"],
+        "total_diff": {
+            "old": old_total / 100,
+            "new": new_total / 100,
+            "diff": (new_total - old_total) / 100,
+        },
+        **{dimension: aggregate(dimension) for dimension in AGGREGATE_DIMENSIONS},
+        "row_diffs": {"added": added, "removed": removed},
+    }
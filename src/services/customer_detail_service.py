@@ -1,9 +1,12 @@
 """Customer detail service - business logic for customer report page."""
 
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Optional
 from decimal import Decimal
-from src.utils.query_builders import RevenueQueryBuilder
 
 
 @dataclass
@@ -141,13 +144,105 @@ class CustomerDetailReport:
     has_date_filter: bool = False
 
 
+@dataclass(frozen=True)
+class CustomerSpotAggregate:
+    """Every spot-derived figure on the customer detail page, from one
+    read of the customer's non-Trade spots (newest first).
+
+    Breakdowns are (key..., gross, net, spots) tuples; recent holds the
+    first RECENT_SPOTS rows of the read.
+    """
+    gross: float
+    net: float
+    spots: int
+    first_air_date: Optional[str]
+    last_air_date: Optional[str]
+    primary_ae: Optional[str]
+    yearly: tuple = ()
+    monthly: tuple = ()
+    languages: tuple = ()
+    aes: tuple = ()
+    markets: tuple = ()
+    recent: tuple = ()
+
+
+RECENT_SPOTS = 15
+
+# Aggregates kept per process, keyed by (database file, customer_id,
+# start_date, end_date); least recently used dropped first
+AGGREGATE_CACHE_SIZE = 256
+_aggregate_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_aggregate_cache_lock = threading.Lock()
+
+_MONTH_NUMBERS = {
+    m: i for i, m in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+         "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1,
+    )
+}
+
+
+def clear_spot_aggregate_cache() -> None:
+    """Drop every cached customer spot aggregate (useful for testing)."""
+    with _aggregate_cache_lock:
+        _aggregate_cache.clear()
+
+
+def _broadcast_year(broadcast_month: Optional[str]) -> Optional[int]:
+    """CAST('20' || SUBSTR(broadcast_month, 5, 2) AS INTEGER)."""
+    if broadcast_month is None:
+        return None
+    digits = ""
+    for ch in "20" + broadcast_month[4:6]:
+        if not ch.isdigit():
+            break
+        digits += ch
+    return int(digits)
+
+
+def _month_sort_key(broadcast_month: Optional[str]):
+    """Year then month number, NULLs first, as ORDER BY would."""
+    year = _broadcast_year(broadcast_month)
+    month = _MONTH_NUMBERS.get((broadcast_month or "")[:3])
+    return (year is not None, year or 0, month is not None, month or 0)
+
+
+def _add(totals: dict, key, gross, net) -> None:
+    t = totals.get(key)
+    if t is None:
+        totals[key] = [gross or 0, net or 0, 1]
+    else:
+        t[0] += gross or 0
+        t[1] += net or 0
+        t[2] += 1
+
+
+def _by_gross(totals: dict) -> tuple:
+    """(key..., gross, net, spots) rows, highest gross first."""
+    rows = [
+        (key if isinstance(key, tuple) else (key,)) + tuple(t)
+        for key, t in totals.items()
+    ]
+    rows.sort(key=lambda r: (-r[-3], [str(k or "") for k in r[:-3]]))
+    return tuple(rows)
+
+
 class CustomerDetailService:
-    """Service for retrieving customer detail report data."""
+    """Service for retrieving customer detail report data.
+
+    The spot-derived sections come from one CustomerSpotAggregate, read in
+    a single ordered pass and cached per (customer_id, date range). A
+    cached aggregate is reused while the customer's spot count and
+    highest spot_id, and the spots version each import bumps (migration
+    029), are unchanged, so the detail page and the monthly-trend API
+    share it.
+    """
 
     def __init__(self, db_connection):
         self.conn = db_connection
         self.start_date = ""
         self.end_date = ""
+        self._aggregates: dict = {}
 
     def _date_filter_sql(self, alias="s"):
         """Build date filter clause and params for air_date."""
@@ -215,12 +310,174 @@ class CustomerDetailService:
             ) if has_filter else "",
             has_date_filter=has_filter,
         )
-    
+
+    # ------------------------------------------------------------------
+    # Spot aggregate
+    # ------------------------------------------------------------------
+
+    def _spot_aggregate(self, customer_id: int) -> CustomerSpotAggregate:
+        """The customer's aggregate for the current date range."""
+        key = (customer_id, self.start_date, self.end_date)
+        aggregate = self._aggregates.get(key)
+        if aggregate is not None:
+            return aggregate
+
+        db_path = self.conn.execute("PRAGMA database_list").fetchone()[2]
+        enabled = (
+            bool(db_path)
+            and os.environ.get("CACHE_ENABLED", "true").lower() == "true"
+        )
+        if enabled:
+            cache_key = (db_path,) + key
+            stamp = self._aggregate_stamp(customer_id)
+            with _aggregate_cache_lock:
+                cached = _aggregate_cache.get(cache_key)
+                if cached is not None and cached[0] == stamp:
+                    _aggregate_cache.move_to_end(cache_key)
+                    aggregate = cached[1]
+
+        if aggregate is None:
+            aggregate = self._scan_spots(customer_id)
+            if enabled:
+                with _aggregate_cache_lock:
+                    _aggregate_cache[cache_key] = (stamp, aggregate)
+                    _aggregate_cache.move_to_end(cache_key)
+                    while len(_aggregate_cache) > AGGREGATE_CACHE_SIZE:
+                        _aggregate_cache.popitem(last=False)
+
+        self._aggregates[key] = aggregate
+        return aggregate
+
+    def _aggregate_stamp(self, customer_id: int) -> tuple:
+        """Changes whenever the customer's spots do: imports bump the
+        spots version, and spot_ids are never reused, so any spot added
+        to, moved into or out of, or deleted from the customer moves the
+        count or the highest id."""
+        try:
+            row = self.conn.execute(
+                "SELECT version FROM reference_data_versions "
+                "WHERE source = 'spots'"
+            ).fetchone()
+            version = row[0] if row else None
+        except sqlite3.OperationalError:
+            version = None
+        count, max_id = self.conn.execute(
+            "SELECT COUNT(*), MAX(spot_id) FROM spots WHERE customer_id = ?",
+            [customer_id],
+        ).fetchone()
+        return (version, count, max_id)
+
+    def _scan_spots(self, customer_id: int) -> CustomerSpotAggregate:
+        """Aggregate the customer's non-Trade spots in one ordered read."""
+        date_sql, date_params = self._date_filter_sql("s")
+        cursor = self.conn.execute(f"""
+            SELECT
+                s.spot_id,
+                s.bill_code,
+                s.air_date,
+                s.broadcast_month,
+                s.time_in,
+                s.length_seconds,
+                s.gross_rate,
+                s.station_net,
+                s.sales_person,
+                s.language_code,
+                l.language_name,
+                m.market_code,
+                m.market_name,
+                s.revenue_type
+            FROM spots s
+            LEFT JOIN languages l ON s.language_code = l.language_code
+            LEFT JOIN markets m ON s.market_id = m.market_id
+            WHERE s.customer_id = ?
+                AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
+                {date_sql}
+            ORDER BY s.air_date DESC, s.time_in DESC
+        """, [customer_id] + date_params)
+
+        totals = {}
+        first_air = last_air = None
+        yearly, monthly, languages, aes, markets = {}, {}, {}, {}, {}
+        ae_gross = {}
+        recent = []
+
+        for row in cursor:
+            (spot_id, bill_code, air_date, broadcast_month, time_in,
+             length_seconds, gross, net, sales_person, language_code,
+             language_name, market_code, market_name, revenue_type) = row
+
+            _add(totals, None, gross, net)
+            if air_date is not None:
+                if first_air is None or air_date < first_air:
+                    first_air = air_date
+                if last_air is None or air_date > last_air:
+                    last_air = air_date
+
+            year = _broadcast_year(broadcast_month)
+            if year is not None:
+                _add(yearly, year, gross, net)
+            _add(monthly, broadcast_month, gross, net)
+            _add(
+                languages,
+                (language_code if language_code is not None else "Unknown",
+                 language_name),
+                gross, net,
+            )
+            _add(
+                aes,
+                sales_person if sales_person is not None else "Unassigned",
+                gross, net,
+            )
+            if sales_person is not None:
+                ae_gross[sales_person] = (
+                    ae_gross.get(sales_person, 0) + (gross or 0)
+                )
+            _add(
+                markets,
+                (market_code if market_code is not None else "Unknown",
+                 market_name if market_name is not None else "Unknown"),
+                gross, net,
+            )
+            if len(recent) < RECENT_SPOTS:
+                recent.append((
+                    spot_id, bill_code, air_date, broadcast_month, time_in,
+                    length_seconds, gross, net, sales_person,
+                    language_code, market_code, revenue_type,
+                ))
+
+        gross, net, spots = totals.get(None, (0, 0, 0))
+        # Highest-grossing named AE; ties go to the first name
+        primary_ae = min(
+            ae_gross, key=lambda ae: (-ae_gross[ae], ae), default=None,
+        )
+
+        return CustomerSpotAggregate(
+            gross=gross,
+            net=net,
+            spots=spots,
+            first_air_date=first_air,
+            last_air_date=last_air,
+            primary_ae=primary_ae,
+            yearly=tuple(sorted(
+                (year,) + tuple(t) for year, t in yearly.items()
+            )),
+            monthly=tuple(sorted(
+                ((bm,) + tuple(t) for bm, t in monthly.items()),
+                key=lambda r: _month_sort_key(r[0]),
+            )),
+            languages=_by_gross(languages),
+            aes=_by_gross(aes),
+            markets=_by_gross(markets),
+            recent=tuple(recent),
+        )
+
+    # ------------------------------------------------------------------
+    # Report sections
+    # ------------------------------------------------------------------
+
     def _get_summary(self, customer_id: int) -> Optional[CustomerSummary]:
         """Get customer identity and lifetime metrics."""
-        date_sql, date_params = self._date_filter_sql("s")
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
+        row = self.conn.execute("""
             SELECT
                 c.customer_id,
                 c.normalized_name,
@@ -230,45 +487,19 @@ class CustomerDetailService:
                 c.notes,
                 sec.sector_code,
                 sec.sector_name,
-                a.agency_name,
-                COALESCE(SUM(s.gross_rate), 0) AS lifetime_gross,
-                COALESCE(SUM(s.station_net), 0) AS lifetime_net,
-                COUNT(s.spot_id) AS lifetime_spots,
-                MIN(s.air_date) AS first_air_date,
-                MAX(s.air_date) AS last_air_date
+                a.agency_name
             FROM customers c
             LEFT JOIN sectors sec ON c.sector_id = sec.sector_id
             LEFT JOIN agencies a ON c.agency_id = a.agency_id
-            LEFT JOIN spots s ON c.customer_id = s.customer_id
-                AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-                {date_sql}
             WHERE c.customer_id = ?
-            GROUP BY c.customer_id
-        """, date_params + [customer_id])
-
-        row = cursor.fetchone()
+        """, [customer_id]).fetchone()
         if not row:
             return None
 
-        ae_date_sql, ae_date_params = self._date_filter_sql("")
-        ae_date_sql_clean = ae_date_sql.replace(".air_date", "air_date")
-        cursor.execute(f"""
-            SELECT sales_person
-            FROM spots
-            WHERE customer_id = ?
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                AND sales_person IS NOT NULL
-                {ae_date_sql_clean}
-            GROUP BY sales_person
-            ORDER BY SUM(gross_rate) DESC
-            LIMIT 1
-        """, [customer_id] + ae_date_params)
-        ae_row = cursor.fetchone()
-        primary_ae = ae_row[0] if ae_row else None
-        
-        lifetime_gross = Decimal(str(row[9])) if row[9] else Decimal("0")
-        lifetime_spots = row[11] or 0
-        
+        agg = self._spot_aggregate(customer_id)
+        lifetime_gross = Decimal(str(agg.gross)) if agg.gross else Decimal("0")
+        lifetime_spots = agg.spots
+
         return CustomerSummary(
             customer_id=row[0],
             normalized_name=row[1],
@@ -280,42 +511,26 @@ class CustomerDetailService:
             sector_name=row[7],
             agency_name=row[8],
             lifetime_gross=lifetime_gross,
-            lifetime_net=Decimal(str(row[10])) if row[10] else Decimal("0"),
+            lifetime_net=Decimal(str(agg.net)) if agg.net else Decimal("0"),
             lifetime_spots=lifetime_spots,
-            first_air_date=row[12],
-            last_air_date=row[13],
+            first_air_date=agg.first_air_date,
+            last_air_date=agg.last_air_date,
             avg_spot_rate=lifetime_gross / lifetime_spots if lifetime_spots > 0 else Decimal("0"),
-            primary_ae=primary_ae
+            primary_ae=agg.primary_ae,
         )
-    
+
     def _get_period_comparison(self, customer_id: int) -> PeriodComparison:
         """Get current year vs prior year comparison."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            WITH yearly AS (
-                SELECT 
-                    CAST('20' || SUBSTR(broadcast_month, 5, 2) AS INTEGER) AS year,
-                    SUM(gross_rate) AS gross,
-                    SUM(station_net) AS net,
-                    COUNT(*) AS spots
-                FROM spots
-                WHERE customer_id = ?
-                    AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                GROUP BY CAST('20' || SUBSTR(broadcast_month, 5, 2) AS INTEGER)
-            )
-            SELECT 
-                year, gross, net, spots
-            FROM yearly
-            WHERE year >= (SELECT MAX(year) - 1 FROM yearly)
-            ORDER BY year DESC
-        """, [customer_id])
-        
-        rows = cursor.fetchall()
-        
+        yearly = self._spot_aggregate(customer_id).yearly
+        latest = yearly[-1][0] if yearly else None
+        rows = sorted(
+            (r for r in yearly if r[0] >= latest - 1), reverse=True,
+        ) if yearly else []
+
         current_year = 2025  # Default
         current = {"gross": Decimal("0"), "net": Decimal("0"), "spots": 0}
         prior = {"gross": Decimal("0"), "net": Decimal("0"), "spots": 0}
-        
+
         for row in rows:
             year, gross, net, spots = row
             if not current_year or year > current_year - 1:
@@ -323,7 +538,7 @@ class CustomerDetailService:
                 current = {"gross": Decimal(str(gross or 0)), "net": Decimal(str(net or 0)), "spots": spots or 0}
             else:
                 prior = {"gross": Decimal(str(gross or 0)), "net": Decimal(str(net or 0)), "spots": spots or 0}
-        
+
         return PeriodComparison(
             current_year=current_year,
             current_year_gross=current["gross"],
@@ -333,189 +548,72 @@ class CustomerDetailService:
             prior_year_net=prior["net"],
             prior_year_spots=prior["spots"]
         )
-    
+
     def _get_monthly_trend(self, customer_id: int, months: int = 24) -> list[MonthlyRevenue]:
-        """Get monthly revenue trend for charting."""
-        date_sql, date_params = self._date_filter_sql("")
-        date_sql_clean = date_sql.replace(".air_date", "air_date")
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
-            SELECT
-                broadcast_month,
-                SUM(gross_rate) AS gross,
-                SUM(station_net) AS net,
-                COUNT(*) AS spots
-            FROM spots
-            WHERE customer_id = ?
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                {date_sql_clean}
-            GROUP BY broadcast_month
-            ORDER BY
-                CAST('20' || SUBSTR(broadcast_month, 5, 2) AS INTEGER),
-                {RevenueQueryBuilder.build_month_number_case()}
-        """, [customer_id] + date_params)
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append(MonthlyRevenue(
-                broadcast_month=row[0],
-                gross_revenue=Decimal(str(row[1] or 0)),
-                net_revenue=Decimal(str(row[2] or 0)),
-                spot_count=row[3] or 0
-            ))
-        
-        # Return last N months
+        """Get monthly revenue trend for charting (last N months)."""
+        results = [
+            MonthlyRevenue(
+                broadcast_month=bm,
+                gross_revenue=Decimal(str(gross or 0)),
+                net_revenue=Decimal(str(net or 0)),
+                spot_count=spots or 0,
+            )
+            for bm, gross, net, spots in self._spot_aggregate(customer_id).monthly
+        ]
         return results[-months:] if len(results) > months else results
-    
-    def _get_language_breakdown(self, customer_id: int) -> list[LanguageBreakdown]:
-        """Get revenue breakdown by language."""
-        date_sql, date_params = self._date_filter_sql("s")
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
-            SELECT
-                COALESCE(s.language_code, 'Unknown') AS lang_code,
-                l.language_name,
-                SUM(s.gross_rate) AS gross,
-                SUM(s.station_net) AS net,
-                COUNT(*) AS spots
-            FROM spots s
-            LEFT JOIN languages l ON s.language_code = l.language_code
-            WHERE s.customer_id = ?
-                AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-                {date_sql}
-            GROUP BY COALESCE(s.language_code, 'Unknown'), l.language_name
-            ORDER BY gross DESC
-        """, [customer_id] + date_params)
-        
-        results = []
-        total_gross = Decimal("0")
-        
-        for row in cursor.fetchall():
-            gross = Decimal(str(row[2] or 0))
-            total_gross += gross
-            results.append(LanguageBreakdown(
-                language_code=row[0],
-                language_name=row[1],
-                gross_revenue=gross,
-                net_revenue=Decimal(str(row[3] or 0)),
-                spot_count=row[4] or 0
-            ))
-        
-        # Calculate percentages
-        for item in results:
+
+    @staticmethod
+    def _with_pct(items: list) -> list:
+        total_gross = sum((item.gross_revenue for item in items), Decimal("0"))
+        for item in items:
             if total_gross > 0:
                 item.pct_of_total = float(item.gross_revenue / total_gross * 100)
-        
-        return results
-    
+        return items
+
+    def _get_language_breakdown(self, customer_id: int) -> list[LanguageBreakdown]:
+        """Get revenue breakdown by language."""
+        return self._with_pct([
+            LanguageBreakdown(
+                language_code=code,
+                language_name=name,
+                gross_revenue=Decimal(str(gross or 0)),
+                net_revenue=Decimal(str(net or 0)),
+                spot_count=spots or 0,
+            )
+            for code, name, gross, net, spots
+            in self._spot_aggregate(customer_id).languages
+        ])
+
     def _get_ae_breakdown(self, customer_id: int) -> list[AEBreakdown]:
         """Get revenue breakdown by account executive."""
-        date_sql, date_params = self._date_filter_sql("")
-        date_sql_clean = date_sql.replace(".air_date", "air_date")
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
-            SELECT
-                COALESCE(sales_person, 'Unassigned') AS ae,
-                SUM(gross_rate) AS gross,
-                SUM(station_net) AS net,
-                COUNT(*) AS spots
-            FROM spots
-            WHERE customer_id = ?
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                {date_sql_clean}
-            GROUP BY COALESCE(sales_person, 'Unassigned')
-            ORDER BY gross DESC
-        """, [customer_id] + date_params)
-        
-        results = []
-        total_gross = Decimal("0")
-        
-        for row in cursor.fetchall():
-            gross = Decimal(str(row[1] or 0))
-            total_gross += gross
-            results.append(AEBreakdown(
-                ae_name=row[0],
-                gross_revenue=gross,
-                net_revenue=Decimal(str(row[2] or 0)),
-                spot_count=row[3] or 0
-            ))
-        
-        for item in results:
-            if total_gross > 0:
-                item.pct_of_total = float(item.gross_revenue / total_gross * 100)
-        
-        return results
-    
+        return self._with_pct([
+            AEBreakdown(
+                ae_name=ae,
+                gross_revenue=Decimal(str(gross or 0)),
+                net_revenue=Decimal(str(net or 0)),
+                spot_count=spots or 0,
+            )
+            for ae, gross, net, spots in self._spot_aggregate(customer_id).aes
+        ])
+
     def _get_market_breakdown(self, customer_id: int) -> list[MarketBreakdown]:
         """Get revenue breakdown by market."""
-        date_sql, date_params = self._date_filter_sql("s")
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
-            SELECT
-                COALESCE(m.market_code, 'Unknown') AS mkt_code,
-                COALESCE(m.market_name, 'Unknown') AS mkt_name,
-                SUM(s.gross_rate) AS gross,
-                SUM(s.station_net) AS net,
-                COUNT(*) AS spots
-            FROM spots s
-            LEFT JOIN markets m ON s.market_id = m.market_id
-            WHERE s.customer_id = ?
-                AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-                {date_sql}
-            GROUP BY COALESCE(m.market_code, 'Unknown'), COALESCE(m.market_name, 'Unknown')
-            ORDER BY gross DESC
-        """, [customer_id] + date_params)
-        
-        results = []
-        total_gross = Decimal("0")
-        
-        for row in cursor.fetchall():
-            gross = Decimal(str(row[2] or 0))
-            total_gross += gross
-            results.append(MarketBreakdown(
-                market_code=row[0],
-                market_name=row[1],
-                gross_revenue=gross,
-                net_revenue=Decimal(str(row[3] or 0)),
-                spot_count=row[4] or 0
-            ))
-        
-        for item in results:
-            if total_gross > 0:
-                item.pct_of_total = float(item.gross_revenue / total_gross * 100)
-        
-        return results
-    
-    def _get_recent_spots(self, customer_id: int, limit: int = 15) -> list[RecentSpot]:
-        """Get most recent spot activity."""
-        date_sql, date_params = self._date_filter_sql("s")
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
-            SELECT
-                s.spot_id,
-                s.bill_code,
-                s.air_date,
-                s.broadcast_month,
-                s.time_in,
-                s.length_seconds,
-                s.gross_rate,
-                s.station_net,
-                s.sales_person,
-                s.language_code,
-                m.market_code,
-                s.revenue_type
-            FROM spots s
-            LEFT JOIN markets m ON s.market_id = m.market_id
-            WHERE s.customer_id = ?
-                AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-                {date_sql}
-            ORDER BY s.air_date DESC, s.time_in DESC
-            LIMIT ?
-        """, [customer_id] + date_params + [limit])
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append(RecentSpot(
+        return self._with_pct([
+            MarketBreakdown(
+                market_code=code,
+                market_name=name,
+                gross_revenue=Decimal(str(gross or 0)),
+                net_revenue=Decimal(str(net or 0)),
+                spot_count=spots or 0,
+            )
+            for code, name, gross, net, spots
+            in self._spot_aggregate(customer_id).markets
+        ])
+
+    def _get_recent_spots(self, customer_id: int, limit: int = RECENT_SPOTS) -> list[RecentSpot]:
+        """Get most recent spot activity (at most RECENT_SPOTS)."""
+        return [
+            RecentSpot(
                 spot_id=row[0],
                 bill_code=row[1],
                 air_date=row[2],
@@ -528,10 +626,10 @@ class CustomerDetailService:
                 language_code=row[9],
                 market_code=row[10],
                 revenue_type=row[11]
-            ))
-        
-        return results
-    
+            )
+            for row in self._spot_aggregate(customer_id).recent[:limit]
+        ]
+
     def _get_aliases(self, customer_id: int) -> list[BillCodeAlias]:
         """Get bill code aliases that resolve to this customer."""
         cursor = self.conn.cursor()
@@ -8,12 +8,13 @@ This just creates customer records for normalized names that don't exist yet.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from src.database.connection import DatabaseConnection
+from src.services.entity_search import search_entities, search_index_exists
 from src.utils.query_builders import CustomerNormalizationQueryBuilder
 
 try:
-    from rapidfuzz import fuzz
+    from rapidfuzz import fuzz, process
     _HAVE_RAPIDFUZZ = True
 except ImportError:
     _HAVE_RAPIDFUZZ = False
@@ -30,6 +31,52 @@ def _score_name(q: str, n: str) -> float:
     return len(qt & nt) / len(qt | nt)
 
 
+def _similar_pairs(
+    names: List[str], threshold: float
+) -> List[Tuple[int, int, float]]:
+    """All (i, j, score) with i < j and _score_name(names[i], names[j])
+    >= threshold, without calling _score_name for every pair.
+
+    With RapidFuzz the score matrix is computed in bulk by process.cdist.
+    The Jaccard fallback is zero for names without a common token, so
+    only pairs sharing a token (via an inverted index) are scored.
+    """
+    if len(names) < 2:
+        return []
+    if _HAVE_RAPIDFUZZ:
+        import numpy as np
+
+        cutoff = threshold * 100
+        scores = np.maximum(
+            process.cdist(names, names, scorer=fuzz.WRatio,
+                          score_cutoff=cutoff, dtype=np.float64, workers=-1),
+            process.cdist(names, names, scorer=fuzz.token_set_ratio,
+                          score_cutoff=cutoff, dtype=np.float64, workers=-1),
+        )
+        rows, cols = np.nonzero(np.triu(scores >= cutoff, k=1))
+        return [
+            (int(i), int(j), float(scores[i, j]) / 100.0)
+            for i, j in zip(rows, cols)
+        ]
+
+    by_token: Dict[str, List[int]] = {}
+    for i, name in enumerate(names):
+        for token in set(name.lower().split()):
+            by_token.setdefault(token, []).append(i)
+    candidates = {
+        (i, j)
+        for ids in by_token.values()
+        for k, i in enumerate(ids)
+        for j in ids[k + 1:]
+    }
+    pairs = []
+    for i, j in sorted(candidates):
+        score = _score_name(names[i], names[j])
+        if score >= threshold:
+            pairs.append((i, j, score))
+    return pairs
+
+
 @dataclass
 class UnresolvedCustomer:
     """A bill_code that doesn't resolve to a customer."""
@@ -398,28 +445,44 @@ class CustomerResolutionService:
             }
     
     def search_customers(self, query: str, limit: int = 15) -> List[Dict]:
-        """Search existing customers with sector and spot count."""
+        """Search existing customers with sector and spot count.
+
+        Ranked by the entity_search index when present (names, aliases,
+        contacts, addresses, notes, near misses); otherwise a name
+        substring match.
+        """
+        ids = None
         with self._db_ro() as db:
-            rows = db.execute("""
+            if search_index_exists(db):
+                hits = search_entities(
+                    db, query, entity_type="customer", limit=limit
+                )
+                ids = [h["entity_id"] for h in hits]
+                marks = ", ".join("?" * len(ids)) or "NULL"
+                where, params = f"c.customer_id IN ({marks})", ids
+            else:
+                where = "c.normalized_name LIKE ? AND c.is_active = 1"
+                params = [f"%{query}%"]
+            rows = db.execute(f"""
                 SELECT
                     c.customer_id,
                     c.normalized_name,
                     s2.sector_name,
-                    COALESCE(sp.spot_count, 0) AS spot_count
+                    (SELECT COUNT(*) FROM spots sp
+                     WHERE sp.customer_id = c.customer_id
+                       AND (sp.revenue_type != 'Trade'
+                            OR sp.revenue_type IS NULL)) AS spot_count
                 FROM customers c
                 LEFT JOIN customer_sectors cs
                     ON cs.customer_id = c.customer_id AND cs.is_primary = 1
                 LEFT JOIN sectors s2 ON s2.sector_id = cs.sector_id
-                LEFT JOIN (
-                    SELECT customer_id, COUNT(*) AS spot_count
-                    FROM spots
-                    WHERE (revenue_type != 'Trade' OR revenue_type IS NULL)
-                    GROUP BY customer_id
-                ) sp ON sp.customer_id = c.customer_id
-                WHERE c.normalized_name LIKE ? AND c.is_active = 1
+                WHERE {where}
                 ORDER BY c.normalized_name
                 LIMIT ?
-            """, [f"%{query}%", limit]).fetchall()
+            """, params + [limit]).fetchall()
+        if ids is not None:
+            rank = {cid: i for i, cid in enumerate(ids)}
+            rows = sorted(rows, key=lambda r: rank[r["customer_id"]])
         return [
             {
                 "customer_id": r["customer_id"],
@@ -482,96 +545,15 @@ class CustomerResolutionService:
         - Creates alias from source's normalized_name → target
         - Deactivates source customer
         
-        Returns stats on what was moved.
+        Returns stats on what was moved. Runs inline via MergeEngine
+        (spots move in short chunked transactions); web routes queue
+        it as a background job instead.
         """
-        if source_id == target_id:
-            return {"success": False, "error": "Cannot merge customer into itself"}
-        
-        with self._db_rw() as db:
-            # Verify both exist
-            source = db.execute("""
-                SELECT customer_id, normalized_name FROM customers
-                WHERE customer_id = ? AND is_active = 1
-            """, [source_id]).fetchone()
-            
-            target = db.execute("""
-                SELECT customer_id, normalized_name FROM customers
-                WHERE customer_id = ? AND is_active = 1
-            """, [target_id]).fetchone()
-            
-            if not source:
-                return {"success": False, "error": f"Source customer {source_id} not found"}
-            if not target:
-                return {"success": False, "error": f"Target customer {target_id} not found"}
-            
-            # 1. Move aliases from source to target
-            aliases_moved = db.execute("""
-                UPDATE entity_aliases
-                SET target_entity_id = ?,
-                    updated_date = CURRENT_TIMESTAMP,
-                    notes = COALESCE(notes, '') || ' | Merged from customer ' || ? || ' by ' || ?
-                WHERE target_entity_id = ?
-                AND entity_type = 'customer'
-                AND is_active = 1
-            """, [target_id, source_id, merged_by, source_id]).rowcount
-            
-            # 2. Create alias from source's normalized_name → target
-            #    (so future imports with that exact bill_code resolve correctly)
-            existing_alias = db.execute("""
-                SELECT alias_id FROM entity_aliases
-                WHERE alias_name = ? AND entity_type = 'customer'
-            """, [source["normalized_name"]]).fetchone()
-            
-            alias_created = False
-            if not existing_alias and source["normalized_name"] != target["normalized_name"]:
-                db.execute("""
-                    INSERT INTO entity_aliases
-                    (alias_name, entity_type, target_entity_id, confidence_score,
-                    created_by, notes, is_active)
-                    VALUES (?, 'customer', ?, 100, ?,
-                            'Created via merge from customer ' || ?, 1)
-                """, [source["normalized_name"], target_id, merged_by, source_id])
-                alias_created = True
-            
-            # 3. Update all spots from source → target
-            spots_moved = db.execute("""
-                UPDATE spots
-                SET customer_id = ?
-                WHERE customer_id = ?
-            """, [target_id, source_id]).rowcount
-            
-            # 4. Deactivate source customer
-            db.execute("""
-                UPDATE customers
-                SET is_active = 0,
-                    updated_date = CURRENT_TIMESTAMP,
-                    notes = COALESCE(notes, '') || ' | Merged into customer ' || ? || ' by ' || ? || ' at ' || datetime('now')
-                WHERE customer_id = ?
-            """, [target_id, merged_by, source_id])
-            
-            # 5. Log to audit via canon_audit (exists and has no constraints)
-            db.execute("""
-                INSERT INTO canon_audit (actor, action, key, value, extra)
-                VALUES (?, 'MERGE', ?, ?, ?)
-            """, [
-                merged_by,
-                f"customer:{source_id}",
-                f"customer:{target_id}",
-                f"source_name={source['normalized_name']}|target_name={target['normalized_name']}|aliases={aliases_moved}|spots={spots_moved}"
-            ])
-            
-            db.commit()
-        
-        return {
-            "success": True,
-            "source_id": source_id,
-            "source_name": source["normalized_name"],
-            "target_id": target_id,
-            "target_name": target["normalized_name"],
-            "aliases_moved": aliases_moved,
-            "alias_created": alias_created,
-            "spots_moved": spots_moved,
-        }
+        from src.services.merge_engine import MergeEngine
+
+        return MergeEngine(self.db).merge(
+            "customer", source_id, target_id, merged_by=merged_by
+        )
 
 
     def get_customers_with_aliases(
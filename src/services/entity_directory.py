@@ -0,0 +1,824 @@
+"""Queries over the entity_directory snapshot (migration 036).
+
+entity_directory holds one denormalized row per agency and customer:
+address, AE, sectors, agency, contact stats, alias and client counts,
+entity_metrics and entity_signals. Triggers keep it current, so the
+entity list pages read it with one indexed query and let SQLite do the
+filtering, sorting and paging:
+
+    rows = list_directory(conn, include_inactive=False)
+    page = query_directory(conn, market="SEA", sort="revenue", limit=200)
+    rows, total = stale_entities(conn, cutoff="2024-01-01",
+                                 grace_cutoff="2026-07-01", limit=100)
+    rows, total = sector_customers(conn, search="dragon", limit=50)
+
+query_directory() serves the address book's filters and sorts with
+keyset paging; its sector, market and signal filters read the
+entity_directory_tags index (migration 037). Without that index,
+filter_entities() applies the same filters to list_entities() rows.
+
+Spot metrics come from the entity_metrics cache, which the entity cache
+job rebuilds after each import, so they are as fresh as that job.
+Without migration 036, stale_entities(), stale_summary() and
+sector_customers() run the same filters over the source tables and
+aggregate spots directly.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.services.entity_search import phrase_query, search_index_exists
+
+# Address book columns common to agencies and customers, in the order
+# EntityService.list_entities has always returned them
+LIST_COLUMNS = (
+    "entity_id", "entity_type", "entity_name",
+    "address", "city", "state", "zip",
+    "notes", "assigned_ae", "is_active",
+    "sector_id", "sector_name", "sector_code",
+    "contact_count", "primary_contact", "sector_count", "sector_ids",
+    "markets", "last_active", "total_revenue", "spot_count",
+)
+AGENCY_COLUMNS = ("client_count",)
+CUSTOMER_COLUMNS = ("agency_id", "agency_name", "agency_booked")
+DIRECTORY_FIELDS = LIST_COLUMNS + AGENCY_COLUMNS + CUSTOMER_COLUMNS + (
+    "signals",
+)
+
+NEGATIVE_SIGNALS = ("churned", "declining", "gone_quiet")
+
+# Address book sorts as (expression, descending) keys, matching the page's
+# client-side sorts: blank values last, then name. (entity_type,
+# entity_id) is appended to every sort so a page can resume after the
+# last row's keys.
+_NAME_KEY = ("lower(entity_name)", False)
+DIRECTORY_SORTS = {
+    "name": (_NAME_KEY,),
+    "last_active": (
+        ("COALESCE(last_active, '') = ''", False),
+        ("COALESCE(last_active, '')", True),
+        _NAME_KEY,
+    ),
+    "revenue": (("COALESCE(total_revenue, 0)", True), _NAME_KEY),
+    "market": (("markets = ''", False), ("lower(markets)", False), _NAME_KEY),
+    "sector": (
+        ("COALESCE(sector_name, '') = ''", False),
+        ("lower(COALESCE(sector_name, ''))", False),
+        _NAME_KEY,
+    ),
+    "type": (("entity_type", False), _NAME_KEY),
+    "ae": (
+        ("COALESCE(assigned_ae, '') = ''", False),
+        ("lower(COALESCE(assigned_ae, ''))", False),
+        _NAME_KEY,
+    ),
+    "signal": (("COALESCE(top_signal_priority, 99)", False), _NAME_KEY),
+}
+_UNIQUE_KEYS = (("entity_type", False), ("entity_id", False))
+
+# Columns the address book search box matches against
+SEARCH_COLUMNS = (
+    "entity_name", "notes", "sector_name", "sector_code",
+    "primary_contact", "agency_name",
+)
+
+STALE_SORTS = {
+    "name": "entity_name COLLATE NOCASE, entity_type, entity_id",
+    "last_active": "last_active IS NULL, last_active, "
+                   "entity_name COLLATE NOCASE",
+    "revenue": "total_revenue DESC, entity_name COLLATE NOCASE",
+    "spots": "spot_count DESC, entity_name COLLATE NOCASE",
+    "type": "entity_type, entity_name COLLATE NOCASE",
+}
+
+SECTOR_CUSTOMER_SORTS = {
+    "name": "entity_name",
+    "revenue": "total_revenue DESC, entity_name",
+    "spots": "spot_count DESC, entity_name",
+    "sector": "sector_name IS NULL, sector_name, entity_name",
+}
+
+
+# Source-table equivalents of the directory columns the stale and sector
+# pages read, for databases without migration 036. Spot figures are
+# aggregated from spots, as the pages did before the snapshot.
+_STALE_SOURCE = """(
+    SELECT
+        'agency' AS entity_type, a.agency_id AS entity_id,
+        a.agency_name AS entity_name, a.is_active,
+        NULL AS sector_id, NULL AS sector_name,
+        a.assigned_ae, a.notes, a.created_date,
+        COALESCE(m.spot_count, 0) AS spot_count,
+        COALESCE(m.total_revenue, 0) AS total_revenue,
+        m.last_active,
+        (SELECT COUNT(*) FROM entity_aliases ea
+         WHERE ea.target_entity_id = a.agency_id
+           AND ea.entity_type = 'agency' AND ea.is_active = 1)
+            AS alias_count
+    FROM agencies a
+    LEFT JOIN (
+        SELECT agency_id AS entity_id, COUNT(*) AS spot_count,
+               SUM(CASE WHEN revenue_type != 'Trade'
+                             OR revenue_type IS NULL
+                        THEN gross_rate ELSE 0 END) AS total_revenue,
+               MAX(air_date) AS last_active
+        FROM spots WHERE agency_id IS NOT NULL
+        GROUP BY agency_id
+    ) m ON m.entity_id = a.agency_id
+    UNION ALL
+    SELECT
+        'customer', c.customer_id, c.normalized_name, c.is_active,
+        c.sector_id, s.sector_name,
+        c.assigned_ae, c.notes, c.created_date,
+        COALESCE(m.spot_count, 0),
+        COALESCE(m.total_revenue, 0),
+        m.last_active,
+        (SELECT COUNT(*) FROM entity_aliases ea
+         WHERE ea.target_entity_id = c.customer_id
+           AND ea.entity_type = 'customer' AND ea.is_active = 1)
+    FROM customers c
+    LEFT JOIN sectors s ON s.sector_id = c.sector_id
+    LEFT JOIN (
+        SELECT customer_id AS entity_id, COUNT(*) AS spot_count,
+               SUM(CASE WHEN revenue_type != 'Trade'
+                             OR revenue_type IS NULL
+                        THEN gross_rate ELSE 0 END) AS total_revenue,
+               MAX(air_date) AS last_active
+        FROM spots WHERE customer_id IS NOT NULL
+        GROUP BY customer_id
+    ) m ON m.entity_id = c.customer_id
+)"""
+
+_SECTOR_CUSTOMER_SOURCE = """(
+    SELECT
+        'customer' AS entity_type, c.customer_id AS entity_id,
+        c.normalized_name AS entity_name, c.is_active,
+        s.sector_name, c.updated_date,
+        COALESCE(r.total_revenue, 0) AS total_revenue,
+        COALESCE(r.spot_count, 0) AS spot_count,
+        ps.assigned_by AS sector_assigned_by,
+        ps.assigned_date AS sector_assigned_date,
+        (c.normalized_name LIKE '%WorldLink%'
+         OR EXISTS (SELECT 1 FROM entity_aliases ea
+                    WHERE ea.target_entity_id = c.customer_id
+                      AND ea.entity_type = 'customer' AND ea.is_active = 1
+                      AND ea.alias_name LIKE 'WorldLink%'))
+            AS worldlink_client
+    FROM customers c
+    LEFT JOIN sectors s ON s.sector_id = c.sector_id
+    LEFT JOIN customer_sectors ps
+        ON ps.customer_id = c.customer_id AND ps.is_primary = 1
+    LEFT JOIN (
+        SELECT customer_id, SUM(COALESCE(gross_rate, 0)) AS total_revenue,
+               COUNT(*) AS spot_count
+        FROM spots
+        WHERE customer_id IS NOT NULL
+          AND (revenue_type != 'Trade' OR revenue_type IS NULL)
+        GROUP BY customer_id
+    ) r ON r.customer_id = c.customer_id
+)"""
+
+
+def directory_exists(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'entity_directory'"
+    ).fetchone()
+    return row is not None
+
+
+def directory_tags_exist(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'entity_directory_tags'"
+    ).fetchone()
+    return row is not None
+
+
+def rebuild_directory(conn: sqlite3.Connection) -> int:
+    """Recompute every row from the source tables. Returns the row count.
+
+    The triggers keep the snapshot current; this is for repairs after
+    writes that bypassed them (e.g. a restored table).
+    """
+    conn.execute("DELETE FROM entity_directory")
+    return conn.execute(
+        "INSERT INTO entity_directory SELECT * FROM entity_directory_source"
+    ).rowcount
+
+
+def _page(
+    conn: sqlite3.Connection,
+    where: List[str],
+    params: List[Any],
+    columns: str,
+    order_by: str,
+    limit: Optional[int],
+    offset: int,
+    column_params: Tuple[Any, ...] = (),
+    source: str = "entity_directory",
+) -> Tuple[List[sqlite3.Row], int]:
+    """Run a filtered, ordered, optionally paged directory query.
+
+    column_params bind placeholders in columns; source is the table or
+    subquery read. Returns (rows, total) where total counts every
+    matching row.
+    """
+    where_sql = " AND ".join(where) if where else "1 = 1"
+    sql = (
+        f"SELECT {columns} FROM {source} "
+        f"WHERE {where_sql} ORDER BY {order_by}"
+    )
+    if limit is None:
+        rows = conn.execute(sql, list(column_params) + params).fetchall()
+        return rows, len(rows)
+    total = conn.execute(
+        f"SELECT COUNT(*) FROM {source} WHERE {where_sql}", params
+    ).fetchone()[0]
+    rows = conn.execute(
+        f"{sql} LIMIT ? OFFSET ?",
+        list(column_params) + params + [limit, max(offset, 0)],
+    ).fetchall()
+    return rows, total
+
+
+def list_directory(
+    conn: sqlite3.Connection, include_inactive: bool = False
+) -> List[Dict[str, Any]]:
+    """Address book rows: agencies then customers, by name.
+
+    Same shape as EntityService.list_entities: customers named
+    "AGENCY:CLIENT" without an agency are left out.
+    """
+    where = [
+        "NOT (entity_type = 'customer' AND agency_id IS NULL "
+        "AND instr(entity_name, ':') > 0)"
+    ]
+    if not include_inactive:
+        where.append("is_active = 1")
+    columns = ", ".join(
+        LIST_COLUMNS + AGENCY_COLUMNS + CUSTOMER_COLUMNS + ("signals",)
+    )
+    rows, _ = _page(
+        conn, where, [], columns, "entity_type, entity_name", None, 0
+    )
+    return [_list_row(r) for r in rows]
+
+
+def _list_row(r: sqlite3.Row) -> Dict[str, Any]:
+    row = {col: r[col] for col in LIST_COLUMNS}
+    if row["entity_type"] == "agency":
+        row["client_count"] = r["client_count"]
+    else:
+        row["agency_id"] = r["agency_id"]
+        row["agency_name"] = r["agency_name"]
+        row["agency_booked"] = bool(r["agency_booked"])
+    row["signals"] = json.loads(r["signals"])
+    return row
+
+
+def _tag_match(kind: str, values: Sequence[str]) -> Tuple[str, List[Any]]:
+    """SQL condition: the row has an entity_directory_tags value."""
+    marks = ", ".join("?" * len(values))
+    return (
+        "(entity_type, entity_id) IN ("
+        "SELECT entity_type, entity_id FROM entity_directory_tags "
+        f"WHERE kind = ? AND value IN ({marks}))",
+        [kind] + [str(v) for v in values],
+    )
+
+
+def _encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _after(
+    keys: Sequence[Tuple[str, bool]], values: Sequence[Any]
+) -> Tuple[str, List[Any]]:
+    """SQL condition: the row sorts after values under keys."""
+    clauses = []
+    params: List[Any] = []
+    for i, (expr, descending) in enumerate(keys):
+        terms = [f"({e}) = ?" for e, _ in keys[:i]]
+        terms.append(f"({expr}) {'<' if descending else '>'} ?")
+        clauses.append("(" + " AND ".join(terms) + ")")
+        params.extend(values[:i + 1])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def _columns(fields: Optional[Sequence[str]]) -> List[str]:
+    """Projected columns: fields plus entity_type and entity_id, or all."""
+    if not fields:
+        return list(DIRECTORY_FIELDS)
+    unknown = set(fields) - set(DIRECTORY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return ["entity_type", "entity_id"] + [
+        f for f in dict.fromkeys(fields)
+        if f not in ("entity_type", "entity_id")
+    ]
+
+
+def query_directory(
+    conn: sqlite3.Connection,
+    search: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    sector_id: Optional[int] = None,
+    market: Optional[str] = None,
+    ae: Optional[str] = None,
+    has_contacts: Optional[str] = None,
+    signal: Optional[str] = None,
+    include_inactive: bool = False,
+    hide_agency_booked: bool = False,
+    sort: str = "name",
+    fields: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Filter, sort and page address book rows in SQL.
+
+    Filters mirror the address book page: search is a case-insensitive
+    substring of SEARCH_COLUMNS (with the entity_search index, also of
+    aliases, all contacts and addresses), ae "__none__" means unassigned,
+    has_contacts is "yes" or "no", and signal is a signal type,
+    "attention" (any of NEGATIVE_SIGNALS) or "clean" (none). The market
+    and signal filters also keep agencies that parent a matching
+    customer. hide_agency_booked drops customers whose spots all come
+    through their agency, as the flat view does.
+
+    Rows have list_directory()'s shape, or only fields (plus
+    entity_type and entity_id) when given. With limit, pass the
+    returned next_cursor back as cursor for the following page.
+    Returns {"items", "next_cursor", "total", "stats"}, where total and
+    stats (agencies, customers, with_contacts, needs_attention) cover
+    every matching row. Raises ValueError for unknown fields or a bad
+    cursor.
+    """
+    columns = _columns(fields)
+    keys = DIRECTORY_SORTS.get(sort, DIRECTORY_SORTS["name"]) + _UNIQUE_KEYS
+
+    where = [
+        "NOT (entity_type = 'customer' AND agency_id IS NULL "
+        "AND instr(entity_name, ':') > 0)"
+    ]
+    params: List[Any] = []
+    if not include_inactive:
+        where.append("is_active = 1")
+    if entity_type in ("agency", "customer"):
+        where.append("entity_type = ?")
+        params.append(entity_type)
+    needle = (search or "").strip()
+    if len(needle) >= 3 and search_index_exists(conn):
+        # Name, notes and contacts through the trigram index; the
+        # agency and sector columns are short enough to scan
+        scanned = ("sector_name", "sector_code", "agency_name")
+        where.append(
+            "((entity_type, entity_id) IN (SELECT entity_type, entity_id "
+            "FROM entity_search WHERE entity_search MATCH ?) OR "
+            + " OR ".join(
+                f"instr(lower(COALESCE({col}, '')), ?) > 0"
+                for col in scanned
+            ) + ")"
+        )
+        params.append(phrase_query(needle))
+        params.extend([needle.lower()] * len(scanned))
+    elif needle:
+        where.append("(" + " OR ".join(
+            f"instr(lower(COALESCE({col}, '')), ?) > 0"
+            for col in SEARCH_COLUMNS
+        ) + ")")
+        params.extend([needle.lower()] * len(SEARCH_COLUMNS))
+    if has_contacts == "yes":
+        where.append("contact_count > 0")
+    elif has_contacts == "no":
+        where.append("contact_count = 0")
+    if sector_id not in (None, ""):
+        sql, tag_params = _tag_match("sector", [sector_id])
+        where.append(sql)
+        params.extend(tag_params)
+
+    # Each filter stage reads the one before it, so "parents a matching
+    # customer" means a customer that passed the earlier filters
+    ctes = [
+        "base AS (SELECT * FROM entity_directory "
+        f"WHERE {' AND '.join(where)})"
+    ]
+    stage = "base"
+
+    def add_stage(name: str, condition: str, stage_params: List[Any]):
+        nonlocal stage
+        ctes.append(f"{name} AS (SELECT * FROM {stage} WHERE {condition})")
+        params.extend(stage_params)
+        stage = name
+
+    def add_parent_stage(name: str, match: str, match_params: List[Any]):
+        add_stage(
+            name,
+            f"{match} OR (entity_type = 'agency' AND entity_id IN ("
+            f"SELECT agency_id FROM {stage} "
+            f"WHERE entity_type = 'customer' AND {match}))",
+            match_params + match_params,
+        )
+
+    if market:
+        add_parent_stage("by_market", *_tag_match("market", [market]))
+    if ae == "__none__":
+        add_stage("by_ae", "COALESCE(assigned_ae, '') = ''", [])
+    elif ae:
+        add_stage("by_ae", "assigned_ae = ?", [ae])
+    if signal == "attention":
+        add_parent_stage("by_signal", *_tag_match("signal", NEGATIVE_SIGNALS))
+    elif signal == "clean":
+        add_parent_stage("by_signal", "signals = '[]'", [])
+    elif signal:
+        add_parent_stage("by_signal", *_tag_match("signal", [signal]))
+    if hide_agency_booked:
+        add_stage(
+            "shown",
+            "NOT (entity_type = 'customer' AND agency_booked = 1)", [],
+        )
+    with_sql = "WITH " + ", ".join(ctes)
+
+    attention_sql, attention_params = _tag_match("signal", NEGATIVE_SIGNALS)
+    stats_row = conn.execute(f"""
+        {with_sql}
+        SELECT COUNT(*) AS total,
+               COALESCE(SUM(entity_type = 'agency'), 0) AS agencies,
+               COALESCE(SUM(entity_type = 'customer'), 0) AS customers,
+               COALESCE(SUM(contact_count > 0), 0) AS with_contacts,
+               COALESCE(SUM({attention_sql}), 0) AS needs_attention
+        FROM {stage}
+    """, params + attention_params).fetchone()
+
+    page_params = list(params)
+    after_sql = ""
+    if cursor:
+        sql, after_params = _after(keys, _decode_cursor(cursor, len(keys)))
+        after_sql = f"WHERE {sql}"
+        page_params.extend(after_params)
+    key_columns = ", ".join(
+        f"{expr} AS _key{i}" for i, (expr, _) in enumerate(keys)
+    )
+    order_by = ", ".join(
+        f"{expr}{' DESC' if descending else ''}" for expr, descending in keys
+    )
+    page_sql = (
+        f"{with_sql} SELECT {', '.join(columns)}, {key_columns} "
+        f"FROM {stage} {after_sql} ORDER BY {order_by}"
+    )
+    if limit is not None:
+        page_sql += " LIMIT ?"
+        page_params.append(limit + 1)
+    rows = conn.execute(page_sql, page_params).fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(
+            [last[f"_key{i}"] for i in range(len(keys))]
+        )
+
+    if fields:
+        items = []
+        for r in rows:
+            item = {col: r[col] for col in columns}
+            if "agency_booked" in item:
+                item["agency_booked"] = bool(item["agency_booked"])
+            if "signals" in item:
+                item["signals"] = json.loads(item["signals"])
+            items.append(item)
+    else:
+        items = [_list_row(r) for r in rows]
+
+    stats = dict(stats_row)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": stats.pop("total"),
+        "stats": stats,
+    }
+
+
+def _lower(value: Optional[str]) -> str:
+    return (value or "").lower()
+
+
+def _top_priority(row: Dict[str, Any]) -> int:
+    return min(
+        (s["signal_priority"] for s in row["signals"]), default=99
+    )
+
+
+# DIRECTORY_SORTS over list_entities() rows, for filter_entities()
+_ROW_NAME_KEY = (lambda r: _lower(r["entity_name"]), False)
+_ROW_SORTS = {
+    "name": (_ROW_NAME_KEY,),
+    "last_active": (
+        (lambda r: not r["last_active"], False),
+        (lambda r: r["last_active"] or "", True),
+        _ROW_NAME_KEY,
+    ),
+    "revenue": (
+        (lambda r: r["total_revenue"] or 0, True), _ROW_NAME_KEY,
+    ),
+    "market": (
+        (lambda r: not r["markets"], False),
+        (lambda r: _lower(r["markets"]), False),
+        _ROW_NAME_KEY,
+    ),
+    "sector": (
+        (lambda r: not r["sector_name"], False),
+        (lambda r: _lower(r["sector_name"]), False),
+        _ROW_NAME_KEY,
+    ),
+    "type": ((lambda r: r["entity_type"], False), _ROW_NAME_KEY),
+    "ae": (
+        (lambda r: not r["assigned_ae"], False),
+        (lambda r: _lower(r["assigned_ae"]), False),
+        _ROW_NAME_KEY,
+    ),
+    "signal": ((_top_priority, False), _ROW_NAME_KEY),
+}
+
+
+def filter_entities(
+    rows: List[Dict[str, Any]],
+    search: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    sector_id: Optional[int] = None,
+    market: Optional[str] = None,
+    ae: Optional[str] = None,
+    has_contacts: Optional[str] = None,
+    signal: Optional[str] = None,
+    hide_agency_booked: bool = False,
+    sort: str = "name",
+    fields: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """query_directory() over EntityService.list_entities() rows.
+
+    For databases without entity_directory_tags (migration 037): same
+    filters, sorts and result shape, computed in Python. Search is a
+    substring of SEARCH_COLUMNS only, and cursors are only valid for
+    this function.
+    """
+    columns = _columns(fields)
+
+    needle = (search or "").strip().lower()
+    stage = [
+        r for r in rows
+        if (entity_type not in ("agency", "customer")
+            or r["entity_type"] == entity_type)
+        and (not needle or any(
+            needle in _lower(r.get(col)) for col in SEARCH_COLUMNS
+        ))
+        and (has_contacts != "yes" or r["contact_count"] > 0)
+        and (has_contacts != "no" or r["contact_count"] == 0)
+        and (sector_id in (None, "")
+             or str(sector_id) in (r["sector_ids"] or "").split(","))
+    ]
+
+    # Each filter stage reads the one before it, as in query_directory()
+    def parent_stage(rows, match):
+        parents = {
+            r["agency_id"] for r in rows
+            if r["entity_type"] == "customer" and match(r)
+        }
+        return [
+            r for r in rows
+            if match(r) or (r["entity_type"] == "agency"
+                            and r["entity_id"] in parents)
+        ]
+
+    def signal_types(r):
+        return {s["signal_type"] for s in r["signals"]}
+
+    if market:
+        stage = parent_stage(
+            stage, lambda r: market in (r["markets"] or "").split(",")
+        )
+    if ae == "__none__":
+        stage = [r for r in stage if not r["assigned_ae"]]
+    elif ae:
+        stage = [r for r in stage if r["assigned_ae"] == ae]
+    if signal == "attention":
+        stage = parent_stage(
+            stage, lambda r: bool(signal_types(r) & set(NEGATIVE_SIGNALS))
+        )
+    elif signal == "clean":
+        stage = parent_stage(stage, lambda r: not r["signals"])
+    elif signal:
+        stage = parent_stage(stage, lambda r: signal in signal_types(r))
+    if hide_agency_booked:
+        stage = [
+            r for r in stage
+            if not (r["entity_type"] == "customer" and r["agency_booked"])
+        ]
+
+    keys = _ROW_SORTS.get(sort, _ROW_SORTS["name"]) + (
+        (lambda r: r["entity_type"], False),
+        (lambda r: r["entity_id"], False),
+    )
+    for key, descending in reversed(keys):
+        stage.sort(key=key, reverse=descending)
+
+    stats = {
+        "agencies": sum(r["entity_type"] == "agency" for r in stage),
+        "customers": sum(r["entity_type"] == "customer" for r in stage),
+        "with_contacts": sum(r["contact_count"] > 0 for r in stage),
+        "needs_attention": sum(
+            bool(signal_types(r) & set(NEGATIVE_SIGNALS)) for r in stage
+        ),
+    }
+    total = len(stage)
+
+    if cursor:
+        after = _decode_cursor(cursor, 2)
+        positions = [
+            i for i, r in enumerate(stage)
+            if [r["entity_type"], r["entity_id"]] == after
+        ]
+        if not positions:
+            raise ValueError("Invalid cursor")
+        stage = stage[positions[0] + 1:]
+    next_cursor = None
+    if limit is not None and len(stage) > limit:
+        stage = stage[:limit]
+        next_cursor = _encode_cursor(
+            [stage[-1]["entity_type"], stage[-1]["entity_id"]]
+        )
+
+    items = stage
+    if fields:
+        items = [
+            {col: r.get(col) for col in columns} for r in stage
+        ]
+        if "agency_booked" in columns:
+            for item in items:
+                item["agency_booked"] = bool(item["agency_booked"])
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": total,
+        "stats": stats,
+    }
+
+
+def stale_entities(
+    conn: sqlite3.Connection,
+    cutoff: str,
+    grace_cutoff: str,
+    entity_type: str = "all",
+    category: str = "all",
+    sector_id: Optional[int] = None,
+    include_inactive: bool = False,
+    sort: str = "name",
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Entities with no spots ("zero_spot") or none since cutoff ("stale").
+
+    Zero-spot entities created on or after grace_cutoff are left out:
+    they are new, not stale. Returns (rows, total matching).
+    """
+    category_sql = (
+        "CASE WHEN spot_count = 0 THEN 'zero_spot' "
+        "WHEN last_active < ? THEN 'stale' END"
+    )
+    where = [
+        f"{category_sql} IS NOT NULL",
+        "NOT (spot_count = 0 AND COALESCE(created_date, '') >= ?)",
+    ]
+    params: List[Any] = [cutoff, grace_cutoff]
+    if entity_type in ("customer", "agency"):
+        where.append("entity_type = ?")
+        params.append(entity_type)
+    if category in ("zero_spot", "stale"):
+        where.append(f"{category_sql} = ?")
+        params.extend([cutoff, category])
+    if sector_id is not None:
+        where.append("entity_type = 'customer' AND sector_id = ?")
+        params.append(sector_id)
+    if not include_inactive:
+        where.append("is_active = 1")
+
+    columns = f"""
+        entity_id, entity_type, entity_name, is_active,
+        sector_id,
+        CASE WHEN entity_type = 'customer' THEN sector_name END
+            AS sector_name,
+        assigned_ae, notes, created_date,
+        spot_count, total_revenue, last_active, alias_count,
+        entity_type = 'customer' AND instr(entity_name, ':') > 0
+            AS is_agency_client,
+        {category_sql} AS category
+    """
+    rows, total = _page(
+        conn, where, params, columns,
+        STALE_SORTS.get(sort, STALE_SORTS["name"]), limit, offset,
+        column_params=(cutoff,),
+        source="entity_directory" if directory_exists(conn)
+        else _STALE_SOURCE,
+    )
+    results = []
+    for r in rows:
+        row = dict(r)
+        row["is_agency_client"] = bool(row["is_agency_client"])
+        results.append(row)
+    return results, total
+
+
+def stale_summary(
+    conn: sqlite3.Connection, cutoff: str, grace_cutoff: str
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Active stale_entities() counted by (entity_type, category).
+
+    Each value is {"count", "revenue"}; pairs with no entities are
+    missing.
+    """
+    source = (
+        "entity_directory" if directory_exists(conn) else _STALE_SOURCE
+    )
+    rows = conn.execute(f"""
+        SELECT entity_type, category,
+               COUNT(*) AS cnt, SUM(total_revenue) AS revenue
+        FROM (
+            SELECT entity_type, total_revenue,
+                   CASE WHEN spot_count = 0 THEN 'zero_spot'
+                        WHEN last_active < ? THEN 'stale' END AS category
+            FROM {source}
+            WHERE is_active = 1
+              AND NOT (spot_count = 0 AND COALESCE(created_date, '') >= ?)
+        )
+        WHERE category IS NOT NULL
+        GROUP BY entity_type, category
+    """, (cutoff, grace_cutoff)).fetchall()
+    return {
+        (r["entity_type"], r["category"]): {
+            "count": r["cnt"], "revenue": float(r["revenue"] or 0)
+        }
+        for r in rows
+    }
+
+
+def sector_customers(
+    conn: sqlite3.Connection,
+    search: Optional[str] = None,
+    sector: Optional[str] = None,
+    sort: str = "name",
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Tuple[List[sqlite3.Row], int]:
+    """Active customers with revenue, for sector assignment.
+
+    WorldLink broker clients are left out. sector filters by sector
+    name, or "unassigned" for customers without one. Returns
+    (rows, total matching).
+    """
+    where = [
+        "entity_type = 'customer'",
+        "is_active = 1",
+        "worldlink_client = 0",
+        "total_revenue > 0",
+    ]
+    params: List[Any] = []
+    if search:
+        where.append("entity_name LIKE ?")
+        params.append(f"%{search}%")
+    if sector:
+        if sector.lower() == "unassigned":
+            where.append("sector_name IS NULL")
+        else:
+            where.append("sector_name = ?")
+            params.append(sector)
+
+    columns = """
+        entity_id, entity_name, sector_name, updated_date,
+        ROUND(total_revenue, 2) AS total_revenue, spot_count,
+        sector_assigned_by, sector_assigned_date
+    """
+    return _page(
+        conn, where, params, columns,
+        SECTOR_CUSTOMER_SORTS.get(sort, SECTOR_CUSTOMER_SORTS["name"]),
+        limit, offset,
+        source="entity_directory" if directory_exists(conn)
+        else _SECTOR_CUSTOMER_SOURCE,
+    )
@@ -1,13 +1,102 @@
 """Service for computing and caching entity metrics and signals."""
 
+import json
 import logging
+import sqlite3
 from datetime import date
 
 from src.services.base_service import BaseService
+from src.services.reference_data import bump_version
 from src.utils.formatting import fmt_revenue
 
 logger = logging.getLogger(__name__)
 
+# Per-entity inputs to the signal rules in _compute_signals_for_row
+SIGNAL_QUERY = """
+    SELECT {id_col} as entity_id,
+      SUM(CASE
+          WHEN air_date >= date('now','-12 months')
+               AND air_date <= date('now')
+               AND (revenue_type != 'Trade'
+                    OR revenue_type IS NULL)
+          THEN gross_rate ELSE 0 END) as trailing_12m,
+      SUM(CASE
+          WHEN air_date >= date('now','-24 months')
+               AND air_date < date('now','-12 months')
+               AND (revenue_type != 'Trade'
+                    OR revenue_type IS NULL)
+          THEN gross_rate ELSE 0 END) as prior_12m,
+      SUM(CASE
+          WHEN air_date > date('now')
+               AND (revenue_type != 'Trade'
+                    OR revenue_type IS NULL)
+          THEN gross_rate ELSE 0 END) as future_rev,
+      SUM(CASE
+          WHEN air_date > date('now') THEN 1
+          ELSE 0 END) as future_spots,
+      SUM(CASE
+          WHEN revenue_type != 'Trade'
+               OR revenue_type IS NULL
+          THEN gross_rate ELSE 0 END) as lifetime_rev,
+      MIN(air_date) as first_spot,
+      MAX(CASE
+          WHEN air_date <= date('now')
+          THEN air_date END) as last_past_spot,
+      COUNT(DISTINCT CASE
+          WHEN air_date >= date('now','-24 months')
+               AND air_date <= date('now')
+          THEN strftime('%Y-%m', air_date) END)
+          as active_months_24m
+    FROM spots
+    WHERE {id_filter}
+    GROUP BY {id_col}
+"""
+
+MONTH_ABBRS = (
+    "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
+)
+
+# Window boundaries behind SIGNAL_QUERY's buckets and the gone_quiet
+# thresholds (90/120/240 days). A spot whose air_date one of these
+# passes since the last sweep may change its entity's signals.
+AGING_OFFSETS = (
+    "-12 months", "-24 months", "-90 days", "-120 days", "-240 days",
+)
+
+
+def queue_signal_refresh(conn, broadcast_months):
+    """Queue every entity with spots in broadcast_months for
+    refresh_changed_signals(), inside the caller's transaction.
+
+    Imports call this before replacing months (entities losing spots)
+    and after (entities gaining them); one set-based statement per call
+    instead of a per-row spot trigger. A missing entity_signal_dirty
+    table (before migration 039) is ignored: the cache job then
+    refreshes every signal.
+    """
+    if not broadcast_months:
+        return
+    months = json.dumps(sorted(broadcast_months))
+    try:
+        conn.execute("""
+            INSERT OR IGNORE INTO entity_signal_dirty (entity_type, entity_id)
+            SELECT 'customer', customer_id FROM spots
+            WHERE broadcast_month IN (SELECT value FROM json_each(?))
+              AND customer_id IS NOT NULL
+            UNION
+            SELECT 'agency', agency_id FROM spots
+            WHERE broadcast_month IN (SELECT value FROM json_each(?))
+              AND agency_id IS NOT NULL
+            UNION
+            SELECT 'agency', c.agency_id
+            FROM spots s JOIN customers c ON c.customer_id = s.customer_id
+            WHERE s.broadcast_month IN (SELECT value FROM json_each(?))
+              AND c.agency_id IS NOT NULL
+        """, [months, months, months])
+    except sqlite3.OperationalError as e:
+        logger.debug(f"Signal refresh not queued: {e}")
+
 
 class EntityMetricsService(BaseService):
     """Computes and caches entity-level metrics and health signals."""
@@ -87,64 +176,203 @@ class EntityMetricsService(BaseService):
         self.ensure_cache_tables(conn)
 
         # Snapshot current signals before delete
-        before_snapshot = {
-            (r["entity_type"], r["entity_id"], r["signal_type"])
-            for r in conn.execute(
-                "SELECT entity_type, entity_id, signal_type"
-                " FROM entity_signals"
-            ).fetchall()
-        }
+        before_snapshot = self._signal_snapshot(conn)
 
         conn.execute("DELETE FROM entity_signals")
+        self._insert_signals(conn)
+        self._compute_renewal_gap_signals(conn)
+
+        # Sync signal actions with refreshed signals
+        from src.services.signal_action_service import SignalActionService
+        svc = SignalActionService(self.db_connection)
+        svc.sync_from_signals(conn, before_snapshot, self._ae_lookup(conn))
+
+        # Everything is current, including windows that aged
+        if self._signal_queue_exists(conn):
+            conn.execute("DELETE FROM entity_signal_dirty")
+            conn.execute(
+                "UPDATE entity_signal_sweep SET swept_on = date('now')"
+            )
+
+        # Cached manager scoreboard reads entity_signals
+        bump_version(conn, "entity_signals")
 
-        signal_query = """
-            SELECT {id_col} as entity_id,
-              SUM(CASE
-                  WHEN air_date >= date('now','-12 months')
-                       AND air_date <= date('now')
-                       AND (revenue_type != 'Trade'
-                            OR revenue_type IS NULL)
-                  THEN gross_rate ELSE 0 END) as trailing_12m,
-              SUM(CASE
-                  WHEN air_date >= date('now','-24 months')
-                       AND air_date < date('now','-12 months')
-                       AND (revenue_type != 'Trade'
-                            OR revenue_type IS NULL)
-                  THEN gross_rate ELSE 0 END) as prior_12m,
-              SUM(CASE
-                  WHEN air_date > date('now')
-                       AND (revenue_type != 'Trade'
-                            OR revenue_type IS NULL)
-                  THEN gross_rate ELSE 0 END) as future_rev,
-              SUM(CASE
-                  WHEN air_date > date('now') THEN 1
-                  ELSE 0 END) as future_spots,
-              SUM(CASE
-                  WHEN revenue_type != 'Trade'
-                       OR revenue_type IS NULL
-                  THEN gross_rate ELSE 0 END) as lifetime_rev,
-              MIN(air_date) as first_spot,
-              MAX(CASE
-                  WHEN air_date <= date('now')
-                  THEN air_date END) as last_past_spot,
-              COUNT(DISTINCT CASE
-                  WHEN air_date >= date('now','-24 months')
-                       AND air_date <= date('now')
-                  THEN strftime('%Y-%m', air_date) END)
-                  as active_months_24m
-            FROM spots
-            WHERE {id_col} IS NOT NULL
-            GROUP BY {id_col}
+    def refresh_signals_for_ids(
+        self, conn, customer_ids=None, agency_ids=None
+    ):
+        """Recompute signals and sync signal actions for these entities only.
+
+        Also removes them from the dirty queue (migration 039).
         """
+        self.ensure_cache_tables(conn)
+        scope = {
+            "agency": sorted(set(agency_ids or [])),
+            "customer": sorted(set(customer_ids or [])),
+        }
+        if not scope["agency"] and not scope["customer"]:
+            return
+
+        before_snapshot = self._signal_snapshot(conn, scope)
+        for entity_type, ids in scope.items():
+            if ids:
+                conn.execute(
+                    "DELETE FROM entity_signals WHERE entity_type = ? "
+                    "AND entity_id IN (SELECT value FROM json_each(?))",
+                    [entity_type, json.dumps(ids)],
+                )
+        self._insert_signals(conn, scope)
+        self._compute_renewal_gap_signals(conn, scope)
 
+        from src.services.signal_action_service import SignalActionService
+        svc = SignalActionService(self.db_connection)
+        svc.sync_from_signals(
+            conn, before_snapshot, self._ae_lookup(conn, scope), scope
+        )
+
+        if self._signal_queue_exists(conn):
+            for entity_type, ids in scope.items():
+                if ids:
+                    conn.execute(
+                        "DELETE FROM entity_signal_dirty "
+                        "WHERE entity_type = ? AND entity_id IN "
+                        "(SELECT value FROM json_each(?))",
+                        [entity_type, json.dumps(ids)],
+                    )
+
+        bump_version(conn, "entity_signals")
+
+    def refresh_changed_signals(self, conn):
+        """Recompute signals for queued entities and those that aged.
+
+        Drains entity_signal_dirty and, on the first run of a day, adds
+        the entities whose time-windowed inputs crossed a boundary since
+        the last sweep. The first run of a month (renewal_gap and
+        new_account work in calendar months) and databases without
+        migration 039 get a full refresh_signals() instead.
+
+        Returns {"mode": "full"} or {"mode": "incremental",
+        "dirty": n, "aged": n}.
+        """
+        self.ensure_cache_tables(conn)
+        if not self._signal_queue_exists(conn):
+            self.refresh_signals(conn)
+            return {"mode": "full"}
+
+        today = conn.execute("SELECT date('now')").fetchone()[0]
+        row = conn.execute(
+            "SELECT swept_on FROM entity_signal_sweep WHERE id = 1"
+        ).fetchone()
+        swept_on = row[0] if row else None
+        if not swept_on or swept_on[:7] != today[:7]:
+            self.refresh_signals(conn)
+            return {"mode": "full"}
+
+        scope = {"agency": set(), "customer": set()}
+        for r in conn.execute(
+            "SELECT entity_type, entity_id FROM entity_signal_dirty"
+        ).fetchall():
+            scope[r[0]].add(r[1])
+        dirty = len(scope["agency"]) + len(scope["customer"])
+
+        aged = 0
+        if swept_on < today:
+            for entity_type, entity_id in self._aged_entities(
+                conn, swept_on
+            ):
+                if entity_id not in scope[entity_type]:
+                    scope[entity_type].add(entity_id)
+                    aged += 1
+            conn.execute(
+                "UPDATE entity_signal_sweep SET swept_on = ? WHERE id = 1",
+                [today],
+            )
+
+        self.refresh_signals_for_ids(
+            conn,
+            customer_ids=scope["customer"],
+            agency_ids=scope["agency"],
+        )
+        return {"mode": "incremental", "dirty": dirty, "aged": aged}
+
+    def _aged_entities(self, conn, since):
+        """Entities whose windowed signal inputs may have changed since
+        the date since, without any write to their spots.
+
+        A spot changes bucket when one of the window boundaries used by
+        the signal query passes its air_date: today (future -> past),
+        12 and 24 months ago, and the gone_quiet thresholds. Entities
+        with a gone_quiet signal are included as well, since its label
+        counts days.
+        """
+        bands = ["(air_date > ? AND air_date <= date('now'))"]
+        params = [since]
+        for offset in AGING_OFFSETS:
+            bands.append(
+                "(air_date >= date(?, ?) AND air_date < date('now', ?))"
+            )
+            params += [since, offset, offset]
+        rows = conn.execute(f"""
+            SELECT DISTINCT customer_id, agency_id FROM spots
+            WHERE {' OR '.join(bands)}
+        """, params).fetchall()
+
+        entities = set()
+        for r in rows:
+            if r[0] is not None:
+                entities.add(("customer", r[0]))
+            if r[1] is not None:
+                entities.add(("agency", r[1]))
+        for r in conn.execute(
+            "SELECT entity_type, entity_id FROM entity_signals "
+            "WHERE signal_type = 'gone_quiet'"
+        ).fetchall():
+            entities.add((r[0], r[1]))
+        return entities
+
+    def _signal_queue_exists(self, conn):
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'entity_signal_dirty'"
+        ).fetchone()
+        return row is not None
+
+    def _signal_snapshot(self, conn, scope=None):
+        """Set of (entity_type, entity_id, signal_type), optionally for
+        the entity ids in scope only."""
+        if scope is None:
+            rows = conn.execute(
+                "SELECT entity_type, entity_id, signal_type"
+                " FROM entity_signals"
+            ).fetchall()
+        else:
+            rows = []
+            for entity_type, ids in scope.items():
+                if ids:
+                    rows += conn.execute(
+                        "SELECT entity_type, entity_id, signal_type"
+                        " FROM entity_signals WHERE entity_type = ?"
+                        " AND entity_id IN (SELECT value FROM json_each(?))",
+                        [entity_type, json.dumps(ids)],
+                    ).fetchall()
+        return {(r[0], r[1], r[2]) for r in rows}
+
+    def _insert_signals(self, conn, scope=None):
+        """Evaluate the spot-based signal rules and insert the results."""
         rows_to_insert = []
 
         for entity_type, id_col in [
             ("agency", "agency_id"),
             ("customer", "customer_id"),
         ]:
-            query = signal_query.format(id_col=id_col)
-            for row in conn.execute(query).fetchall():
+            if scope is None:
+                id_filter, params = f"{id_col} IS NOT NULL", []
+            elif scope[entity_type]:
+                id_filter = f"{id_col} IN (SELECT value FROM json_each(?))"
+                params = [json.dumps(scope[entity_type])]
+            else:
+                continue
+            query = SIGNAL_QUERY.format(id_col=id_col, id_filter=id_filter)
+            for row in conn.execute(query, params).fetchall():
                 self._compute_signals_for_row(
                     entity_type, row, rows_to_insert
                 )
@@ -157,27 +385,26 @@ class EntityMetricsService(BaseService):
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, rows_to_insert)
 
-        self._compute_renewal_gap_signals(conn)
-
-        # Build AE lookup for signal action assignment
-        ae_rows = conn.execute("""
-            SELECT 'agency' AS entity_type, agency_id AS entity_id,
-                   assigned_ae
-            FROM agencies WHERE is_active = 1 AND assigned_ae IS NOT NULL
-            UNION ALL
-            SELECT 'customer' AS entity_type, customer_id AS entity_id,
-                   assigned_ae
-            FROM customers WHERE is_active = 1 AND assigned_ae IS NOT NULL
-        """).fetchall()
-        ae_lookup = {
-            (r["entity_type"], r["entity_id"]): r["assigned_ae"]
-            for r in ae_rows
-        }
-
-        # Sync signal actions with refreshed signals
-        from src.services.signal_action_service import SignalActionService
-        svc = SignalActionService(self.db_connection)
-        svc.sync_from_signals(conn, before_snapshot, ae_lookup)
+    def _ae_lookup(self, conn, scope=None):
+        """AE lookup for signal action assignment."""
+        ae_lookup = {}
+        for entity_type, table, id_col in [
+            ("agency", "agencies", "agency_id"),
+            ("customer", "customers", "customer_id"),
+        ]:
+            sql = (
+                f"SELECT {id_col}, assigned_ae FROM {table} "
+                "WHERE is_active = 1 AND assigned_ae IS NOT NULL"
+            )
+            params = []
+            if scope is not None:
+                if not scope[entity_type]:
+                    continue
+                sql += f" AND {id_col} IN (SELECT value FROM json_each(?))"
+                params = [json.dumps(scope[entity_type])]
+            for r in conn.execute(sql, params).fetchall():
+                ae_lookup[(entity_type, r[0])] = r[1]
+        return ae_lookup
 
     def _compute_signals_for_row(self, entity_type, row, rows_to_insert):
         """Evaluate all signal rules for one entity row."""
@@ -293,61 +520,68 @@ class EntityMetricsService(BaseService):
                  priority, trailing, prior)
             )
 
-    def _compute_renewal_gap_signals(self, conn):
-        """Detect accounts with trailing revenue but little forward booking."""
-        bm_to_iso = """
-            '20' || SUBSTR(s.broadcast_month, 5, 2) || '-' ||
-            CASE SUBSTR(s.broadcast_month, 1, 3)
-                WHEN 'Jan' THEN '01' WHEN 'Feb' THEN '02'
-                WHEN 'Mar' THEN '03' WHEN 'Apr' THEN '04'
-                WHEN 'May' THEN '05' WHEN 'Jun' THEN '06'
-                WHEN 'Jul' THEN '07' WHEN 'Aug' THEN '08'
-                WHEN 'Sep' THEN '09' WHEN 'Oct' THEN '10'
-                WHEN 'Nov' THEN '11' WHEN 'Dec' THEN '12'
-            END
+    def _compute_renewal_gap_signals(self, conn, scope=None):
+        """Detect accounts with trailing revenue but little forward booking.
+
+        Sums each customer's spots in the six broadcast months the
+        windows cover in one pass, then rolls customers up to agencies.
+        scope limits the scan to the entity ids it maps each type to.
         """
+        months = self._renewal_gap_months(conn)
         configs = [
-            ("customer_id", "customer", "customers",
-             "s.customer_id = e.customer_id"),
-            ("agency_id", "agency", "agencies",
-             "s.customer_id IN "
-             "(SELECT customer_id FROM customers "
-             "WHERE agency_id = e.agency_id)"),
+            ("customer_id", "customer",
+             "customers e JOIN gap_window w ON w.customer_id = e.customer_id",
+             "customer_id IN (SELECT value FROM json_each(?))"),
+            ("agency_id", "agency",
+             "agencies e JOIN customers c ON c.agency_id = e.agency_id "
+             "JOIN gap_window w ON w.customer_id = c.customer_id",
+             "customer_id IN (SELECT customer_id FROM customers "
+             "WHERE agency_id IN (SELECT value FROM json_each(?)))"),
         ]
-        for entity_col, entity_type, entity_table, join_clause in configs:
+        for entity_col, entity_type, entity_join, spot_filter in configs:
+            params = [
+                json.dumps(months[:3]), json.dumps(months[3:]),
+                json.dumps(months),
+            ]
+            spot_scope, id_filter = "", ""
+            if scope is not None:
+                if not scope[entity_type]:
+                    continue
+                ids = json.dumps(scope[entity_type])
+                spot_scope = f"AND {spot_filter}"
+                id_filter = (
+                    f"AND e.{entity_col} IN (SELECT value FROM json_each(?))"
+                )
+                params += [ids, ids]
             gap_rows = conn.execute(f"""
-                SELECT
-                    sub.entity_id,
-                    sub.trailing_3m,
-                    sub.forward_3m
-                FROM (
+                WITH gap_window AS (
                     SELECT
-                        e.{entity_col} AS entity_id,
-                        COALESCE(SUM(CASE
-                            WHEN {bm_to_iso}
-                                >= strftime('%Y-%m', 'now', '-3 months')
-                             AND {bm_to_iso}
-                                < strftime('%Y-%m', 'now')
-                            THEN s.gross_rate ELSE 0 END), 0)
-                            AS trailing_3m,
-                        COALESCE(SUM(CASE
-                            WHEN {bm_to_iso}
-                                >= strftime('%Y-%m', 'now')
-                             AND {bm_to_iso}
-                                < strftime('%Y-%m', 'now', '+3 months')
-                            THEN s.gross_rate ELSE 0 END), 0)
-                            AS forward_3m
-                    FROM {entity_table} e
-                    LEFT JOIN spots s ON {join_clause}
-                        AND s.is_historical = 0
-                        AND (s.revenue_type != 'Trade'
-                             OR s.revenue_type IS NULL)
-                    WHERE e.is_active = 1
-                    GROUP BY e.{entity_col}
-                ) sub
-                WHERE sub.trailing_3m > 0
-                  AND sub.forward_3m < sub.trailing_3m * 0.25
-            """).fetchall()
+                        customer_id,
+                        SUM(CASE WHEN broadcast_month IN
+                                (SELECT value FROM json_each(?))
+                            THEN gross_rate ELSE 0 END) AS trailing_3m,
+                        SUM(CASE WHEN broadcast_month IN
+                                (SELECT value FROM json_each(?))
+                            THEN gross_rate ELSE 0 END) AS forward_3m
+                    FROM spots
+                    WHERE broadcast_month IN (SELECT value FROM json_each(?))
+                      AND is_historical = 0
+                      AND (revenue_type != 'Trade' OR revenue_type IS NULL)
+                      AND customer_id IS NOT NULL
+                      {spot_scope}
+                    GROUP BY customer_id
+                )
+                SELECT
+                    e.{entity_col} AS entity_id,
+                    COALESCE(SUM(w.trailing_3m), 0) AS trailing_3m,
+                    COALESCE(SUM(w.forward_3m), 0) AS forward_3m
+                FROM {entity_join}
+                WHERE e.is_active = 1 {id_filter}
+                GROUP BY e.{entity_col}
+                HAVING SUM(w.trailing_3m) > 0
+                   AND COALESCE(SUM(w.forward_3m), 0)
+                       < SUM(w.trailing_3m) * 0.25
+            """, params).fetchall()
 
             for row in gap_rows:
                 trailing = row["trailing_3m"]
@@ -365,6 +599,20 @@ class EntityMetricsService(BaseService):
                 """, [entity_type, row["entity_id"],
                       label, trailing, forward])
 
+    def _renewal_gap_months(self, conn):
+        """broadcast_month labels ('Jan-25') of the three months before
+        the current month, then the current month and the two after it."""
+        months = []
+        for offset in range(-3, 3):
+            month, year = conn.execute(
+                "SELECT CAST(strftime('%m', 'now', 'start of month', ?)"
+                " AS INTEGER),"
+                " substr(strftime('%Y', 'now', 'start of month', ?), 3)",
+                [f"{offset:+d} months"] * 2,
+            ).fetchone()
+            months.append(f"{MONTH_ABBRS[month - 1]}-{year}")
+        return months
+
     def refresh_metrics_for_ids(
         self, conn, customer_ids=None, agency_ids=None
     ):
@@ -458,11 +706,36 @@ class EntityMetricsService(BaseService):
         return [dict(row) for row in rows]
 
     def auto_refresh_if_empty(self, conn):
-        """Refresh both caches if entity_metrics is empty."""
+        """Fill both caches if entity_metrics is empty.
+
+        Queues a background refresh rather than recomputing inside the
+        page request; falls back to refreshing inline when the job queue
+        (migration 030) is not available. Returns True if a refresh was
+        queued, i.e. metrics will appear once the job has run.
+        """
         self.ensure_cache_tables(conn)
         count = conn.execute(
             "SELECT COUNT(*) FROM entity_metrics"
         ).fetchone()[0]
-        if count == 0:
-            self.refresh_metrics(conn)
-            self.refresh_signals(conn)
+        if count:
+            return False
+
+        from src.services.background_jobs import (
+            REFRESH_ENTITY_CACHES,
+            enqueue_job,
+        )
+
+        # Commit the CREATE TABLEs before queueing on a separate connection
+        conn.commit()
+        job_id = enqueue_job(
+            self.db_connection,
+            REFRESH_ENTITY_CACHES,
+            job_key="entity_caches",
+            created_by="address_book",
+        )
+        if job_id is not None:
+            return True
+
+        self.refresh_metrics(conn)
+        self.refresh_signals(conn)
+        return False
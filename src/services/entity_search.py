@@ -0,0 +1,183 @@
+"""Ranked entity search over the entity_search FTS5 index (migration 038).
+
+entity_search holds one trigram-tokenized row per agency and customer:
+name, active aliases, contacts (name, title, email, phone), addresses
+and notes. Triggers keep it current, so every lookup UI (address book,
+customer/agency resolution, canon tools) can share one search:
+
+    results = search_entities(conn, "golden dargon", entity_type="customer")
+
+Results come in two tiers:
+
+1. Substring matches of the whole query, in any column. Name prefixes
+   come first, then names, aliases, contacts, addresses and notes,
+   shorter names first within a tier.
+2. If that leaves room under limit, near misses: entities whose name or
+   an alias shares enough trigrams with the query (Jaccard similarity
+   of at least MIN_SIMILARITY), which catches typos and transposed
+   letters.
+
+Both are index lookups, so typeahead latency tracks the number of
+matches rather than the number of entities. Queries shorter than three
+characters have no trigrams and fall back to scanning names.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+MIN_SIMILARITY = 0.3
+
+# Near-miss candidates read from the index, best bm25 first, before the
+# similarity check
+FUZZY_CANDIDATES = 200
+
+_MATCHED_ON = ("name", "name", "alias", "contact", "address", "notes")
+
+_COLUMNS = "entity_type, entity_id, is_active, name, aliases"
+
+
+def search_index_exists(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'entity_search'"
+    ).fetchone()
+    return row is not None
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> int:
+    """Recompute every row from the source tables. Returns the row count.
+
+    The triggers keep the index current; this is for repairs after
+    writes that bypassed them.
+    """
+    conn.execute("DELETE FROM entity_search")
+    return conn.execute("""
+        INSERT INTO entity_search (rowid, entity_type, entity_id, is_active,
+                                   name, aliases, contacts, addresses, notes)
+        SELECT search_rowid, entity_type, entity_id, is_active,
+               name, aliases, contacts, addresses, notes
+        FROM entity_search_source
+    """).rowcount
+
+
+def phrase_query(text: str) -> str:
+    """FTS5 query matching text as a substring (three characters or more)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _similarity(query_grams: Set[str], text: str) -> float:
+    grams = _trigrams(text)
+    if not grams:
+        return 0.0
+    return len(query_grams & grams) / len(query_grams | grams)
+
+
+def _filters(
+    entity_type: Optional[str], include_inactive: bool
+) -> Tuple[str, List[Any]]:
+    where: List[str] = []
+    params: List[Any] = []
+    if entity_type in ("agency", "customer"):
+        where.append("entity_type = ?")
+        params.append(entity_type)
+    if not include_inactive:
+        where.append("is_active = 1")
+    return "".join(f" AND {w}" for w in where), params
+
+
+def _result(r: sqlite3.Row, matched_on: str, score: float) -> Dict[str, Any]:
+    return {
+        "entity_type": r[0],
+        "entity_id": r[1],
+        "entity_name": r[3],
+        "is_active": bool(r[2]),
+        "matched_on": matched_on,
+        "score": round(score, 3),
+    }
+
+
+def search_entities(
+    conn: sqlite3.Connection,
+    query: str,
+    entity_type: Optional[str] = None,
+    include_inactive: bool = False,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """Agencies and customers matching query, best first.
+
+    Each result is {"entity_type", "entity_id", "entity_name",
+    "is_active", "matched_on", "score"}: matched_on is "name", "alias",
+    "contact", "address" or "notes", and score is 1.0 for substring
+    matches or the trigram similarity of a near miss.
+    """
+    q = (query or "").strip()
+    if not q or limit <= 0:
+        return []
+    filter_sql, filter_params = _filters(entity_type, include_inactive)
+
+    if len(q) < 3:
+        escaped = (
+            q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        rows = conn.execute(f"""
+            SELECT {_COLUMNS} FROM entity_search
+            WHERE name LIKE ? ESCAPE '\\' {filter_sql}
+            ORDER BY instr(lower(name), ?) != 1, length(name), lower(name)
+            LIMIT ?
+        """, [f"%{escaped}%"] + filter_params + [q.lower(), limit]).fetchall()
+        return [_result(r, "name", 1.0) for r in rows]
+
+    needle = q.lower()
+    rows = conn.execute(f"""
+        SELECT {_COLUMNS},
+               CASE WHEN instr(lower(name), ?) = 1 THEN 0
+                    WHEN instr(lower(name), ?) > 0 THEN 1
+                    WHEN instr(lower(COALESCE(aliases, '')), ?) > 0 THEN 2
+                    WHEN instr(lower(COALESCE(contacts, '')), ?) > 0 THEN 3
+                    WHEN instr(lower(COALESCE(addresses, '')), ?) > 0 THEN 4
+                    ELSE 5 END AS tier
+        FROM entity_search
+        WHERE entity_search MATCH ? {filter_sql}
+        ORDER BY tier, length(name), lower(name)
+        LIMIT ?
+    """, [needle] * 5 + [phrase_query(q)] + filter_params + [limit]).fetchall()
+    results = [_result(r, _MATCHED_ON[r[5]], 1.0) for r in rows]
+
+    query_grams = _trigrams(q)
+    if len(results) >= limit or len(query_grams) < 2:
+        return results
+
+    found = {(r["entity_type"], r["entity_id"]) for r in results}
+    any_gram = " OR ".join(phrase_query(g) for g in sorted(query_grams))
+    candidates = conn.execute(f"""
+        SELECT {_COLUMNS} FROM entity_search
+        WHERE entity_search MATCH ? {filter_sql}
+        ORDER BY rank
+        LIMIT ?
+    """, [f"{{name aliases}} : ({any_gram})"] + filter_params
+         + [FUZZY_CANDIDATES]).fetchall()
+
+    near = []
+    for r in candidates:
+        if (r[0], r[1]) in found:
+            continue
+        best, matched_on = _similarity(query_grams, r[3]), "name"
+        for alias in (r[4] or "").split("\n"):
+            score = _similarity(query_grams, alias)
+            if score > best:
+                best, matched_on = score, "alias"
+        if best >= MIN_SIMILARITY:
+            near.append((best, r, matched_on))
+    near.sort(key=lambda n: (-n[0], n[1][3].lower()))
+    results.extend(
+        _result(r, matched_on, score)
+        for score, r, matched_on in near[:limit - len(results)]
+    )
+    return results
@@ -7,7 +7,13 @@ Extracted from address_book.py routes. All methods accept a conn parameter
 import logging
 
 from src.services.base_service import BaseService
-from src.services.customer_resolution_service import _score_name
+from src.services.entity_directory import directory_exists, list_directory
+from src.services.customer_resolution_service import (
+    _score_name,
+    _similar_pairs,
+)
+from src.services.reference_data import get_reference_data
+from src.services.spot_catalog import ae_names
 from src.utils.formatting import client_portion
 
 logger = logging.getLogger(__name__)
@@ -20,11 +26,20 @@ class EntityService(BaseService):
         super().__init__(db_connection)
 
     def list_entities(self, conn, include_inactive=False):
-        """List all entities with batch contact stats, sectors, metrics,
+        """List all entities with contact stats, sectors, metrics,
         and signals.
 
+        Reads the entity_directory snapshot (migration 036); without it,
+        assembles the same rows from the source tables.
+
         Returns dict with top-level list (agencies then customers).
         """
+        if directory_exists(conn):
+            return list_directory(conn, include_inactive)
+        return self._list_entities_from_sources(conn, include_inactive)
+
+    def _list_entities_from_sources(self, conn, include_inactive=False):
+        """list_entities() via batch queries merged in Python."""
         results = []
 
         # Batch: contact stats for all entities
@@ -334,7 +349,9 @@ class EntityService(BaseService):
         """Create agency or customer with optional contact, sector,
         AE assignment. Fuzzy duplicate detection.
 
-        Returns dict with result or error info.
+        Returns dict with result or error info. After committing an AE
+        assignment, the caller invalidates the "ae_assignments"
+        reference data.
         """
         entity_type = (data.get("entity_type") or "").strip()
         name = (data.get("name") or "").strip()
@@ -1148,116 +1165,9 @@ class EntityService(BaseService):
         if not agency:
             return {"error": "Agency not found", "status": 404}
 
-        # Collect agency name variants
-        agency_names = [agency["agency_name"]]
-        alias_rows = conn.execute("""
-            SELECT alias_name FROM entity_aliases
-            WHERE entity_type = 'agency'
-              AND target_entity_id = ? AND is_active = 1
-        """, [agency_id]).fetchall()
-        for ar in alias_rows:
-            agency_names.append(ar["alias_name"])
-
-        # Source 1: spots with this agency_id
-        spot_customers = conn.execute("""
-            SELECT
-                c.customer_id,
-                c.normalized_name as customer_name,
-                c.sector_id, s.sector_name,
-                c.po_number, c.edi_billing,
-                c.commission_rate, c.order_rate_basis,
-                SUM(CASE
-                    WHEN sp.revenue_type != 'Trade'
-                         OR sp.revenue_type IS NULL
-                    THEN sp.gross_rate ELSE 0
-                END) as revenue_via_agency,
-                COUNT(sp.spot_id) as spot_count,
-                MAX(sp.air_date) as last_active
-            FROM spots sp
-            JOIN customers c
-                ON sp.customer_id = c.customer_id
-            LEFT JOIN sectors s ON c.sector_id = s.sector_id
-            WHERE sp.agency_id = ? AND c.is_active = 1
-            GROUP BY c.customer_id
-        """, [agency_id]).fetchall()
-
-        seen_ids = set()
-        result_customers = []
-        for c in spot_customers:
-            result_customers.append(dict(c))
-            seen_ids.add(c["customer_id"])
-
-        # Source 2: name prefix match
-        for name in agency_names:
-            name_customers = conn.execute("""
-                SELECT
-                    c.customer_id,
-                    c.normalized_name as customer_name,
-                    c.sector_id, s.sector_name,
-                    c.po_number, c.edi_billing,
-                    c.commission_rate, c.order_rate_basis,
-                    COALESCE((
-                        SELECT SUM(
-                            CASE WHEN sp.revenue_type != 'Trade'
-                                 OR sp.revenue_type IS NULL
-                            THEN sp.gross_rate ELSE 0 END
-                        ) FROM spots sp
-                        WHERE sp.customer_id = c.customer_id
-                    ), 0) as revenue_via_agency,
-                    COALESCE((
-                        SELECT COUNT(*)
-                        FROM spots sp
-                        WHERE sp.customer_id = c.customer_id
-                    ), 0) as spot_count,
-                    (SELECT MAX(sp.air_date) FROM spots sp
-                     WHERE sp.customer_id = c.customer_id
-                    ) as last_active
-                FROM customers c
-                LEFT JOIN sectors s
-                    ON c.sector_id = s.sector_id
-                WHERE c.is_active = 1
-                  AND c.normalized_name LIKE ? || ':%'
-            """, [name]).fetchall()
-
-            for c in name_customers:
-                if c["customer_id"] not in seen_ids:
-                    result_customers.append(dict(c))
-                    seen_ids.add(c["customer_id"])
-
-        # Source 3: directly assigned agency_id
-        assigned_customers = conn.execute("""
-            SELECT
-                c.customer_id,
-                c.normalized_name as customer_name,
-                c.sector_id, s.sector_name,
-                c.po_number, c.edi_billing,
-                c.commission_rate, c.order_rate_basis,
-                COALESCE((
-                    SELECT SUM(
-                        CASE WHEN sp.revenue_type != 'Trade'
-                             OR sp.revenue_type IS NULL
-                        THEN sp.gross_rate ELSE 0 END
-                    ) FROM spots sp
-                    WHERE sp.customer_id = c.customer_id
-                ), 0) as revenue_via_agency,
-                COALESCE((
-                    SELECT COUNT(*)
-                    FROM spots sp
-                    WHERE sp.customer_id = c.customer_id
-                ), 0) as spot_count,
-                (SELECT MAX(sp.air_date) FROM spots sp
-                 WHERE sp.customer_id = c.customer_id
-                ) as last_active
-            FROM customers c
-            LEFT JOIN sectors s
-                ON c.sector_id = s.sector_id
-            WHERE c.agency_id = ? AND c.is_active = 1
-        """, [agency_id]).fetchall()
-
-        for c in assigned_customers:
-            if c["customer_id"] not in seen_ids:
-                result_customers.append(dict(c))
-                seen_ids.add(c["customer_id"])
+        result_customers = self._load_agency_clients(
+            conn, agency_id, agency["agency_name"]
+        )
 
         # Sort by revenue descending
         result_customers.sort(
@@ -1272,6 +1182,82 @@ class EntityService(BaseService):
             "customers": result_customers
         }
 
+    def _load_agency_clients(self, conn, agency_id, agency_name):
+        """Active customers linked to an agency, in one query.
+
+        Sources, in precedence order: spots booked through the agency
+        (revenue counted via the agency only), customer names prefixed
+        with the agency name or one of its aliases ("Agency:Client"),
+        and customers.agency_id. Customers found only by name or
+        assignment take their totals from entity_metrics.
+        """
+        rows = conn.execute("""
+            WITH agency_names(name) AS (
+                SELECT ?
+                UNION
+                SELECT alias_name FROM entity_aliases
+                WHERE entity_type = 'agency'
+                  AND target_entity_id = ? AND is_active = 1
+            ),
+            via_spots AS (
+                SELECT
+                    customer_id,
+                    SUM(CASE
+                        WHEN revenue_type != 'Trade'
+                             OR revenue_type IS NULL
+                        THEN gross_rate ELSE 0
+                    END) AS revenue,
+                    COUNT(spot_id) AS spot_count,
+                    MAX(air_date) AS last_active
+                FROM spots
+                WHERE agency_id = ?
+                GROUP BY customer_id
+            ),
+            linked(customer_id, source) AS (
+                SELECT customer_id, 1 FROM via_spots
+                UNION ALL
+                SELECT c.customer_id, 2
+                FROM customers c
+                JOIN agency_names n
+                    ON c.normalized_name LIKE n.name || ':%'
+                UNION ALL
+                SELECT customer_id, 3 FROM customers
+                WHERE agency_id = ?
+            )
+            SELECT
+                c.customer_id,
+                c.normalized_name AS customer_name,
+                c.sector_id, s.sector_name,
+                c.po_number, c.edi_billing,
+                c.commission_rate, c.order_rate_basis,
+                CASE WHEN vs.customer_id IS NOT NULL
+                     THEN vs.revenue
+                     ELSE COALESCE(em.total_revenue, 0)
+                END AS revenue_via_agency,
+                CASE WHEN vs.customer_id IS NOT NULL
+                     THEN vs.spot_count
+                     ELSE COALESCE(em.spot_count, 0)
+                END AS spot_count,
+                CASE WHEN vs.customer_id IS NOT NULL
+                     THEN vs.last_active
+                     ELSE em.last_active
+                END AS last_active
+            FROM (
+                SELECT customer_id, MIN(source) AS source
+                FROM linked
+                GROUP BY customer_id
+            ) l
+            JOIN customers c
+                ON c.customer_id = l.customer_id AND c.is_active = 1
+            LEFT JOIN via_spots vs ON vs.customer_id = l.customer_id
+            LEFT JOIN entity_metrics em
+                ON em.entity_type = 'customer'
+               AND em.entity_id = l.customer_id
+            LEFT JOIN sectors s ON c.sector_id = s.sector_id
+            ORDER BY l.source, c.customer_id
+        """, [agency_name, agency_id, agency_id, agency_id]).fetchall()
+        return [dict(r) for r in rows]
+
     def get_agency_duplicates(self, conn, agency_id):
         """Find potential duplicate clients within an agency
         using fuzzy name matching.
@@ -1286,153 +1272,34 @@ class EntityService(BaseService):
         if not agency:
             return {"error": "Agency not found", "status": 404}
 
-        # Collect agency name variants
-        agency_names = [agency["agency_name"]]
-        for ar in conn.execute(
-            "SELECT alias_name FROM entity_aliases "
-            "WHERE entity_type = 'agency' "
-            "AND target_entity_id = ? AND is_active = 1",
-            [agency_id]
-        ).fetchall():
-            agency_names.append(ar["alias_name"])
+        clients = self._load_agency_clients(
+            conn, agency_id, agency["agency_name"]
+        )
+        portions = [client_portion(c["customer_name"]) for c in clients]
 
-        # Gather clients from 3 sources
-        seen_ids = set()
-        clients = []
+        def summary(client, portion):
+            return {
+                "customer_id": client["customer_id"],
+                "customer_name": client["customer_name"],
+                "client_portion": portion,
+                "revenue": client["revenue_via_agency"] or 0,
+                "spot_count": client["spot_count"] or 0,
+                "sector_name": client.get("sector_name") or "",
+            }
 
-        # Source 1: spots
-        for row in conn.execute("""
-            SELECT c.customer_id,
-                   c.normalized_name AS customer_name,
-                   c.sector_id, s.sector_name,
-                   SUM(CASE
-                       WHEN sp.revenue_type != 'Trade'
-                            OR sp.revenue_type IS NULL
-                       THEN sp.gross_rate ELSE 0
-                   END) AS revenue,
-                   COUNT(sp.spot_id) AS spot_count
-            FROM spots sp
-            JOIN customers c
-                ON sp.customer_id = c.customer_id
-            LEFT JOIN sectors s ON c.sector_id = s.sector_id
-            WHERE sp.agency_id = ? AND c.is_active = 1
-            GROUP BY c.customer_id
-        """, [agency_id]).fetchall():
-            if row["customer_id"] not in seen_ids:
-                clients.append(dict(row))
-                seen_ids.add(row["customer_id"])
-
-        # Source 2: name prefix match
-        for name in agency_names:
-            for row in conn.execute("""
-                SELECT c.customer_id,
-                       c.normalized_name AS customer_name,
-                       c.sector_id, s.sector_name,
-                       COALESCE((
-                           SELECT SUM(
-                               CASE WHEN sp.revenue_type != 'Trade'
-                                    OR sp.revenue_type IS NULL
-                               THEN sp.gross_rate ELSE 0 END
-                           ) FROM spots sp
-                           WHERE sp.customer_id = c.customer_id
-                       ), 0) AS revenue,
-                       COALESCE((
-                           SELECT COUNT(*)
-                           FROM spots sp
-                           WHERE sp.customer_id = c.customer_id
-                       ), 0) AS spot_count
-                FROM customers c
-                LEFT JOIN sectors s
-                    ON c.sector_id = s.sector_id
-                WHERE c.is_active = 1
-                  AND c.normalized_name LIKE ? || ':%'
-            """, [name]).fetchall():
-                if row["customer_id"] not in seen_ids:
-                    clients.append(dict(row))
-                    seen_ids.add(row["customer_id"])
-
-        # Source 3: directly assigned
-        for row in conn.execute("""
-            SELECT c.customer_id,
-                   c.normalized_name AS customer_name,
-                   c.sector_id, s.sector_name,
-                   COALESCE((
-                       SELECT SUM(
-                           CASE WHEN sp.revenue_type != 'Trade'
-                                OR sp.revenue_type IS NULL
-                           THEN sp.gross_rate ELSE 0 END
-                       ) FROM spots sp
-                       WHERE sp.customer_id = c.customer_id
-                   ), 0) AS revenue,
-                   COALESCE((
-                       SELECT COUNT(*)
-                       FROM spots sp
-                       WHERE sp.customer_id = c.customer_id
-                   ), 0) AS spot_count
-            FROM customers c
-            LEFT JOIN sectors s
-                ON c.sector_id = s.sector_id
-            WHERE c.agency_id = ? AND c.is_active = 1
-        """, [agency_id]).fetchall():
-            if row["customer_id"] not in seen_ids:
-                clients.append(dict(row))
-                seen_ids.add(row["customer_id"])
-
-        # Compare all pairs
         duplicates = []
-        for i in range(len(clients)):
-            for j in range(i + 1, len(clients)):
-                a, b = clients[i], clients[j]
-                portion_a = client_portion(
-                    a["customer_name"]
-                )
-                portion_b = client_portion(
-                    b["customer_name"]
-                )
-                score = _score_name(portion_a, portion_b)
-                if score >= 0.50:
-                    if ((a["revenue"] or 0)
-                            >= (b["revenue"] or 0)):
-                        target, source = a, b
-                    else:
-                        target, source = b, a
-                    duplicates.append({
-                        "score": round(score, 2),
-                        "source": {
-                            "customer_id":
-                                source["customer_id"],
-                            "customer_name":
-                                source["customer_name"],
-                            "client_portion":
-                                client_portion(
-                                    source["customer_name"]
-                                ),
-                            "revenue":
-                                source["revenue"] or 0,
-                            "spot_count":
-                                source["spot_count"] or 0,
-                            "sector_name":
-                                source.get(
-                                    "sector_name") or ""
-                        },
-                        "target": {
-                            "customer_id":
-                                target["customer_id"],
-                            "customer_name":
-                                target["customer_name"],
-                            "client_portion":
-                                client_portion(
-                                    target["customer_name"]
-                                ),
-                            "revenue":
-                                target["revenue"] or 0,
-                            "spot_count":
-                                target["spot_count"] or 0,
-                            "sector_name":
-                                target.get(
-                                    "sector_name") or ""
-                        }
-                    })
+        for i, j, score in _similar_pairs(portions, 0.50):
+            a, b = clients[i], clients[j]
+            if ((a["revenue_via_agency"] or 0)
+                    >= (b["revenue_via_agency"] or 0)):
+                target, source = i, j
+            else:
+                target, source = j, i
+            duplicates.append({
+                "score": round(score, 2),
+                "source": summary(clients[source], portions[source]),
+                "target": summary(clients[target], portions[target]),
+            })
 
         duplicates.sort(key=lambda d: -d["score"])
 
@@ -1446,7 +1313,8 @@ class EntityService(BaseService):
                   ae_name, actor):
         """Update assigned AE with history tracking.
 
-        Returns dict with success/error.
+        Returns dict with success/error. After committing, the caller
+        invalidates the "ae_assignments" reference data.
         """
         if entity_type not in ("agency", "customer"):
             return {"error": "Invalid entity type"}
@@ -1534,18 +1402,17 @@ class EntityService(BaseService):
 
     def get_ae_list(self, conn):
         """Get sorted unique AE names from spots + existing
-        assignments.
+        assignments. Cached per process (see reference_data).
 
         Returns sorted list of strings.
         """
-        spot_aes = conn.execute("""
-            SELECT DISTINCT sales_person
-            FROM spots
-            WHERE sales_person IS NOT NULL
-              AND sales_person != ''
-            ORDER BY sales_person
-        """).fetchall()
+        return get_reference_data().get(
+            self.db_connection, "entity.ae_list",
+            ("spots", "ae_assignments"),
+            lambda: self._query_ae_list(conn), conn=conn,
+        )
 
+    def _query_ae_list(self, conn):
         assigned_aes = conn.execute("""
             SELECT DISTINCT assigned_ae FROM agencies
             WHERE assigned_ae IS NOT NULL
@@ -1556,19 +1423,23 @@ class EntityService(BaseService):
               AND assigned_ae != ''
         """).fetchall()
 
-        ae_set = set()
-        for row in spot_aes:
-            ae_set.add(row["sales_person"])
+        ae_set = set(ae_names(conn))
         for row in assigned_aes:
             ae_set.add(row["assigned_ae"])
 
         return sorted(ae_set, key=str.lower)
 
     def get_sectors(self, conn):
-        """Active sectors for dropdown.
+        """Active sectors for dropdown. Cached per process.
 
         Returns list of dicts.
         """
+        return get_reference_data().get(
+            self.db_connection, "entity.sectors", ("sectors",),
+            lambda: self._query_sectors(conn), conn=conn,
+        )
+
+    def _query_sectors(self, conn):
         sectors = conn.execute("""
             SELECT sector_id, sector_code, sector_name,
                    sector_group
@@ -1586,10 +1457,16 @@ class EntityService(BaseService):
         return [dict(s) for s in sectors]
 
     def get_markets(self, conn):
-        """Distinct markets from spots.
+        """Distinct markets from spots. Cached per process.
 
         Returns list of market name strings.
         """
+        return get_reference_data().get(
+            self.db_connection, "entity.markets", ("spots",),
+            lambda: self._query_markets(conn), conn=conn,
+        )
+
+    def _query_markets(self, conn):
         markets = conn.execute("""
             SELECT DISTINCT market_name
             FROM spots
@@ -6,7 +6,10 @@ Extracted from address_book.py routes. All methods accept a conn parameter
 
 import csv
 import io
+import json
 import logging
+import sqlite3
+import string
 
 from src.services.base_service import BaseService
 
@@ -16,6 +19,48 @@ VALID_IMPORT_ROLES = [
     "decision_maker", "account_manager", "billing", "technical", "traffic", "other",
 ]
 
+EXPORT_HEADER = [
+    "Entity Name", "Type", "Sector", "Assigned AE",
+    "Primary Contact", "Email", "Phone",
+    "Address", "City", "State", "ZIP",
+    "PO Number", "EDI Billing", "EDI Code",
+    "Markets", "Last Active", "Total Revenue", "Notes",
+]
+
+# Rows written per CSV chunk
+EXPORT_BATCH_SIZE = 500
+
+# Stand-in for entity_metrics before the entity cache tables exist
+_NO_METRICS = """(
+    SELECT NULL AS entity_type, NULL AS entity_id, NULL AS markets,
+           NULL AS last_active, NULL AS total_revenue,
+           NULL AS spot_count, NULL AS agency_spot_count
+    WHERE 0
+)"""
+
+
+_INSERT_CONTACT = """
+    INSERT INTO entity_contacts
+        (entity_type, entity_id, contact_name,
+         contact_title, email, phone,
+         contact_role, is_primary, created_by)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)
+"""
+
+# SQLite's NOCASE collation folds ASCII letters only
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _nocase(name):
+    return name.translate(_NOCASE)
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        [name],
+    ).fetchone() is not None
+
 
 class ExportService(BaseService):
     """Handles CSV export of entities and CSV import of contacts."""
@@ -23,251 +68,205 @@ class ExportService(BaseService):
     def __init__(self, db_connection):
         super().__init__(db_connection)
 
-    def export_entities_csv(self, conn, filters, metrics_map):
-        """Build CSV content string from entity data.
+    def export_entities_csv(self, conn, filters):
+        """Stream the filtered address book as CSV.
 
         Args:
-            conn: database connection (read-only)
+            conn: database connection (read-only), open for as long as
+                  the returned iterator is consumed
             filters: dict with optional keys: search, type, has_contacts,
                      has_address, sector_id, market, ae
-            metrics_map: dict keyed by (entity_type, entity_id) tuples
-                         as returned by EntityMetricsService.get_metrics_map
 
-        Returns CSV string ready to send as response body.
+        Yields CSV text chunks (header first), sorted by entity name.
+        Filtering, the entity_metrics join and the primary-contact join
+        all happen in one query, so rows are written as they are read.
         """
-        agency_client_ids = set()
-        for key, m in metrics_map.items():
-            etype = key[0] if isinstance(key, tuple) else m.get("entity_type")
-            eid = key[1] if isinstance(key, tuple) else key
-            if (etype == "customer"
-                    and m.get("agency_spot_count") == m.get("spot_count")
-                    and m.get("spot_count", 0) > 0):
-                agency_client_ids.add(eid)
-
-        # Build flat lookup by (entity_type, entity_id) for convenience
-        flat_map = {}
-        for key, m in metrics_map.items():
-            if isinstance(key, tuple):
-                flat_map[key] = m
-            else:
-                etype = m.get("entity_type", "customer")
-                flat_map[(etype, key)] = m
-
-        results = []
+        sql, params = self._export_query(conn, filters)
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_HEADER)
+
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            for r in rows:
+                rev = r["total_revenue"]
+                writer.writerow([
+                    r["entity_name"],
+                    r["entity_type"],
+                    r["sector_name"],
+                    r["assigned_ae"],
+                    r["primary_contact"],
+                    r["primary_email"],
+                    r["primary_phone"],
+                    r["address"],
+                    r["city"],
+                    r["state"],
+                    r["zip"],
+                    r["po_number"],
+                    "Yes" if r["edi_billing"] else "No",
+                    r["edi_code"],
+                    r["markets"],
+                    r["last_active"],
+                    f"${rev:,.2f}" if rev else "",
+                    r["notes"],
+                ])
+            chunk = output.getvalue()
+            if chunk:
+                yield chunk
+                output.seek(0)
+                output.truncate()
+            if not rows:
+                return
+
+    def _export_query(self, conn, filters):
+        """Build the export's SELECT and its parameters from filters."""
+        metrics = (
+            "entity_metrics" if _table_exists(conn, "entity_metrics")
+            else _NO_METRICS
+        )
+        parts = []
         entity_type_filter = filters.get("type", "all")
 
         if entity_type_filter in ("all", "agency"):
-            results.extend(
-                self._load_agencies_for_export(conn, flat_map)
-            )
+            parts.append(f"""
+                SELECT
+                    a.agency_id AS entity_id,
+                    'agency' AS entity_type,
+                    a.agency_name AS entity_name,
+                    a.address, a.city, a.state, a.zip,
+                    a.notes, a.assigned_ae,
+                    a.po_number, a.edi_billing, a.edi_code,
+                    NULL AS sector_name,
+                    m.markets, m.last_active, m.total_revenue,
+                    pc.contact_name AS primary_contact,
+                    pc.email AS primary_email,
+                    pc.phone AS primary_phone
+                FROM agencies a
+                LEFT JOIN {metrics} m
+                    ON m.entity_type = 'agency' AND m.entity_id = a.agency_id
+                LEFT JOIN primary_contacts pc
+                    ON pc.entity_type = 'agency' AND pc.entity_id = a.agency_id
+                WHERE a.is_active = 1
+            """)
 
         if entity_type_filter in ("all", "customer"):
-            results.extend(
-                self._load_customers_for_export(
-                    conn, flat_map, agency_client_ids,
+            # Agency clients (all spots booked through an agency, or an
+            # "Agency:Client" name) are exported under their agency
+            parts.append(f"""
+                SELECT
+                    c.customer_id AS entity_id,
+                    'customer' AS entity_type,
+                    c.normalized_name AS entity_name,
+                    c.address, c.city, c.state, c.zip,
+                    c.notes, c.assigned_ae,
+                    c.po_number, c.edi_billing, NULL AS edi_code,
+                    s.sector_name,
+                    m.markets, m.last_active, m.total_revenue,
+                    pc.contact_name AS primary_contact,
+                    pc.email AS primary_email,
+                    pc.phone AS primary_phone
+                FROM customers c
+                LEFT JOIN sectors s ON c.sector_id = s.sector_id
+                LEFT JOIN {metrics} m
+                    ON m.entity_type = 'customer' AND m.entity_id = c.customer_id
+                LEFT JOIN primary_contacts pc
+                    ON pc.entity_type = 'customer'
+                   AND pc.entity_id = c.customer_id
+                WHERE c.is_active = 1
+                  AND instr(c.normalized_name, ':') = 0
+                  AND NOT (COALESCE(m.spot_count, 0) > 0
+                           AND m.agency_spot_count = m.spot_count)
+            """)
+
+        if not parts:
+            parts.append(
+                "SELECT NULL AS entity_id, NULL AS entity_type,"
+                " NULL AS entity_name WHERE 0"
+            )
+
+        where, params = self._export_conditions(filters)
+        sql = f"""
+            WITH primary_contacts AS (
+                SELECT entity_type, entity_id, contact_name, email, phone
+                FROM entity_contacts
+                WHERE contact_id IN (
+                    SELECT MIN(contact_id) FROM entity_contacts
+                    WHERE is_active = 1 AND is_primary = 1
+                    GROUP BY entity_type, entity_id
                 )
             )
+            SELECT
+                entity_id, entity_type, entity_name,
+                address, city, state, zip, notes, assigned_ae,
+                po_number, edi_billing, edi_code, sector_name,
+                COALESCE(markets, '') AS markets,
+                COALESCE(last_active, '') AS last_active,
+                COALESCE(total_revenue, 0) AS total_revenue,
+                primary_contact, primary_email, primary_phone
+            FROM ({" UNION ALL ".join(parts)})
+            {where}
+            ORDER BY lower(entity_name), entity_type, entity_id
+        """
+        return sql, params
 
-        results = self._apply_filters(conn, results, filters)
-        results.sort(key=lambda r: r["entity_name"].lower())
-        return self._build_csv(results)
+    def _export_conditions(self, filters):
+        """WHERE clause for search, contact, address, sector, market and
+        AE filters."""
+        conditions = []
+        params = []
 
-    def _load_agencies_for_export(self, conn, flat_map):
-        """Load agency rows with primary contact for export."""
-        rows = conn.execute("""
-            SELECT
-                a.agency_id as entity_id,
-                'agency' as entity_type,
-                a.agency_name as entity_name,
-                a.address, a.city, a.state, a.zip,
-                a.notes, a.assigned_ae,
-                a.po_number, a.edi_billing, a.edi_code,
-                NULL as sector_name,
-                (SELECT contact_name FROM entity_contacts ec
-                 WHERE ec.entity_type = 'agency'
-                   AND ec.entity_id = a.agency_id
-                   AND ec.is_active = 1 AND ec.is_primary = 1
-                 LIMIT 1) as primary_contact,
-                (SELECT email FROM entity_contacts ec
-                 WHERE ec.entity_type = 'agency'
-                   AND ec.entity_id = a.agency_id
-                   AND ec.is_active = 1 AND ec.is_primary = 1
-                 LIMIT 1) as primary_email,
-                (SELECT phone FROM entity_contacts ec
-                 WHERE ec.entity_type = 'agency'
-                   AND ec.entity_id = a.agency_id
-                   AND ec.is_active = 1 AND ec.is_primary = 1
-                 LIMIT 1) as primary_phone
-            FROM agencies a WHERE a.is_active = 1
-        """).fetchall()
-
-        results = []
-        for row in rows:
-            d = dict(row)
-            m = flat_map.get(("agency", d["entity_id"]), {})
-            d["last_active"] = m.get("last_active", "")
-            d["total_revenue"] = float(m.get("total_revenue") or 0)
-            d["markets"] = m.get("markets", "")
-            results.append(d)
-        return results
-
-    def _load_customers_for_export(
-        self, conn, flat_map, agency_client_ids,
-    ):
-        """Load customer rows (excluding agency clients) for export."""
-        rows = conn.execute("""
-            SELECT
-                c.customer_id as entity_id,
-                'customer' as entity_type,
-                c.normalized_name as entity_name,
-                c.address, c.city, c.state, c.zip,
-                c.notes, c.assigned_ae,
-                c.po_number, c.edi_billing,
-                s.sector_name,
-                (SELECT contact_name FROM entity_contacts ec
-                 WHERE ec.entity_type = 'customer'
-                   AND ec.entity_id = c.customer_id
-                   AND ec.is_active = 1 AND ec.is_primary = 1
-                 LIMIT 1) as primary_contact,
-                (SELECT email FROM entity_contacts ec
-                 WHERE ec.entity_type = 'customer'
-                   AND ec.entity_id = c.customer_id
-                   AND ec.is_active = 1 AND ec.is_primary = 1
-                 LIMIT 1) as primary_email,
-                (SELECT phone FROM entity_contacts ec
-                 WHERE ec.entity_type = 'customer'
-                   AND ec.entity_id = c.customer_id
-                   AND ec.is_active = 1 AND ec.is_primary = 1
-                 LIMIT 1) as primary_phone
-            FROM customers c
-            LEFT JOIN sectors s ON c.sector_id = s.sector_id
-            WHERE c.is_active = 1
-        """).fetchall()
-
-        results = []
-        for row in rows:
-            d = dict(row)
-            if (":" in d["entity_name"]
-                    or d["entity_id"] in agency_client_ids):
-                continue
-            m = flat_map.get(("customer", d["entity_id"]), {})
-            d["last_active"] = m.get("last_active", "")
-            d["total_revenue"] = float(m.get("total_revenue") or 0)
-            d["markets"] = m.get("markets", "")
-            results.append(d)
-        return results
-
-    def _apply_filters(self, conn, results, filters):
-        """Apply search, contact, address, sector, market, AE filters."""
         search = filters.get("search", "").strip()
         if search:
-            q = search.lower()
-            results = [
-                r for r in results
-                if (q in r["entity_name"].lower()
-                    or q in (r.get("notes") or "").lower()
-                    or q in (r.get("sector_name") or "").lower())
-            ]
+            conditions.append(
+                "(instr(lower(entity_name), :search) > 0"
+                " OR instr(lower(COALESCE(notes, '')), :search) > 0"
+                " OR instr(lower(COALESCE(sector_name, '')), :search) > 0)"
+            )
+            params.append(("search", search.lower()))
 
         has_contacts = filters.get("has_contacts", "all")
         if has_contacts == "yes":
-            results = [
-                r for r in results if r.get("primary_contact")
-            ]
+            conditions.append("COALESCE(primary_contact, '') != ''")
         elif has_contacts == "no":
-            results = [
-                r for r in results if not r.get("primary_contact")
-            ]
+            conditions.append("COALESCE(primary_contact, '') = ''")
 
         has_address = filters.get("has_address", "all")
         if has_address == "yes":
-            results = [
-                r for r in results
-                if r.get("address") or r.get("city")
-            ]
+            conditions.append(
+                "(COALESCE(address, '') != '' OR COALESCE(city, '') != '')"
+            )
         elif has_address == "no":
-            results = [
-                r for r in results
-                if not r.get("address") and not r.get("city")
-            ]
+            conditions.append(
+                "COALESCE(address, '') = '' AND COALESCE(city, '') = ''"
+            )
 
         sector_filter = filters.get("sector_id", "")
         if sector_filter:
             try:
-                sid = int(sector_filter)
-                sector_customer_ids = set(
-                    r["customer_id"]
-                    for r in conn.execute(
-                        "SELECT customer_id FROM customer_sectors "
-                        "WHERE sector_id = ?",
-                        [sid],
-                    ).fetchall()
+                params.append(("sector_id", int(sector_filter)))
+                conditions.append(
+                    "entity_type = 'customer' AND entity_id IN ("
+                    "SELECT customer_id FROM customer_sectors"
+                    " WHERE sector_id = :sector_id)"
                 )
-                results = [
-                    r for r in results
-                    if (r.get("entity_type") == "customer"
-                        and r.get("entity_id") in sector_customer_ids)
-                ]
             except ValueError:
                 pass
 
         market_filter = filters.get("market", "")
         if market_filter:
-            results = [
-                r for r in results
-                if market_filter in (r.get("markets") or "")
-            ]
+            conditions.append("instr(COALESCE(markets, ''), :market) > 0")
+            params.append(("market", market_filter))
 
         ae_filter = filters.get("ae", "")
-        if ae_filter:
-            if ae_filter == "__none__":
-                results = [
-                    r for r in results if not r.get("assigned_ae")
-                ]
-            else:
-                results = [
-                    r for r in results
-                    if r.get("assigned_ae") == ae_filter
-                ]
-
-        return results
-
-    def _build_csv(self, results):
-        """Build CSV string from result list."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow([
-            "Entity Name", "Type", "Sector", "Assigned AE",
-            "Primary Contact", "Email", "Phone",
-            "Address", "City", "State", "ZIP",
-            "PO Number", "EDI Billing", "EDI Code",
-            "Markets", "Last Active", "Total Revenue", "Notes",
-        ])
-
-        for r in results:
-            rev = r.get("total_revenue", 0)
-            writer.writerow([
-                r.get("entity_name", ""),
-                r.get("entity_type", ""),
-                r.get("sector_name", ""),
-                r.get("assigned_ae", ""),
-                r.get("primary_contact", ""),
-                r.get("primary_email", ""),
-                r.get("primary_phone", ""),
-                r.get("address", ""),
-                r.get("city", ""),
-                r.get("state", ""),
-                r.get("zip", ""),
-                r.get("po_number", ""),
-                "Yes" if r.get("edi_billing") else "No",
-                r.get("edi_code", ""),
-                r.get("markets", ""),
-                r.get("last_active", ""),
-                f"${rev:,.2f}" if rev else "",
-                r.get("notes", ""),
-            ])
-
-        return output.getvalue()
+        if ae_filter == "__none__":
+            conditions.append("COALESCE(assigned_ae, '') = ''")
+        elif ae_filter:
+            conditions.append("assigned_ae = :ae")
+            params.append(("ae", ae_filter))
+
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return where, dict(params)
 
     def import_contacts_csv(self, conn, csv_content, created_by):
         """Parse CSV and create contacts for matching entities.
@@ -277,7 +276,9 @@ class ExportService(BaseService):
             csv_content: decoded CSV string
             created_by: username for audit trail
 
-        Returns dict with imported, skipped, errors keys.
+        Returns dict with imported, skipped, errors keys. Entity names are
+        resolved with one lookup per entity type and the contacts inserted
+        with a single executemany; the caller commits.
         """
         reader = csv.DictReader(io.StringIO(csv_content))
         required_cols = {"Entity Name", "Type", "Contact Name"}
@@ -287,9 +288,9 @@ class ExportService(BaseService):
                          + ", ".join(sorted(required_cols)),
             }
 
-        imported = 0
         skipped = 0
         errors = []
+        candidates = []
 
         for i, row in enumerate(reader, start=2):
             entity_name = (row.get("Entity Name") or "").strip()
@@ -297,29 +298,38 @@ class ExportService(BaseService):
             contact_name = (row.get("Contact Name") or "").strip()
 
             if not entity_name or not entity_type or not contact_name:
-                errors.append(
-                    f"Row {i}: Missing required field "
-                    f"(Entity Name, Type, or Contact Name)"
-                )
+                errors.append((
+                    i, "Missing required field "
+                       "(Entity Name, Type, or Contact Name)",
+                ))
                 skipped += 1
                 continue
 
             if entity_type not in ("agency", "customer"):
-                errors.append(
-                    f"Row {i}: Type must be 'agency' or 'customer', "
-                    f"got '{entity_type}'"
-                )
+                errors.append((
+                    i, f"Type must be 'agency' or 'customer', "
+                       f"got '{entity_type}'",
+                ))
                 skipped += 1
                 continue
 
-            entity_id = self._lookup_entity(
-                conn, entity_type, entity_name,
+            candidates.append((i, entity_type, entity_name, contact_name, row))
+
+        entity_ids = {
+            entity_type: self._lookup_entities(
+                conn, entity_type,
+                {c[2] for c in candidates if c[1] == entity_type},
             )
+            for entity_type in ("agency", "customer")
+        }
+
+        inserts = []
+        for i, entity_type, entity_name, contact_name, row in candidates:
+            entity_id = entity_ids[entity_type].get(_nocase(entity_name))
             if not entity_id:
-                errors.append(
-                    f"Row {i}: Entity '{entity_name}' "
-                    f"({entity_type}) not found"
-                )
+                errors.append((
+                    i, f"Entity '{entity_name}' ({entity_type}) not found",
+                ))
                 skipped += 1
                 continue
 
@@ -327,46 +337,80 @@ class ExportService(BaseService):
             if role and role not in VALID_IMPORT_ROLES:
                 role = None
 
-            try:
-                conn.execute("""
-                    INSERT INTO entity_contacts
-                        (entity_type, entity_id, contact_name,
-                         contact_title, email, phone,
-                         contact_role, is_primary, created_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)
-                """, [
-                    entity_type, entity_id, contact_name,
-                    (row.get("Title") or "").strip() or None,
-                    (row.get("Email") or "").strip() or None,
-                    (row.get("Phone") or "").strip() or None,
-                    role, created_by,
-                ])
-                imported += 1
-            except Exception as e:
-                errors.append(f"Row {i}: {e}")
-                skipped += 1
+            inserts.append((i, [
+                entity_type, entity_id, contact_name,
+                (row.get("Title") or "").strip() or None,
+                (row.get("Email") or "").strip() or None,
+                (row.get("Phone") or "").strip() or None,
+                role, created_by,
+            ]))
 
+        imported, failed = self._insert_contacts(conn, inserts)
+        errors.extend(failed)
+        skipped += len(failed)
+
+        errors.sort(key=lambda e: e[0])
         return {
             "imported": imported,
             "skipped": skipped,
-            "errors": errors[:20],
+            "errors": [f"Row {i}: {e}" for i, e in errors[:20]],
         }
 
-    def _lookup_entity(self, conn, entity_type, entity_name):
-        """Look up entity ID by name. Returns int or None."""
+    def _insert_contacts(self, conn, inserts):
+        """Insert (csv_line, params) contacts in one executemany.
+
+        If the batch fails it is rolled back to a savepoint and retried row
+        by row, so one bad row only skips itself. Returns (imported,
+        [(csv_line, error)]).
+        """
+        if not inserts:
+            return 0, []
+
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT import_contacts")
+        try:
+            conn.executemany(_INSERT_CONTACT, [p for _, p in inserts])
+            return len(inserts), []
+        except sqlite3.Error:
+            conn.execute("ROLLBACK TO import_contacts")
+        finally:
+            conn.execute("RELEASE import_contacts")
+
+        imported = 0
+        failed = []
+        for i, params in inserts:
+            try:
+                conn.execute(_INSERT_CONTACT, params)
+                imported += 1
+            except Exception as e:
+                failed.append((i, str(e)))
+        return imported, failed
+
+    def _lookup_entities(self, conn, entity_type, entity_names):
+        """Map active entity names (matched case-insensitively, as
+        COLLATE NOCASE does) to IDs for a set of names; the lowest ID wins
+        when two entities share a name."""
+        if not entity_names:
+            return {}
         if entity_type == "agency":
-            row = conn.execute(
-                "SELECT agency_id FROM agencies "
-                "WHERE agency_name = ? COLLATE NOCASE "
-                "AND is_active = 1",
-                [entity_name],
-            ).fetchone()
-            return row["agency_id"] if row else None
-
-        row = conn.execute(
-            "SELECT customer_id FROM customers "
-            "WHERE normalized_name = ? COLLATE NOCASE "
-            "AND is_active = 1",
-            [entity_name],
-        ).fetchone()
-        return row["customer_id"] if row else None
+            sql = (
+                "SELECT agency_id AS entity_id, agency_name AS entity_name "
+                "FROM agencies "
+                "WHERE agency_name COLLATE NOCASE IN "
+                "(SELECT value FROM json_each(?)) "
+                "AND is_active = 1 ORDER BY agency_id"
+            )
+        else:
+            sql = (
+                "SELECT customer_id AS entity_id, "
+                "normalized_name AS entity_name FROM customers "
+                "WHERE normalized_name COLLATE NOCASE IN "
+                "(SELECT value FROM json_each(?)) "
+                "AND is_active = 1 ORDER BY customer_id"
+            )
+
+        ids = {}
+        for row in conn.execute(sql, [json.dumps(sorted(entity_names))]):
+            ids.setdefault(_nocase(row["entity_name"]), row["entity_id"])
+        return ids
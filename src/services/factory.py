@@ -38,6 +38,7 @@ def configure_container_from_environment():
     config = {
         "PROJECT_ROOT": project_root,
         "DB_PATH": _resolve_db_path(),
+        "READ_REPLICA_PATH": os.environ.get("READ_REPLICA_PATH") or None,
         "DATA_PATH": os.environ.get(
             "DATA_PATH", os.path.join(project_root, "data/processed")
         ),
@@ -161,9 +162,15 @@ def initialize_services():
 # ---------------------------------------------------------------------------
 
 def create_database_connection(db_path: Optional[str] = None):
-    """Create DatabaseConnection from container config or override."""
+    """Create DatabaseConnection from container config or override.
+
+    READ_REPLICA_PATH (optional) enables connection_ro(replica=True)
+    routing to the post-import snapshot; only applied to the configured
+    DB, not to explicit db_path overrides.
+    """
     from src.database.connection import DatabaseConnection
 
+    read_replica_path = None
     if db_path is None:
         container = get_container()
         db_path = container.get_config("DB_PATH")
@@ -171,9 +178,12 @@ def create_database_connection(db_path: Optional[str] = None):
             raise ServiceCreationError(
                 "DB_PATH not configured in container"
             )
+        read_replica_path = container.get_config("READ_REPLICA_PATH")
 
     logger.info(f"Creating database connection to: {db_path}")
-    return DatabaseConnection(db_path)
+    if read_replica_path:
+        logger.info(f"Read replica snapshot: {read_replica_path}")
+    return DatabaseConnection(db_path, read_replica_path=read_replica_path)
 
 
 def create_report_data_service():
@@ -332,7 +342,9 @@ def create_pending_order_service():
     """Factory function for PendingOrderService."""
     from src.services.pending_order_service import PendingOrderService
 
-    return PendingOrderService()
+    container = get_container()
+    db_connection = container.get("database_connection")
+    return PendingOrderService(db_connection=db_connection)
 
 
 def create_signal_action_service():
@@ -1,4 +1,12 @@
-"""Service for computing account health scores, tiers, and touch cadence."""
+"""Service for computing account health scores, tiers, and touch cadence.
+
+The spot-derived inputs (trailing/prior 3-month and trailing 12-month
+revenue) are persisted in entity_health_components (migration 033) by
+refresh_components(), which the entity cache job runs after each import.
+Reads use the stored rows for the current month and compute only the
+entities that have no row yet. Signal, touch and follow-up factors are
+cheap lookups and are always read live.
+"""
 
 from src.services.base_service import BaseService
 
@@ -18,17 +26,14 @@ TOUCH_THRESHOLDS = [
     (60, 25),
 ]
 
-BM_TO_ISO = """
-    '20' || SUBSTR(s.broadcast_month, 5, 2) || '-' ||
-    CASE SUBSTR(s.broadcast_month, 1, 3)
-        WHEN 'Jan' THEN '01' WHEN 'Feb' THEN '02'
-        WHEN 'Mar' THEN '03' WHEN 'Apr' THEN '04'
-        WHEN 'May' THEN '05' WHEN 'Jun' THEN '06'
-        WHEN 'Jul' THEN '07' WHEN 'Aug' THEN '08'
-        WHEN 'Sep' THEN '09' WHEN 'Oct' THEN '10'
-        WHEN 'Nov' THEN '11' WHEN 'Dec' THEN '12'
-    END
-"""
+MONTH_ABBR = (
+    "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
+)
+
+# Revenue windows, in whole months before the current month
+TREND_MONTHS = 3
+TIER_MONTHS = 12
 
 TIER_CADENCE = {"A": 7, "B": 14, "C": 30}
 
@@ -51,10 +56,13 @@ class HealthScoreService(BaseService):
             health_color, and individual factor scores.
         """
         entities = self._load_entities(conn, ae_name)
-        signals = self._load_signals(conn)
+        revenue = self._load_revenue(conn, entities)
         touches = self._load_last_touches(conn)
+        return self._score_entities(conn, entities, revenue, touches)
+
+    def _score_entities(self, conn, entities, revenue, touches):
+        signals = self._load_signals(conn)
         overdue = self._load_overdue_set(conn)
-        revenue = self._load_revenue_trends(conn)
 
         results = []
         for e in entities:
@@ -121,10 +129,9 @@ class HealthScoreService(BaseService):
         rows = conn.execute("""
             SELECT entity_type, entity_id,
                    CAST(julianday('now') - julianday(
-                       MAX(activity_date)) AS INTEGER) AS days_ago
-            FROM entity_activity
-            WHERE activity_type IN ('note', 'call', 'email', 'meeting')
-            GROUP BY entity_type, entity_id
+                       last_touch_date) AS INTEGER) AS days_ago
+            FROM entity_activity_rollup
+            WHERE last_touch_date IS NOT NULL
         """).fetchall()
         return {
             (r["entity_type"], r["entity_id"]): r["days_ago"]
@@ -132,6 +139,8 @@ class HealthScoreService(BaseService):
         }
 
     def _load_overdue_set(self, conn):
+        # The rollup's next follow-up puts undated ones first (migration
+        # 044), so read overdue rows from the open follow-up index
         rows = conn.execute("""
             SELECT DISTINCT entity_type, entity_id
             FROM entity_activity
@@ -141,49 +150,192 @@ class HealthScoreService(BaseService):
         """).fetchall()
         return {(r["entity_type"], r["entity_id"]) for r in rows}
 
-    def _load_revenue_trends(self, conn):
+    def _load_revenue(self, conn, entities):
+        """Revenue windows per entity: stored rows, computing any missing.
+
+        Returns:
+            Dict mapping (entity_type, entity_id) -> {trailing, prior,
+            trailing_12m}.
+        """
+        as_of = self._current_month(conn)
         result = {}
-        for entity_col, entity_type, entity_table, join_clause in [
-            ("customer_id", "customer", "customers",
-             "s.customer_id = e.customer_id"),
-            ("agency_id", "agency", "agencies",
-             "s.customer_id IN "
-             "(SELECT customer_id FROM customers "
-             "WHERE agency_id = e.agency_id)"),
-        ]:
-            rows = conn.execute(f"""
-                SELECT
-                    e.{entity_col} AS entity_id,
-                    COALESCE(SUM(CASE
-                        WHEN {BM_TO_ISO}
-                            >= strftime('%Y-%m', 'now', '-3 months')
-                         AND {BM_TO_ISO}
-                            < strftime('%Y-%m', 'now')
-                        THEN s.gross_rate ELSE 0 END), 0)
-                        AS trailing_3m,
-                    COALESCE(SUM(CASE
-                        WHEN {BM_TO_ISO}
-                            >= strftime('%Y-%m', 'now', '-6 months')
-                         AND {BM_TO_ISO}
-                            < strftime('%Y-%m', 'now', '-3 months')
-                        THEN s.gross_rate ELSE 0 END), 0)
-                        AS prior_3m
-                FROM {entity_table} e
-                LEFT JOIN spots s ON {join_clause}
-                    AND s.is_historical = 0
-                    AND (s.revenue_type != 'Trade'
-                         OR s.revenue_type IS NULL)
-                WHERE e.is_active = 1
-                GROUP BY e.{entity_col}
-            """).fetchall()
-            for r in rows:
-                key = (entity_type, r["entity_id"])
-                result[key] = {
+        if self._components_table_exists(conn):
+            rows = conn.execute("""
+                SELECT entity_type, entity_id,
+                       trailing_3m, prior_3m, trailing_12m
+                FROM entity_health_components
+                WHERE as_of_month = ?
+            """, [as_of]).fetchall()
+            result = {
+                (r["entity_type"], r["entity_id"]): {
                     "trailing": r["trailing_3m"],
                     "prior": r["prior_3m"],
+                    "trailing_12m": r["trailing_12m"],
                 }
+                for r in rows
+            }
+
+        missing = [
+            (e["entity_type"], e["entity_id"]) for e in entities
+            if (e["entity_type"], e["entity_id"]) not in result
+        ]
+        if missing:
+            # Nothing stored for this month: one unfiltered pass is
+            # cheaper than a huge IN list
+            keys = missing if result else None
+            result.update(self._compute_revenue(conn, as_of, keys))
+        return result
+
+    def _compute_revenue(self, conn, as_of, keys=None):
+        """Compute revenue windows from spots for keys (None = all active).
+
+        Spots are summed once per (customer_id, broadcast_month) over the
+        last TIER_MONTHS months; agencies add up their customers
+        (customers.agency_id).
+        """
+        full = keys is None
+        if full:
+            keys = [
+                (e["entity_type"], e["entity_id"])
+                for e in self._load_entities(conn, None)
+            ]
+        agency_ids = [k[1] for k in keys if k[0] == "agency"]
+        agency_customers = self._load_agency_customers(
+            conn, None if full else agency_ids
+        )
+
+        customer_ids = None
+        if not full:
+            customer_ids = {k[1] for k in keys if k[0] == "customer"}
+            for ids in agency_customers.values():
+                customer_ids.update(ids)
+        by_customer = self._load_customer_windows(
+            conn, self._window_months(as_of), customer_ids
+        )
+
+        result = {}
+        for entity_type, entity_id in keys:
+            if entity_type == "agency":
+                customers = agency_customers.get(entity_id, ())
+            else:
+                customers = (entity_id,)
+            totals = [0.0, 0.0, 0.0]
+            for cid in customers:
+                for i, value in enumerate(by_customer.get(cid, ())):
+                    totals[i] += value
+            result[(entity_type, entity_id)] = {
+                "trailing": totals[0],
+                "prior": totals[1],
+                "trailing_12m": totals[2],
+            }
         return result
 
+    def _load_agency_customers(self, conn, agency_ids=None):
+        """Map agency_id -> customer_ids (agency_ids None = all agencies)."""
+        if agency_ids is not None and not agency_ids:
+            return {}
+        agency_filter = ""
+        params = []
+        if agency_ids is not None:
+            agency_filter = (
+                f"AND agency_id IN ({','.join('?' * len(agency_ids))})"
+            )
+            params = list(agency_ids)
+        rows = conn.execute(f"""
+            SELECT customer_id, agency_id FROM customers
+            WHERE agency_id IS NOT NULL {agency_filter}
+        """, params).fetchall()
+        result = {}
+        for r in rows:
+            result.setdefault(r["agency_id"], []).append(r["customer_id"])
+        return result
+
+    def _load_customer_windows(self, conn, months, customer_ids=None):
+        """Map customer_id -> [trailing_3m, prior_3m, trailing_12m].
+
+        months is newest first; customer_ids None means every customer.
+        """
+        if customer_ids is not None and not customer_ids:
+            return {}
+        params = list(months)
+        customer_filter = ""
+        if customer_ids is not None:
+            customer_filter = (
+                f"AND customer_id IN ({','.join('?' * len(customer_ids))})"
+            )
+            params.extend(customer_ids)
+
+        rows = conn.execute(f"""
+            SELECT customer_id, broadcast_month,
+                   SUM(gross_rate) AS revenue
+            FROM spots
+            WHERE broadcast_month IN ({','.join('?' * len(months))})
+              AND is_historical = 0
+              AND (revenue_type != 'Trade' OR revenue_type IS NULL)
+              {customer_filter}
+            GROUP BY customer_id, broadcast_month
+        """, params).fetchall()
+
+        offsets = {m: i + 1 for i, m in enumerate(months)}
+        result = {}
+        for r in rows:
+            windows = result.setdefault(r["customer_id"], [0.0, 0.0, 0.0])
+            offset = offsets[r["broadcast_month"]]
+            revenue = r["revenue"] or 0
+            if offset <= TREND_MONTHS:
+                windows[0] += revenue
+            elif offset <= TREND_MONTHS * 2:
+                windows[1] += revenue
+            windows[2] += revenue
+        return result
+
+    def refresh_components(self, conn, keys=None):
+        """Persist revenue components for keys (None = all active entities).
+
+        Runs after imports from the entity cache job; a full refresh also
+        drops rows for entities that are no longer active. Returns the
+        number of rows written (0 without migration 033).
+        """
+        if not self._components_table_exists(conn):
+            return 0
+        as_of = self._current_month(conn)
+        revenue = self._compute_revenue(conn, as_of, keys)
+        if keys is None:
+            conn.execute("DELETE FROM entity_health_components")
+        conn.executemany("""
+            INSERT OR REPLACE INTO entity_health_components
+                (entity_type, entity_id, as_of_month,
+                 trailing_3m, prior_3m, trailing_12m, computed_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, [
+            (key[0], key[1], as_of,
+             r["trailing"], r["prior"], r["trailing_12m"])
+            for key, r in revenue.items()
+        ])
+        return len(revenue)
+
+    def _components_table_exists(self, conn):
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'entity_health_components'"
+        ).fetchone() is not None
+
+    def _current_month(self, conn):
+        # SQLite's clock (UTC), as the touch/overdue queries use
+        return conn.execute("SELECT strftime('%Y-%m', 'now')").fetchone()[0]
+
+    def _window_months(self, as_of):
+        """Broadcast months (Mmm-YY) before as_of ('YYYY-MM'), newest first."""
+        year, month = (int(part) for part in as_of.split("-"))
+        months = []
+        for _ in range(TIER_MONTHS):
+            month -= 1
+            if month == 0:
+                month = 12
+                year -= 1
+            months.append(f"{MONTH_ABBR[month - 1]}-{year % 100:02d}")
+        return months
+
     def _score_revenue_trend(self, rev_data):
         if not rev_data:
             return 60
@@ -237,18 +389,18 @@ class HealthScoreService(BaseService):
             List of health score dicts enriched with tier,
             tier_cadence_days, days_since_touch, and touch_status.
         """
-        scores = self.get_health_scores(conn, ae_name)
-        touches = self._load_last_touches(conn)
-        trailing_12m = self._load_trailing_12m(conn)
         entities = self._load_entities(conn, ae_name)
+        revenue = self._load_revenue(conn, entities)
+        touches = self._load_last_touches(conn)
+        scores = self._score_entities(conn, entities, revenue, touches)
 
         # Build ae -> list of (key, revenue) for ranking within each AE
         ae_buckets: dict[str, list[tuple[tuple, float]]] = {}
         for e in entities:
             key = (e["entity_type"], e["entity_id"])
             ae = e["assigned_ae"] or ""
-            revenue = trailing_12m.get(key, 0.0)
-            ae_buckets.setdefault(ae, []).append((key, revenue))
+            trailing_12m = revenue.get(key, {}).get("trailing_12m", 0.0)
+            ae_buckets.setdefault(ae, []).append((key, trailing_12m))
 
         # Assign tiers per AE by revenue rank (descending)
         tiers: dict[tuple, str] = {}
@@ -277,42 +429,6 @@ class HealthScoreService(BaseService):
 
         return scores
 
-    def _load_trailing_12m(self, conn):
-        """Load trailing 12-month revenue per entity for tier ranking.
-
-        Returns:
-            Dict mapping (entity_type, entity_id) -> float revenue.
-        """
-        result = {}
-        for entity_col, entity_type, entity_table, join_clause in [
-            ("customer_id", "customer", "customers",
-             "s.customer_id = e.customer_id"),
-            ("agency_id", "agency", "agencies",
-             "s.customer_id IN "
-             "(SELECT customer_id FROM customers "
-             "WHERE agency_id = e.agency_id)"),
-        ]:
-            rows = conn.execute(f"""
-                SELECT e.{entity_col} AS entity_id,
-                       COALESCE(SUM(CASE
-                           WHEN {BM_TO_ISO}
-                               >= strftime('%Y-%m', 'now', '-12 months')
-                            AND {BM_TO_ISO}
-                               < strftime('%Y-%m', 'now')
-                            AND (s.revenue_type != 'Trade'
-                                 OR s.revenue_type IS NULL)
-                           THEN s.gross_rate ELSE 0 END), 0) AS trailing_12m
-                FROM {entity_table} e
-                LEFT JOIN spots s ON {join_clause}
-                    AND s.is_historical = 0
-                WHERE e.is_active = 1
-                GROUP BY e.{entity_col}
-            """).fetchall()
-            for r in rows:
-                key = (entity_type, r["entity_id"])
-                result[key] = r["trailing_12m"]
-        return result
-
     def touch_compliance(self, health_results):
         """Percentage of accounts where touch is within cadence.
 
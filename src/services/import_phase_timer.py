@@ -0,0 +1,141 @@
+"""Per-phase timing for the import pipeline.
+
+Records wall time, rows processed and SQL statement counts for each phase
+of an import (market scan, Excel read, fingerprinting, delete, insert,
+cache refresh, ...) so import_batch_phases accumulates trend data on how
+imports scale as the Commercial Log grows.
+
+Statement counts come from the connection trace hook in
+src.database.connection. The hook is attached when a connection opens,
+so the timer must be started before the import opens its connections:
+
+    with ImportPhaseTimer() as timer:
+        with timer.phase("excel_read") as phase:
+            rows = read_rows()
+            phase.rows = len(rows)
+    timer.persist(db_connection, batch_id)
+
+Counts are process-wide: statements from other threads that open
+connections while the timer is running are included.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from src.database.connection import (
+    DatabaseConnection,
+    add_trace_callback,
+    remove_trace_callback,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PhaseTiming:
+    """Timing for one import phase. ``rows`` is set by the caller."""
+
+    phase: str
+    started_at: str
+    duration_seconds: float = 0.0
+    rows: int = 0
+    sql_count: int = 0
+    succeeded: bool = True
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        if not self.rows or self.duration_seconds <= 0:
+            return None
+        return self.rows / self.duration_seconds
+
+
+class ImportPhaseTimer:
+    """Collects PhaseTiming entries for one import run."""
+
+    def __init__(self):
+        self.phases: List[PhaseTiming] = []
+        self._statements = 0
+        self._active = False
+
+    def _on_statement(self, statement: str) -> None:
+        self._statements += 1
+
+    def start(self) -> "ImportPhaseTimer":
+        if not self._active:
+            add_trace_callback(self._on_statement)
+            self._active = True
+        return self
+
+    def stop(self) -> None:
+        if self._active:
+            remove_trace_callback(self._on_statement)
+            self._active = False
+
+    def __enter__(self) -> "ImportPhaseTimer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    @contextmanager
+    def phase(self, name: str, rows: int = 0) -> Iterator[PhaseTiming]:
+        """Time the enclosed block as phase ``name``.
+
+        The yielded PhaseTiming is recorded even when the block raises, with
+        succeeded=False, so failed imports still show where time went.
+        """
+        timing = PhaseTiming(
+            phase=name, started_at=datetime.now().isoformat(), rows=rows
+        )
+        statements_before = self._statements
+        started = time.perf_counter()
+        try:
+            yield timing
+        except BaseException:
+            timing.succeeded = False
+            raise
+        finally:
+            timing.duration_seconds = time.perf_counter() - started
+            timing.sql_count = self._statements - statements_before
+            self.phases.append(timing)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(p.duration_seconds for p in self.phases)
+
+    def summary_lines(self) -> List[str]:
+        """Human-readable table of phases, for CLI output and logs."""
+        lines = [f"{'phase':<24} {'seconds':>9} {'rows':>10} {'rows/s':>10} {'sql':>8}"]
+        for p in self.phases:
+            rate = f"{p.rows_per_second:,.0f}" if p.rows_per_second else "-"
+            flag = "" if p.succeeded else "  FAILED"
+            lines.append(
+                f"{p.phase:<24} {p.duration_seconds:>9.2f} {p.rows:>10,} "
+                f"{rate:>10} {p.sql_count:>8,}{flag}"
+            )
+        return lines
+
+    def persist(self, db_connection: DatabaseConnection, batch_id: str) -> bool:
+        """Write phases to import_batch_phases. Best-effort: never raises.
+
+        Timing is diagnostic data; a missing table (migration 028 not yet
+        applied) or a locked database must not fail an import.
+        """
+        if not self.phases:
+            return False
+
+        from src.repositories.import_batch_repository import ImportBatchRepository
+
+        try:
+            with db_connection.transaction() as conn:
+                ImportBatchRepository().record_phases(batch_id, self.phases, conn)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not record import phase timings: {e}")
+            return False
@@ -0,0 +1,235 @@
+"""Directory index of the insertion-order share (migration 042).
+
+The pending-orders panel, the /reports/insertion-orders browser and
+scripts/scan_insertion_orders.py used to os.listdir/isdir/stat the AE and
+customer folders on the mounted K drive for every request, each call a
+network round trip. io_directory_index keeps the listing, and is
+refreshed by directory mtime:
+
+    refresh_directory(conn, path)      # one stat; relist if it changed
+    refresh(conn, root, max_depth=1)   # that, for root and the folders
+                                       # max_depth levels below it
+    list_entries(conn, path, is_dir)   # indexed children of path
+    try_refresh(conn, root, max_depth) # refresh() for web requests
+
+Adding, removing or renaming an entry changes its folder's mtime. A
+file rewritten in place keeps its indexed size/mtime until its folder
+is next relisted.
+
+Apart from try_refresh(), nothing here commits: callers own the
+transaction.
+"""
+
+import logging
+import os
+import sqlite3
+import stat
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_TABLE = "io_directory_index"
+
+# How long try_refresh() waits for the write lock. An import holds it for
+# minutes; a page load should not.
+REFRESH_BUSY_TIMEOUT_MS = 1000
+
+
+def parse_folder_name(folder_name):
+    """Extract contract number and customer from folder name.
+
+    Folder format: "NNNN Customer Name" where leading digits are the
+    contract number and the rest is the customer name.
+    """
+    parts = folder_name.split(None, 1)
+    if len(parts) == 2 and parts[0].isdigit():
+        return parts[0], parts[1]
+    return "", folder_name
+
+
+def index_exists(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = ?",
+        [INDEX_TABLE],
+    ).fetchone()
+    return row is not None
+
+
+def _delete_tree(conn: sqlite3.Connection, path: str) -> None:
+    conn.execute(
+        f"DELETE FROM {INDEX_TABLE}"
+        " WHERE path = ? OR substr(path, 1, ?) = ?",
+        [path, len(path) + 1, path + os.sep],
+    )
+
+
+def _relist(conn: sqlite3.Connection, path: str, mtime: float) -> None:
+    """Replace the indexed children of path with a fresh listing."""
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                st = None if is_dir else entry.stat()
+            except OSError as exc:
+                logger.warning("Could not stat %s: %s", entry.path, exc)
+                continue
+            if is_dir:
+                contract, customer = parse_folder_name(entry.name)
+                entries.append(
+                    (entry.path, path, entry.name, 1, None, None,
+                     contract, customer)
+                )
+            else:
+                entries.append(
+                    (entry.path, path, entry.name, 0, st.st_mtime,
+                     st.st_size, None, None)
+                )
+
+    # Children that disappeared, or turned from folder into file, take
+    # their indexed subtree with them
+    listed = {e[2]: e[3] for e in entries}
+    for row in conn.execute(
+        f"SELECT path, name, is_dir FROM {INDEX_TABLE} WHERE parent = ?",
+        [path],
+    ).fetchall():
+        if listed.get(row[1]) != row[2]:
+            _delete_tree(conn, row[0])
+
+    contract, customer = parse_folder_name(os.path.basename(path))
+    entries.append(
+        (path, os.path.dirname(path), os.path.basename(path), 1, mtime,
+         None, contract, customer)
+    )
+    # A subfolder keeps the mtime of its own last listing; this folder
+    # records the mtime its listing was taken at
+    conn.executemany(
+        f"""
+        INSERT INTO {INDEX_TABLE}
+            (path, parent, name, is_dir, mtime, size, contract, customer)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            is_dir = excluded.is_dir,
+            mtime = CASE
+                WHEN excluded.is_dir AND excluded.path != ? THEN mtime
+                ELSE excluded.mtime
+            END,
+            size = excluded.size,
+            contract = excluded.contract,
+            customer = excluded.customer,
+            indexed_at = CURRENT_TIMESTAMP
+        """,
+        [e + (path,) for e in entries],
+    )
+
+
+def _refresh_directory(
+    conn: sqlite3.Connection, path: str
+) -> Optional[bool]:
+    """None if path is no longer a folder, else whether it was relisted."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISDIR(st.st_mode):
+        _delete_tree(conn, path)
+        return None
+
+    row = conn.execute(
+        f"SELECT mtime FROM {INDEX_TABLE} WHERE path = ? AND is_dir = 1",
+        [path],
+    ).fetchone()
+    if row is not None and row[0] == st.st_mtime:
+        return False
+
+    try:
+        _relist(conn, path, st.st_mtime)
+    except OSError as exc:
+        logger.warning("Could not list %s: %s", path, exc)
+        return False
+    return True
+
+
+def refresh_directory(conn: sqlite3.Connection, path: str) -> bool:
+    """Bring the indexed listing of one folder up to date.
+
+    Returns False (and drops it from the index) when path is not a folder.
+    """
+    return _refresh_directory(conn, os.path.normpath(path)) is not None
+
+
+def refresh(
+    conn: sqlite3.Connection, root: str, max_depth: Optional[int] = None
+) -> Dict[str, Any]:
+    """Refresh root and the folders up to max_depth levels below it
+    (all levels when None): one stat per folder, and a listing only for
+    folders whose mtime changed.
+    """
+    root = os.path.normpath(root)
+    result = {"exists": False, "directories": 0, "relisted": 0}
+
+    pending = [(root, 0)]
+    while pending:
+        path, depth = pending.pop()
+        relisted = _refresh_directory(conn, path)
+        if relisted is None:
+            continue
+        if path == root:
+            result["exists"] = True
+        result["directories"] += 1
+        result["relisted"] += int(relisted)
+
+        if max_depth is None or depth < max_depth:
+            pending.extend(
+                (r[0], depth + 1) for r in conn.execute(
+                    f"SELECT path FROM {INDEX_TABLE}"
+                    " WHERE parent = ? AND is_dir = 1",
+                    [path],
+                ).fetchall()
+            )
+
+    if result["relisted"]:
+        logger.info(
+            "Refreshed IO index under %s: %d of %d folders relisted",
+            root, result["relisted"], result["directories"],
+        )
+    return result
+
+
+def try_refresh(
+    conn: sqlite3.Connection, root: str, max_depth: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """refresh() and commit, waiting at most REFRESH_BUSY_TIMEOUT_MS for
+    the write lock.
+
+    Returns None, with nothing written, when the database stays locked;
+    the caller then reads the share directly.
+    """
+    busy_timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {REFRESH_BUSY_TIMEOUT_MS}")
+    try:
+        result = refresh(conn, root, max_depth)
+        conn.commit()
+        return result
+    except sqlite3.OperationalError as exc:
+        conn.rollback()
+        logger.info("IO index not refreshed under %s: %s", root, exc)
+        return None
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+
+
+def list_entries(
+    conn: sqlite3.Connection, path: str, is_dir: bool
+) -> List[sqlite3.Row]:
+    """Indexed folders (is_dir=True) or files directly under path, by name."""
+    return conn.execute(
+        f"""
+        SELECT path, name, mtime, size, contract, customer
+        FROM {INDEX_TABLE}
+        WHERE parent = ? AND is_dir = ?
+        ORDER BY name
+        """,
+        [os.path.normpath(path), int(is_dir)],
+    ).fetchall()
@@ -0,0 +1,173 @@
+"""Monthly language block revenue (migration 040).
+
+The /api/language-blocks endpoints aggregate language_block_revenue_summary,
+a view over spots_with_language_blocks_enhanced that re-joins and
+re-groups every assigned spot on each request. language_block_revenue_monthly
+holds the same rows, one per (block, market, year_month), and is kept
+current a month at a time:
+
+    queue_block_summary_refresh(conn, months)   # imports, in their transaction
+    refresh_block_summary(conn)                 # REFRESH_BLOCK_SUMMARY job
+    refresh_queued_block_summary(db)            # before a replica refresh
+
+Block assignments and block edits queue their months through triggers.
+Without the migration, summary_source() names the view and queueing is
+a no-op.
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TABLE = "language_block_revenue_monthly"
+SUMMARY_VIEW = "language_block_revenue_summary"
+
+# language_block_revenue_summary for the spots aired in one calendar
+# month. The view's LEFT JOIN from language_blocks only keeps rows with
+# a spot, so this starts from the spots: filtering on swlb.air_date
+# (rather than the view's year_month) lets SQLite flatten the spot view,
+# read the month from idx_spots_air_date and look each block up by id.
+_MONTH_SUMMARY = """
+    SELECT
+        lb.block_id,
+        lb.block_name,
+        lb.language_id,
+        l.language_name,
+        lb.schedule_id,
+        ps.schedule_name,
+        swlb.market_code,
+        swlb.market_display_name,
+        lb.block_type,
+        lb.day_part,
+        lb.time_start,
+        lb.time_end,
+        COUNT(DISTINCT swlb.spot_id) as total_spots,
+        COUNT(DISTINCT swlb.customer_name) as unique_customers,
+        SUM(swlb.station_net) as total_revenue,
+        AVG(swlb.station_net) as avg_spot_revenue,
+        MIN(swlb.air_date) as first_air_date,
+        MAX(swlb.air_date) as last_air_date,
+        strftime('%Y', swlb.air_date) as year,
+        strftime('%Y-%m', swlb.air_date) as year_month,
+        lb.is_active
+    FROM spots_with_language_blocks_enhanced swlb
+    JOIN language_blocks lb ON lb.block_id = swlb.block_id
+    LEFT JOIN languages l ON lb.language_id = l.language_id
+    LEFT JOIN programming_schedules ps ON lb.schedule_id = ps.schedule_id
+    WHERE lb.is_active = 1
+      AND swlb.air_date >= :start AND swlb.air_date < date(:start, '+1 month')
+    GROUP BY
+        lb.block_id,
+        lb.block_name,
+        lb.language_id,
+        l.language_name,
+        lb.schedule_id,
+        ps.schedule_name,
+        swlb.market_code,
+        swlb.market_display_name,
+        lb.block_type,
+        lb.day_part,
+        lb.time_start,
+        lb.time_end,
+        strftime('%Y', swlb.air_date),
+        strftime('%Y-%m', swlb.air_date),
+        lb.is_active
+"""
+
+
+def summary_exists(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = ?",
+        [SUMMARY_TABLE],
+    ).fetchone()
+    return row is not None
+
+
+def summary_source(conn: sqlite3.Connection) -> str:
+    """Table (or, before migration 040, view) the endpoints read."""
+    return SUMMARY_TABLE if summary_exists(conn) else SUMMARY_VIEW
+
+
+def queue_block_summary_refresh(conn, broadcast_months):
+    """Queue the calendar months of every spot in broadcast_months for
+    refresh_block_summary(), inside the caller's transaction.
+
+    Imports call this before replacing months (months losing spots) and
+    after (months gaining them). A missing queue table (before migration
+    040) is ignored: the endpoints then read the view.
+    """
+    if not broadcast_months:
+        return
+    try:
+        conn.execute("""
+            INSERT OR IGNORE INTO language_block_summary_dirty (year_month)
+            SELECT DISTINCT strftime('%Y-%m', air_date) FROM spots
+            WHERE broadcast_month IN (SELECT value FROM json_each(?))
+              AND air_date IS NOT NULL
+        """, [json.dumps(sorted(broadcast_months))])
+    except sqlite3.OperationalError as e:
+        logger.debug(f"Block summary refresh not queued: {e}")
+
+
+def refresh_block_summary(
+    conn: sqlite3.Connection,
+    year_months: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """Recompute language_block_revenue_monthly for year_months ("2025-01"),
+    or for every queued month, and clear them from the queue.
+
+    Runs inside the caller's transaction.
+    """
+    if year_months is None:
+        year_months = [
+            r[0] for r in conn.execute(
+                "SELECT year_month FROM language_block_summary_dirty"
+                " ORDER BY year_month"
+            ).fetchall()
+        ]
+    months = sorted(set(year_months))
+
+    rows = 0
+    for year_month in months:
+        conn.execute(
+            f"DELETE FROM {SUMMARY_TABLE} WHERE year_month = ?", [year_month]
+        )
+        cursor = conn.execute(
+            f"INSERT INTO {SUMMARY_TABLE} {_MONTH_SUMMARY}",
+            {"start": f"{year_month}-01"},
+        )
+        rows += cursor.rowcount
+        conn.execute(
+            "DELETE FROM language_block_summary_dirty WHERE year_month = ?",
+            [year_month],
+        )
+
+    if months:
+        logger.info(
+            f"Refreshed {rows} language block summary rows "
+            f"for {len(months)} months"
+        )
+    return {"months": len(months), "rows": rows}
+
+
+def refresh_queued_block_summary(db) -> Optional[Dict[str, Any]]:
+    """Recompute the queued months in their own transaction on db (a
+    DatabaseConnection), before a read replica snapshot is taken.
+
+    Imports only queue their months; the REFRESH_BLOCK_SUMMARY job may
+    not have run by the time the replica is copied, which would leave it
+    with stale block revenue. The job then finds the queue empty.
+    Best-effort: returns None (logging why) if the refresh fails.
+    """
+    try:
+        with db.transaction() as conn:
+            if not summary_exists(conn):
+                return None
+            return refresh_block_summary(conn)
+    except sqlite3.Error as e:
+        logger.warning(f"Block summary refresh before replica failed: {e}")
+        return None
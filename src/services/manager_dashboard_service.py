@@ -1,6 +1,30 @@
 """Service for manager dashboard -- composes metrics across all AEs."""
 
 from src.services.base_service import BaseService
+from src.services.reference_data import get_reference_data
+
+# Version sources the scoreboard and weekly activity are built from
+# (reference_data_versions, migrations 029/031).
+SCOREBOARD_SOURCES = (
+    "ae_assignments", "entity_signals", "signal_actions", "entity_activity",
+)
+# Aging ("> 7 days", "overdue") moves with the clock, not with writes.
+SCOREBOARD_MAX_AGE = 300
+
+
+def _ae_entities_cte(active_only):
+    """CTE mapping every AE-assigned account to its AE."""
+    active = "AND is_active = 1" if active_only else ""
+    return f"""ae_entities AS (
+                SELECT 'customer' AS entity_type, customer_id AS entity_id,
+                       assigned_ae
+                FROM customers
+                WHERE assigned_ae IS NOT NULL {active}
+                UNION ALL
+                SELECT 'agency', agency_id, assigned_ae
+                FROM agencies
+                WHERE assigned_ae IS NOT NULL {active}
+            )"""
 
 
 class ManagerDashboardService(BaseService):
@@ -12,6 +36,11 @@ class ManagerDashboardService(BaseService):
     def get_scoreboard(self, conn, ae_names):
         """Per-AE fast stats for the scoreboard comparison table.
 
+        Computed for all AEs at once in four GROUP BY queries over the
+        shared entity -> AE mapping, so the cost does not grow with the
+        number of AEs. Cached per process until accounts, signals,
+        signal actions or activities change (or SCOREBOARD_MAX_AGE).
+
         Args:
             conn: Database connection (read-only preferred).
             ae_names: List of AE name strings.
@@ -24,78 +53,78 @@ class ManagerDashboardService(BaseService):
         if not ae_names:
             return {}
 
-        result = {}
-        for ae in ae_names:
-            result[ae] = {
-                "account_count": self._count_accounts(conn, ae),
-                "revenue_at_risk": self._revenue_at_risk(conn, ae),
-                "unworked_signals_7d": self._unworked_signals(conn, ae),
-                **self._followup_counts(conn, ae),
-            }
-        return result
+        stats = get_reference_data().get(
+            self.db_connection, "manager.scoreboard", SCOREBOARD_SOURCES,
+            lambda: self._scoreboard_all(conn), conn=conn,
+            max_age=SCOREBOARD_MAX_AGE,
+        )
+        empty = {
+            "account_count": 0,
+            "revenue_at_risk": 0,
+            "unworked_signals_7d": 0,
+            "open_followups": 0,
+            "overdue_followups": 0,
+        }
+        return {ae: {**empty, **stats.get(ae, {})} for ae in ae_names}
 
-    def _count_accounts(self, conn, ae_name):
-        row = conn.execute("""
-            SELECT COUNT(*) AS n FROM (
-                SELECT customer_id FROM customers
-                WHERE assigned_ae = ? AND is_active = 1
-                UNION ALL
-                SELECT agency_id FROM agencies
-                WHERE assigned_ae = ? AND is_active = 1
-            )
-        """, [ae_name, ae_name]).fetchone()
-        return row["n"]
+    def _scoreboard_all(self, conn):
+        """Scoreboard stats for every AE with accounts or signal actions."""
+        stats = {}
 
-    def _revenue_at_risk(self, conn, ae_name):
-        row = conn.execute("""
-            SELECT COALESCE(SUM(es.trailing_revenue), 0) AS at_risk
-            FROM entity_signals es
+        def put(ae, **values):
+            stats.setdefault(ae, {}).update(values)
+
+        for r in conn.execute(f"""
+            WITH {_ae_entities_cte(active_only=True)}
+            SELECT assigned_ae, COUNT(*) AS n
+            FROM ae_entities
+            GROUP BY assigned_ae
+        """):
+            put(r["assigned_ae"], account_count=r["n"])
+
+        for r in conn.execute(f"""
+            WITH {_ae_entities_cte(active_only=True)}
+            SELECT m.assigned_ae,
+                   COALESCE(SUM(es.trailing_revenue), 0) AS at_risk
+            FROM ae_entities m
+            JOIN entity_signals es
+                ON es.entity_type = m.entity_type
+               AND es.entity_id = m.entity_id
             WHERE es.signal_type = 'renewal_gap'
-              AND (
-                  (es.entity_type = 'customer' AND es.entity_id IN (
-                      SELECT customer_id FROM customers
-                      WHERE assigned_ae = ? AND is_active = 1))
-                  OR
-                  (es.entity_type = 'agency' AND es.entity_id IN (
-                      SELECT agency_id FROM agencies
-                      WHERE assigned_ae = ? AND is_active = 1))
-              )
-        """, [ae_name, ae_name]).fetchone()
-        return row["at_risk"]
+            GROUP BY m.assigned_ae
+        """):
+            put(r["assigned_ae"], revenue_at_risk=r["at_risk"])
 
-    def _unworked_signals(self, conn, ae_name):
-        row = conn.execute("""
-            SELECT COUNT(*) AS n
+        for r in conn.execute("""
+            SELECT assigned_ae, COUNT(*) AS n
             FROM signal_actions
-            WHERE assigned_ae = ?
-              AND status = 'new'
+            WHERE status = 'new'
               AND julianday('now') - julianday(created_date) > 7
-        """, [ae_name]).fetchone()
-        return row["n"]
+            GROUP BY assigned_ae
+        """):
+            put(r["assigned_ae"], unworked_signals_7d=r["n"])
 
-    def _followup_counts(self, conn, ae_name):
-        row = conn.execute("""
-            SELECT
-                COUNT(*) AS open_followups,
-                SUM(CASE WHEN ea.due_date < date('now')
-                    THEN 1 ELSE 0 END) AS overdue_followups
-            FROM entity_activity ea
+        for r in conn.execute(f"""
+            WITH {_ae_entities_cte(active_only=True)}
+            SELECT m.assigned_ae,
+                   COUNT(*) AS open_followups,
+                   SUM(CASE WHEN ea.due_date < date('now')
+                       THEN 1 ELSE 0 END) AS overdue_followups
+            FROM ae_entities m
+            JOIN entity_activity ea
+                ON ea.entity_type = m.entity_type
+               AND ea.entity_id = m.entity_id
             WHERE ea.activity_type = 'follow_up'
               AND ea.is_completed = 0
-              AND (
-                  (ea.entity_type = 'customer' AND ea.entity_id IN (
-                      SELECT customer_id FROM customers
-                      WHERE assigned_ae = ? AND is_active = 1))
-                  OR
-                  (ea.entity_type = 'agency' AND ea.entity_id IN (
-                      SELECT agency_id FROM agencies
-                      WHERE assigned_ae = ? AND is_active = 1))
-              )
-        """, [ae_name, ae_name]).fetchone()
-        return {
-            "open_followups": row["open_followups"] or 0,
-            "overdue_followups": row["overdue_followups"] or 0,
-        }
+            GROUP BY m.assigned_ae
+        """):
+            put(
+                r["assigned_ae"],
+                open_followups=r["open_followups"] or 0,
+                overdue_followups=r["overdue_followups"] or 0,
+            )
+
+        return stats
 
     def get_attention_items(self, conn):
         """Items needing manager awareness, sorted by dollar impact.
@@ -185,7 +214,8 @@ class ManagerDashboardService(BaseService):
         """Activity counts by type per AE for the last 7 days.
 
         Counts note, call, email, meeting, and completed follow_ups.
-        Excludes status_change and incomplete follow_ups.
+        Excludes status_change and incomplete follow_ups. One GROUP BY
+        over all AEs, cached like the scoreboard.
 
         Args:
             conn: Database connection (read-only preferred).
@@ -202,32 +232,37 @@ class ManagerDashboardService(BaseService):
         if not ae_names:
             return {}
 
-        result = {ae: dict(base) for ae in ae_names}
+        counts = get_reference_data().get(
+            self.db_connection, "manager.weekly_activity",
+            SCOREBOARD_SOURCES,
+            lambda: self._weekly_activity_all(conn), conn=conn,
+            max_age=SCOREBOARD_MAX_AGE,
+        )
 
+        result = {}
         for ae in ae_names:
-            rows = conn.execute("""
-                SELECT ea.activity_type, COUNT(*) AS n
-                FROM entity_activity ea
-                WHERE ea.activity_date >= date('now', '-7 days')
-                  AND ea.activity_type IN (
-                      'note', 'call', 'email', 'meeting', 'follow_up')
-                  AND (ea.activity_type != 'follow_up'
-                       OR ea.is_completed = 1)
-                  AND (
-                      (ea.entity_type = 'customer' AND ea.entity_id IN (
-                          SELECT customer_id FROM customers
-                          WHERE assigned_ae = ?))
-                      OR
-                      (ea.entity_type = 'agency' AND ea.entity_id IN (
-                          SELECT agency_id FROM agencies
-                          WHERE assigned_ae = ?))
-                  )
-                GROUP BY ea.activity_type
-            """, [ae, ae]).fetchall()
-            total = 0
-            for r in rows:
-                result[ae][r["activity_type"]] = r["n"]
-                total += r["n"]
-            result[ae]["total"] = total
-
+            result[ae] = dict(base)
+            for activity_type, n in counts.get(ae, {}).items():
+                result[ae][activity_type] = n
+            result[ae]["total"] = sum(counts.get(ae, {}).values())
         return result
+
+    def _weekly_activity_all(self, conn):
+        rows = conn.execute(f"""
+            WITH {_ae_entities_cte(active_only=False)}
+            SELECT m.assigned_ae, ea.activity_type, COUNT(*) AS n
+            FROM ae_entities m
+            JOIN entity_activity ea
+                ON ea.entity_type = m.entity_type
+               AND ea.entity_id = m.entity_id
+            WHERE ea.activity_date >= date('now', '-7 days')
+              AND ea.activity_type IN (
+                  'note', 'call', 'email', 'meeting', 'follow_up')
+              AND (ea.activity_type != 'follow_up'
+                   OR ea.is_completed = 1)
+            GROUP BY m.assigned_ae, ea.activity_type
+        """).fetchall()
+        counts = {}
+        for r in rows:
+            counts.setdefault(r["assigned_ae"], {})[r["activity_type"]] = r["n"]
+        return counts
@@ -1,13 +1,24 @@
 """
 Market Analysis Service - Web integration for market analysis engine.
 Wraps the MarketAnalysisEngine for Flask route consumption.
+
+Every report on the page and its CSV exports are sliced from one
+RevenueCube (src/utils/revenue_cube.py), cached per process until the
+next import bumps the spots version.
 """
 
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from datetime import date
+from src.services.reference_data import get_reference_data
 from src.utils.language_constants import LanguageConstants
+from src.utils.revenue_cube import (
+    INTERNAL_AD_SALES,
+    REPORT_SPOT_TYPES,
+    RevenueCube,
+    load_cells,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,128 +49,84 @@ class MarketAnalysisService:
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def get_available_years(self) -> List[str]:
-        """Get list of years with data."""
-        with self.db.connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT DISTINCT '20' || SUBSTR(broadcast_month, -2) as year
-                FROM spots
-                WHERE broadcast_month IS NOT NULL
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                ORDER BY year DESC
-            """)
-            return [row[0] for row in cursor.fetchall()]
-
-    def get_revenue_context(self, year: str) -> Dict[str, Any]:
+        """Get list of years with data (cached per process)."""
+        return self.get_cube().years()
+
+    def get_cube(self) -> RevenueCube:
+        """Spot totals for every report on the page, cached until the
+        next import bumps the spots version."""
+        return RevenueCube(get_reference_data().get(
+            self.db, "market_analysis.cube", ("spots",), self._load_cells,
+        ))
+
+    def _load_cells(self):
+        with self.db.connection_ro() as conn:
+            return load_cells(conn)
+
+    def _report_cells(self, cube: RevenueCube, year: str):
+        """Internal Ad Sales COM/BNS spots: what the report analyzes."""
+        return cube.select(
+            [year[-2:]], revenue_type=INTERNAL_AD_SALES,
+            spot_types=REPORT_SPOT_TYPES,
+        )
+
+    def get_revenue_context(
+        self, year: str, cube: Optional[RevenueCube] = None
+    ) -> Dict[str, Any]:
         """Get revenue totals at each filter level."""
-        with self.db.connection() as conn:
-            cursor = conn.cursor()
-            suffix = year[-2:]
-
-            cursor.execute(
-                """
-                SELECT SUM(COALESCE(gross_rate, 0))
-                FROM spots
-                WHERE broadcast_month LIKE ?
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-            """,
-                (f"%-{suffix}",),
-            )
-            total_gross = cursor.fetchone()[0] or 0
-
-            cursor.execute(
-                """
-                SELECT SUM(COALESCE(gross_rate, 0))
-                FROM spots
-                WHERE broadcast_month LIKE ?
-                AND revenue_type = 'Internal Ad Sales'
-            """,
-                (f"%-{suffix}",),
-            )
-            internal_ad_sales = cursor.fetchone()[0] or 0
-
-            cursor.execute(
-                """
-                SELECT SUM(COALESCE(gross_rate, 0))
-                FROM spots
-                WHERE broadcast_month LIKE ?
-                AND revenue_type = 'Internal Ad Sales'
-                AND spot_type IN ('COM', 'BNS')
-            """,
-                (f"%-{suffix}",),
-            )
-            report_scope = cursor.fetchone()[0] or 0
-
-            cursor.execute(
-                """
-                SELECT revenue_type, SUM(COALESCE(gross_rate, 0)) as revenue
-                FROM spots
-                WHERE broadcast_month LIKE ?
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                AND revenue_type != 'Internal Ad Sales'
-                GROUP BY revenue_type
-                ORDER BY revenue DESC
-            """,
-                (f"%-{suffix}",),
-            )
-            other_types = {row[0]: row[1] for row in cursor.fetchall()}
-
-            return {
-                "total_gross": total_gross,
-                "internal_ad_sales": internal_ad_sales,
-                "report_scope": report_scope,
-                "excluded_from_report": total_gross - report_scope,
-                "other_revenue_types": other_types,
-                "report_percentage": (report_scope / total_gross * 100)
-                if total_gross > 0
-                else 0,
-            }
-
-    def _build_language_case_sql(self) -> str:
-        """Build SQL CASE statement for language grouping."""
-        return LanguageConstants.build_language_case_sql()
-
-    def get_language_summary(self, year: str) -> List[Dict[str, Any]]:
+        cube = cube or self.get_cube()
+        cells = cube.select([year[-2:]])
+        total_gross = cube.totals(cells)["revenue"]
+        internal_ad_sales = cube.totals(
+            c for c in cells if c.revenue_type == INTERNAL_AD_SALES
+        )["revenue"]
+        report_scope = cube.totals(self._report_cells(cube, year))["revenue"]
+        other_types = {
+            revenue_type: totals["revenue"]
+            for revenue_type, totals in cube.group(
+                (c for c in cells
+                 if c.revenue_type is not None
+                 and c.revenue_type != INTERNAL_AD_SALES),
+                lambda c: c.revenue_type,
+            ).items()
+        }
+
+        return {
+            "total_gross": total_gross,
+            "internal_ad_sales": internal_ad_sales,
+            "report_scope": report_scope,
+            "excluded_from_report": total_gross - report_scope,
+            "other_revenue_types": other_types,
+            "report_percentage": (report_scope / total_gross * 100)
+            if total_gross > 0
+            else 0,
+        }
+
+    def get_language_summary(
+        self, year: str, cube: Optional[RevenueCube] = None
+    ) -> List[Dict[str, Any]]:
         """Get language performance summary."""
-        with self.db.connection() as conn:
-            cursor = conn.cursor()
-            suffix = year[-2:]
-            lang_case = self._build_language_case_sql()
-
-            query = f"""
-            SELECT 
-                {lang_case} as language_group,
-                SUM(COALESCE(gross_rate, 0)) as revenue,
-                COUNT(CASE WHEN spot_type != 'BNS' OR spot_type IS NULL THEN 1 END) as paid_spots,
-                COUNT(CASE WHEN spot_type = 'BNS' THEN 1 END) as bonus_spots,
-                COUNT(*) as total_spots
-            FROM spots
-            WHERE broadcast_month LIKE ?
-            AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-            AND revenue_type = 'Internal Ad Sales'
-            AND spot_type IN ('COM', 'BNS')
-            AND language_code IS NOT NULL
-            AND TRIM(language_code) != ''
-            GROUP BY {lang_case}
-            HAVING SUM(COALESCE(gross_rate, 0)) > 0
-            ORDER BY SUM(COALESCE(gross_rate, 0)) DESC
-            """
-
-            cursor.execute(query, (f"%-{suffix}",))
-            rows = cursor.fetchall()
+        cube = cube or self.get_cube()
+        groups = cube.group(
+            (c for c in self._report_cells(cube, year) if c.language_code),
+            lambda c: cube.language_group(c.language_code),
+        )
 
         results = []
         total_revenue = 0
 
-        for row in rows:
-            lang, revenue, paid, bonus, total = row
+        for lang, totals in groups.items():
+            revenue = totals["revenue"]
+            if revenue <= 0:
+                continue
+            total = totals["total_spots"]
             total_revenue += revenue
             results.append(
                 {
                     "language": lang,
                     "revenue": revenue,
-                    "paid_spots": paid,
-                    "bonus_spots": bonus,
+                    "paid_spots": totals["paid_spots"],
+                    "bonus_spots": totals["bonus_spots"],
                     "total_spots": total,
                     "avg_per_spot": revenue / total if total > 0 else 0,
                 }
@@ -172,43 +139,28 @@ class MarketAnalysisService:
 
         return results
 
-    def get_market_breakdown(self, year: str) -> List[Dict[str, Any]]:
+    def get_market_breakdown(
+        self, year: str, cube: Optional[RevenueCube] = None
+    ) -> List[Dict[str, Any]]:
         """Get language performance by market."""
-        with self.db.connection() as conn:
-            cursor = conn.cursor()
-            suffix = year[-2:]
-            lang_case = self._build_language_case_sql()
-
-            query = f"""
-            SELECT 
-                {lang_case} as language_group,
-                CASE 
-                    WHEN UPPER(COALESCE(market_name, 'Unknown')) IN ('CHI', 'CMP', 'MSP') THEN 'CMP'
-                    ELSE COALESCE(market_name, 'Unknown')
-                END as market,
-                SUM(COALESCE(gross_rate, 0)) as revenue,
-                COUNT(*) as total_spots
-            FROM spots
-            WHERE broadcast_month LIKE ?
-            AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-            AND revenue_type = 'Internal Ad Sales'
-            AND spot_type IN ('COM', 'BNS')
-            AND language_code IS NOT NULL
-            AND TRIM(language_code) != ''
-            GROUP BY language_group, market
-            HAVING SUM(COALESCE(gross_rate, 0)) > 0
-            ORDER BY language_group, revenue DESC
-            """
-
-            cursor.execute(query, (f"%-{suffix}",))
-            rows = cursor.fetchall()
+        cube = cube or self.get_cube()
+        groups = cube.group(
+            (c for c in self._report_cells(cube, year) if c.language_code),
+            lambda c: (cube.language_group(c.language_code),
+                       cube.market_group(c.market_name)),
+        )
 
         results = []
         lang_totals = {}
         market_totals = {}
 
-        for row in rows:
-            lang, market, revenue, spots = row
+        # By language, then revenue descending (group() is stable)
+        for (lang, market), totals in sorted(
+            groups.items(), key=lambda kv: kv[0][0]
+        ):
+            revenue = totals["revenue"]
+            if revenue <= 0:
+                continue
             lang_totals[lang] = lang_totals.get(lang, 0) + revenue
             market_totals[market] = market_totals.get(market, 0) + revenue
             results.append(
@@ -216,7 +168,7 @@ class MarketAnalysisService:
                     "language": lang,
                     "market": market,
                     "revenue": revenue,
-                    "total_spots": spots,
+                    "total_spots": totals["total_spots"],
                 }
             )
 
@@ -234,9 +186,11 @@ class MarketAnalysisService:
 
         return results
 
-    def get_market_summary(self, year: str) -> List[Dict[str, Any]]:
+    def get_market_summary(
+        self, year: str, cube: Optional[RevenueCube] = None
+    ) -> List[Dict[str, Any]]:
         """Get market-level summary."""
-        breakdown = self.get_market_breakdown(year)
+        breakdown = self.get_market_breakdown(year, cube)
 
         market_data = {}
         total_revenue = 0
@@ -274,36 +228,21 @@ class MarketAnalysisService:
         results.sort(key=lambda x: x["revenue"], reverse=True)
         return results
 
-    def get_code_distribution(self, year: str) -> Dict[str, Any]:
+    def get_code_distribution(
+        self, year: str, cube: Optional[RevenueCube] = None
+    ) -> Dict[str, Any]:
         """Get raw language code distribution."""
-        with self.db.connection() as conn:
-            cursor = conn.cursor()
-            suffix = year[-2:]
-
-            cursor.execute(
-                """
-                SELECT 
-                    UPPER(TRIM(language_code)) as code,
-                    COUNT(*) as spots,
-                    SUM(COALESCE(gross_rate, 0)) as revenue
-                FROM spots
-                WHERE broadcast_month LIKE ?
-                AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                AND revenue_type = 'Internal Ad Sales'
-                AND spot_type IN ('COM', 'BNS')
-                GROUP BY UPPER(TRIM(language_code))
-                ORDER BY revenue DESC
-            """,
-                (f"%-{suffix}",),
-            )
-            rows = cursor.fetchall()
+        cube = cube or self.get_cube()
+        groups = cube.group(
+            self._report_cells(cube, year), lambda c: c.language_code
+        )
 
         codes = []
         total_spots = 0
         total_revenue = 0
 
-        for row in rows:
-            code, spots, revenue = row
+        for code, totals in groups.items():
+            spots, revenue = totals["total_spots"], totals["revenue"]
             code = code if code else "EMPTY"
             group = LanguageConstants.get_language_group(code)
             codes.append(
@@ -331,18 +270,19 @@ class MarketAnalysisService:
 
         start_time = time.time()
 
-        available_years = self.get_available_years()
+        cube = self.get_cube()
+        available_years = cube.years()
         if not year:
             year = str(date.today().year)
 
         if year not in available_years and available_years:
             year = available_years[0]
 
-        revenue_context = self.get_revenue_context(year)
-        language_summary = self.get_language_summary(year)
-        market_breakdown = self.get_market_breakdown(year)
-        market_summary = self.get_market_summary(year)
-        code_distribution = self.get_code_distribution(year)
+        revenue_context = self.get_revenue_context(year, cube)
+        language_summary = self.get_language_summary(year, cube)
+        market_breakdown = self.get_market_breakdown(year, cube)
+        market_summary = self.get_market_summary(year, cube)
+        code_distribution = self.get_code_distribution(year, cube)
 
         processing_time = (time.time() - start_time) * 1000
 
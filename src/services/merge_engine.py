@@ -0,0 +1,321 @@
+"""Chunked customer and agency merges.
+
+Merging used to repoint aliases, move every spot (or, for agencies, every
+client customer), deactivate the source and write the audit row in one
+write transaction. For a large advertiser that held the write lock for
+the whole spot UPDATE and the per-row triggers it fires, stalling imports
+and every other writer. MergeEngine splits a merge into:
+
+  1. plan     read-only: source/target rows and the ids of every row to
+              repoint (spot_ids for a customer, customer_ids for an agency)
+  2. move     repoint those rows in chunks of chunk_size, one short
+              transaction per chunk, reporting progress after each
+  3. finish   one short transaction: sweep rows that arrived after the
+              plan, move aliases, add the source-name alias, deactivate
+              the source, audit, refresh the affected entity_metrics rows
+
+The source stays active until step 3 commits, so a merge interrupted
+after some chunks is finished by running it again (the job worker retries
+it). Web routes queue MERGE_ENTITIES jobs and the client polls
+/api/merge-jobs/<job_id>; see background_jobs.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from src.database.connection import DatabaseConnection
+
+logger = logging.getLogger(__name__)
+
+MERGE_CHUNK_SIZE = 2000
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class MergeError(ValueError):
+    """A merge that cannot be applied (missing entity, self-merge)."""
+
+
+@dataclass(frozen=True)
+class _EntityKind:
+    """Tables and columns for one mergeable entity type."""
+
+    entity_type: str  # entity_aliases.entity_type, canon_audit key prefix
+    label: str
+    table: str
+    id_col: str
+    name_col: str
+    moved_table: str  # rows repointed from source to target
+    moved_key: str
+    moved_col: str
+    moved_label: str  # result key / audit field for the moved rows
+
+
+_KINDS = {
+    "customer": _EntityKind(
+        entity_type="customer", label="customer",
+        table="customers", id_col="customer_id", name_col="normalized_name",
+        moved_table="spots", moved_key="spot_id", moved_col="customer_id",
+        moved_label="spots",
+    ),
+    "agency": _EntityKind(
+        entity_type="agency", label="agency",
+        table="agencies", id_col="agency_id", name_col="agency_name",
+        moved_table="customers", moved_key="customer_id",
+        moved_col="agency_id", moved_label="customers",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class MergePlan:
+    """Everything a merge will touch, read before any write."""
+
+    entity_type: str
+    source_id: int
+    source_name: str
+    target_id: int
+    target_name: str
+    row_ids: List[int]
+    alias_count: int
+
+
+class MergeEngine:
+    """Plans and applies customer/agency merges in bounded chunks."""
+
+    def __init__(
+        self, db: DatabaseConnection, chunk_size: int = MERGE_CHUNK_SIZE
+    ):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def plan(self, entity_type: str, source_id: int, target_id: int) -> MergePlan:
+        """Read the rows a merge will touch. Raises MergeError if invalid."""
+        kind = self._kind(entity_type)
+        if source_id == target_id:
+            raise MergeError(f"Cannot merge {kind.label} into itself")
+
+        with self.db.connection_ro() as conn:
+            source = self._active_entity(conn, kind, source_id)
+            target = self._active_entity(conn, kind, target_id)
+            if not source:
+                raise MergeError(f"Source {kind.label} {source_id} not found")
+            if not target:
+                raise MergeError(f"Target {kind.label} {target_id} not found")
+
+            row_ids = [
+                r[0] for r in conn.execute(
+                    f"SELECT {kind.moved_key} FROM {kind.moved_table} "
+                    f"WHERE {kind.moved_col} = ? ORDER BY {kind.moved_key}",
+                    [source_id],
+                )
+            ]
+            alias_count = conn.execute(
+                """
+                SELECT COUNT(*) FROM entity_aliases
+                WHERE target_entity_id = ? AND entity_type = ? AND is_active = 1
+                """,
+                [source_id, kind.entity_type],
+            ).fetchone()[0]
+
+        return MergePlan(
+            entity_type=kind.entity_type,
+            source_id=source_id,
+            source_name=source[1],
+            target_id=target_id,
+            target_name=target[1],
+            row_ids=row_ids,
+            alias_count=alias_count,
+        )
+
+    def merge(
+        self,
+        entity_type: str,
+        source_id: int,
+        target_id: int,
+        merged_by: str = "web_user",
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Plan and apply a merge. Returns the merge stats, or
+        {"success": False, "error": ...} when the merge is invalid."""
+        try:
+            plan = self.plan(entity_type, source_id, target_id)
+        except MergeError as e:
+            return {"success": False, "error": str(e)}
+        return self.apply(plan, merged_by=merged_by, progress=progress)
+
+    def apply(
+        self,
+        plan: MergePlan,
+        merged_by: str = "web_user",
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Repoint plan.row_ids in chunks, then finish the merge."""
+        kind = self._kind(plan.entity_type)
+        total = len(plan.row_ids)
+        moved = 0
+        self._report(progress, "moving", 0, total)
+
+        for start in range(0, total, self.chunk_size):
+            chunk = plan.row_ids[start:start + self.chunk_size]
+            # The range covers ids of other entities too; the source
+            # filter keeps the UPDATE to planned rows still on the source.
+            with self.db.transaction() as conn:
+                moved += conn.execute(
+                    f"""
+                    UPDATE {kind.moved_table}
+                    SET {kind.moved_col} = ?
+                    WHERE {kind.moved_col} = ?
+                      AND {kind.moved_key} BETWEEN ? AND ?
+                    """,
+                    [plan.target_id, plan.source_id, chunk[0], chunk[-1]],
+                ).rowcount
+            self._report(progress, "moving", start + len(chunk), total)
+
+        self._report(progress, "finishing", total, total)
+        with self.db.transaction() as conn:
+            result = self._finish(conn, kind, plan, merged_by, moved)
+        self._report(progress, "done", total, total)
+
+        logger.info(
+            f"Merged {kind.label} {plan.source_id} into {plan.target_id}: "
+            f"{result[kind.moved_label + '_moved']} {kind.moved_label}, "
+            f"{result['aliases_moved']} aliases"
+        )
+        return result
+
+    # ------------------------------------------------------------------
+
+    def _finish(self, conn, kind, plan, merged_by, moved) -> Dict[str, Any]:
+        source = self._active_entity(conn, kind, plan.source_id)
+        target = self._active_entity(conn, kind, plan.target_id)
+        if not source or not target:
+            # Merged or deactivated by someone else while rows moved
+            missing = "Source" if not source else "Target"
+            entity_id = plan.source_id if not source else plan.target_id
+            return {
+                "success": False,
+                "error": f"{missing} {kind.label} {entity_id} not found",
+            }
+
+        # Rows that reached the source after the plan was read
+        moved += conn.execute(
+            f"UPDATE {kind.moved_table} SET {kind.moved_col} = ? "
+            f"WHERE {kind.moved_col} = ?",
+            [plan.target_id, plan.source_id],
+        ).rowcount
+
+        aliases_moved = conn.execute(
+            f"""
+            UPDATE entity_aliases
+            SET target_entity_id = ?,
+                updated_date = CURRENT_TIMESTAMP,
+                notes = COALESCE(notes, '') || ' | Merged from {kind.label} ' || ? || ' by ' || ?
+            WHERE target_entity_id = ?
+            AND entity_type = ?
+            AND is_active = 1
+            """,
+            [plan.target_id, plan.source_id, merged_by, plan.source_id,
+             kind.entity_type],
+        ).rowcount
+
+        # Alias from the source's name so future imports resolve to target
+        existing_alias = conn.execute(
+            "SELECT alias_id FROM entity_aliases "
+            "WHERE alias_name = ? AND entity_type = ?",
+            [plan.source_name, kind.entity_type],
+        ).fetchone()
+        alias_created = False
+        if not existing_alias and plan.source_name != plan.target_name:
+            conn.execute(
+                f"""
+                INSERT INTO entity_aliases
+                (alias_name, entity_type, target_entity_id, confidence_score,
+                created_by, notes, is_active)
+                VALUES (?, ?, ?, 100, ?,
+                        'Created via merge from {kind.label} ' || ?, 1)
+                """,
+                [plan.source_name, kind.entity_type, plan.target_id,
+                 merged_by, plan.source_id],
+            )
+            alias_created = True
+
+        conn.execute(
+            f"""
+            UPDATE {kind.table}
+            SET is_active = 0,
+                updated_date = CURRENT_TIMESTAMP,
+                notes = COALESCE(notes, '') || ' | Merged into {kind.label} ' || ? || ' by ' || ? || ' at ' || datetime('now')
+            WHERE {kind.id_col} = ?
+            """,
+            [plan.target_id, merged_by, plan.source_id],
+        )
+
+        conn.execute(
+            """
+            INSERT INTO canon_audit (actor, action, key, value, extra)
+            VALUES (?, 'MERGE', ?, ?, ?)
+            """,
+            [
+                merged_by,
+                f"{kind.entity_type}:{plan.source_id}",
+                f"{kind.entity_type}:{plan.target_id}",
+                f"source_name={plan.source_name}|target_name={plan.target_name}"
+                f"|aliases={aliases_moved}|{kind.moved_label}={moved}",
+            ],
+        )
+
+        if kind.entity_type == "customer":
+            self._refresh_customer_metrics(conn, plan)
+
+        return {
+            "success": True,
+            "source_id": plan.source_id,
+            "source_name": plan.source_name,
+            "target_id": plan.target_id,
+            "target_name": plan.target_name,
+            "aliases_moved": aliases_moved,
+            "alias_created": alias_created,
+            f"{kind.moved_label}_moved": moved,
+        }
+
+    def _refresh_customer_metrics(self, conn, plan: MergePlan) -> None:
+        """Rebuild entity_metrics for source and target only.
+
+        An agency merge moves customers.agency_id, which entity_metrics
+        does not read, so only customer merges need this.
+        """
+        from src.services.entity_metrics_service import EntityMetricsService
+
+        ids = [plan.source_id, plan.target_id]
+        EntityMetricsService(self.db).refresh_metrics_for_ids(
+            conn, customer_ids=ids
+        )
+        # The source has no spots left; its signals are stale
+        conn.execute(
+            "DELETE FROM entity_signals "
+            "WHERE entity_type = 'customer' AND entity_id = ?",
+            [plan.source_id],
+        )
+
+    def _active_entity(self, conn, kind: _EntityKind, entity_id: int):
+        return conn.execute(
+            f"SELECT {kind.id_col}, {kind.name_col} FROM {kind.table} "
+            f"WHERE {kind.id_col} = ? AND is_active = 1",
+            [entity_id],
+        ).fetchone()
+
+    @staticmethod
+    def _kind(entity_type: str) -> _EntityKind:
+        try:
+            return _KINDS[entity_type]
+        except KeyError:
+            raise MergeError(f"Unknown entity type {entity_type!r}") from None
+
+    @staticmethod
+    def _report(progress, phase: str, done: int, total: int) -> None:
+        if progress is not None:
+            progress({"phase": phase, "done": done, "total": total})
@@ -4,17 +4,78 @@ import logging
 import os
 from datetime import datetime
 
-from scripts.scan_insertion_orders import parse_folder_name
+from src.services.io_index import (
+    INDEX_TABLE,
+    index_exists,
+    parse_folder_name,
+    try_refresh,
+)
 
 logger = logging.getLogger(__name__)
 DEFAULT_IO_PATH = "/mnt/k-drive/Insertion Orders"
 
 
 class PendingOrderService:
-    """Scans pending insertion orders live from the K drive directory."""
+    """Lists pending insertion orders from the K drive directory.
 
-    def __init__(self, io_path=DEFAULT_IO_PATH):
+    With a db_connection and migration 042, orders come from the IO
+    directory index (refreshed for the root and AE folders on each
+    call); otherwise the share is walked live.
+    """
+
+    def __init__(self, io_path=DEFAULT_IO_PATH, db_connection=None):
         self.io_path = io_path
+        self.db_connection = db_connection
+
+    def _scan_from_index(self, conn):
+        """Orders from io_directory_index, once refreshed."""
+        root = os.path.normpath(self.io_path)
+        rows = conn.execute(
+            f"""
+            SELECT ae.name AS sales_person, c.contract, c.customer
+            FROM {INDEX_TABLE} ae
+            JOIN {INDEX_TABLE} c ON c.parent = ae.path AND c.is_dir = 1
+            WHERE ae.parent = ? AND ae.is_dir = 1
+              AND lower(ae.name) != 'traffic only'
+            ORDER BY ae.name, c.name
+            """,
+            [root],
+        ).fetchall()
+
+        return [
+            {
+                "sales_person": row["sales_person"],
+                "customer": row["customer"],
+                "contract": row["contract"],
+                "market": "",
+                "spot_count": 0,
+                "total_gross": 0.0,
+                "total_net": 0.0,
+                "date_range_start": None,
+                "date_range_end": None,
+            }
+            for row in rows
+        ]
+
+    def _scan_orders(self):
+        """Orders from the index when available, else a live walk; None
+        when the IO path is missing.
+
+        The share is also walked live while an import holds the database
+        write lock, rather than waiting for it to refresh the index.
+        """
+        if self.db_connection is not None:
+            with self.db_connection.connection() as conn:
+                if index_exists(conn):
+                    refreshed = try_refresh(conn, self.io_path, max_depth=1)
+                    if refreshed is not None:
+                        if not refreshed["exists"]:
+                            return None
+                        return self._scan_from_index(conn)
+
+        if not os.path.isdir(self.io_path):
+            return None
+        return self._scan_with_ae_folders()
 
     def _scan_with_ae_folders(self):
         """Walk a two-level hierarchy: AE folders then customer folders.
@@ -89,14 +150,13 @@ class PendingOrderService:
             "order_count": 0,
         }
 
-        if not os.path.isdir(self.io_path):
+        orders = self._scan_orders()
+        if orders is None:
             logger.debug(
                 "Insertion orders path not found: %s", self.io_path
             )
             return empty
 
-        orders = self._scan_with_ae_folders()
-
         if ae_name:
             ae_lower = ae_name.lower()
             orders = [
@@ -7,6 +7,7 @@ Uses broadcast_month and month_closures for accurate period comparisons.
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Tuple, Any
 import logging
+from src.services.reference_data import get_reference_data
 from src.utils.query_builders import RevenueQueryBuilder
 
 logger = logging.getLogger(__name__)
@@ -700,7 +701,13 @@ class PricingAnalysisService:
         )
 
     def get_filter_options(self) -> Dict[str, List[str]]:
-        """Get available filter options."""
+        """Get available filter options (cached per process)."""
+        return get_reference_data().get(
+            self.db, "pricing.filter_options", ("markets", "sectors", "spots"),
+            self._query_filter_options,
+        )
+
+    def _query_filter_options(self) -> Dict[str, List[str]]:
         options = {}
 
         # Static options for computed dimensions
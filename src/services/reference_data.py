@@ -0,0 +1,216 @@
+"""In-process cache for small, rarely changing reference lists.
+
+Dropdown endpoints (sectors, markets, AE names, available years, revenue
+types) re-ran the same DISTINCT queries on every request even though the
+answers change a few times a day at most. The registry keeps each list in
+memory per process and reloads it only when one of the tables it was
+built from has a new version in reference_data_versions (migration 029):
+
+    registry = get_reference_data()
+    sectors = registry.get(
+        self.db_connection, "entity.sectors", ("sectors",),
+        lambda: self._load_sectors(conn), conn=conn,
+    )
+
+Versions are bumped by triggers for sectors, markets and AE assignments,
+and by bump_version(conn, "spots") at the end of each import, so writes
+from any process are picked up. Versions are re-read at most every
+VERSION_CHECK_SECONDS; write paths in this process call invalidate() so
+their own changes show up on the next request.
+
+Without migration 029 (or for in-memory databases) every get() simply
+calls the loader, i.e. behaves exactly as before.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_SECONDS = 5.0
+
+
+def bump_version(conn: sqlite3.Connection, *sources: str) -> None:
+    """Bump sources inside the caller's transaction.
+
+    Used for tables without a version trigger (spots). A missing
+    reference_data_versions table is ignored so imports keep working on
+    databases that have not run migration 029.
+    """
+    try:
+        conn.executemany(
+            """
+            UPDATE reference_data_versions
+            SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE source = ?
+            """,
+            [(s,) for s in sources],
+        )
+    except sqlite3.OperationalError as e:
+        logger.debug(f"Reference data versions not bumped: {e}")
+
+
+@dataclass
+class _Entry:
+    sources: Tuple[str, ...]
+    stamp: Tuple[int, ...]
+    value: Any
+    loaded_at: float
+
+
+@dataclass
+class _Namespace:
+    """Cached lists and last-seen versions for one database file."""
+
+    versions: Optional[Dict[str, int]] = None
+    checked_at: float = float("-inf")
+    entries: Dict[Hashable, _Entry] = field(default_factory=dict)
+
+
+class ReferenceDataRegistry:
+    """Version-stamped cache of reference lists, keyed per database file."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        check_interval: float = VERSION_CHECK_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = enabled
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, _Namespace] = {}
+
+    def get(
+        self,
+        db,
+        key: Hashable,
+        sources: Sequence[str],
+        loader: Callable[[], Any],
+        conn: Optional[sqlite3.Connection] = None,
+        max_age: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for key, calling loader() on a miss.
+
+        Args:
+            db: DatabaseConnection the list is read from; its db_path
+                scopes the cache.
+            key: Cache key, including any arguments (e.g. the year).
+            sources: Version sources the value is derived from.
+            loader: Builds the value; only called on a miss.
+            conn: Open connection to read versions with, if the caller
+                has one; otherwise a read-only connection is opened.
+            max_age: Also reload after this many seconds, for values
+                that depend on the date ('overdue', 'last 7 days').
+
+        Callers get a copy, so mutating the result never leaks into
+        the cache.
+        """
+        db_path = getattr(db, "db_path", None)
+        if not self.enabled or not db_path or db_path == ":memory:":
+            return loader()
+
+        versions = self._versions(db, db_path, conn)
+        if versions is None:
+            return loader()
+
+        stamp = tuple(versions.get(s, 0) for s in sources)
+        now = self._clock()
+        with self._lock:
+            entry = self._namespace(db_path).entries.get(key)
+        if (
+            entry is not None
+            and entry.stamp == stamp
+            and (max_age is None or now - entry.loaded_at < max_age)
+        ):
+            return copy.deepcopy(entry.value)
+
+        value = loader()
+        with self._lock:
+            self._namespace(db_path).entries[key] = _Entry(
+                tuple(sources), stamp, copy.deepcopy(value), now
+            )
+        return value
+
+    def invalidate(self, db, *sources: str) -> None:
+        """Drop entries built from sources and re-read versions next get().
+
+        Call after committing a write to one of the source tables so this
+        process does not serve the old list for up to check_interval.
+        """
+        db_path = getattr(db, "db_path", None)
+        if not db_path:
+            return
+        dropped = set(sources)
+        with self._lock:
+            ns = self._namespace(db_path)
+            ns.checked_at = float("-inf")
+            ns.entries = {
+                key: entry for key, entry in ns.entries.items()
+                if not dropped.intersection(entry.sources)
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._namespaces.clear()
+
+    # -- internals ---------------------------------------------------------
+
+    def _namespace(self, db_path: str) -> _Namespace:
+        ns = self._namespaces.get(db_path)
+        if ns is None:
+            ns = self._namespaces[db_path] = _Namespace()
+        return ns
+
+    def _versions(
+        self, db, db_path: str, conn: Optional[sqlite3.Connection]
+    ) -> Optional[Dict[str, int]]:
+        now = self._clock()
+        with self._lock:
+            ns = self._namespace(db_path)
+            if now - ns.checked_at < self.check_interval:
+                return ns.versions
+
+        sql = "SELECT source, version FROM reference_data_versions"
+        try:
+            if conn is not None:
+                rows = conn.execute(sql).fetchall()
+            else:
+                with db.connection_ro() as ro:
+                    rows = ro.execute(sql).fetchall()
+            versions = {row[0]: row[1] for row in rows}
+        except sqlite3.OperationalError:
+            versions = None
+
+        with self._lock:
+            ns.versions = versions
+            ns.checked_at = now
+        return versions
+
+
+_registry: Optional[ReferenceDataRegistry] = None
+
+
+def get_reference_data() -> ReferenceDataRegistry:
+    """Process-wide registry. CACHE_ENABLED=false turns caching off."""
+    global _registry
+    if _registry is None:
+        _registry = ReferenceDataRegistry(
+            enabled=os.environ.get("CACHE_ENABLED", "true").lower() == "true"
+        )
+    return _registry
+
+
+def reset_reference_data() -> None:
+    """Drop the process registry (useful for testing)."""
+    global _registry
+    _registry = None
@@ -12,6 +12,7 @@ from datetime import datetime, date
 from decimal import Decimal
 from dataclasses import dataclass
 from enum import Enum
+from src.services.reference_data import get_reference_data
 from src.utils.query_builders import (
     CustomerNormalizationQueryBuilder,
     BroadcastMonthQueryBuilder,
@@ -539,7 +540,14 @@ class SQLiteRevenueRepository:
         )
 
     def get_available_years(self, conn=None) -> List[int]:
-        """Get list of available years from data using index-friendly EXISTS checks"""
+        """Get list of available years from data (cached per process)"""
+        return get_reference_data().get(
+            self.db, "report.years", ("spots",),
+            lambda: self._query_available_years(conn), conn=conn,
+        )
+
+    def _query_available_years(self, conn=None) -> List[int]:
+        """Index-friendly EXISTS checks per candidate year"""
         # Instead of scanning all spots with DISTINCT, check each candidate year
         # via EXISTS + IN on indexed broadcast_month column (milliseconds per year)
         candidate_years = list(range(2021, 2031))
@@ -565,7 +573,13 @@ class SQLiteRevenueRepository:
                 conn.close()
 
     def get_ae_list(self, year: Optional[int] = None, conn=None) -> List[str]:
-        """Get list of available AEs, optionally filtered by year"""
+        """Get list of available AEs, optionally filtered by year (cached)"""
+        return get_reference_data().get(
+            self.db, ("report.ae_list", year), ("spots",),
+            lambda: self._query_ae_list(year, conn), conn=conn,
+        )
+
+    def _query_ae_list(self, year: Optional[int] = None, conn=None) -> List[str]:
         query = """
             SELECT MIN(TRIM(sales_person)) AS ae_display
             FROM spots
@@ -1451,7 +1465,13 @@ class ReportDataService:
         )
 
     def _get_revenue_types(self, year: int = None, conn=None) -> List[str]:
-        """Get available revenue types, optionally filtered by year"""
+        """Get available revenue types, optionally filtered by year (cached)"""
+        return get_reference_data().get(
+            self.repository.db, ("report.revenue_types", year), ("spots",),
+            lambda: self._query_revenue_types(year, conn), conn=conn,
+        )
+
+    def _query_revenue_types(self, year: int = None, conn=None) -> List[str]:
         query = """
             SELECT DISTINCT COALESCE(revenue_type, 'Regular') AS revenue_type
             FROM spots
@@ -1,6 +1,13 @@
 """Service for revenue classification (regular/irregular) analysis."""
 
+import json
+
 from src.services.base_service import BaseService
+from src.services.spot_catalog import (
+    REVENUE_TABLE,
+    available_years,
+    catalog_exists,
+)
 
 MONTH_ABBREVS = [
     "Jan", "Feb", "Mar", "Apr", "May", "Jun",
@@ -16,13 +23,46 @@ def _bm_values(year):
     return [f"{m}-{yy}" for m in MONTH_ABBREVS]
 
 
-def _bm_placeholders(year, prefix):
-    """Return (sql_fragment, params_dict) for broadcast_month IN clause."""
-    values = _bm_values(year)
-    keys = [f"{prefix}_{i}" for i in range(12)]
-    sql = ", ".join(f":{k}" for k in keys)
-    params = dict(zip(keys, values))
-    return f"s.broadcast_month IN ({sql})", params
+def _revenue_rows(conn):
+    """SQL for (broadcast_month, customer_id, cents) rows of resolved,
+    non-Trade spots in the broadcast months of :months (a JSON list).
+
+    Reads customer_month_revenue (migration 043) when it exists, so a
+    year is at most twelve rows per customer; otherwise aggregates spots.
+    """
+    in_months = "broadcast_month IN (SELECT value FROM json_each(:months))"
+    if catalog_exists(conn):
+        return f"""
+            SELECT broadcast_month, customer_id, gross_cents AS cents
+            FROM {REVENUE_TABLE}
+            WHERE {in_months}
+        """
+    return f"""
+        SELECT s.broadcast_month, s.customer_id,
+               SUM(CAST(ROUND(COALESCE(s.gross_rate, 0) * 100) AS INTEGER))
+                   AS cents
+        FROM spots s
+        WHERE s.customer_id IS NOT NULL
+          AND {TRADE_FILTER}
+          AND s.{in_months}
+        GROUP BY s.broadcast_month, s.customer_id
+    """
+
+
+def _customer_filters(filters, params):
+    """WHERE clauses on customers c for the page's filter keys."""
+    clauses = []
+    if filters.get("sector_id"):
+        clauses.append("c.sector_id = :sector_id")
+        params["sector_id"] = filters["sector_id"]
+    if filters.get("ae"):
+        clauses.append("c.assigned_ae = :ae")
+        params["ae"] = filters["ae"]
+    if filters.get("classification"):
+        clauses.append("c.revenue_class = :classification")
+        params["classification"] = filters["classification"]
+    return clauses
+
 
 VALID_CLASSES = ("regular", "irregular", "political")
 
@@ -73,33 +113,16 @@ class RevenueClassificationService(BaseService):
             unclassified_count, monthly list, available_years list.
         """
         filters = filters or {}
-        bm_sql, bm_params = _bm_placeholders(year, "bm")
-        where_clauses = [
-            "s.customer_id IS NOT NULL",
-            TRADE_FILTER,
-            bm_sql,
-        ]
-        params = {**bm_params}
-
-        if filters.get("sector_id"):
-            where_clauses.append("c.sector_id = :sector_id")
-            params["sector_id"] = filters["sector_id"]
-        if filters.get("ae"):
-            where_clauses.append("c.assigned_ae = :ae")
-            params["ae"] = filters["ae"]
-        if filters.get("classification"):
-            where_clauses.append("c.revenue_class = :classification")
-            params["classification"] = filters["classification"]
-
-        where = " AND ".join(where_clauses)
+        params = {"months": json.dumps(_bm_values(year))}
+        where = " AND ".join(_customer_filters(filters, params)) or "1"
 
         rows = conn.execute(f"""
             SELECT
-                SUBSTR(s.broadcast_month, 1, 3) AS month_abbr,
+                SUBSTR(r.broadcast_month, 1, 3) AS month_abbr,
                 c.revenue_class,
-                SUM(s.gross_rate) AS total
-            FROM spots s
-            JOIN customers c ON s.customer_id = c.customer_id
+                SUM(r.cents) / 100.0 AS total
+            FROM ({_revenue_rows(conn)}) r
+            JOIN customers c ON r.customer_id = c.customer_id
             WHERE {where}
             GROUP BY month_abbr, c.revenue_class
         """, params).fetchall()
@@ -143,13 +166,6 @@ class RevenueClassificationService(BaseService):
             "WHERE is_active = 1 AND revenue_class IS NULL"
         ).fetchone()["cnt"]
 
-        year_rows = conn.execute(
-            "SELECT DISTINCT SUBSTR(broadcast_month, 5, 2) AS yy "
-            "FROM spots WHERE customer_id IS NOT NULL "
-            "ORDER BY yy"
-        ).fetchall()
-        available_years = [2000 + int(r["yy"]) for r in year_rows]
-
         sectors = self.get_sectors(conn)
 
         return {
@@ -159,7 +175,7 @@ class RevenueClassificationService(BaseService):
             "regular_pct": round(regular_pct, 1),
             "unclassified_count": unclassified,
             "monthly": monthly,
-            "available_years": available_years,
+            "available_years": available_years(conn),
             "sectors": sectors,
         }
 
@@ -177,26 +193,13 @@ class RevenueClassificationService(BaseService):
             prior_year_revenue, yoy_dollar, yoy_pct.
         """
         filters = filters or {}
-        cy_sql, cy_params = _bm_placeholders(year, "cy")
-        py_sql, py_params = _bm_placeholders(year - 1, "py")
-        cust_where = ["c.is_active = 1"]
-        params = {**cy_params, **py_params}
-
-        if filters.get("sector_id"):
-            cust_where.append("c.sector_id = :sector_id")
-            params["sector_id"] = filters["sector_id"]
-        if filters.get("ae"):
-            cust_where.append("c.assigned_ae = :ae")
-            params["ae"] = filters["ae"]
-        if filters.get("classification"):
-            cust_where.append("c.revenue_class = :classification")
-            params["classification"] = filters["classification"]
-
-        cust_filter = " AND ".join(cust_where)
-
-        spot_filter = (
-            "s.customer_id IS NOT NULL AND "
-            f"{TRADE_FILTER}"
+        params = {
+            "months": json.dumps(_bm_values(year - 1) + _bm_values(year)),
+            "cy": str(year)[-2:],
+            "py": str(year - 1)[-2:],
+        }
+        cust_filter = " AND ".join(
+            ["c.is_active = 1"] + _customer_filters(filters, params)
         )
 
         rows = conn.execute(f"""
@@ -208,24 +211,20 @@ class RevenueClassificationService(BaseService):
                 COALESCE(sec.sector_name, '') AS sector_name,
                 COALESCE(c.revenue_class, 'regular') AS revenue_class,
                 COALESCE(c.assigned_ae, '') AS assigned_ae,
-                COALESCE(cy.rev, 0) AS current_year_revenue,
-                COALESCE(py.rev, 0) AS prior_year_revenue
+                COALESCE(rev.cy, 0) AS current_year_revenue,
+                COALESCE(rev.py, 0) AS prior_year_revenue
             FROM customers c
             LEFT JOIN sectors sec ON c.sector_id = sec.sector_id
             LEFT JOIN (
-                SELECT s.customer_id, SUM(s.gross_rate) AS rev
-                FROM spots s
-                WHERE {spot_filter}
-                  AND {cy_sql}
-                GROUP BY s.customer_id
-            ) cy ON c.customer_id = cy.customer_id
-            LEFT JOIN (
-                SELECT s.customer_id, SUM(s.gross_rate) AS rev
-                FROM spots s
-                WHERE {spot_filter}
-                  AND {py_sql}
-                GROUP BY s.customer_id
-            ) py ON c.customer_id = py.customer_id
+                SELECT
+                    r.customer_id,
+                    SUM(CASE WHEN SUBSTR(r.broadcast_month, -2) = :cy
+                        THEN r.cents ELSE 0 END) / 100.0 AS cy,
+                    SUM(CASE WHEN SUBSTR(r.broadcast_month, -2) = :py
+                        THEN r.cents ELSE 0 END) / 100.0 AS py
+                FROM ({_revenue_rows(conn)}) r
+                GROUP BY r.customer_id
+            ) rev ON c.customer_id = rev.customer_id
             WHERE {cust_filter}
             ORDER BY current_year_revenue DESC
         """, params).fetchall()
@@ -11,6 +11,13 @@ from src.services.base_service import BaseService
 
 logger = logging.getLogger(__name__)
 
+# filter_config keys the address book saves; each is also the name of the
+# /api/address-book query parameter it stands for
+QUERY_KEYS = (
+    "search", "type", "market", "ae", "sector_id",
+    "has_contacts", "signal", "sort",
+)
+
 
 class SavedFilterService(BaseService):
     """Manages saved filter presets for the address book."""
@@ -42,6 +49,39 @@ class SavedFilterService(BaseService):
             result.append(d)
         return result
 
+    def get_filter(self, conn, filter_id):
+        """Get one saved filter with parsed filter_config, or None."""
+        row = conn.execute("""
+            SELECT filter_id, filter_name, filter_config,
+                   created_by, created_date, is_shared
+            FROM saved_filters
+            WHERE filter_id = ?
+        """, [filter_id]).fetchone()
+        if row is None:
+            return None
+        d = dict(row)
+        d["filter_config"] = (
+            json.loads(d["filter_config"])
+            if d["filter_config"]
+            else {}
+        )
+        return d
+
+    @staticmethod
+    def query_params(config):
+        """Map a filter_config to address book query parameters.
+
+        Blank and "all" values are dropped, as the page treats them as
+        no filter.
+        """
+        params = {}
+        for key in QUERY_KEYS:
+            value = config.get(key)
+            if value is None or str(value).strip() in ("", "all"):
+                continue
+            params[key] = str(value).strip()
+        return params
+
     def save_filter(
         self, conn, name, config, created_by, is_shared=False,
     ):
@@ -241,7 +241,7 @@ class SheetExportService:
                 END,
                 SUBSTR(a.broadcast_month_raw, 5, 2)
         """
-        with self._db.connection() as conn:
+        with self._db.connection_ro(replica=True) as conn:
             cursor = conn.execute(sql)
             out: List[Dict[str, Any]] = []
             for r in cursor.fetchall():
@@ -4,6 +4,8 @@ Tracks the lifecycle of entity signals as work items that AEs
 must acknowledge, snooze, or dismiss.
 """
 
+import json
+
 from src.services.base_service import BaseService
 
 
@@ -177,7 +179,7 @@ class SignalActionService(BaseService):
               AND status = 'new'
         """, [updated_by, entity_type, entity_id])
 
-    def sync_from_signals(self, conn, before_snapshot, ae_lookup):
+    def sync_from_signals(self, conn, before_snapshot, ae_lookup, scope=None):
         """Sync signal_actions with current entity_signals state.
 
         Called after refresh_signals() completes. Uses a diff between
@@ -190,6 +192,10 @@ class SignalActionService(BaseService):
                 tuples captured before refresh_signals ran.
             ae_lookup: Dict mapping (entity_type, entity_id) to
                 assigned_ae string.
+            scope: Optional dict mapping entity_type to the entity ids
+                that were recomputed (refresh_signals_for_ids). Only
+                their signals are diffed; before_snapshot must cover the
+                same entities.
         """
         # Step 1: Revert expired snoozes globally
         conn.execute("""
@@ -200,10 +206,22 @@ class SignalActionService(BaseService):
         """)
 
         # Step 2: Get current signals
-        current_rows = conn.execute("""
-            SELECT entity_type, entity_id, signal_type
-            FROM entity_signals
-        """).fetchall()
+        if scope is None:
+            current_rows = conn.execute("""
+                SELECT entity_type, entity_id, signal_type
+                FROM entity_signals
+            """).fetchall()
+        else:
+            current_rows = []
+            for entity_type, ids in scope.items():
+                if not ids:
+                    continue
+                current_rows += conn.execute("""
+                    SELECT entity_type, entity_id, signal_type
+                    FROM entity_signals
+                    WHERE entity_type = ?
+                      AND entity_id IN (SELECT value FROM json_each(?))
+                """, [entity_type, json.dumps(sorted(ids))]).fetchall()
         current_signals = {
             (r["entity_type"], r["entity_id"], r["signal_type"])
             for r in current_rows
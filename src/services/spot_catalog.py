@@ -0,0 +1,123 @@
+"""Spot catalog and per-customer monthly revenue (migration 043).
+
+Year pickers and AE dropdowns ran SELECT DISTINCT over every spot, and
+the Revenue Classification Manager re-aggregated a year of spots on each
+request. Two small tables answer those instead:
+
+    spot_catalog            (broadcast_month, sales_person) -> spots
+    customer_month_revenue  (broadcast_month, customer_id)  -> non-Trade
+                            gross cents and spots
+
+Imports keep them current a broadcast month at a time:
+
+    refresh_spot_catalog(conn, months)    # in the import transaction
+
+and a trigger moves revenue when spots change customer outside an
+import. Without the migration every reader falls back to the query
+over spots it replaced, and refreshing is a no-op.
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLE = "spot_catalog"
+REVENUE_TABLE = "customer_month_revenue"
+
+_YEAR = "CAST('20' || SUBSTR(broadcast_month, -2) AS INTEGER)"
+_CENTS = "CAST(ROUND(COALESCE(gross_rate, 0) * 100) AS INTEGER)"
+
+
+def catalog_exists(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type = 'table' AND name = ?",
+        [CATALOG_TABLE],
+    ).fetchone()
+    return row is not None
+
+
+def refresh_spot_catalog(
+    conn: sqlite3.Connection, broadcast_months: Iterable[str]
+) -> Dict[str, Any]:
+    """Recompute both tables for broadcast_months ("Jan-25").
+
+    Runs inside the caller's transaction, after the months' spots have
+    been written. A missing table (before migration 043) is ignored.
+    """
+    months = sorted(set(broadcast_months or ()))
+    if not months or not catalog_exists(conn):
+        return {"months": 0}
+
+    params = [json.dumps(months)]
+    in_months = "broadcast_month IN (SELECT value FROM json_each(?))"
+    conn.execute(f"DELETE FROM {CATALOG_TABLE} WHERE {in_months}", params)
+    conn.execute(f"""
+        INSERT INTO {CATALOG_TABLE} (broadcast_month, sales_person, spot_count)
+        SELECT broadcast_month, COALESCE(sales_person, ''), COUNT(*)
+        FROM spots
+        WHERE {in_months}
+        GROUP BY broadcast_month, COALESCE(sales_person, '')
+    """, params)
+    conn.execute(f"DELETE FROM {REVENUE_TABLE} WHERE {in_months}", params)
+    rows = conn.execute(f"""
+        INSERT INTO {REVENUE_TABLE}
+            (broadcast_month, customer_id, gross_cents, spot_count)
+        SELECT broadcast_month, customer_id, SUM({_CENTS}), COUNT(*)
+        FROM spots
+        WHERE {in_months}
+          AND customer_id IS NOT NULL
+          AND (revenue_type != 'Trade' OR revenue_type IS NULL)
+        GROUP BY broadcast_month, customer_id
+    """, params).rowcount
+
+    logger.info(
+        f"Refreshed spot catalog for {len(months)} months "
+        f"({rows} customer-month rows)"
+    )
+    return {"months": len(months), "revenue_rows": rows}
+
+
+def available_years(conn: sqlite3.Connection) -> List[int]:
+    """Years (2025, ...) with spots, ascending."""
+    source = CATALOG_TABLE if catalog_exists(conn) else "spots"
+    return [
+        r[0] for r in conn.execute(f"""
+            SELECT DISTINCT {_YEAR} AS year FROM {source}
+            WHERE broadcast_month IS NOT NULL
+            ORDER BY year
+        """).fetchall()
+    ]
+
+
+def available_months(conn: sqlite3.Connection) -> List[str]:
+    """Broadcast months ("Jan-25") with spots, in calendar order."""
+    source = CATALOG_TABLE if catalog_exists(conn) else "spots"
+    return [
+        r[0] for r in conn.execute(f"""
+            SELECT DISTINCT broadcast_month FROM {source}
+            WHERE broadcast_month IS NOT NULL
+            ORDER BY {_YEAR},
+                     INSTR('JanFebMarAprMayJunJulAugSepOctNovDec',
+                           SUBSTR(broadcast_month, 1, 3))
+        """).fetchall()
+    ]
+
+
+def ae_names(conn: sqlite3.Connection) -> List[str]:
+    """Sales person names on any spot, sorted."""
+    if catalog_exists(conn):
+        sql = (
+            f"SELECT DISTINCT sales_person FROM {CATALOG_TABLE} "
+            "WHERE sales_person != '' ORDER BY sales_person"
+        )
+    else:
+        sql = (
+            "SELECT DISTINCT sales_person FROM spots "
+            "WHERE sales_person IS NOT NULL AND sales_person != '' "
+            "ORDER BY sales_person"
+        )
+    return [r[0] for r in conn.execute(sql).fetchall()]
@@ -18,6 +18,7 @@ from enum import Enum
 import sqlite3
 
 from src.utils.query_builders import BroadcastMonthQueryBuilder
+from src.utils.revenue_cube import CubeCell, RevenueCube
 
 
 # ============================================================================
@@ -80,18 +81,15 @@ class YearRange:
 class BusinessCategory(Enum):
     """Business categories with their rules"""
 
-    INTERNAL_AD_SALES = ("Internal Ad Sales", "revenue_type = 'Internal Ad Sales'")
-    DIRECT_RESPONSE = (
-        "Direct Response Sales",
-        "revenue_type = 'Direct Response Sales'",
-    )
-    PAID_PROGRAMMING = ("Paid Programming", "revenue_type = 'Paid Programming'")
-    BRANDED_CONTENT = ("Branded Content", "revenue_type = 'Branded Content'")
-    OTHER_REVIEW = ("Other/Review Required", "revenue_type = 'Other'")
+    INTERNAL_AD_SALES = ("Internal Ad Sales", "Internal Ad Sales")
+    DIRECT_RESPONSE = ("Direct Response Sales", "Direct Response Sales")
+    PAID_PROGRAMMING = ("Paid Programming", "Paid Programming")
+    BRANDED_CONTENT = ("Branded Content", "Branded Content")
+    OTHER_REVIEW = ("Other/Review Required", "Other")
 
-    def __init__(self, display_name: str, sql_condition: str):
+    def __init__(self, display_name: str, revenue_type: str):
         self.display_name = display_name
-        self.sql_condition = sql_condition
+        self.revenue_type = revenue_type
 
 
 class LanguageGroup(Enum):
@@ -142,123 +140,81 @@ class QueryBuilder:
 
 
 class SpotRepository:
-    """Repository for spot-related data access"""
+    """Repository for spot-related data access.
+
+    Every total comes from one RevenueCube, read on first use, so a
+    report scans spots once whatever the year range or category count.
+    """
 
     def __init__(self, db: DatabaseConnection):
         self.db = db
         self.query_builder = QueryBuilder()
+        self._cube: Optional[RevenueCube] = None
+
+    def _cells(self, year_range: YearRange, **filters) -> List[CubeCell]:
+        """Priced, non-Trade cells in the year range (the base filter)."""
+        if self._cube is None:
+            self._cube = RevenueCube.from_connection(self.db)
+        return self._cube.select(year_range.suffixes, priced=True, **filters)
 
     def get_base_totals(self, year_range: YearRange) -> Dict[str, Any]:
         """Get base totals for the specified year range"""
-        year_filter, params = self.query_builder.build_year_filter(year_range.suffixes)
-        base_where = self.query_builder.get_base_where_clause(year_filter)
-
-        query = f"""
-        SELECT 
-            SUM(COALESCE(s.gross_rate, 0)) AS revenue,
-            COUNT(CASE WHEN s.spot_type IS NULL OR s.spot_type <> 'BNS' THEN 1 END) AS paid_spots,
-            COUNT(CASE WHEN s.spot_type = 'BNS' THEN 1 END) AS bonus_spots,
-            COUNT(*) AS total_spots
-        FROM spots s
-        {base_where}
-        """
-
-        cursor = self.db.cursor()
-        cursor.execute(query, params)
-        row = cursor.fetchone()
+        totals = RevenueCube.totals(self._cells(year_range))
 
         return {
-            "revenue": float(row["revenue"] or 0),
-            "paid_spots": int(row["paid_spots"] or 0),
-            "bonus_spots": int(row["bonus_spots"] or 0),
-            "total_spots": int(row["total_spots"] or 0),
+            "revenue": float(totals["revenue"]),
+            "paid_spots": totals["paid_spots"],
+            "bonus_spots": totals["bonus_spots"],
+            "total_spots": totals["total_spots"],
         }
 
     def get_category_data(
         self, category: BusinessCategory, year_range: YearRange
     ) -> AnalysisResult:
         """Get data for a specific business category"""
-        year_filter, params = self.query_builder.build_year_filter(year_range.suffixes)
-        base_where = self.query_builder.get_base_where_clause(year_filter)
-
-        query = f"""
-        SELECT 
-            SUM(COALESCE(s.gross_rate, 0)) AS revenue,
-            COUNT(CASE WHEN s.spot_type IS NULL OR s.spot_type <> 'BNS' THEN 1 END) AS paid_spots,
-            COUNT(CASE WHEN s.spot_type = 'BNS' THEN 1 END) AS bonus_spots,
-            COUNT(*) AS total_spots
-        FROM spots s
-        {base_where}
-        AND {category.sql_condition}
-        """
-
-        cursor = self.db.cursor()
-        cursor.execute(query, params)
-        row = cursor.fetchone()
+        totals = RevenueCube.totals(
+            self._cells(year_range, revenue_type=category.revenue_type)
+        )
 
-        revenue = float(row["revenue"] or 0)
-        total_spots = int(row["total_spots"] or 0)
+        revenue = float(totals["revenue"])
+        total_spots = totals["total_spots"]
 
         return AnalysisResult(
             name=category.display_name,
             revenue=revenue,
-            paid_spots=int(row["paid_spots"] or 0),
-            bonus_spots=int(row["bonus_spots"] or 0),
+            paid_spots=totals["paid_spots"],
+            bonus_spots=totals["bonus_spots"],
             total_spots=total_spots,
             avg_per_spot=revenue / total_spots if total_spots else 0,
         )
 
     def get_language_data(self, year_range: YearRange) -> List[AnalysisResult]:
         """Get language analysis data for Internal Ad Sales spots"""
-        year_filter, params = self.query_builder.build_year_filter(year_range.suffixes)
-
-        # Build language case statement
-        language_cases = []
-        for lang_group in LanguageGroup:
-            names_condition = " OR ".join(
-                [f"l.language_name = '{name}'" for name in lang_group.language_names]
-            )
-            language_cases.append(
-                f"WHEN ({names_condition}) THEN '{lang_group.display_name}'"
-            )
-
-        language_case_sql = (
-            "CASE " + " ".join(language_cases) + " ELSE 'Other: Undetermined' END"
+        groups_by_name = {
+            name: lang_group.display_name
+            for lang_group in LanguageGroup
+            for name in lang_group.language_names
+        }
+        groups = RevenueCube.group(
+            self._cells(
+                year_range, revenue_type="Internal Ad Sales", assigned=True
+            ),
+            lambda c: groups_by_name.get(
+                c.assigned_language, "Other: Undetermined"
+            ),
         )
 
-        query = f"""
-        SELECT 
-            {language_case_sql} AS language,
-            SUM(COALESCE(s.gross_rate,0)) AS revenue,
-            COUNT(CASE WHEN s.spot_type IS NULL OR s.spot_type <> 'BNS' THEN 1 END) AS paid_spots,
-            COUNT(CASE WHEN s.spot_type = 'BNS' THEN 1 END) AS bonus_spots,
-            COUNT(*) AS total_spots
-        FROM spots s
-        JOIN spot_language_assignments sla ON s.spot_id = sla.spot_id
-        LEFT JOIN languages l ON UPPER(sla.language_code) = UPPER(l.language_code)
-        WHERE {year_filter}
-        AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
-        AND (s.gross_rate IS NOT NULL OR s.station_net IS NOT NULL OR s.spot_type = 'BNS')
-        AND s.revenue_type = 'Internal Ad Sales'
-        GROUP BY 1
-        HAVING SUM(COALESCE(s.gross_rate,0)) > 0 OR COUNT(*) > 0
-        ORDER BY revenue DESC
-        """
-
-        cursor = self.db.cursor()
-        cursor.execute(query, params)
-
         results = []
-        for row in cursor.fetchall():
-            revenue = float(row["revenue"] or 0)
-            total_spots = int(row["total_spots"] or 0)
+        for language, totals in groups.items():
+            revenue = float(totals["revenue"])
+            total_spots = totals["total_spots"]
 
             results.append(
                 AnalysisResult(
-                    name=row["language"],
+                    name=language,
                     revenue=revenue,
-                    paid_spots=int(row["paid_spots"] or 0),
-                    bonus_spots=int(row["bonus_spots"] or 0),
+                    paid_spots=totals["paid_spots"],
+                    bonus_spots=totals["bonus_spots"],
                     total_spots=total_spots,
                     avg_per_spot=revenue / total_spots if total_spots else 0,
                 )
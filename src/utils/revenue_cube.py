@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Revenue Cube for the market and language reports
+
+The market analysis page, its CSV export and the market/unified analysis
+CLIs all slice the same non-Trade spots by year, market, language,
+revenue type and spot type. Each slice used to be its own full scan of
+spots. RevenueCube reads spots once, grouped by every dimension those
+reports filter or group on, and answers each report from the grouped
+cells in Python:
+
+    cube = RevenueCube.from_connection(conn)
+    cells = cube.select(["24"], revenue_type="Internal Ad Sales",
+                        spot_types=("COM", "BNS"))
+    by_language = cube.group(cells, lambda c: cube.language_group(
+        c.language_code))
+
+Cells keep raw market names and language codes, so the grouped views
+(market CHI/CMP/MSP -> CMP, code -> language group) and the raw code
+distribution come from the same pass. The cube is a plain value:
+callers that serve requests cache it until the next import (see
+MarketAnalysisService).
+"""
+
+import sqlite3
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional,
+    Sequence, Tuple,
+)
+
+from .language_constants import LanguageConstants
+
+INTERNAL_AD_SALES = "Internal Ad Sales"
+REPORT_SPOT_TYPES = ("COM", "BNS")
+COMBINED_MARKETS = ("CHI", "CMP", "MSP")
+
+
+class CubeCell(NamedTuple):
+    """Totals for one combination of dimensions."""
+
+    year: str                   # broadcast_month suffix, e.g. "-24"
+    market_name: Optional[str]
+    language_code: Optional[str]  # UPPER(TRIM(spots.language_code))
+    # languages.language_name via spot_language_assignments: None
+    # without an assignment, "" when the code has no languages row
+    assigned_language: Optional[str]
+    revenue_type: Optional[str]
+    spot_type: Optional[str]
+    priced: int                 # has a rate, or is a bonus spot
+    revenue: float
+    spots: int
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (name,),
+    )
+    return cursor.fetchone() is not None
+
+
+def load_cells(conn: sqlite3.Connection) -> Tuple[Tuple[Any, ...], ...]:
+    """Group every non-Trade spot with a broadcast month in one scan.
+
+    Returns plain tuples in CubeCell field order, so the result can be
+    cached and copied cheaply.
+    """
+    if (_table_exists(conn, "spot_language_assignments")
+            and _table_exists(conn, "languages")):
+        assigned = (
+            "CASE WHEN sla.spot_id IS NULL THEN NULL "
+            "ELSE COALESCE(l.language_name, '') END"
+        )
+        joins = """
+            LEFT JOIN spot_language_assignments sla
+                ON sla.spot_id = s.spot_id
+            LEFT JOIN languages l
+                ON UPPER(sla.language_code) = UPPER(l.language_code)
+        """
+    else:
+        assigned, joins = "NULL", ""
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT
+            SUBSTR(s.broadcast_month, -3),
+            s.market_name,
+            UPPER(TRIM(s.language_code)),
+            {assigned},
+            s.revenue_type,
+            s.spot_type,
+            COALESCE(s.gross_rate IS NOT NULL
+                     OR s.station_net IS NOT NULL
+                     OR s.spot_type = 'BNS', 0),
+            SUM(COALESCE(s.gross_rate, 0)),
+            COUNT(*)
+        FROM spots s NOT INDEXED  -- a full scan beats index lookups here
+        {joins}
+        WHERE s.broadcast_month IS NOT NULL
+          AND (s.revenue_type != 'Trade' OR s.revenue_type IS NULL)
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """)
+    return tuple(tuple(row) for row in cursor.fetchall())
+
+
+class RevenueCube:
+    """Grouped spot totals, sliced in memory."""
+
+    def __init__(self, cells: Iterable[Sequence[Any]]):
+        self.cells = [CubeCell(*cell) for cell in cells]
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> "RevenueCube":
+        return cls(load_cells(conn))
+
+    @staticmethod
+    def market_group(market_name: Optional[str]) -> str:
+        """CHI, CMP and MSP report as one CMP market."""
+        market = market_name if market_name is not None else "Unknown"
+        return "CMP" if market.upper() in COMBINED_MARKETS else market
+
+    @staticmethod
+    def language_group(language_code: Optional[str]) -> str:
+        """Group for an upper-cased, trimmed code; "Other" if unmapped."""
+        return LanguageConstants.LANGUAGE_GROUPS.get(language_code, "Other")
+
+    def years(self) -> List[str]:
+        """Four-digit years with spots, newest first."""
+        return sorted({"20" + c.year[-2:] for c in self.cells}, reverse=True)
+
+    def select(
+        self,
+        year_suffixes: Sequence[str],
+        revenue_type: Optional[str] = None,
+        spot_types: Optional[Sequence[str]] = None,
+        priced: bool = False,
+        assigned: bool = False,
+    ) -> List[CubeCell]:
+        """Cells in the given years ("24") matching every filter given.
+
+        priced keeps spots with a gross rate or station net, or bonus
+        spots; assigned keeps spots with a language assignment.
+        """
+        years = {f"-{suffix}" for suffix in year_suffixes}
+        return [
+            c for c in self.cells
+            if c.year in years
+            and (revenue_type is None or c.revenue_type == revenue_type)
+            and (spot_types is None or c.spot_type in spot_types)
+            and (not priced or c.priced)
+            and (not assigned or c.assigned_language is not None)
+        ]
+
+    @staticmethod
+    def totals(cells: Iterable[CubeCell]) -> Dict[str, Any]:
+        """revenue, paid_spots, bonus_spots and total_spots over cells."""
+        result = {
+            "revenue": 0, "paid_spots": 0, "bonus_spots": 0,
+            "total_spots": 0,
+        }
+        for c in cells:
+            result["revenue"] += c.revenue
+            if c.spot_type == "BNS":
+                result["bonus_spots"] += c.spots
+            else:
+                result["paid_spots"] += c.spots
+            result["total_spots"] += c.spots
+        return result
+
+    @classmethod
+    def group(
+        cls,
+        cells: Iterable[CubeCell],
+        key: Callable[[CubeCell], Hashable],
+    ) -> Dict[Hashable, Dict[str, Any]]:
+        """totals() per key(cell), sorted by revenue descending."""
+        buckets: Dict[Hashable, List[CubeCell]] = {}
+        for c in cells:
+            buckets.setdefault(key(c), []).append(c)
+        grouped = {k: cls.totals(v) for k, v in buckets.items()}
+        return dict(
+            sorted(grouped.items(), key=lambda kv: kv[1]["revenue"],
+                   reverse=True)
+        )
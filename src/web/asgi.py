@@ -13,5 +13,13 @@ ENV = os.getenv("ENVIRONMENT") or os.getenv("FLASK_ENV") or "production"
 # Create the Flask app (WSGI)
 flask_app = create_app(ENV)
 
+# Background job worker (entity cache refreshes queued by imports and
+# page loads). JOB_WORKER=off when jobs are run by a separate process.
+if os.getenv("JOB_WORKER", "thread").lower() != "off":
+    from src.services.background_jobs import JobWorker
+    from src.services.container import get_container
+
+    job_worker = JobWorker(get_container().get("database_connection")).start()
+
 # Wrap into ASGI for Uvicorn
 app = WSGIMiddleware(flask_app)
@@ -560,6 +560,7 @@ def get_blueprint_info() -> Dict[str, Any]:
                     "/health/consistency/repair - Data consistency repair",
                     "/health/emergency/repair - Emergency system repair",
                     "/health/metrics - System performance metrics",
+                    "/health/jobs - Background job queue status",
                 ],
             },
         ],
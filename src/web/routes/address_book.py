@@ -4,10 +4,19 @@ All business logic lives in services. Route handlers parse HTTP
 requests, call the appropriate service, and format responses.
 """
 
-from flask import Blueprint, render_template, jsonify, request, Response
+from flask import (
+    Blueprint, render_template, jsonify, request, Response, stream_with_context,
+)
 from flask_login import current_user
 
 from src.services.container import get_container
+from src.services.entity_directory import (
+    directory_tags_exist,
+    filter_entities,
+    query_directory,
+)
+from src.services.entity_search import search_entities, search_index_exists
+from src.services.reference_data import get_reference_data
 
 address_book_bp = Blueprint("address_book", __name__)
 
@@ -76,9 +85,26 @@ def api_ae_list():
 # Entity list and detail
 # ------------------------------------------------------------------
 
+# Query parameters that switch /api/address-book to server-side filtering
+_QUERY_ARGS = (
+    "search", "type", "market", "ae", "sector_id", "has_contacts",
+    "signal", "sort", "fields", "limit", "cursor", "filter_id",
+    "hide_agency_booked",
+)
+_MAX_PAGE_SIZE = 1000
+
+
 @address_book_bp.route("/api/address-book")
 def api_address_book():
-    """Get all entities with contacts, sectors, markets, and metrics."""
+    """Get entities with contacts, sectors, markets, and metrics.
+
+    Without query parameters this returns every entity. With any of
+    _QUERY_ARGS the directory is filtered and sorted server-side:
+    filter_id applies a saved filter (explicit parameters win), fields
+    is a comma-separated projection, and limit pages the result --
+    then the response is {items, next_cursor, total, stats} and
+    next_cursor fetches the following page.
+    """
     include_inactive = request.args.get("include_inactive", "0") == "1"
     entity_svc = _svc("entity_service")
     metrics_svc = _svc("entity_metrics_service")
@@ -87,10 +113,85 @@ def api_address_book():
         metrics_svc.auto_refresh_if_empty(rw_conn)
         rw_conn.commit()
 
+    if not any(arg in request.args for arg in _QUERY_ARGS):
+        with _db().connection_ro() as conn:
+            return jsonify(
+                entity_svc.list_entities(conn, include_inactive)
+            )
+
+    args = {}
     with _db().connection_ro() as conn:
-        return jsonify(
-            entity_svc.list_entities(conn, include_inactive)
+        filter_id = request.args.get("filter_id", type=int)
+        if filter_id is not None:
+            filter_svc = _svc("saved_filter_service")
+            saved = filter_svc.get_filter(conn, filter_id)
+            if saved is None:
+                return jsonify({"error": "Saved filter not found"}), 404
+            args.update(filter_svc.query_params(saved["filter_config"]))
+        args.update(
+            (k, v) for k, v in request.args.items() if k in _QUERY_ARGS
+        )
+
+        limit = None
+        if args.get("limit"):
+            try:
+                limit = min(max(int(args["limit"]), 1), _MAX_PAGE_SIZE)
+            except ValueError:
+                return jsonify({"error": "limit must be an integer"}), 400
+        fields = [
+            f.strip() for f in (args.get("fields") or "").split(",")
+            if f.strip()
+        ]
+        query = dict(
+            search=args.get("search"),
+            entity_type=args.get("type"),
+            sector_id=args.get("sector_id") or None,
+            market=args.get("market") or None,
+            ae=args.get("ae") or None,
+            has_contacts=args.get("has_contacts"),
+            signal=args.get("signal") or None,
+            hide_agency_booked=args.get("hide_agency_booked") == "1",
+            sort=args.get("sort") or "name",
+            fields=fields or None,
+            limit=limit,
+            cursor=args.get("cursor") or None,
         )
+        try:
+            if directory_tags_exist(conn):
+                result = query_directory(
+                    conn, include_inactive=include_inactive, **query
+                )
+            else:
+                # Before migration 037: filter the full list in Python
+                result = filter_entities(
+                    entity_svc.list_entities(conn, include_inactive),
+                    **query,
+                )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    if limit is None:
+        return jsonify(result["items"])
+    return jsonify(result)
+
+
+@address_book_bp.route("/api/address-book/search")
+def api_search_entities():
+    """Ranked typeahead over names, aliases, contacts, addresses, notes."""
+    q = request.args.get("q", "").strip()
+    entity_type = request.args.get("type")
+    include_inactive = request.args.get("include_inactive", "0") == "1"
+    limit = min(request.args.get("limit", 20, type=int), 100)
+    if len(q) < 2:
+        return jsonify([])
+
+    with _db().connection_ro() as conn:
+        if not search_index_exists(conn):
+            return jsonify({"error": "Search index not available"}), 503
+        return jsonify(search_entities(
+            conn, q, entity_type=entity_type,
+            include_inactive=include_inactive, limit=limit,
+        ))
 
 
 @address_book_bp.route(
@@ -133,6 +234,7 @@ def api_create_entity():
             if result.get("needs_confirmation"):
                 return jsonify(result), 200
             conn.commit()
+            get_reference_data().invalidate(_db(), "ae_assignments")
             return jsonify(result), 201
         except Exception as e:
             conn.rollback()
@@ -469,6 +571,7 @@ def api_update_ae(entity_type, entity_id):
                 status = result.pop("status", 404)
                 return jsonify(result), status
             conn.commit()
+            get_reference_data().invalidate(_db(), "ae_assignments")
             return jsonify(result)
         except Exception as e:
             conn.rollback()
@@ -645,18 +748,19 @@ def api_export_csv():
     metrics_svc = _svc("entity_metrics_service")
     export_svc = _svc("export_service")
 
-    with _db().connection() as rw_conn:
+    db = _db()
+
+    with db.connection() as rw_conn:
         metrics_svc.auto_refresh_if_empty(rw_conn)
         rw_conn.commit()
 
-    with _db().connection_ro() as conn:
-        metrics_map = metrics_svc.get_metrics_map(conn)
-        csv_content = export_svc.export_entities_csv(
-            conn, filters, metrics_map,
-        )
+    def generate():
+        # The connection stays open while the response streams
+        with db.connection_ro() as conn:
+            yield from export_svc.export_entities_csv(conn, filters)
 
     return Response(
-        csv_content,
+        stream_with_context(generate()),
         mimetype="text/csv",
         headers={
             "Content-Disposition":
@@ -12,6 +12,10 @@ from dataclasses import dataclass
 from typing import Optional
 from flask import Blueprint, current_app, request, jsonify
 
+from src.database.connection import DatabaseConnection
+from src.services.entity_metrics_service import EntityMetricsService
+from src.services.entity_search import search_entities, search_index_exists
+
 canon_bp = Blueprint("canon", __name__, url_prefix="/api/canon")
 
 
@@ -141,7 +145,21 @@ def _upsert_entity_alias(
     )
 
 
+def _clean_table_exists(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master "
+        "WHERE type='table' AND name='raw_customer_clean';"
+    ).fetchone() is not None
+
+
 def _preview_agency_hits(conn: sqlite3.Connection, alias_: str) -> int:
+    if _clean_table_exists(conn):
+        # Agency segments as v_normalized_candidates splits them (041)
+        q = """
+        SELECT COUNT(*) FROM raw_customer_clean
+        WHERE agency1 = ? COLLATE NOCASE OR agency2 = ? COLLATE NOCASE;
+        """
+        return conn.execute(q, (alias_, alias_)).fetchone()[0]
     q = """
     WITH v AS (SELECT cleaned FROM v_raw_clean)
     SELECT COUNT(*) FROM v
@@ -152,6 +170,12 @@ def _preview_agency_hits(conn: sqlite3.Connection, alias_: str) -> int:
 
 
 def _preview_customer_hits(conn: sqlite3.Connection, alias_: str) -> int:
+    if _clean_table_exists(conn):
+        q = """
+        SELECT COUNT(*) FROM raw_customer_clean
+        WHERE customer_tail = ? COLLATE NOCASE;
+        """
+        return conn.execute(q, (alias_,)).fetchone()[0]
     q = """
     WITH base AS (SELECT cleaned FROM v_raw_clean),
     lastseg AS (
@@ -172,6 +196,199 @@ def _preview_customer_hits(conn: sqlite3.Connection, alias_: str) -> int:
     return conn.execute(q, (alias_,)).fetchone()[0]
 
 
+# Customers whose tail (after the first colon) maps, through
+# customer_canonical_map, to the same full name. Spot counts and revenue
+# come from entity_metrics for group members only, and are joined back;
+# the page of groups (by revenue) comes back as one row per member, best
+# survivor first. Every row carries the total group count; an empty page
+# is a single row without a member.
+_DUPLICATE_GROUPS_SQL = """
+WITH customer_tails AS (
+    SELECT
+        customer_id,
+        normalized_name,
+        created_date,
+        CASE
+            WHEN INSTR(normalized_name, ':') > 0 THEN
+                TRIM(SUBSTR(normalized_name, INSTR(normalized_name, ':') + 1))
+            ELSE normalized_name
+        END AS customer_tail,
+        CASE
+            WHEN INSTR(normalized_name, ':') > 0 THEN
+                TRIM(SUBSTR(normalized_name, 1, INSTR(normalized_name, ':') - 1))
+            ELSE ''
+        END AS customer_prefix
+    FROM customers
+),
+normalized_tails AS (
+    SELECT
+        ct.*,
+        CASE
+            WHEN ct.customer_prefix != '' THEN ct.customer_prefix || ':' || COALESCE(ccm.canonical_name, ct.customer_tail)
+            ELSE COALESCE(ccm.canonical_name, ct.customer_tail)
+        END AS canonical_full_name
+    FROM customer_tails ct
+    LEFT JOIN customer_canonical_map ccm ON ct.customer_tail = ccm.alias_name
+),
+members AS (
+    SELECT * FROM (
+        SELECT nt.*,
+               COUNT(*) OVER (PARTITION BY canonical_full_name) AS customer_count
+        FROM normalized_tails nt
+    )
+    WHERE customer_count > 1
+),
+spot_totals AS ({spot_totals}),
+ranked AS (
+    SELECT
+        m.canonical_full_name,
+        m.customer_count,
+        m.customer_id,
+        m.normalized_name,
+        m.created_date,
+        COALESCE(st.spot_count, 0) AS spot_count,
+        COALESCE(st.total_revenue, 0) AS total_revenue,
+        SUM(COALESCE(st.spot_count, 0))
+            OVER (PARTITION BY m.canonical_full_name) AS group_spots,
+        SUM(COALESCE(st.total_revenue, 0))
+            OVER (PARTITION BY m.canonical_full_name) AS group_revenue,
+        ROW_NUMBER() OVER (
+            PARTITION BY m.canonical_full_name
+            ORDER BY COALESCE(st.total_revenue, 0) DESC, m.customer_id
+        ) AS member_rank
+    FROM members m
+    LEFT JOIN spot_totals st ON st.customer_id = m.customer_id
+),
+group_list AS (
+    SELECT canonical_full_name, group_revenue
+    FROM ranked WHERE member_rank = 1
+),
+page AS (
+    SELECT canonical_full_name, group_revenue
+    FROM group_list
+    ORDER BY group_revenue DESC, canonical_full_name
+    LIMIT :limit OFFSET :offset
+)
+SELECT t.total_groups, r.*
+FROM (SELECT COUNT(*) AS total_groups FROM group_list) t
+LEFT JOIN (
+    SELECT r.* FROM page p
+    JOIN ranked r ON r.canonical_full_name = p.canonical_full_name
+) r ON 1
+ORDER BY r.group_revenue DESC, r.canonical_full_name, r.member_rank;
+"""
+
+
+# Per-customer spot count and non-Trade revenue, as the address book
+# shows them: the entity_metrics cache, or (before it is first built)
+# the same aggregate over the members' spots.
+_METRICS_SPOT_TOTALS = """
+    SELECT entity_id AS customer_id, spot_count,
+           COALESCE(total_revenue, 0) AS total_revenue
+    FROM entity_metrics
+    WHERE entity_type = 'customer'
+      AND entity_id IN (SELECT customer_id FROM members)
+"""
+_SPOTS_SPOT_TOTALS = """
+    SELECT customer_id,
+           COUNT(*) AS spot_count,
+           COALESCE(SUM(CASE
+               WHEN revenue_type != 'Trade' OR revenue_type IS NULL
+               THEN gross_rate ELSE 0 END), 0) AS total_revenue
+    FROM spots
+    WHERE customer_id IN (SELECT customer_id FROM members)
+    GROUP BY customer_id
+"""
+
+def _duplicate_customer_groups(
+    conn: sqlite3.Connection,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> tuple[list[dict], int]:
+    """Page of duplicate customer groups, largest revenue first, and the
+    number of groups."""
+    has_metrics = conn.execute(
+        "SELECT 1 FROM sqlite_master"
+        " WHERE type = 'table' AND name = 'entity_metrics'"
+    ).fetchone()
+    sql = _DUPLICATE_GROUPS_SQL.format(
+        spot_totals=_METRICS_SPOT_TOTALS if has_metrics else _SPOTS_SPOT_TOTALS
+    )
+    rows = conn.execute(
+        sql,
+        {"limit": -1 if limit is None else limit, "offset": max(offset, 0)},
+    ).fetchall()
+
+    total = rows[0]["total_groups"] if rows else 0
+    groups: list[dict] = []
+    for row in rows:
+        if row["customer_id"] is None:
+            continue
+        if row["member_rank"] == 1:
+            groups.append(
+                {
+                    "canonical_target": row["canonical_full_name"],
+                    "customer_count": row["customer_count"],
+                    "actual_names": [],
+                    "customers": [],
+                    "suggested_target": row["customer_id"],
+                    "total_revenue": float(row["group_revenue"]),
+                    "total_spots": row["group_spots"],
+                }
+            )
+        group = groups[-1]
+        group["actual_names"].append(row["normalized_name"])
+        group["customers"].append(
+            {
+                "customer_id": row["customer_id"],
+                "normalized_name": row["normalized_name"],
+                "created_date": row["created_date"],
+                "spot_count": row["spot_count"],
+                "total_revenue": float(row["total_revenue"]),
+            }
+        )
+    return groups, total
+
+
+def _consolidation_impact(conn: sqlite3.Connection, source_id: int) -> dict:
+    """Spots, revenue, aliases and monthly breakdown moved by consolidating
+    source_id, from one pass over the customer's spots."""
+    rows = conn.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM entity_aliases
+             WHERE target_entity_id = :source AND entity_type = 'customer')
+                AS alias_count,
+            m.broadcast_month, m.spots, m.revenue
+        FROM (SELECT 1)
+        LEFT JOIN (
+            SELECT broadcast_month,
+                   COUNT(*) AS spots,
+                   COALESCE(SUM(gross_rate), 0) AS revenue
+            FROM spots WHERE customer_id = :source
+            GROUP BY broadcast_month
+        ) m ON 1
+        ORDER BY m.broadcast_month;
+        """,
+        {"source": source_id},
+    ).fetchall()
+
+    months = [r for r in rows if r["spots"] is not None]
+    return {
+        "spots_affected": sum(r["spots"] for r in months),
+        "total_revenue": float(sum(r["revenue"] for r in months)),
+        "aliases_affected": rows[0]["alias_count"],
+        "monthly_breakdown": [
+            {
+                "month": r["broadcast_month"],
+                "spots": r["spots"],
+                "revenue": float(r["revenue"]),
+            }
+            for r in months
+        ],
+    }
+
+
 def _audit(
     conn: sqlite3.Connection,
     actor: str,
@@ -426,11 +643,17 @@ def raw_to_customer():
 
 @canon_bp.get("/suggest/normalized")
 def suggest_normalized():
-    """Return up to 20 normalized_name suggestions containing q."""
+    """Return up to 20 normalized_name suggestions matching q, best first."""
     q = _nfkc(request.args.get("q"))
     if not q:
         return jsonify([])
     with _open_rw(current_app.config["DB_PATH"]) as conn:
+        if search_index_exists(conn):
+            hits = search_entities(
+                conn, q, entity_type="customer", include_inactive=True,
+                limit=20,
+            )
+            return jsonify([h["entity_name"] for h in hits])
         rows = conn.execute(
             "SELECT normalized_name FROM customers WHERE normalized_name LIKE ? ORDER BY normalized_name LIMIT 20;",
             (f"%{q}%",),
@@ -479,29 +702,10 @@ def consolidate_customer():
                 {"success": False, "error": f"Target customer {target_id} not found"}
             ), 404
 
-        # Get consolidation stats
-        spots_count = conn.execute(
-            "SELECT COUNT(*) as cnt FROM spots WHERE customer_id = ?", (source_id,)
-        ).fetchone()["cnt"]
-
-        total_revenue = conn.execute(
-            "SELECT COALESCE(SUM(gross_rate), 0) as total FROM spots WHERE customer_id = ?",
-            (source_id,),
-        ).fetchone()["total"]
-
-        # Check for any entity_aliases that point to source customer
-        alias_count = conn.execute(
-            "SELECT COUNT(*) as cnt FROM entity_aliases WHERE target_entity_id = ? AND entity_type = 'customer'",
-            (source_id,),
-        ).fetchone()["cnt"]
-
-        # Get month breakdown for audit
-        monthly_spots = conn.execute(
-            """SELECT broadcast_month, COUNT(*) as spots, SUM(gross_rate) as revenue 
-               FROM spots WHERE customer_id = ? 
-               GROUP BY broadcast_month ORDER BY broadcast_month""",
-            (source_id,),
-        ).fetchall()
+        impact = _consolidation_impact(conn, source_id)
+        spots_count = impact["spots_affected"]
+        total_revenue = impact["total_revenue"]
+        alias_count = impact["aliases_affected"]
 
         consolidation_summary = {
             "source_customer": {
@@ -512,19 +716,7 @@ def consolidate_customer():
                 "id": target_id,
                 "normalized_name": target_customer["normalized_name"],
             },
-            "impact": {
-                "spots_affected": spots_count,
-                "total_revenue": float(total_revenue),
-                "aliases_affected": alias_count,
-                "monthly_breakdown": [
-                    {
-                        "month": row["broadcast_month"],
-                        "spots": row["spots"],
-                        "revenue": float(row["revenue"]),
-                    }
-                    for row in monthly_spots
-                ],
-            },
+            "impact": impact,
         }
 
         if dry_run:
@@ -579,6 +771,15 @@ def consolidate_customer():
             (target_id, source_id),
         )
 
+        # 5. Rebuild both customers' entity_metrics, which the duplicate
+        # finder reads
+        metrics = EntityMetricsService(
+            DatabaseConnection(current_app.config["DB_PATH"])
+        )
+        metrics.refresh_metrics_for_ids(
+            conn, customer_ids=[source_id, target_id]
+        )
+
         conn.execute("COMMIT;")
 
         # Audit log
@@ -613,124 +814,19 @@ def find_duplicate_customers():
     """
     Find customer records that should be consolidated based on normalization rules.
     Finds customers where multiple actual normalized_names should map to the same target.
+
+    Query params:
+        limit, offset: page of groups, largest revenue first (default: all)
     """
+    limit = request.args.get("limit", type=int)
+    offset = request.args.get("offset", 0, type=int)
     try:
         with _open_rw(current_app.config["DB_PATH"]) as conn:
-            # Strategy: Find customers whose tails (after colon) would normalize to same target
-            # via customer_canonical_map, but exist as separate customer records
-            duplicates_sql = """
-            WITH customer_tails AS (
-                SELECT 
-                    customer_id,
-                    normalized_name,
-                    created_date,
-                    -- Extract tail (part after last colon)
-                    CASE 
-                        WHEN INSTR(normalized_name, ':') > 0 THEN
-                            TRIM(SUBSTR(normalized_name, INSTR(normalized_name, ':') + 1))
-                        ELSE normalized_name
-                    END as customer_tail,
-                    -- Extract prefix (part before colon)  
-                    CASE
-                        WHEN INSTR(normalized_name, ':') > 0 THEN
-                            TRIM(SUBSTR(normalized_name, 1, INSTR(normalized_name, ':') - 1))
-                        ELSE ''
-                    END as customer_prefix
-                FROM customers
-            ),
-            normalized_tails AS (
-                SELECT 
-                    ct.*,
-                    -- Apply canonical mapping to tail
-                    COALESCE(ccm.canonical_name, ct.customer_tail) as canonical_tail,
-                    -- Reconstruct full canonical name
-                    CASE
-                        WHEN ct.customer_prefix != '' THEN ct.customer_prefix || ':' || COALESCE(ccm.canonical_name, ct.customer_tail)
-                        ELSE COALESCE(ccm.canonical_name, ct.customer_tail)  
-                    END as canonical_full_name
-                FROM customer_tails ct
-                LEFT JOIN customer_canonical_map ccm ON ct.customer_tail = ccm.alias_name
-            ),
-            duplicate_groups AS (
-                SELECT 
-                    canonical_full_name,
-                    COUNT(*) as customer_count,
-                    GROUP_CONCAT(customer_id) as customer_ids,
-                    GROUP_CONCAT(normalized_name) as actual_names,
-                    -- Get stats for each group
-                    SUM((SELECT COUNT(*) FROM spots WHERE customer_id = nt.customer_id)) as total_spots,
-                    SUM((SELECT COALESCE(SUM(gross_rate), 0) FROM spots WHERE customer_id = nt.customer_id)) as total_revenue
-                FROM normalized_tails nt
-                GROUP BY canonical_full_name
-                HAVING customer_count > 1
-            )
-            SELECT 
-                dg.*,
-                -- Get the customer with most revenue as suggested target
-                (SELECT customer_id FROM normalized_tails nt2 
-                 WHERE nt2.canonical_full_name = dg.canonical_full_name 
-                 ORDER BY (SELECT COALESCE(SUM(gross_rate), 0) FROM spots WHERE customer_id = nt2.customer_id) DESC 
-                 LIMIT 1) as suggested_target_id
-            FROM duplicate_groups dg
-            ORDER BY total_revenue DESC;
-            """
-
-            rows = conn.execute(duplicates_sql).fetchall()
-
-            duplicates = []
-            for row in rows:
-                # Parse customer IDs and get detailed info for each
-                customer_ids = [int(x.strip()) for x in row["customer_ids"].split(",")]
-                actual_names = row["actual_names"].split(",")
-
-                # Get detailed info for each customer
-                customer_details = []
-                for cid in customer_ids:
-                    cust_info = conn.execute(
-                        """
-                        SELECT 
-                            customer_id, 
-                            normalized_name, 
-                            created_date,
-                            (SELECT COUNT(*) FROM spots WHERE customer_id = ?) as spot_count,
-                            (SELECT COALESCE(SUM(gross_rate), 0) FROM spots WHERE customer_id = ?) as total_revenue
-                        FROM customers WHERE customer_id = ?
-                    """,
-                        (cid, cid, cid),
-                    ).fetchone()
-
-                    if cust_info:
-                        customer_details.append(
-                            {
-                                "customer_id": cust_info["customer_id"],
-                                "normalized_name": cust_info["normalized_name"],
-                                "created_date": cust_info["created_date"],
-                                "spot_count": cust_info["spot_count"],
-                                "total_revenue": float(cust_info["total_revenue"]),
-                            }
-                        )
-
-                # Sort customers by revenue (largest first) to suggest merge direction
-                customer_details.sort(key=lambda x: x["total_revenue"], reverse=True)
-
-                duplicates.append(
-                    {
-                        "canonical_target": row["canonical_full_name"],
-                        "customer_count": row["customer_count"],
-                        "actual_names": actual_names,
-                        "customers": customer_details,
-                        "suggested_target": customer_details[0]["customer_id"]
-                        if customer_details
-                        else None,
-                        "total_revenue": float(row["total_revenue"]),
-                        "total_spots": row["total_spots"],
-                    }
-                )
-
+            duplicates, total = _duplicate_customer_groups(conn, limit, offset)
             return jsonify(
                 {
                     "success": True,
-                    "duplicates_found": len(duplicates),
+                    "duplicates_found": total,
                     "duplicates": duplicates,
                 }
             )
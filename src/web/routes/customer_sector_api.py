@@ -3,6 +3,8 @@
 from flask import Blueprint, request, jsonify
 from flask_login import current_user
 from src.services.container import get_container
+from src.services.entity_directory import sector_customers
+from src.services.reference_data import get_reference_data
 import logging
 from src.utils.query_builders import CustomerNormalizationQueryBuilder
 
@@ -21,99 +23,54 @@ def _require_admin_for_writes():
 
 @customer_sector_bp.route("/customers", methods=["GET"])
 def get_customers():
-    """Get customers - FILTER WORLDLINK CLIENTS VERSION"""
+    """Active customers with revenue, excluding WorldLink broker clients.
+
+    Query params (all optional; the default is every customer by name):
+        search: substring of the customer name
+        sector: sector name, or "unassigned"
+        sort: name | revenue | spots | sector
+        limit, offset: page of results; "total" counts every match
+    """
     try:
         container = get_container()
         db = container.get("database_connection")
-        conn = db.connect()
-        cursor = conn.cursor()
 
-        # Get all active customers, excluding WorldLink broker clients
-        customer_query = """
-        SELECT
-            c.customer_id,
-            c.normalized_name,
-            COALESCE(s.sector_name, 'Unassigned') AS sector,
-            c.updated_date,
-            cs.assigned_by,
-            cs.assigned_date
-        FROM customers c
-        LEFT JOIN sectors s ON c.sector_id = s.sector_id
-        LEFT JOIN customer_sectors cs
-            ON c.customer_id = cs.customer_id AND cs.is_primary = 1
-        WHERE c.is_active = 1
-          AND c.customer_id NOT IN (
-              SELECT DISTINCT target_entity_id
-              FROM entity_aliases
-              WHERE entity_type = 'customer'
-                AND is_active = 1
-                AND (alias_name LIKE 'WorldLink%'
-                  OR alias_name LIKE 'Worldlink%')
-          )
-          AND c.normalized_name NOT LIKE '%WorldLink%'
-          AND c.normalized_name NOT LIKE '%Worldlink%'
-        ORDER BY c.normalized_name
-        """
-
-        cursor.execute(customer_query)
-        customer_rows = cursor.fetchall()
-
-        # Get revenue data directly from spots by customer_id
-        revenue_query = """
-        SELECT
-            customer_id,
-            ROUND(SUM(COALESCE(gross_rate, 0)), 2) AS total_revenue,
-            COUNT(spot_id) AS spot_count
-        FROM spots
-        WHERE customer_id IS NOT NULL
-          AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-        GROUP BY customer_id
-        """
-
-        cursor.execute(revenue_query)
-        revenue_rows = cursor.fetchall()
-
-        # Create revenue lookup dict
-        revenue_lookup = {}
-        for rev_row in revenue_rows:
-            revenue_lookup[rev_row[0]] = {
-                "total_revenue": float(rev_row[1]) if rev_row[1] else 0.0,
-                "spot_count": rev_row[2] if rev_row[2] else 0,
-            }
-
-        # Build final customer list - exclude $0 revenue customers
-        customers = []
-        for row in customer_rows:
-            customer_id = row[0]
-            revenue_data = revenue_lookup.get(
-                customer_id, {"total_revenue": 0.0, "spot_count": 0}
+        with db.connection_ro() as conn:
+            rows, total = sector_customers(
+                conn,
+                search=request.args.get("search", "").strip() or None,
+                sector=request.args.get("sector", "").strip() or None,
+                sort=request.args.get("sort", "name"),
+                limit=request.args.get("limit", type=int),
+                offset=request.args.get("offset", 0, type=int),
             )
 
-            if revenue_data["total_revenue"] <= 0:
-                continue
-
-            assigned_by = row[4] or None
-            assigned_date = str(row[5])[:10] if row[5] else None
-
+        customers = []
+        for row in rows:
+            sector = row["sector_name"]
+            assigned_date = row["sector_assigned_date"]
             customers.append(
                 {
-                    "id": customer_id,
-                    "name": row[1],
-                    "sector": row[2] if row[2] != "Unassigned" else None,
-                    "lastUpdated": str(row[3])[:10] if row[3] else "2025-01-01",
-                    "totalRevenue": revenue_data["total_revenue"],
-                    "spotCount": revenue_data["spot_count"],
-                    "assignedBy": assigned_by,
-                    "assignedDate": assigned_date,
+                    "id": row["entity_id"],
+                    "name": row["entity_name"],
+                    "sector": sector if sector != "Unassigned" else None,
+                    "lastUpdated": (
+                        str(row["updated_date"])[:10]
+                        if row["updated_date"] else "2025-01-01"
+                    ),
+                    "totalRevenue": float(row["total_revenue"]),
+                    "spotCount": row["spot_count"],
+                    "assignedBy": row["sector_assigned_by"] or None,
+                    "assignedDate": (
+                        str(assigned_date)[:10] if assigned_date else None
+                    ),
                     "resolutionStatus": "resolved",
                     "isUnresolved": False,
                 }
             )
 
-        conn.close()
-
         logger.info(f"Fetched {len(customers)} customers (filtered WorldLink clients)")
-        return jsonify({"success": True, "data": customers})
+        return jsonify({"success": True, "data": customers, "total": total})
 
     except Exception as e:
         logger.error(f"Error fetching customers: {e}")
@@ -1277,6 +1234,7 @@ def add_sector():
         conn.commit()
         sector_id = cursor.lastrowid
         conn.close()
+        get_reference_data().invalidate(db, "sectors")
 
         logger.info(f"Successfully created sector '{name}' with ID {sector_id}")
 
@@ -1339,6 +1297,7 @@ def update_sector(sector_id):
 
         conn.commit()
         conn.close()
+        get_reference_data().invalidate(db, "sectors")
 
         return jsonify(
             {
@@ -1381,6 +1340,7 @@ def delete_sector(sector_id):
 
         conn.commit()
         conn.close()
+        get_reference_data().invalidate(db, "sectors")
 
         return jsonify({"success": True, "message": "Sector deleted successfully"})
 
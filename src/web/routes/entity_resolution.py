@@ -73,6 +73,59 @@ def _get_agency_service():
     return AgencyResolutionService(db)
 
 
+def _merge(entity_type: str, service_merge):
+    """Validate a merge, then queue it as a background job (202 + job_id)
+    or, without the job queue, run it inline via service_merge."""
+    from src.services.background_jobs import MERGE_ENTITIES, enqueue_job
+    from src.services.container import get_container
+    from src.services.merge_engine import MergeEngine, MergeError
+
+    data = request.json
+    source_id = data.get("source_id")
+    target_id = data.get("target_id")
+    if not source_id or not target_id:
+        return jsonify({"success": False, "error": "source_id and target_id required"}), 400
+    source_id, target_id = int(source_id), int(target_id)
+
+    db = get_container().get("database_connection")
+    try:
+        plan = MergeEngine(db).plan(entity_type, source_id, target_id)
+    except MergeError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    job_id = enqueue_job(
+        db,
+        MERGE_ENTITIES,
+        job_key=f"merge:{entity_type}:{source_id}:{target_id}",
+        payload={
+            "entity_type": entity_type,
+            "source_id": source_id,
+            "target_id": target_id,
+            "merged_by": current_user.full_name,
+        },
+        created_by=current_user.full_name,
+    )
+    if job_id is None:
+        result = service_merge(
+            source_id=source_id, target_id=target_id, merged_by=current_user.full_name
+        )
+        if not result["success"]:
+            return jsonify(result), 400
+        return jsonify(result)
+
+    return jsonify({
+        "success": True,
+        "queued": True,
+        "job_id": job_id,
+        "status_url": f"/api/merge-jobs/{job_id}",
+        "source_id": source_id,
+        "source_name": plan.source_name,
+        "target_id": target_id,
+        "target_name": plan.target_name,
+        "rows_to_move": len(plan.row_ids),
+    }), 202
+
+
 # ── Page routes ─────────────────────────────────────────────────────────
 
 @entity_resolution_bp.route("/entity-resolution")
@@ -186,17 +239,7 @@ def customer_search():
 
 @entity_resolution_bp.route("/api/customer-aliases/merge", methods=["POST"])
 def customer_merge():
-    data = request.json
-    source_id = data.get("source_id")
-    target_id = data.get("target_id")
-    if not source_id or not target_id:
-        return jsonify({"success": False, "error": "source_id and target_id required"}), 400
-    result = _get_customer_service().merge_customers(
-        source_id=int(source_id), target_id=int(target_id), merged_by=current_user.full_name
-    )
-    if not result["success"]:
-        return jsonify(result), 400
-    return jsonify(result)
+    return _merge("customer", _get_customer_service().merge_customers)
 
 
 @entity_resolution_bp.route("/api/customer-aliases")
@@ -321,17 +364,34 @@ def agency_search():
 
 @entity_resolution_bp.route("/api/agency-aliases/merge", methods=["POST"])
 def agency_merge():
-    data = request.json
-    source_id = data.get("source_id")
-    target_id = data.get("target_id")
-    if not source_id or not target_id:
-        return jsonify({"success": False, "error": "source_id and target_id required"}), 400
-    result = _get_agency_service().merge_agencies(
-        source_id=int(source_id), target_id=int(target_id), merged_by=current_user.full_name
+    return _merge("agency", _get_agency_service().merge_agencies)
+
+
+@entity_resolution_bp.route("/api/merge-jobs/<int:job_id>")
+def merge_job_status(job_id: int):
+    """Status of a queued merge; result holds the merge stats once done."""
+    from src.repositories.background_job_repository import (
+        BackgroundJobRepository,
     )
-    if not result["success"]:
-        return jsonify(result), 400
-    return jsonify(result)
+    from src.services.background_jobs import MERGE_ENTITIES
+    from src.services.container import get_container
+
+    db = get_container().get("database_connection")
+    with db.connection_ro() as conn:
+        job = BackgroundJobRepository().get_job(job_id, conn)
+    if job is None or job.job_type != MERGE_ENTITIES:
+        return jsonify({"error": f"Merge job {job_id} not found"}), 404
+    return jsonify({
+        "job_id": job.job_id,
+        "status": job.status.value,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.last_error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    })
 
 
 @entity_resolution_bp.route("/api/agency-aliases")
@@ -53,6 +53,51 @@ def database_health():
         return jsonify(info), 503
 
 
+@health_bp.route("/jobs")
+def background_jobs():
+    """Background job queue: counts by status and the most recent jobs."""
+    from src.repositories.background_job_repository import (
+        BackgroundJobRepository,
+    )
+
+    container = get_container()
+    repo = BackgroundJobRepository()
+    info = {"timestamp": datetime.now(timezone.utc).isoformat()}
+    try:
+        db = container.get("database_connection")
+        with db.connection_ro() as conn:
+            if not repo.table_exists(conn):
+                info.update({"status": "unavailable",
+                             "error": "background_jobs table missing"})
+                return jsonify(info), 503
+            counts = repo.get_status_counts(conn)
+            recent = repo.get_recent(25, conn)
+    except Exception as e:
+        info.update({"status": "critical", "error": str(e)})
+        return jsonify(info), 503
+
+    info.update({
+        "status": "healthy",
+        "counts": counts,
+        "jobs": [
+            {
+                "job_id": j.job_id,
+                "job_type": j.job_type,
+                "job_key": j.job_key,
+                "status": j.status.value,
+                "attempts": j.attempts,
+                "max_attempts": j.max_attempts,
+                "created_at": j.created_at,
+                "started_at": j.started_at,
+                "finished_at": j.finished_at,
+                "last_error": j.last_error,
+            }
+            for j in recent
+        ],
+    })
+    return jsonify(info), 200
+
+
 @health_bp.route("/metrics")
 def system_metrics():
     """Return system resource metrics."""
@@ -12,6 +12,9 @@ from flask import (
     send_from_directory,
 )
 
+from src.services.container import get_container
+from src.services.io_index import index_exists, list_entries, try_refresh
+
 logger = logging.getLogger(__name__)
 
 insertion_orders_bp = Blueprint(
@@ -99,28 +102,57 @@ def _format_mtime(mtime):
     return pacific.strftime("%b %d, %Y %I:%M %p")
 
 
+def _listing(folder_path, is_dir):
+    """(name, mtime, size) of the folders (is_dir) or files in folder_path,
+    by name, or None if folder_path is not a folder.
+
+    Reads the IO directory index, relisting folder_path only when its
+    mtime changed; walks the share without migration 042, or while an
+    import holds the database write lock.
+    """
+    db = get_container().get("database_connection")
+    with db.connection() as conn:
+        if index_exists(conn):
+            refreshed = try_refresh(conn, folder_path, max_depth=0)
+            if refreshed is not None:
+                if not refreshed["exists"]:
+                    return None
+                return [
+                    (row["name"], row["mtime"], row["size"])
+                    for row in list_entries(conn, folder_path, is_dir)
+                ]
+
+    if not os.path.isdir(folder_path):
+        return None
+
+    items = []
+    for entry in sorted(os.listdir(folder_path)):
+        full = os.path.join(folder_path, entry)
+        if is_dir and os.path.isdir(full):
+            items.append((entry, None, None))
+        elif not is_dir and os.path.isfile(full):
+            stat = os.stat(full)
+            items.append((entry, stat.st_mtime, stat.st_size))
+    return items
+
+
 @insertion_orders_bp.route("/<ae_name>")
 def list_customers(ae_name):
     """List customer folders for an AE."""
     ae_name = _safe_segment(ae_name)
     ae_path = os.path.join(IO_BASE_PATH, ae_name)
 
-    if not os.path.isdir(ae_path):
+    folders = _listing(ae_path, is_dir=True)
+    if folders is None:
         abort(404)
 
-    folders = sorted(
-        entry
-        for entry in os.listdir(ae_path)
-        if os.path.isdir(os.path.join(ae_path, entry))
-    )
-
     items = [
         {
             "name": folder,
             "href": f"/reports/insertion-orders/{ae_name}/{folder}",
             "icon": "📁",
         }
-        for folder in folders
+        for folder, _, _ in folders
     ]
 
     breadcrumb = (
@@ -144,16 +176,12 @@ def list_files(ae_name, customer_folder):
     customer_folder = _safe_segment(customer_folder)
     folder_path = os.path.join(IO_BASE_PATH, ae_name, customer_folder)
 
-    if not os.path.isdir(folder_path):
+    files = _listing(folder_path, is_dir=False)
+    if files is None:
         abort(404)
 
-    entries = sorted(os.listdir(folder_path))
     items = []
-    for entry in entries:
-        full = os.path.join(folder_path, entry)
-        if not os.path.isfile(full):
-            continue
-        stat = os.stat(full)
+    for entry, mtime, size in files:
         items.append({
             "name": entry,
             "href": (
@@ -161,8 +189,8 @@ def list_files(ae_name, customer_folder):
                 f"/{ae_name}/{customer_folder}/{entry}"
             ),
             "icon": "📄",
-            "size": _format_size(stat.st_size),
-            "modified": _format_mtime(stat.st_mtime),
+            "size": _format_size(size),
+            "modified": _format_mtime(mtime),
         })
 
     breadcrumb = (
@@ -7,6 +7,7 @@ import logging
 from flask import Blueprint, request
 from datetime import datetime, date
 from src.services.container import get_container
+from src.services.language_block_summary import summary_source
 from src.web.utils.request_helpers import (
     create_json_response,
     create_error_response,
@@ -64,22 +65,23 @@ def get_filter_params():
 def get_available_periods():
     """Get available years and months for filtering"""
     try:
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
             years = [
                 row["year"]
-                for row in conn.execute("""
+                for row in conn.execute(f"""
                     SELECT DISTINCT year
-                    FROM language_block_revenue_summary
+                    FROM {source}
                     WHERE year IS NOT NULL
                     ORDER BY year DESC
                 """).fetchall()
             ]
 
-            months_data = conn.execute("""
+            months_data = conn.execute(f"""
                 SELECT DISTINCT year,
                        CAST(substr(year_month, 6, 2) AS INTEGER) as month,
                        year_month
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE year_month IS NOT NULL
                 ORDER BY year DESC, month ASC
             """).fetchall()
@@ -115,9 +117,9 @@ def test_connection():
         date_filters, params = build_date_filter(year, month)
         where_clause = " AND ".join(date_filters) if date_filters else "1=1"
 
-        query = f"SELECT COUNT(*) as count FROM language_block_revenue_summary WHERE {where_clause}"
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"SELECT COUNT(*) as count FROM {source} WHERE {where_clause}"
             result = conn.execute(query, params).fetchone()
         count = result["count"] if result else 0
 
@@ -153,21 +155,21 @@ def get_language_block_summary():
             ["(is_active = 1 OR is_active IS NULL)"] + date_filters
         )
 
-        query = f"""
-        SELECT
-            COUNT(DISTINCT block_id) as total_blocks,
-            COUNT(DISTINCT language_name) as total_languages,
-            COUNT(DISTINCT market_code) as total_markets,
-            COALESCE(SUM(total_revenue), 0) as total_revenue,
-            COALESCE(SUM(total_spots), 0) as total_spots,
-            COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block_month,
-            MIN(first_air_date) as data_start_date,
-            MAX(last_air_date) as data_end_date
-        FROM language_block_revenue_summary
-        WHERE {where_clause}
-        """
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"""
+            SELECT
+                COUNT(DISTINCT block_id) as total_blocks,
+                COUNT(DISTINCT language_name) as total_languages,
+                COUNT(DISTINCT market_code) as total_markets,
+                COALESCE(SUM(total_revenue), 0) as total_revenue,
+                COALESCE(SUM(total_spots), 0) as total_spots,
+                COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block_month,
+                MIN(first_air_date) as data_start_date,
+                MAX(last_air_date) as data_end_date
+            FROM {source}
+            WHERE {where_clause}
+            """
             result = conn.execute(query, params).fetchone()
 
         if not result:
@@ -204,23 +206,23 @@ def get_top_performing_blocks():
         )
         params.append(limit)
 
-        query = f"""
-        SELECT
-            block_name, language_name, market_display_name, day_part,
-            time_start || '-' || time_end as time_slot,
-            COALESCE(SUM(total_revenue), 0) as total_revenue,
-            COALESCE(SUM(total_spots), 0) as total_spots,
-            COUNT(DISTINCT year_month) as active_months,
-            COALESCE(AVG(total_revenue), 0) as avg_monthly_revenue
-        FROM language_block_revenue_summary
-        WHERE {where_clause}
-        GROUP BY block_id, block_name, language_name, market_display_name,
-                 day_part, time_start, time_end
-        ORDER BY total_revenue DESC
-        LIMIT ?
-        """
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"""
+            SELECT
+                block_name, language_name, market_display_name, day_part,
+                time_start || '-' || time_end as time_slot,
+                COALESCE(SUM(total_revenue), 0) as total_revenue,
+                COALESCE(SUM(total_spots), 0) as total_spots,
+                COUNT(DISTINCT year_month) as active_months,
+                COALESCE(AVG(total_revenue), 0) as avg_monthly_revenue
+            FROM {source}
+            WHERE {where_clause}
+            GROUP BY block_id, block_name, language_name, market_display_name,
+                     day_part, time_start, time_end
+            ORDER BY total_revenue DESC
+            LIMIT ?
+            """
             results = conn.execute(query, params).fetchall()
 
         return create_json_response(
@@ -249,25 +251,25 @@ def get_language_performance():
             ["(is_active = 1 OR is_active IS NULL)"] + date_filters
         )
 
-        query = f"""
-        SELECT
-            language_name,
-            COUNT(DISTINCT block_id) as block_count,
-            COALESCE(SUM(total_revenue), 0) as total_revenue,
-            COALESCE(SUM(total_spots), 0) as total_spots,
-            COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block,
-            CASE
-                WHEN COALESCE(SUM(total_spots), 0) > 0
-                THEN COALESCE(SUM(total_revenue), 0) / COALESCE(SUM(total_spots), 1)
-                ELSE 0
-            END as revenue_per_spot
-        FROM language_block_revenue_summary
-        WHERE {where_clause}
-        GROUP BY language_name
-        ORDER BY total_revenue DESC
-        """
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"""
+            SELECT
+                language_name,
+                COUNT(DISTINCT block_id) as block_count,
+                COALESCE(SUM(total_revenue), 0) as total_revenue,
+                COALESCE(SUM(total_spots), 0) as total_spots,
+                COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block,
+                CASE
+                    WHEN COALESCE(SUM(total_spots), 0) > 0
+                    THEN COALESCE(SUM(total_revenue), 0) / COALESCE(SUM(total_spots), 1)
+                    ELSE 0
+                END as revenue_per_spot
+            FROM {source}
+            WHERE {where_clause}
+            GROUP BY language_name
+            ORDER BY total_revenue DESC
+            """
             results = conn.execute(query, params).fetchall()
 
         return create_json_response(
@@ -295,21 +297,21 @@ def get_market_performance():
             ["(is_active = 1 OR is_active IS NULL)"] + date_filters
         )
 
-        query = f"""
-        SELECT
-            market_display_name, market_code,
-            COUNT(DISTINCT block_id) as block_count,
-            COUNT(DISTINCT language_name) as language_count,
-            COALESCE(SUM(total_revenue), 0) as total_revenue,
-            COALESCE(SUM(total_spots), 0) as total_spots,
-            COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block
-        FROM language_block_revenue_summary
-        WHERE {where_clause}
-        GROUP BY market_display_name, market_code
-        ORDER BY total_revenue DESC
-        """
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"""
+            SELECT
+                market_display_name, market_code,
+                COUNT(DISTINCT block_id) as block_count,
+                COUNT(DISTINCT language_name) as language_count,
+                COALESCE(SUM(total_revenue), 0) as total_revenue,
+                COALESCE(SUM(total_spots), 0) as total_spots,
+                COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block
+            FROM {source}
+            WHERE {where_clause}
+            GROUP BY market_display_name, market_code
+            ORDER BY total_revenue DESC
+            """
             results = conn.execute(query, params).fetchall()
 
         return create_json_response(
@@ -341,25 +343,25 @@ def get_time_slot_performance():
             + date_filters
         )
 
-        query = f"""
-        SELECT
-            day_part,
-            COUNT(DISTINCT block_id) as block_count,
-            COALESCE(SUM(total_revenue), 0) as total_revenue,
-            COALESCE(SUM(total_spots), 0) as total_spots,
-            COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block,
-            CASE
-                WHEN COALESCE(SUM(total_spots), 0) > 0
-                THEN COALESCE(SUM(total_revenue), 0) / COALESCE(SUM(total_spots), 1)
-                ELSE 0
-            END as revenue_per_spot
-        FROM language_block_revenue_summary
-        WHERE {where_clause}
-        GROUP BY day_part
-        ORDER BY total_revenue DESC
-        """
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"""
+            SELECT
+                day_part,
+                COUNT(DISTINCT block_id) as block_count,
+                COALESCE(SUM(total_revenue), 0) as total_revenue,
+                COALESCE(SUM(total_spots), 0) as total_spots,
+                COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block,
+                CASE
+                    WHEN COALESCE(SUM(total_spots), 0) > 0
+                    THEN COALESCE(SUM(total_revenue), 0) / COALESCE(SUM(total_spots), 1)
+                    ELSE 0
+                END as revenue_per_spot
+            FROM {source}
+            WHERE {where_clause}
+            GROUP BY day_part
+            ORDER BY total_revenue DESC
+            """
             results = conn.execute(query, params).fetchall()
 
         return create_json_response(
@@ -409,20 +411,20 @@ def get_recent_activity():
                 + date_filters
             )
 
-        query = f"""
-        SELECT
-            year_month,
-            COUNT(DISTINCT block_id) as active_blocks,
-            COALESCE(SUM(total_revenue), 0) as monthly_revenue,
-            COALESCE(SUM(total_spots), 0) as monthly_spots,
-            COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block
-        FROM language_block_revenue_summary
-        WHERE {where_clause}
-        GROUP BY year_month
-        ORDER BY year_month DESC
-        """
-
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
+            query = f"""
+            SELECT
+                year_month,
+                COUNT(DISTINCT block_id) as active_blocks,
+                COALESCE(SUM(total_revenue), 0) as monthly_revenue,
+                COALESCE(SUM(total_spots), 0) as monthly_spots,
+                COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block
+            FROM {source}
+            WHERE {where_clause}
+            GROUP BY year_month
+            ORDER BY year_month DESC
+            """
             results = conn.execute(query, params).fetchall()
 
         return create_json_response(
@@ -453,14 +455,15 @@ def get_performance_insights():
             ["(is_active = 1 OR is_active IS NULL)"] + date_filters
         )
 
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
             most_profitable = conn.execute(f"""
                 SELECT language_name,
                        COALESCE(SUM(total_revenue), 0)
                            / COALESCE(SUM(total_spots), 1) as revenue_per_spot,
                        COALESCE(SUM(total_spots), 0) as total_spots,
                        COALESCE(SUM(total_revenue), 0) as total_revenue
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE {base_where}
                 GROUP BY language_name
                 HAVING COALESCE(SUM(total_spots), 0) >= 10
@@ -475,7 +478,7 @@ def get_performance_insights():
                        COALESCE(SUM(total_spots), 0) as total_spots,
                        COALESCE(SUM(total_revenue), 0) as total_revenue,
                        COUNT(DISTINCT block_id) as block_count
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE {base_where}
                   AND day_part IS NOT NULL AND day_part != ''
                 GROUP BY day_part
@@ -491,7 +494,7 @@ def get_performance_insights():
                        COALESCE(SUM(total_revenue), 0) as current_revenue,
                        COALESCE(SUM(total_spots), 0) as total_spots,
                        COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE {base_where}
                 GROUP BY language_name
                 HAVING current_markets < 5 AND current_revenue > 1000
@@ -524,7 +527,8 @@ def get_comprehensive_report():
             ["(is_active = 1 OR is_active IS NULL)"] + date_filters
         )
 
-        with _get_db().connection_ro() as conn:
+        with _get_db().connection_ro(replica=True) as conn:
+            source = summary_source(conn)
             summary_result = conn.execute(f"""
                 SELECT
                     COUNT(DISTINCT block_id) as total_blocks,
@@ -533,7 +537,7 @@ def get_comprehensive_report():
                     COALESCE(SUM(total_revenue), 0) as total_revenue,
                     COALESCE(SUM(total_spots), 0) as total_spots,
                     COALESCE(AVG(total_revenue), 0) as avg_revenue_per_block_month
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE {base_where}
             """, params).fetchone()
             if summary_result:
@@ -544,7 +548,7 @@ def get_comprehensive_report():
                        COALESCE(SUM(total_revenue), 0) as total_revenue,
                        COALESCE(SUM(total_spots), 0) as total_spots,
                        COUNT(DISTINCT year_month) as active_months
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE {base_where}
                 GROUP BY block_id, block_name, language_name,
                          market_display_name, day_part
@@ -564,7 +568,7 @@ def get_comprehensive_report():
                                / COALESCE(SUM(total_spots), 1)
                            ELSE 0
                        END as revenue_per_spot
-                FROM language_block_revenue_summary
+                FROM {source}
                 WHERE {base_where}
                 GROUP BY language_name
                 ORDER BY total_revenue DESC
@@ -25,7 +25,7 @@ from src.web.placement_confirmation_parser import (
     contracts_highlight_7_days,
     contracts_by_client_15_days,
 )
-from src.models.planning import PlanningPeriod
+from src.models.planning import PlanningPeriod, PlanningYearGrid
 from src.utils.query_builders import RevenueQueryBuilder
 
 logger = logging.getLogger(__name__)
@@ -267,75 +267,60 @@ def ae_dashboard_personal():
         total_forecast = Decimal("0")
         total_budget = Decimal("0")
         repo = planning_service.repository
+        periods = PlanningPeriod.full_year(current_year)
 
-        for month_num in range(1, 13):
-            # Get booked revenue
-            if show_all_revenue:
-                # Sum all booked revenue across all AEs
-                try:
-                    period = PlanningPeriod(year=current_year, month=month_num)
-                    db_connection = container.get("database_connection")
-                    conn = db_connection.connect()
-                    try:
-                        cursor = conn.execute(
-                            """
-                            SELECT COALESCE(SUM(gross_rate), 0) AS booked
-                            FROM spots
-                            WHERE broadcast_month = ?
-                              AND (revenue_type != 'Trade' OR revenue_type IS NULL)
-                        """,
-                            (period.broadcast_month,),
-                        )
-                        row = cursor.fetchone()
-                        booked_revenue = Decimal(str(row["booked"])) if row else Decimal("0")
-                    finally:
-                        conn.close()
-                except Exception as e:
-                    logger.warning(
-                        f"Could not get all booked revenue for {current_year}-{month_num:02d}: {e}"
-                    )
-                    booked_revenue = Decimal("0")
-            else:
-                try:
-                    booked_revenue = repo.get_booked_revenue(
-                        ae_name, current_year, month_num
-                    ) or Decimal("0")
-                except Exception as e:
-                    logger.warning(
-                        f"Could not get booked revenue for {ae_name} {current_year}-{month_num:02d}: {e}"
-                    )
-                    booked_revenue = Decimal("0")
+        if show_all_revenue:
+            # Company-wide booked and budget, and per-AE effective forecasts,
+            # from one grid of every AE and month
+            try:
+                grid = repo.get_year_grid(current_year)
+                entity_names = [
+                    entity.entity_name
+                    for entity in planning_service.get_revenue_entities()
+                ]
+            except Exception as e:
+                logger.warning(f"Could not get planning grid for {current_year}: {e}")
+                grid = PlanningYearGrid(year=current_year)
+                entity_names = []
+        else:
+            try:
+                booked_by_period = repo.get_booked_revenue_for_periods(
+                    ae_name, periods
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Could not get booked revenue for {ae_name} {current_year}: {e}"
+                )
+                booked_by_period = {}
+            try:
+                budget_by_period = repo.get_budgets_for_periods(ae_name, periods)
+            except Exception as e:
+                logger.warning(f"Could not get budget for {ae_name} {current_year}: {e}")
+                budget_by_period = None
+            try:
+                forecast_by_period = repo.get_forecasts_for_periods(ae_name, periods)
+            except Exception as e:
+                logger.warning(
+                    f"Could not get forecast for {ae_name} {current_year}: {e}"
+                )
+                forecast_by_period = {}
 
-            # Get budget
+        for period in periods:
+            month_num = period.month
             if show_all_revenue:
-                # Sum all budgets across all AEs
-                try:
-                    db_connection = container.get("database_connection")
-                    conn = db_connection.connect()
-                    try:
-                        cursor = conn.execute(
-                            """
-                            SELECT COALESCE(SUM(budget_amount), 0) AS total_budget
-                            FROM budget
-                            WHERE year = ? AND month = ?
-                        """,
-                            (current_year, month_num),
-                        )
-                        row = cursor.fetchone()
-                        budget = Decimal(str(row["total_budget"])) if row else Decimal("0")
-                    finally:
-                        conn.close()
-                except Exception as e:
-                    logger.warning(
-                        f"Could not get all budget for {current_year}-{month_num:02d}: {e}"
-                    )
-                    budget = Decimal("0")
+                booked_revenue = grid.total_booked.get(month_num, Decimal("0"))
+                budget = grid.total_budget.get(month_num, Decimal("0"))
+                # For each AE: forecast = max(forecast_entered (or budget), booked)
+                forecast = sum(
+                    (grid.effective_forecast(name, month_num) for name in entity_names),
+                    Decimal("0"),
+                )
             else:
-                try:
-                    budget = repo.get_budget(ae_name, current_year, month_num) or Decimal(
-                        "0"
-                    )
-                except Exception:
+                booked_revenue = booked_by_period.get(period, Decimal("0"))
+
+                if budget_by_period is not None:
+                    budget = budget_by_period.get(period, Decimal("0"))
+                else:
                     try:
                         budget = Decimal(
                             str(
@@ -344,95 +329,17 @@ def ae_dashboard_personal():
                                 )
                             )
                         )
-                    except:
+                    except Exception:
                         budget = Decimal("0")
 
-            # Get forecast_entered (defaults to budget if not set)
-            if show_all_revenue:
-                # Calculate effective forecast per AE, then sum
-                # For each AE: forecast = max(forecast_entered (or budget), booked_revenue)
-                try:
-                    period = PlanningPeriod(year=current_year, month=month_num)
-                    total_effective_forecast = Decimal("0")
-                    
-                    # Get all revenue entities
-                    entities = planning_service.get_revenue_entities()
-                    
-                    for entity in entities:
-                        entity_name = entity.entity_name
-                        
-                        # Get booked revenue for this entity
-                        try:
-                            entity_booked = repo.get_booked_revenue(
-                                entity_name, current_year, month_num
-                            ) or Decimal("0")
-                        except Exception:
-                            entity_booked = Decimal("0")
-                        
-                        # Get forecast_entered (defaults to budget if not set)
-                        try:
-                            entity_forecast_data = repo.get_forecast_with_metadata(
-                                entity_name, current_year, month_num
-                            )
-                            entity_forecast_entered = (
-                                entity_forecast_data["amount"]
-                                if entity_forecast_data
-                                else None
-                            )
-                        except Exception:
-                            try:
-                                entity_forecast_entered = repo.get_forecast(
-                                    entity_name, current_year, month_num
-                                )
-                            except:
-                                entity_forecast_entered = None
-                        
-                        # Get budget for this entity (for defaulting forecast)
-                        try:
-                            entity_budget = repo.get_budget(
-                                entity_name, current_year, month_num
-                            ) or Decimal("0")
-                        except Exception:
-                            entity_budget = Decimal("0")
-                        
-                        # Forecast entered defaults to budget if not set
-                        if entity_forecast_entered is None:
-                            entity_forecast_entered = entity_budget
-                        
-                        # Effective forecast = max(forecast_entered, booked)
-                        entity_effective_forecast = max(entity_forecast_entered, entity_booked)
-                        total_effective_forecast += entity_effective_forecast
-                    
-                    forecast_entered = total_effective_forecast
-                except Exception as e:
-                    logger.warning(
-                        f"Could not get all forecast for {current_year}-{month_num:02d}: {e}"
-                    )
-                    # Fallback: use budget as forecast_entered
-                    forecast_entered = budget
-            else:
-                try:
-                    forecast_data = repo.get_forecast_with_metadata(
-                        ae_name, current_year, month_num
-                    )
-                    forecast_entered = (
-                        forecast_data["amount"]
-                        if forecast_data
-                        else (budget if budget > 0 else Decimal("0"))
-                    )
-                except Exception:
-                    try:
-                        forecast_entered = repo.get_forecast(
-                            ae_name, current_year, month_num
-                        ) or (budget if budget > 0 else Decimal("0"))
-                    except:
-                        forecast_entered = budget if budget > 0 else Decimal("0")
-
-            # Calculate effective forecast = max(forecast_entered, booked) to match planning tool
-            # For "All", forecast_entered already includes the per-AE max calculation, so use it directly
-            if show_all_revenue:
-                forecast = forecast_entered
-            else:
+                # Forecast entered defaults to budget if not set
+                forecast_data = forecast_by_period.get(period)
+                forecast_entered = (
+                    forecast_data["amount"]
+                    if forecast_data
+                    else (budget if budget > 0 else Decimal("0"))
+                )
+                # Effective forecast = max(forecast_entered, booked) to match planning tool
                 forecast = max(forecast_entered, booked_revenue)
 
             monthly_data.append(
@@ -8,6 +8,7 @@ from flask import Blueprint, render_template, jsonify, request
 from flask_login import current_user
 from datetime import datetime, date, timedelta
 from src.services.container import get_container
+from src.services.entity_directory import stale_entities, stale_summary
 
 stale_customers_bp = Blueprint("stale_customers", __name__)
 
@@ -52,55 +53,25 @@ def api_stale_stats():
         threshold_years = 2
 
     cutoff = f"{date.today().year - threshold_years}-01-01"
+    grace_cutoff = (date.today() - timedelta(days=90)).isoformat()
 
     with _get_db().connection_ro() as conn:
-        # Zero-spot customers (active, no spots, not created in last 90 days)
-        grace_cutoff = (date.today() - timedelta(days=90)).isoformat()
-        zero_spot_customers = conn.execute("""
-            SELECT COUNT(*) as cnt FROM customers c
-            WHERE c.is_active = 1
-            AND (c.created_date IS NULL OR c.created_date < ?)
-            AND NOT EXISTS (SELECT 1 FROM spots s WHERE s.customer_id = c.customer_id)
-        """, [grace_cutoff]).fetchone()["cnt"]
-
-        # Zero-spot agencies
-        zero_spot_agencies = conn.execute("""
-            SELECT COUNT(*) as cnt FROM agencies a
-            WHERE a.is_active = 1
-            AND (a.created_date IS NULL OR a.created_date < ?)
-            AND NOT EXISTS (SELECT 1 FROM spots s WHERE s.agency_id = a.agency_id)
-        """, [grace_cutoff]).fetchone()["cnt"]
-
-        # Stale customers (have spots, but none after cutoff)
-        stale_customers = conn.execute("""
-            SELECT COUNT(*) as cnt FROM customers c
-            WHERE c.is_active = 1
-            AND EXISTS (SELECT 1 FROM spots s WHERE s.customer_id = c.customer_id)
-            AND NOT EXISTS (SELECT 1 FROM spots s WHERE s.customer_id = c.customer_id AND s.air_date >= ?)
-        """, [cutoff]).fetchone()["cnt"]
-
-        # Stale agencies
-        stale_agencies = conn.execute("""
-            SELECT COUNT(*) as cnt FROM agencies a
-            WHERE a.is_active = 1
-            AND EXISTS (SELECT 1 FROM spots s WHERE s.agency_id = a.agency_id)
-            AND NOT EXISTS (SELECT 1 FROM spots s WHERE s.agency_id = a.agency_id AND s.air_date >= ?)
-        """, [cutoff]).fetchone()["cnt"]
+        summary = stale_summary(conn, cutoff, grace_cutoff)
+
+        def count(entity_type, category):
+            return summary.get((entity_type, category), {}).get("count", 0)
+
+        # Zero-spot entities exclude those created in the last 90 days;
+        # stale ones have spots, but none after cutoff
+        zero_spot_customers = count("customer", "zero_spot")
+        zero_spot_agencies = count("agency", "zero_spot")
+        stale_customers = count("customer", "stale")
+        stale_agencies = count("agency", "stale")
 
         # Revenue at risk (total non-trade revenue from stale customers)
-        revenue_at_risk = conn.execute("""
-            SELECT COALESCE(SUM(
-                CASE WHEN s.revenue_type != 'Trade' OR s.revenue_type IS NULL
-                     THEN s.gross_rate ELSE 0 END
-            ), 0) as total
-            FROM spots s
-            JOIN customers c ON s.customer_id = c.customer_id
-            WHERE c.is_active = 1
-            AND NOT EXISTS (
-                SELECT 1 FROM spots s2
-                WHERE s2.customer_id = c.customer_id AND s2.air_date >= ?
-            )
-        """, [cutoff]).fetchone()["total"]
+        revenue_at_risk = summary.get(
+            ("customer", "stale"), {}
+        ).get("revenue", 0)
 
         return jsonify({
             "zero_spot_customers": zero_spot_customers,
@@ -129,198 +100,51 @@ def api_stale_entities():
         sector_id: filter by sector
         include_inactive: 0 | 1 (default: 0)
         sort: name | last_active | revenue | spots | type (default: name)
+        limit, offset: page of results (default: all); the
+            X-Total-Count header holds the number of matching entities
     """
-    entity_type = request.args.get("type", "all")
-    category = request.args.get("category", "all")
-    threshold = request.args.get("threshold", "2", type=str)
-    sector_filter = request.args.get("sector_id", "")
-    include_inactive = request.args.get("include_inactive", "0") == "1"
-    sort_by = request.args.get("sort", "name")
+    filters = _stale_filters()
+    limit = request.args.get("limit", type=int)
+    offset = request.args.get("offset", 0, type=int)
 
+    with _get_db().connection_ro() as conn:
+        results, total = stale_entities(
+            conn,
+            include_inactive=request.args.get("include_inactive", "0") == "1",
+            sort=request.args.get("sort", "name"),
+            limit=limit,
+            offset=offset,
+            **filters,
+        )
+
+    response = jsonify(results)
+    response.headers["X-Total-Count"] = str(total)
+    return response
+
+
+def _stale_filters():
+    """stale_entities() filter arguments from the request query string."""
+    threshold = request.args.get("threshold", "2", type=str)
     try:
         threshold_years = int(threshold)
     except ValueError:
         threshold_years = 2
 
-    cutoff = f"{date.today().year - threshold_years}-01-01"
-    grace_cutoff = (date.today() - timedelta(days=90)).isoformat()
-    results = []
-
-    with _get_db().connection_ro() as conn:
-        # Build customer metrics lookup
-        customer_metrics = {}
-        rows = conn.execute("""
-            SELECT
-                customer_id,
-                COUNT(*) as spot_count,
-                SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL
-                    THEN gross_rate ELSE 0 END) as total_revenue,
-                MAX(air_date) as last_active
-            FROM spots
-            WHERE customer_id IS NOT NULL
-            GROUP BY customer_id
-        """).fetchall()
-        for row in rows:
-            customer_metrics[row["customer_id"]] = {
-                "spot_count": row["spot_count"],
-                "total_revenue": float(row["total_revenue"] or 0),
-                "last_active": row["last_active"],
-            }
-
-        # Build agency metrics lookup
-        agency_metrics = {}
-        rows = conn.execute("""
-            SELECT
-                agency_id,
-                COUNT(*) as spot_count,
-                SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL
-                    THEN gross_rate ELSE 0 END) as total_revenue,
-                MAX(air_date) as last_active
-            FROM spots
-            WHERE agency_id IS NOT NULL
-            GROUP BY agency_id
-        """).fetchall()
-        for row in rows:
-            agency_metrics[row["agency_id"]] = {
-                "spot_count": row["spot_count"],
-                "total_revenue": float(row["total_revenue"] or 0),
-                "last_active": row["last_active"],
-            }
-
-        # Alias counts
-        customer_alias_counts = {}
-        rows = conn.execute("""
-            SELECT target_entity_id, COUNT(*) as cnt
-            FROM entity_aliases
-            WHERE entity_type = 'customer' AND is_active = 1
-            GROUP BY target_entity_id
-        """).fetchall()
-        for row in rows:
-            customer_alias_counts[row["target_entity_id"]] = row["cnt"]
-
-        agency_alias_counts = {}
-        rows = conn.execute("""
-            SELECT target_entity_id, COUNT(*) as cnt
-            FROM entity_aliases
-            WHERE entity_type = 'agency' AND is_active = 1
-            GROUP BY target_entity_id
-        """).fetchall()
-        for row in rows:
-            agency_alias_counts[row["target_entity_id"]] = row["cnt"]
-
-        # Get customers
-        if entity_type in ("all", "customer"):
-            active_clause = "" if include_inactive else "AND c.is_active = 1"
-            customers = conn.execute(f"""
-                SELECT
-                    c.customer_id as entity_id,
-                    'customer' as entity_type,
-                    c.normalized_name as entity_name,
-                    c.is_active,
-                    c.sector_id,
-                    s.sector_name,
-                    c.assigned_ae,
-                    c.notes,
-                    c.created_date
-                FROM customers c
-                LEFT JOIN sectors s ON c.sector_id = s.sector_id
-                WHERE 1=1 {active_clause}
-                ORDER BY c.normalized_name
-            """).fetchall()
-
-            for c in customers:
-                row = dict(c)
-                cid = row["entity_id"]
-                metrics = customer_metrics.get(cid, {})
-                row["spot_count"] = metrics.get("spot_count", 0)
-                row["total_revenue"] = metrics.get("total_revenue", 0)
-                row["last_active"] = metrics.get("last_active")
-                row["alias_count"] = customer_alias_counts.get(cid, 0)
-                row["is_agency_client"] = ":" in (row["entity_name"] or "")
-
-                # Classify — skip zero-spot entities created in last 90 days
-                created = row.get("created_date") or ""
-                if row["spot_count"] == 0:
-                    if created >= grace_cutoff:
-                        continue  # recently created, not stale yet
-                    row["category"] = "zero_spot"
-                elif row["last_active"] and row["last_active"] < cutoff:
-                    row["category"] = "stale"
-                else:
-                    continue  # active customer, skip
-
-                results.append(row)
-
-        # Get agencies
-        if entity_type in ("all", "agency"):
-            active_clause = "" if include_inactive else "AND a.is_active = 1"
-            agencies = conn.execute(f"""
-                SELECT
-                    a.agency_id as entity_id,
-                    'agency' as entity_type,
-                    a.agency_name as entity_name,
-                    a.is_active,
-                    NULL as sector_id,
-                    NULL as sector_name,
-                    a.assigned_ae,
-                    a.notes,
-                    a.created_date
-                FROM agencies a
-                WHERE 1=1 {active_clause}
-                ORDER BY a.agency_name
-            """).fetchall()
-
-            for a in agencies:
-                row = dict(a)
-                aid = row["entity_id"]
-                metrics = agency_metrics.get(aid, {})
-                row["spot_count"] = metrics.get("spot_count", 0)
-                row["total_revenue"] = metrics.get("total_revenue", 0)
-                row["last_active"] = metrics.get("last_active")
-                row["alias_count"] = agency_alias_counts.get(aid, 0)
-                row["is_agency_client"] = False
-
-                # Classify — skip zero-spot entities created in last 90 days
-                created = row.get("created_date") or ""
-                if row["spot_count"] == 0:
-                    if created >= grace_cutoff:
-                        continue  # recently created, not stale yet
-                    row["category"] = "zero_spot"
-                elif row["last_active"] and row["last_active"] < cutoff:
-                    row["category"] = "stale"
-                else:
-                    continue  # active agency, skip
-
-                results.append(row)
-
-    # Apply filters
-    if category != "all":
-        results = [r for r in results if r["category"] == category]
-
+    sector_id = None
+    sector_filter = request.args.get("sector_id", "")
     if sector_filter:
         try:
-            sid = int(sector_filter)
-            results = [r for r in results if r.get("sector_id") == sid]
+            sector_id = int(sector_filter)
         except ValueError:
             pass
 
-    # Sort
-    if sort_by == "last_active":
-        results.sort(key=lambda r: (r.get("last_active") is None, r.get("last_active") or ""))
-        results.sort(key=lambda r: r.get("last_active") is None)
-    elif sort_by == "revenue":
-        results.sort(key=lambda r: -(r.get("total_revenue") or 0))
-    elif sort_by == "spots":
-        results.sort(key=lambda r: -(r.get("spot_count") or 0))
-    elif sort_by == "type":
-        results.sort(key=lambda r: (
-            0 if r["entity_type"] == "agency" else 1,
-            r["entity_name"].lower()
-        ))
-    else:
-        results.sort(key=lambda r: r["entity_name"].lower())
-
-    return jsonify(results)
+    return {
+        "cutoff": f"{date.today().year - threshold_years}-01-01",
+        "grace_cutoff": (date.today() - timedelta(days=90)).isoformat(),
+        "entity_type": request.args.get("type", "all"),
+        "category": request.args.get("category", "all"),
+        "sector_id": sector_id,
+    }
 
 
 @stale_customers_bp.route("/stale-customers/<entity_type>/<int:entity_id>")
@@ -540,141 +364,24 @@ def api_bulk_deactivate():
     data = request.get_json() or {}
     dry_run = data.get("dry_run", True)
 
-    entity_type = request.args.get("type", "all")
-    category = request.args.get("category", "all")
-    threshold = request.args.get("threshold", "2", type=str)
-    sector_filter = request.args.get("sector_id", "")
-
-    try:
-        threshold_years = int(threshold)
-    except ValueError:
-        threshold_years = 2
-
-    cutoff = f"{date.today().year - threshold_years}-01-01"
     age_cutoff = f"{date.today().year - 3}-01-01"
-    candidates = []
 
     with _get_db().connection_ro() as conn:
-        # --- Build metrics lookups (same as api_stale_entities) ---
-        customer_metrics = {}
-        for row in conn.execute("""
-            SELECT customer_id,
-                   COUNT(*) as spot_count,
-                   SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL
-                       THEN gross_rate ELSE 0 END) as total_revenue,
-                   MAX(air_date) as last_active
-            FROM spots WHERE customer_id IS NOT NULL
-            GROUP BY customer_id
-        """).fetchall():
-            customer_metrics[row["customer_id"]] = {
-                "spot_count": row["spot_count"],
-                "total_revenue": float(row["total_revenue"] or 0),
-                "last_active": row["last_active"],
-            }
-
-        agency_metrics = {}
-        for row in conn.execute("""
-            SELECT agency_id,
-                   COUNT(*) as spot_count,
-                   SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL
-                       THEN gross_rate ELSE 0 END) as total_revenue,
-                   MAX(air_date) as last_active
-            FROM spots WHERE agency_id IS NOT NULL
-            GROUP BY agency_id
-        """).fetchall():
-            agency_metrics[row["agency_id"]] = {
-                "spot_count": row["spot_count"],
-                "total_revenue": float(row["total_revenue"] or 0),
-                "last_active": row["last_active"],
-            }
-
-        # --- Collect qualifying entities ---
-        if entity_type in ("all", "customer"):
-            for c in conn.execute("""
-                SELECT customer_id as entity_id, 'customer' as entity_type,
-                       normalized_name as entity_name, sector_id, created_date
-                FROM customers
-                WHERE is_active = 1
-            """).fetchall():
-                row = dict(c)
-                cid = row["entity_id"]
-                metrics = customer_metrics.get(cid, {})
-                spot_count = metrics.get("spot_count", 0)
-                total_revenue = metrics.get("total_revenue", 0)
-                last_active = metrics.get("last_active")
-
-                # Must be stale or zero-spot
-                if spot_count == 0:
-                    cat = "zero_spot"
-                elif last_active and last_active < cutoff:
-                    cat = "stale"
-                else:
-                    continue
-
-                if category != "all" and cat != category:
-                    continue
-
-                # Bulk criteria: zero revenue AND created 3+ years ago
-                if total_revenue != 0:
-                    continue
-                if not row["created_date"] or row["created_date"] >= age_cutoff:
-                    continue
-
-                # Sector filter
-                if sector_filter:
-                    try:
-                        if row.get("sector_id") != int(sector_filter):
-                            continue
-                    except ValueError:
-                        pass
-
-                candidates.append({
-                    "entity_type": "customer",
-                    "entity_id": cid,
-                    "entity_name": row["entity_name"],
-                    "category": cat,
-                    "created_date": row["created_date"],
-                })
-
-        if entity_type in ("all", "agency"):
-            for a in conn.execute("""
-                SELECT agency_id as entity_id, 'agency' as entity_type,
-                       agency_name as entity_name, created_date
-                FROM agencies
-                WHERE is_active = 1
-            """).fetchall():
-                row = dict(a)
-                aid = row["entity_id"]
-                metrics = agency_metrics.get(aid, {})
-                spot_count = metrics.get("spot_count", 0)
-                total_revenue = metrics.get("total_revenue", 0)
-                last_active = metrics.get("last_active")
-
-                if spot_count == 0:
-                    cat = "zero_spot"
-                elif last_active and last_active < cutoff:
-                    cat = "stale"
-                else:
-                    continue
-
-                if category != "all" and cat != category:
-                    continue
-
-                if total_revenue != 0:
-                    continue
-                if not row["created_date"] or row["created_date"] >= age_cutoff:
-                    continue
-
-                if sector_filter:
-                    continue  # agencies have no sector; if sector filter is set, skip
-
-                candidates.append({
-                    "entity_type": "agency",
-                    "entity_id": aid,
-                    "entity_name": row["entity_name"],
-                    "category": cat,
-                    "created_date": row["created_date"],
-                })
+        entities, _ = stale_entities(conn, **_stale_filters())
+
+    # Bulk criteria: zero revenue AND created 3+ years ago
+    candidates = [
+        {
+            "entity_type": e["entity_type"],
+            "entity_id": e["entity_id"],
+            "entity_name": e["entity_name"],
+            "category": e["category"],
+            "created_date": e["created_date"],
+        }
+        for e in entities
+        if e["total_revenue"] == 0
+        and e["created_date"] and e["created_date"] < age_cutoff
+    ]
 
     if dry_run:
         return jsonify({
@@ -0,0 +1,47 @@
+/* Background job indicator.
+ *
+ * Pages whose writes queue background jobs (cache rebuilds, signal
+ * refreshes, merges) show a small badge fed by /health/jobs: how many
+ * jobs are queued or running, and whether any recent job failed. The
+ * badge links to /health/jobs for the details and stays hidden when
+ * the queue is idle or the job table does not exist.
+ */
+
+const JOB_STATUS_POLL_MS = 15000;
+
+function jobStatusText(counts, recentFailed) {
+    const parts = [];
+    if (counts.RUNNING) parts.push(`${counts.RUNNING} running`);
+    if (counts.QUEUED) parts.push(`${counts.QUEUED} queued`);
+    if (recentFailed) parts.push(`${recentFailed} failed recently`);
+    return parts.length ? `Background jobs: ${parts.join(', ')}` : '';
+}
+
+async function refreshJobStatus(el) {
+    let info;
+    try {
+        const r = await fetch('/health/jobs');
+        info = await r.json().catch(() => null);
+        if (!r.ok || !info) {
+            el.hidden = true;
+            return r.status !== 503;  // no job table: stop polling
+        }
+    } catch (e) {
+        return true;
+    }
+    const counts = info.counts || {};
+    const recentFailed = (info.jobs || []).filter(j => j.status === 'FAILED').length;
+    const text = jobStatusText(counts, recentFailed);
+    el.hidden = !text;
+    el.classList.toggle('failed', recentFailed > 0);
+    el.textContent = text;
+    return true;
+}
+
+function startJobStatus(el) {
+    if (!el) return;
+    const tick = async () => {
+        if (await refreshJobStatus(el)) setTimeout(tick, JOB_STATUS_POLL_MS);
+    };
+    tick();
+}
@@ -0,0 +1,79 @@
+/* Customer/agency merge requests.
+ *
+ * The merge endpoints queue the merge as a background job and answer
+ * 202 with a status_url; without the job queue they merge inline and
+ * answer 200 with the stats. postMerge() hides the difference: it polls
+ * status_url until the job finishes and resolves to
+ * { ok, data, error, status } with data = the merge stats.
+ *
+ * A job still QUEUED after MERGE_QUEUE_TIMEOUT_MS most likely has no
+ * worker to run it, so polling stops with an error pointing at
+ * /health/jobs. The job stays queued and runs when a worker starts.
+ */
+
+const MERGE_POLL_MS = 1000;
+const MERGE_QUEUE_TIMEOUT_MS = 60000;
+const JOB_HEALTH_URL = '/health/jobs';
+
+async function postMerge(url, body, onProgress) {
+    let r;
+    let data = null;
+    try {
+        r = await fetch(url, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(body)
+        });
+        data = await r.json().catch(() => null);
+    } catch (e) {
+        return { ok: false, data: null, error: 'Network error. Please try again.', status: 0 };
+    }
+    if (r.status !== 202 || !data || !data.status_url) {
+        const ok = r.ok && !!data && data.success !== false;
+        return { ok, data, error: ok ? null : (data?.error || `Request failed (${r.status})`), status: r.status };
+    }
+
+    const started = Date.now();
+    let lastReply = started;
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, MERGE_POLL_MS));
+        let job;
+        try {
+            const s = await fetch(data.status_url);
+            job = await s.json().catch(() => null);
+            if (!s.ok || !job) {
+                return { ok: false, data: null, error: job?.error || `Request failed (${s.status})`, status: s.status };
+            }
+        } catch (e) {
+            // Transient network error: keep polling, the merge carries on
+            if (Date.now() - lastReply > MERGE_QUEUE_TIMEOUT_MS) {
+                return { ok: false, data: null, error: `Network error. Check ${location.origin}${JOB_HEALTH_URL} for the merge.`, status: 0 };
+            }
+            continue;
+        }
+        lastReply = Date.now();
+        if (onProgress && job.progress) onProgress(job.progress);
+        if (job.status === 'SUCCEEDED') {
+            const result = job.result || {};
+            return { ok: result.success !== false, data: result, error: result.error || null, status: 200 };
+        }
+        if (job.status === 'FAILED') {
+            return { ok: false, data: job.result, error: job.error || 'Merge failed', status: 500 };
+        }
+        if (job.status === 'QUEUED' && Date.now() - started > MERGE_QUEUE_TIMEOUT_MS) {
+            return {
+                ok: false,
+                data: null,
+                error: 'The merge is still queued: no background job worker may be running. ' +
+                       `It will run when one starts; check ${location.origin}${JOB_HEALTH_URL}`,
+                status: 202,
+                jobsUrl: JOB_HEALTH_URL
+            };
+        }
+    }
+}
+
+function mergeProgressText(progress) {
+    if (!progress || !progress.total || progress.phase !== 'moving') return 'Merging...';
+    return `Merging... ${Math.round(100 * progress.done / progress.total)}%`;
+}
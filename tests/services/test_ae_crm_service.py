@@ -1,11 +1,21 @@
 """Tests for AeCrmService -- AE-scoped account queries."""
 
 import sqlite3
+from pathlib import Path
+
 import pytest
 
 from src.services.ae_crm_service import AeCrmService
 from src.database.connection import DatabaseConnection
 
+ROLLUP_MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "sql" / "migrations" / "032_entity_activity_rollup.sql"
+)
+FOLLOW_UP_ORDER_MIGRATION = ROLLUP_MIGRATION.with_name(
+    "044_activity_rollup_follow_up_order.sql"
+)
+
 
 @pytest.fixture()
 def crm_db(tmp_path):
@@ -102,6 +112,8 @@ def crm_db(tmp_path):
             ('Alice', 'Feb-26', 2000, 10, 'Cash'),
             ('Alice', 'Jan-26', 1500, 11, 'Cash');
     """)
+    conn.executescript(ROLLUP_MIGRATION.read_text())
+    conn.executescript(FOLLOW_UP_ORDER_MIGRATION.read_text())
     conn.commit()
     conn.close()
     return DatabaseConnection(db_path)
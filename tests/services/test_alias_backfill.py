@@ -0,0 +1,143 @@
+"""Tests for the set-based alias backfill (migration 035)."""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.services.alias_backfill import bulk_alias_load
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bill_code TEXT NOT NULL,
+    customer_id INTEGER
+);
+CREATE TABLE entity_aliases (
+    alias_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    alias_name TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    target_entity_id INTEGER NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    UNIQUE(alias_name, entity_type)
+);
+INSERT INTO spots (bill_code, customer_id) VALUES
+    ('ACME', NULL), ('ACME', NULL), ('BETA', NULL), ('GAMMA', 7),
+    ('DELTA', NULL);
+INSERT INTO entity_aliases (alias_name, entity_type, target_entity_id,
+                            is_active) VALUES
+    ('DELTA', 'customer', 4, 0),
+    ('OMEGA', 'customer', 9, 1);
+"""
+
+
+def _connect(with_035=True):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    conn.executescript(
+        (MIGRATIONS / "022_alias_spot_backfill_triggers.sql").read_text()
+    )
+    conn.executescript(
+        (MIGRATIONS / "023_spot_insert_alias_lookup_trigger.sql").read_text()
+    )
+    if with_035:
+        conn.executescript(
+            (MIGRATIONS / "035_bulk_alias_backfill.sql").read_text()
+        )
+    return conn
+
+
+def _load(conn):
+    """A bulk load touching every trigger: new, reactivated, repointed,
+    inactive and agency aliases, and spots inserted before and after."""
+    conn.executemany(
+        "INSERT INTO entity_aliases (alias_name, entity_type, "
+        "target_entity_id, is_active) VALUES (?, ?, ?, ?)",
+        [("ACME", "customer", 1, 1), ("BETA", "customer", 2, 0),
+         ("GAMMA", "customer", 3, 1), ("ACME", "agency", 5, 1)],
+    )
+    conn.execute(
+        "UPDATE entity_aliases SET is_active = 1 WHERE alias_name = 'DELTA'"
+    )
+    conn.execute(
+        "UPDATE entity_aliases SET target_entity_id = 2 "
+        "WHERE alias_name = 'ACME' AND entity_type = 'customer'"
+    )
+    conn.executemany(
+        "INSERT INTO spots (bill_code, customer_id) VALUES (?, ?)",
+        [("OMEGA", None), ("BETA", None), ("ACME", None), ("OMEGA", 8)],
+    )
+
+
+def _spots(conn):
+    return conn.execute(
+        "SELECT spot_id, bill_code, customer_id FROM spots ORDER BY spot_id"
+    ).fetchall()
+
+
+class TestBulkAliasLoad:
+    def test_matches_trigger_path(self):
+        triggers = _connect()
+        _load(triggers)
+
+        bulk = _connect()
+        with bulk, bulk_alias_load(bulk) as stats:
+            _load(bulk)
+            # Per-row backfill is suspended inside the block
+            assert bulk.execute(
+                "SELECT COUNT(*) FROM spots WHERE customer_id IS NOT NULL"
+            ).fetchone()[0] == 2
+
+        assert _spots(bulk) == _spots(triggers)
+        assert _spots(bulk)[0] == (1, "ACME", 1)
+        assert stats["spots_backfilled"] == 5
+        assert bulk.execute(
+            "SELECT (SELECT COUNT(*) FROM alias_backfill_session)"
+            " + (SELECT COUNT(*) FROM alias_backfill_pending)"
+        ).fetchone()[0] == 0
+
+    def test_triggers_resume_after_block(self):
+        conn = _connect()
+        with conn, bulk_alias_load(conn):
+            pass
+        conn.execute(
+            "INSERT INTO entity_aliases (alias_name, entity_type, "
+            "target_entity_id) VALUES ('BETA', 'customer', 2)"
+        )
+        assert conn.execute(
+            "SELECT customer_id FROM spots WHERE bill_code = 'BETA'"
+        ).fetchone()[0] == 2
+
+    def test_error_skips_backfill_and_clears_session(self):
+        conn = _connect()
+        with pytest.raises(RuntimeError):
+            with bulk_alias_load(conn):
+                _load(conn)
+                raise RuntimeError("boom")
+        assert conn.execute(
+            "SELECT COUNT(*) FROM alias_backfill_session"
+        ).fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT customer_id FROM spots WHERE spot_id = 1"
+        ).fetchone()[0] is None
+
+    def test_nested_block_defers_to_outer(self):
+        conn = _connect()
+        with conn, bulk_alias_load(conn) as outer:
+            with bulk_alias_load(conn) as inner:
+                _load(conn)
+            assert inner["spots_backfilled"] == 0
+            assert conn.execute(
+                "SELECT COUNT(*) FROM alias_backfill_session"
+            ).fetchone()[0] == 1
+        assert outer["spots_backfilled"] == 5
+
+    def test_without_migration_uses_triggers(self):
+        conn = _connect(with_035=False)
+        with conn, bulk_alias_load(conn) as stats:
+            _load(conn)
+        expected = _connect(with_035=False)
+        _load(expected)
+        assert _spots(conn) == _spots(expected)
+        assert stats["spots_backfilled"] == 0
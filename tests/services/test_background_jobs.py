@@ -0,0 +1,119 @@
+"""Tests for the background job queue and worker."""
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.repositories.background_job_repository import (
+    BackgroundJobRepository,
+    JobStatus,
+)
+from src.services.background_jobs import JobWorker, enqueue_job
+
+MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "sql" / "migrations" / "030_background_jobs.sql"
+)
+
+
+@pytest.fixture()
+def db():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.executescript(MIGRATION.read_text())
+    conn.close()
+    yield DatabaseConnection(path)
+    os.unlink(path)
+
+
+def _job(db, job_id):
+    with db.connection() as conn:
+        return BackgroundJobRepository().get_job(job_id, conn)
+
+
+class TestEnqueue:
+    def test_dedupes_queued_jobs_by_key(self, db):
+        first = enqueue_job(db, "rebuild", job_key="caches")
+        second = enqueue_job(db, "rebuild", job_key="caches")
+        other = enqueue_job(db, "rebuild", job_key="other")
+        assert first == second
+        assert other != first
+
+    def test_running_job_does_not_block_new_one(self, db):
+        first = enqueue_job(db, "rebuild", job_key="caches")
+        seen = []
+
+        def handler(database, payload):
+            seen.append(enqueue_job(database, "rebuild", job_key="caches"))
+
+        JobWorker(db, handlers={"rebuild": handler}).run_once()
+        assert seen[0] != first
+        assert _job(db, seen[0]).status is JobStatus.QUEUED
+
+    def test_without_table_returns_none(self):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            assert enqueue_job(DatabaseConnection(path), "rebuild") is None
+        finally:
+            os.unlink(path)
+
+
+class TestJobWorker:
+    def test_runs_job_with_payload(self, db):
+        calls = []
+        job_id = enqueue_job(db, "rebuild", payload={"months": ["Jan-25"]})
+        worker = JobWorker(
+            db, handlers={"rebuild": lambda d, p: calls.append(p)}
+        )
+
+        assert worker.run_until_empty() == 1
+        assert calls == [{"months": ["Jan-25"]}]
+        job = _job(db, job_id)
+        assert job.status is JobStatus.SUCCEEDED
+        assert job.attempts == 1
+
+    def test_failure_is_retried_then_failed(self, db):
+        def boom(database, payload):
+            raise RuntimeError("locked")
+
+        job_id = enqueue_job(db, "rebuild", max_attempts=2)
+        worker = JobWorker(db, handlers={"rebuild": boom})
+
+        worker.run_once()
+        job = _job(db, job_id)
+        assert job.status is JobStatus.QUEUED
+        assert job.last_error == "locked"
+        # Backoff: not runnable yet
+        assert worker.run_once() is None
+
+        with db.connection() as conn:
+            conn.execute(
+                "UPDATE background_jobs SET run_after = datetime('now', '-1 minute')"
+            )
+            conn.commit()
+        worker.run_once()
+        job = _job(db, job_id)
+        assert job.status is JobStatus.FAILED
+        assert job.attempts == 2
+
+    def test_unknown_job_type_fails_without_retry(self, db):
+        job_id = enqueue_job(db, "nope")
+        JobWorker(db, handlers={}).run_once()
+        assert _job(db, job_id).status is JobStatus.FAILED
+
+    def test_recover_stale_requeues_running_jobs(self, db):
+        job_id = enqueue_job(db, "rebuild", job_key="caches")
+        with db.connection() as conn:
+            conn.execute("""
+                UPDATE background_jobs
+                SET status = 'RUNNING', started_at = datetime('now', '-2 hours')
+            """)
+            conn.commit()
+
+        assert JobWorker(db, handlers={}).recover_stale() == 1
+        assert _job(db, job_id).status is JobStatus.QUEUED
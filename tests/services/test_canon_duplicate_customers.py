@@ -0,0 +1,158 @@
+"""Tests for the canon tool duplicate-customer finder and consolidation
+preview queries."""
+
+import sqlite3
+
+import pytest
+
+from src.web.routes.canon_tools import (
+    _consolidation_impact,
+    _duplicate_customer_groups,
+)
+
+SCHEMA = """
+CREATE TABLE customers (
+  customer_id INTEGER PRIMARY KEY,
+  normalized_name TEXT,
+  created_date TEXT
+);
+CREATE TABLE customer_canonical_map (
+  alias_name TEXT PRIMARY KEY,
+  canonical_name TEXT NOT NULL,
+  updated_date TEXT
+);
+CREATE TABLE spots (
+  spot_id INTEGER PRIMARY KEY,
+  customer_id INTEGER,
+  broadcast_month TEXT,
+  gross_rate REAL,
+  revenue_type TEXT
+);
+CREATE INDEX idx_spots_customer_id ON spots(customer_id);
+CREATE TABLE entity_aliases (
+  alias_id INTEGER PRIMARY KEY,
+  alias_name TEXT,
+  entity_type TEXT,
+  target_entity_id INTEGER
+);
+
+INSERT INTO customers VALUES
+  (1, 'Agency:Acme Corp', '2024-01-01'),
+  (2, 'Agency:ACME', '2024-02-01'),
+  (3, 'Beta', '2024-01-01'),
+  (4, 'Beta Inc', '2024-03-01'),
+  (5, 'Beta Incorporated', '2024-04-01'),
+  (6, 'Solo', '2024-01-01');
+INSERT INTO customer_canonical_map (alias_name, canonical_name) VALUES
+  ('ACME', 'Acme Corp'),
+  ('Beta Inc', 'Beta'),
+  ('Beta Incorporated', 'Beta');
+INSERT INTO spots (customer_id, broadcast_month, gross_rate) VALUES
+  (1, 'Jan-25', 100), (1, 'Jan-25', 100),
+  (2, 'Jan-25', 500), (2, 'Feb-25', 50),
+  (4, 'Feb-25', 10),
+  (6, 'Feb-25', 9999);
+INSERT INTO entity_aliases (alias_name, entity_type, target_entity_id) VALUES
+  ('Acme X', 'customer', 2), ('Acme X', 'agency', 2);
+
+CREATE TABLE entity_metrics (
+  entity_type TEXT,
+  entity_id INTEGER,
+  total_revenue REAL DEFAULT 0,
+  spot_count INTEGER DEFAULT 0,
+  PRIMARY KEY (entity_type, entity_id)
+);
+INSERT INTO entity_metrics
+SELECT 'customer', customer_id, SUM(gross_rate), COUNT(*)
+FROM spots GROUP BY customer_id;
+"""
+
+
+@pytest.fixture()
+def conn():
+    c = sqlite3.connect(":memory:")
+    c.row_factory = sqlite3.Row
+    c.executescript(SCHEMA)
+    yield c
+    c.close()
+
+
+class TestDuplicateGroups:
+    def test_groups_by_revenue_with_survivor_first(self, conn):
+        groups, total = _duplicate_customer_groups(conn)
+
+        assert total == 2
+        assert [g["canonical_target"] for g in groups] == [
+            "Agency:Acme Corp", "Beta",
+        ]
+        acme, beta = groups
+        assert acme["suggested_target"] == 2
+        assert acme["customer_count"] == 2
+        assert acme["total_spots"] == 4
+        assert acme["total_revenue"] == 750.0
+        assert [c["customer_id"] for c in acme["customers"]] == [2, 1]
+        assert acme["actual_names"] == ["Agency:ACME", "Agency:Acme Corp"]
+        assert acme["customers"][1] == {
+            "customer_id": 1,
+            "normalized_name": "Agency:Acme Corp",
+            "created_date": "2024-01-01",
+            "spot_count": 2,
+            "total_revenue": 200.0,
+        }
+
+        # Members without spots count as zero; ties break on customer_id
+        assert [c["customer_id"] for c in beta["customers"]] == [4, 3, 5]
+        assert [c["spot_count"] for c in beta["customers"]] == [1, 0, 0]
+
+    def test_pages(self, conn):
+        groups, total = _duplicate_customer_groups(conn, limit=1, offset=1)
+        assert total == 2
+        assert [g["canonical_target"] for g in groups] == ["Beta"]
+
+        groups, total = _duplicate_customer_groups(conn, limit=1, offset=5)
+        assert (groups, total) == ([], 2)
+
+    def test_reads_entity_metrics(self, conn):
+        conn.execute(
+            "UPDATE entity_metrics SET spot_count = 7, total_revenue = 900"
+            " WHERE entity_id = 1"
+        )
+        acme = _duplicate_customer_groups(conn)[0][0]
+        assert acme["suggested_target"] == 1
+        assert (acme["total_spots"], acme["total_revenue"]) == (9, 1450.0)
+
+    def test_without_entity_metrics_aggregates_spots(self, conn):
+        conn.execute("DROP TABLE entity_metrics")
+        conn.execute(
+            "UPDATE spots SET revenue_type = 'Trade'"
+            " WHERE customer_id = 2 AND broadcast_month = 'Jan-25'"
+        )
+        acme = _duplicate_customer_groups(conn)[0][0]
+        # Trade spots count but, as in entity_metrics, add no revenue
+        assert acme["suggested_target"] == 1
+        assert (acme["total_spots"], acme["total_revenue"]) == (4, 250.0)
+
+    def test_no_duplicates(self, conn):
+        conn.execute("DELETE FROM customer_canonical_map")
+        assert _duplicate_customer_groups(conn) == ([], 0)
+
+
+class TestConsolidationImpact:
+    def test_impact(self, conn):
+        assert _consolidation_impact(conn, 2) == {
+            "spots_affected": 2,
+            "total_revenue": 550.0,
+            "aliases_affected": 1,
+            "monthly_breakdown": [
+                {"month": "Feb-25", "spots": 1, "revenue": 50.0},
+                {"month": "Jan-25", "spots": 1, "revenue": 500.0},
+            ],
+        }
+
+    def test_customer_without_spots(self, conn):
+        assert _consolidation_impact(conn, 3) == {
+            "spots_affected": 0,
+            "total_revenue": 0.0,
+            "aliases_affected": 0,
+            "monthly_breakdown": [],
+        }
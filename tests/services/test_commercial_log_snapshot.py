@@ -0,0 +1,179 @@
+"""Tests for the Commercial Log snapshot store and the daily change
+report built on it."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from openpyxl import Workbook
+
+from src.services import commercial_log_daily_report as daily_report
+from src.services.commercial_log_snapshot import (
+    SNAPSHOT_DB_NAME,
+    diff_snapshots,
+    ensure_snapshot,
+    has_snapshot,
+    open_store,
+    store_snapshot,
+)
+
+
+def _line(bill_code, ae, month, gross, air_date="2026-10-01", rev_type="Internal Ad Sales"):
+    row = [None] * 29
+    row[0] = bill_code
+    row[1] = air_date
+    row[15] = gross
+    row[18] = month
+    row[22] = ae
+    row[23] = rev_type
+    return row
+
+
+def _write_log(path, lines, pending=()):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Commercials"
+    ws.append([f"col{i}" for i in range(29)])
+    for line in lines:
+        ws.append(line)
+    if pending:
+        ws = wb.create_sheet("Pending")
+        ws.append([f"col{i}" for i in range(29)])
+        for line in pending:
+            ws.append(line)
+    wb.save(path)
+    return str(path)
+
+
+BASE_LINES = [
+    _line("Acme:Q1", "Alice", "Oct-26", 100.10),
+    _line("Acme:Q1", "Alice", "Oct-26", 100.10),
+    _line("Beta:Q2", "Bob", "Nov-26", 250),
+    _line("Gamma:Q3", "Bob", "Nov-26", 999, rev_type="Trade"),
+    _line("Delta:Q4", "Alice", None, 75),
+]
+
+
+@pytest.fixture()
+def store(tmp_path):
+    conn = open_store(str(tmp_path / "out"))
+    yield conn
+    conn.close()
+
+
+class TestSnapshot:
+    def test_skips_trade_and_monthless_lines(self, store, tmp_path):
+        path = _write_log(tmp_path / "Commercial Log 261001.xlsx", BASE_LINES)
+        assert store_snapshot(store, path) == 3
+
+        rows = {
+            (r["dimension"], r["key"]): (r["gross_cents"], r["row_count"])
+            for r in store.execute("SELECT * FROM snapshot_aggregates")
+        }
+        assert rows[("total", "")] == (45020, 3)
+        assert rows[("by_ae", "Alice")] == (20020, 2)
+        assert rows[("by_month", "Nov-26")] == (25000, 1)
+        assert ("by_bill_code", "Gamma:Q3") not in rows
+
+    def test_unchanged_file_is_not_reparsed(self, store, tmp_path, monkeypatch):
+        path = _write_log(tmp_path / "Commercial Log 261001.xlsx", BASE_LINES)
+        ensure_snapshot(store, path)
+        assert has_snapshot(store, path)
+
+        def fail(*args):
+            raise AssertionError("snapshot rebuilt")
+
+        monkeypatch.setattr(
+            "src.services.commercial_log_snapshot.store_snapshot", fail
+        )
+        ensure_snapshot(store, path)
+
+
+class TestDiff:
+    def test_aggregate_and_line_changes(self, store, tmp_path):
+        old = _write_log(tmp_path / "Commercial Log 261001.xlsx", BASE_LINES)
+        new = _write_log(
+            tmp_path / "Commercial Log 261002.xlsx",
+            [
+                BASE_LINES[0],  # one of the two Acme lines dropped
+                _line("Beta:Q2", "Bob", "Nov-26", 300),  # rate change
+                _line("Echo:Q5", "Carol", "Dec-26", 40),
+            ],
+            pending=[_line("Foxtrot:Q6", "Carol", "Dec-26", 10)],
+        )
+        ensure_snapshot(store, old)
+        ensure_snapshot(store, new)
+
+        deltas = diff_snapshots(store, old, new)
+
+        assert deltas["total_diff"] == {"old": 450.2, "new": 450.1, "diff": pytest.approx(-0.1)}
+        assert [(d["key"], d["diff"]) for d in deltas["by_ae"]] == [
+            ("Alice", -100.1), ("Bob", 50.0), ("Carol", 50.0),
+        ]
+        assert {d["key"] for d in deltas["by_month"]} == {"Oct-26", "Nov-26", "Dec-26"}
+
+        added = deltas["row_diffs"]["added"]
+        assert [(a["bill_code"], a["sheet"], a["count"]) for a in added] == [
+            ("Echo:Q5", "Commercials", 1),
+            ("Foxtrot:Q6", "Pending", 1),
+            ("Beta:Q2", "Commercials", 1),
+        ]
+        removed = deltas["row_diffs"]["removed"]
+        assert [(r["bill_code"], r["gross"], r["count"]) for r in removed] == [
+            ("Beta:Q2", 250.0, 1), ("Acme:Q1", 100.1, 1),
+        ]
+
+    def test_identical_files(self, store, tmp_path):
+        old = _write_log(tmp_path / "Commercial Log 261001.xlsx", BASE_LINES)
+        new = _write_log(tmp_path / "Commercial Log 261002.xlsx", BASE_LINES)
+        ensure_snapshot(store, old)
+        ensure_snapshot(store, new)
+
+        deltas = diff_snapshots(store, old, new)
+        assert deltas["total_diff"]["diff"] == 0
+        assert deltas["by_ae"] == deltas["by_bill_code"] == deltas["by_month"] == []
+        assert deltas["row_diffs"] == {"added": [], "removed": []}
+
+
+class TestDailyReport:
+    def test_writes_reports_and_keeps_todays_snapshot(self, tmp_path):
+        today = datetime.today()
+        yesterday = today - timedelta(days=1)
+        logs = tmp_path / "logs"
+        logs.mkdir()
+        _write_log(
+            logs / f"Commercial Log {yesterday.strftime('%y%m%d')}.xlsx", BASE_LINES
+        )
+        _write_log(
+            logs / f"Commercial Log {today.strftime('%y%m%d')}.xlsx",
+            BASE_LINES + [_line("New<Co>:Q9", "Dana", "Jan-27", 1234.5)],
+        )
+        # A stale snapshot from an earlier day
+        stale = _write_log(logs / "Commercial Log 200101.xlsx", BASE_LINES)
+        out = tmp_path / "reports"
+        conn = open_store(str(out))
+        store_snapshot(conn, stale)
+        conn.close()
+
+        daily_report.run_daily_report(str(logs), str(out))
+
+        day_dir = out / today.strftime("%Y-%m-%d")
+        md = (day_dir / "revenue_change_report.md").read_text()
+        assert "+$1,234.50" in md
+        assert "## Added Lines (1)" in md
+        html = (day_dir / "revenue_change_report.html").read_text()
+        assert "New&lt;Co&gt;:Q9" in html
+
+        conn = open_store(str(out))
+        kept = [r[0] for r in conn.execute(
+            "SELECT file_name FROM snapshot_files ORDER BY file_name"
+        )]
+        conn.close()
+        assert kept == [
+            f"Commercial Log {yesterday.strftime('%y%m%d')}.xlsx",
+            f"Commercial Log {today.strftime('%y%m%d')}.xlsx",
+        ]
+        assert (out / SNAPSHOT_DB_NAME).exists()
+
+    def test_missing_file(self, tmp_path, capsys):
+        daily_report.run_daily_report(str(tmp_path), str(tmp_path / "out"))
+        assert "File loading error" in capsys.readouterr().out
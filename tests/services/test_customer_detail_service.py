@@ -0,0 +1,225 @@
+"""Tests for CustomerDetailService's single-scan spot aggregate and its
+per-customer cache."""
+
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+import src.services.customer_detail_service as detail
+from src.services.customer_detail_service import (
+    CustomerDetailService,
+    clear_spot_aggregate_cache,
+)
+
+SCHEMA = """
+CREATE TABLE customers (
+    customer_id INTEGER PRIMARY KEY, normalized_name TEXT,
+    customer_type TEXT, is_active INTEGER DEFAULT 1, created_date TEXT,
+    notes TEXT, sector_id INTEGER, agency_id INTEGER
+);
+CREATE TABLE sectors (
+    sector_id INTEGER PRIMARY KEY, sector_code TEXT, sector_name TEXT
+);
+CREATE TABLE agencies (agency_id INTEGER PRIMARY KEY, agency_name TEXT);
+CREATE TABLE languages (language_code TEXT UNIQUE, language_name TEXT);
+CREATE TABLE markets (
+    market_id INTEGER PRIMARY KEY, market_code TEXT, market_name TEXT
+);
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY AUTOINCREMENT, customer_id INTEGER,
+    bill_code TEXT, air_date TEXT, broadcast_month TEXT, time_in TEXT,
+    length_seconds TEXT, gross_rate REAL, station_net REAL,
+    sales_person TEXT, language_code TEXT, market_id INTEGER,
+    revenue_type TEXT
+);
+CREATE INDEX idx_spots_customer_id ON spots(customer_id);
+CREATE TABLE entity_aliases (
+    alias_name TEXT, entity_type TEXT, target_entity_id INTEGER,
+    confidence_score INTEGER, created_date TEXT, is_active INTEGER
+);
+CREATE TABLE entity_contacts (
+    contact_id INTEGER PRIMARY KEY, entity_type TEXT, entity_id INTEGER,
+    contact_name TEXT, contact_title TEXT, email TEXT, phone TEXT,
+    contact_role TEXT, is_primary INTEGER, is_active INTEGER,
+    last_contacted TEXT, notes TEXT
+);
+CREATE TABLE reference_data_versions (
+    source TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0
+);
+INSERT INTO reference_data_versions VALUES ('spots', 0);
+
+INSERT INTO sectors VALUES (1, 'AUTO', 'Automotive');
+INSERT INTO customers VALUES
+    (1, 'Acme Motors', 'Regular', 1, '2024-01-01', NULL, 1, NULL),
+    (2, 'Other Co', 'Regular', 1, '2024-01-01', NULL, NULL, NULL);
+INSERT INTO languages VALUES ('E', 'English'), ('V', 'Vietnamese');
+INSERT INTO markets VALUES (1, 'SEA', 'Seattle'), (2, 'SFO', 'San Francisco');
+"""
+
+SPOTS = [
+    # customer, air_date, month, time, gross, net, ae, lang, market, type
+    (1, "2024-11-05", "Nov-24", "08:00", 100.0, 85.0, "Ann", "E", 1, None),
+    (1, "2024-12-02", "Dec-24", "09:00", 200.0, 170.0, "Ann", "V", 1, "Internal Ad Sales"),
+    (1, "2025-01-06", "Jan-25", "07:00", 300.0, 255.0, "Bob", "V", 2, "Internal Ad Sales"),
+    (1, "2025-01-06", "Jan-25", "10:00", 50.0, 42.5, None, None, None, "Internal Ad Sales"),
+    (1, "2025-01-07", "Jan-25", "10:00", 999.0, 999.0, "Ann", "E", 1, "Trade"),
+    (2, "2025-01-06", "Jan-25", "07:00", 70.0, 60.0, "Bob", "E", 1, None),
+]
+
+
+def _insert_spots(conn, rows):
+    conn.executemany(
+        "INSERT INTO spots (customer_id, air_date, broadcast_month, time_in,"
+        " gross_rate, station_net, sales_person, language_code, market_id,"
+        " revenue_type, bill_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'B')",
+        rows,
+    )
+    conn.commit()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    clear_spot_aggregate_cache()
+    c = sqlite3.connect(str(tmp_path / "detail.db"))
+    c.executescript(SCHEMA)
+    _insert_spots(c, SPOTS)
+    yield c
+    c.close()
+    clear_spot_aggregate_cache()
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Count aggregate scans."""
+    calls = []
+    original = CustomerDetailService._scan_spots
+
+    def counting(self, customer_id):
+        calls.append(customer_id)
+        return original(self, customer_id)
+
+    monkeypatch.setattr(CustomerDetailService, "_scan_spots", counting)
+    return calls
+
+
+class TestReport:
+    def test_sections(self, conn, scans):
+        report = CustomerDetailService(conn).get_customer_detail(1)
+
+        assert scans == [1]
+        s = report.summary
+        assert (s.normalized_name, s.sector_name) == ("Acme Motors", "Automotive")
+        assert s.lifetime_gross == Decimal("650.0")
+        assert s.lifetime_spots == 4
+        assert (s.first_air_date, s.last_air_date) == ("2024-11-05", "2025-01-06")
+        assert s.primary_ae == "Ann"  # 300 vs Bob's 300: ties go by name
+
+        pc = report.period_comparison
+        assert (pc.current_year, pc.current_year_gross, pc.prior_year_gross) == (
+            2025, Decimal("350.0"), Decimal("300.0"),
+        )
+
+        assert [m.broadcast_month for m in report.monthly_trend] == [
+            "Nov-24", "Dec-24", "Jan-25",
+        ]
+        assert [(l.language_code, l.language_name, l.spot_count)
+                for l in report.language_breakdown] == [
+            ("V", "Vietnamese", 2), ("E", "English", 1), ("Unknown", None, 1),
+        ]
+        assert report.language_breakdown[0].pct_of_total == pytest.approx(
+            500 / 650 * 100
+        )
+        assert [a.ae_name for a in report.ae_breakdown] == [
+            "Ann", "Bob", "Unassigned",
+        ]
+        assert [(m.market_code, m.market_name) for m in report.market_breakdown] == [
+            ("SEA", "Seattle"), ("SFO", "San Francisco"), ("Unknown", "Unknown"),
+        ]
+        assert [(r.air_date, r.time_in) for r in report.recent_spots] == [
+            ("2025-01-06", "10:00"), ("2025-01-06", "07:00"),
+            ("2024-12-02", "09:00"), ("2024-11-05", "08:00"),
+        ]
+
+    def test_date_filter(self, conn):
+        report = CustomerDetailService(conn).get_customer_detail(
+            1, "2024-12-01", "2024-12-31",
+        )
+        assert report.has_date_filter
+        assert report.summary.lifetime_spots == 1
+        assert report.summary.lifetime_gross == Decimal("200.0")
+        assert [m.broadcast_month for m in report.monthly_trend] == ["Dec-24"]
+
+    def test_unknown_customer(self, conn, scans):
+        assert CustomerDetailService(conn).get_customer_detail(99) is None
+        assert scans == []
+
+
+class TestCache:
+    def test_page_and_api_share_the_aggregate(self, conn, scans):
+        CustomerDetailService(conn).get_customer_detail(1)
+        trend = CustomerDetailService(conn)._get_monthly_trend(1, months=36)
+
+        assert len(trend) == 3
+        assert scans == [1]
+
+    def test_keyed_by_date_range(self, conn, scans):
+        CustomerDetailService(conn).get_customer_detail(1)
+        CustomerDetailService(conn).get_customer_detail(1, "2025-01-01", "")
+        CustomerDetailService(conn).get_customer_detail(1, "2025-01-01", "")
+        assert scans == [1, 1]
+
+    def test_new_spot_invalidates_only_that_customer(self, conn, scans):
+        CustomerDetailService(conn).get_customer_detail(1)
+        CustomerDetailService(conn).get_customer_detail(2)
+        _insert_spots(conn, [
+            (1, "2025-02-03", "Feb-25", "06:00", 10.0, 8.0, "Ann", "E", 1, None),
+        ])
+
+        report = CustomerDetailService(conn).get_customer_detail(1)
+        CustomerDetailService(conn).get_customer_detail(2)
+
+        assert report.summary.lifetime_spots == 5
+        assert scans == [1, 2, 1]
+
+    def test_moved_spots_invalidate_both_customers(self, conn, scans):
+        CustomerDetailService(conn).get_customer_detail(1)
+        CustomerDetailService(conn).get_customer_detail(2)
+        conn.execute("UPDATE spots SET customer_id = 1 WHERE customer_id = 2")
+        conn.commit()
+
+        assert CustomerDetailService(conn).get_customer_detail(
+            2
+        ).summary.lifetime_spots == 0
+        assert CustomerDetailService(conn).get_customer_detail(
+            1
+        ).summary.lifetime_spots == 5
+        assert scans == [1, 2, 2, 1]
+
+    def test_import_version_bump_invalidates(self, conn, scans):
+        CustomerDetailService(conn).get_customer_detail(1)
+        conn.execute("UPDATE spots SET gross_rate = 1000 WHERE spot_id = 1")
+        conn.execute(
+            "UPDATE reference_data_versions SET version = version + 1"
+            " WHERE source = 'spots'"
+        )
+        conn.commit()
+
+        report = CustomerDetailService(conn).get_customer_detail(1)
+        assert report.summary.lifetime_gross == Decimal("1550.0")
+        assert scans == [1, 1]
+
+    def test_lru_eviction(self, conn, scans, monkeypatch):
+        monkeypatch.setattr(detail, "AGGREGATE_CACHE_SIZE", 1)
+        CustomerDetailService(conn).get_customer_detail(1)
+        CustomerDetailService(conn).get_customer_detail(2)
+        CustomerDetailService(conn).get_customer_detail(1)
+        assert scans == [1, 2, 1]
+
+    def test_in_memory_database_is_not_cached(self, scans):
+        mem = sqlite3.connect(":memory:")
+        mem.executescript(SCHEMA)
+        _insert_spots(mem, SPOTS)
+        CustomerDetailService(mem).get_customer_detail(1)
+        CustomerDetailService(mem).get_customer_detail(1)
+        assert scans == [1, 1]
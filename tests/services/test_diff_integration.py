@@ -164,3 +164,83 @@ class TestNoChangeImport:
 
         assert ("OldClient:Gone", "999", "Mar-26") in diff.removed
         conn.close()
+
+
+class TestApplyDiffAliasBackfill:
+    def test_inserted_spots_resolve_through_aliases(self, db_path):
+        """_apply_diff inserts inside bulk_alias_load: spots without a
+        resolved customer get theirs from entity_aliases in one pass."""
+        from pathlib import Path
+        from types import SimpleNamespace
+
+        from src.database.connection import DatabaseConnection
+        from src.services.broadcast_month_import_service import (
+            BroadcastMonthImportService,
+        )
+        from src.services.import_diff import (
+            build_db_fingerprints,
+            build_excel_fingerprints,
+            compare_fingerprints,
+        )
+
+        migrations = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE entity_aliases (
+                alias_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                alias_name TEXT NOT NULL,
+                entity_type TEXT NOT NULL,
+                target_entity_id INTEGER NOT NULL,
+                is_active BOOLEAN DEFAULT 1,
+                UNIQUE(alias_name, entity_type)
+            );
+            INSERT INTO entity_aliases (alias_name, entity_type,
+                                        target_entity_id)
+            VALUES ('Acme:Widget', 'customer', 42);
+        """)
+        for name in (
+            "022_alias_spot_backfill_triggers.sql",
+            "023_spot_insert_alias_lookup_trigger.sql",
+            "035_bulk_alias_backfill.sql",
+        ):
+            conn.executescript((migrations / name).read_text())
+        conn.execute(
+            "INSERT INTO spots (bill_code, contract, broadcast_month,"
+            " spot_value, air_date) VALUES (?,?,?,?,?)",
+            ("Beta:Gizmo", "200", "Mar-26", 500.00, "2026-03-01"),
+        )
+        conn.commit()
+
+        excel_rows = [
+            _make_row("Acme:Widget", "100", "2026-03-01", 150.00),
+            _make_row("Acme:Widget", "100", "2026-03-02", 250.00),
+            _make_row("Beta:Gizmo", "200", "2026-03-01", 500.00),
+        ]
+        excel_fps, grouped, _ = build_excel_fingerprints(excel_rows)
+        diff = compare_fingerprints(
+            excel_fps, build_db_fingerprints(["Mar-26"], conn)
+        )
+        context = SimpleNamespace(
+            excel_analysis=SimpleNamespace(file_path="daily.xlsx"),
+            batch_id="batch-1",
+            months_to_process=["Mar-26"],
+            phase_timer=None,
+        )
+
+        service = BroadcastMonthImportService(DatabaseConnection(db_path))
+        deleted, imported = service._apply_diff(diff, grouped, context, conn)
+        conn.commit()
+
+        assert (deleted, imported) == (0, 2)
+        assert conn.execute(
+            "SELECT bill_code, customer_id FROM spots ORDER BY spot_id"
+        ).fetchall() == [
+            ("Beta:Gizmo", None),
+            ("Acme:Widget", 42),
+            ("Acme:Widget", 42),
+        ]
+        assert conn.execute(
+            "SELECT (SELECT COUNT(*) FROM alias_backfill_session)"
+            " + (SELECT COUNT(*) FROM alias_backfill_pending)"
+        ).fetchone()[0] == 0
+        conn.close()
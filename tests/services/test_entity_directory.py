@@ -0,0 +1,614 @@
+"""Tests for the entity_directory snapshot (migrations 036, 037)."""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.services.entity_directory import (
+    DIRECTORY_SORTS,
+    directory_tags_exist,
+    filter_entities,
+    list_directory,
+    query_directory,
+    rebuild_directory,
+    sector_customers,
+    stale_entities,
+    stale_summary,
+)
+from src.services.entity_service import EntityService
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE agencies (
+    agency_id INTEGER PRIMARY KEY,
+    agency_name TEXT UNIQUE,
+    address TEXT, city TEXT, state TEXT, zip TEXT,
+    notes TEXT,
+    assigned_ae TEXT,
+    is_active INTEGER DEFAULT 1,
+    created_date TEXT DEFAULT '2020-01-01',
+    updated_date TEXT
+);
+CREATE TABLE customers (
+    customer_id INTEGER PRIMARY KEY,
+    normalized_name TEXT UNIQUE,
+    sector_id INTEGER,
+    agency_id INTEGER,
+    address TEXT, city TEXT, state TEXT, zip TEXT,
+    notes TEXT,
+    assigned_ae TEXT,
+    is_active INTEGER DEFAULT 1,
+    created_date TEXT DEFAULT '2020-01-01',
+    updated_date TEXT
+);
+CREATE TABLE sectors (
+    sector_id INTEGER PRIMARY KEY,
+    sector_code TEXT,
+    sector_name TEXT
+);
+CREATE TABLE customer_sectors (
+    customer_id INTEGER,
+    sector_id INTEGER,
+    is_primary INTEGER DEFAULT 0,
+    assigned_date TEXT,
+    assigned_by TEXT,
+    PRIMARY KEY (customer_id, sector_id)
+);
+CREATE TABLE entity_contacts (
+    contact_id INTEGER PRIMARY KEY,
+    entity_type TEXT,
+    entity_id INTEGER,
+    contact_name TEXT,
+    contact_title TEXT,
+    email TEXT,
+    phone TEXT,
+    is_primary INTEGER DEFAULT 0,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE entity_addresses (
+    address_id INTEGER PRIMARY KEY,
+    entity_type TEXT,
+    entity_id INTEGER,
+    address TEXT, city TEXT, state TEXT, zip TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE entity_aliases (
+    alias_id INTEGER PRIMARY KEY,
+    alias_name TEXT,
+    entity_type TEXT,
+    target_entity_id INTEGER,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE entity_metrics (
+    entity_type TEXT, entity_id INTEGER, markets TEXT,
+    last_active TEXT, total_revenue REAL DEFAULT 0,
+    spot_count INTEGER DEFAULT 0, agency_spot_count INTEGER DEFAULT 0,
+    updated_at TEXT,
+    PRIMARY KEY (entity_type, entity_id)
+);
+CREATE TABLE entity_signals (
+    entity_type TEXT, entity_id INTEGER, signal_type TEXT,
+    signal_label TEXT, signal_priority INTEGER,
+    trailing_revenue REAL, prior_revenue REAL, computed_at TEXT,
+    PRIMARY KEY (entity_type, entity_id, signal_type)
+);
+
+INSERT INTO sectors VALUES (1, 'AUTO', 'Automotive'), (2, 'FOOD', 'Food');
+INSERT INTO agencies (agency_id, agency_name, assigned_ae) VALUES
+    (1, 'Acme Media', 'Pat'), (2, 'Idle Agency', NULL);
+INSERT INTO customers (customer_id, normalized_name, sector_id, agency_id,
+                       created_date) VALUES
+    (10, 'Golden Dragon', 2, 1, '2020-01-01'),
+    (11, 'Acme Media:Car Lot', 1, 1, '2020-01-01'),
+    (12, 'Orphan:Client', NULL, NULL, '2020-01-01'),
+    (13, 'Old Diner', 2, NULL, '2020-01-01'),
+    (14, 'Brand New', NULL, NULL, '2999-01-01'),
+    (15, 'WorldLink Shopping', 1, NULL, '2020-01-01');
+INSERT INTO customer_sectors (customer_id, sector_id, is_primary,
+                              assigned_date, assigned_by) VALUES
+    (10, 2, 1, '2025-03-01 10:00:00', 'jane'), (10, 1, 0, NULL, 'jane');
+INSERT INTO entity_contacts (entity_type, entity_id, contact_name,
+                             is_primary) VALUES
+    ('agency', 1, 'Ann', 1), ('agency', 1, 'Bob', 0),
+    ('customer', 10, 'Cy', 0);
+INSERT INTO entity_aliases (alias_name, entity_type, target_entity_id) VALUES
+    ('GOLDEN DRAGON SEA', 'customer', 10), ('ACME', 'agency', 1);
+INSERT INTO entity_metrics (entity_type, entity_id, markets, last_active,
+                            total_revenue, spot_count,
+                            agency_spot_count) VALUES
+    ('agency', 1, 'SEA', '2025-06-01', 900, 9, 0),
+    ('customer', 10, 'SEA,SFO', '2025-06-01', 700, 7, 7),
+    ('customer', 11, 'SEA', '2025-05-01', 200, 2, 2),
+    ('customer', 13, 'LAX', '2021-02-01', 50, 3, 0),
+    ('customer', 15, 'SEA', '2025-06-01', 400, 4, 0);
+INSERT INTO entity_signals (entity_type, entity_id, signal_type,
+                            signal_label, signal_priority) VALUES
+    ('customer', 10, 'declining', 'Declining', 2),
+    ('customer', 10, 'churned', 'Churned', 1);
+"""
+
+
+@pytest.fixture()
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    for name in ("036_entity_directory.sql",
+                 "037_entity_directory_filters.sql"):
+        conn.executescript((MIGRATIONS / name).read_text())
+    yield conn
+    conn.close()
+
+
+def _legacy(conn, include_inactive=False):
+    service = EntityService.__new__(EntityService)
+    return service._list_entities_from_sources(conn, include_inactive)
+
+
+def _row(conn, entity_type, entity_id):
+    return conn.execute(
+        "SELECT * FROM entity_directory "
+        "WHERE entity_type = ? AND entity_id = ?",
+        (entity_type, entity_id),
+    ).fetchone()
+
+
+class TestListDirectory:
+    @pytest.mark.parametrize("include_inactive", [False, True])
+    def test_matches_source_tables(self, conn, include_inactive):
+        conn.execute("UPDATE agencies SET is_active = 0 WHERE agency_id = 2")
+        assert list_directory(conn, include_inactive) == _legacy(
+            conn, include_inactive
+        )
+
+    def test_row_contents(self, conn):
+        rows = {
+            (r["entity_type"], r["entity_id"]): r
+            for r in list_directory(conn)
+        }
+        assert ("customer", 12) not in rows  # colon name, no agency
+
+        agency = rows[("agency", 1)]
+        assert agency["contact_count"] == 2
+        assert agency["primary_contact"] == "Ann"
+        assert agency["client_count"] == 2
+        assert agency["sector_count"] == 2
+        assert agency["spot_count"] == 9
+
+        customer = rows[("customer", 10)]
+        assert customer["agency_name"] == "Acme Media"
+        assert customer["agency_booked"] is True
+        assert customer["sector_count"] == 2
+        assert [s["signal_type"] for s in customer["signals"]] == [
+            "churned", "declining"
+        ]
+        assert rows[("customer", 13)]["signals"] == []
+
+    def test_entity_service_reads_directory(self, conn):
+        service = EntityService.__new__(EntityService)
+        conn.execute(
+            "UPDATE entity_directory SET notes = 'snapshot' "
+            "WHERE entity_type = 'customer' AND entity_id = 10"
+        )
+        row = next(r for r in service.list_entities(conn)
+                   if r["entity_id"] == 10)
+        assert row["notes"] == "snapshot"
+
+
+class TestMaintenance:
+    def test_child_rows_refresh_their_entity(self, conn):
+        conn.execute(
+            "INSERT INTO entity_contacts (entity_type, entity_id, "
+            "contact_name, is_primary) VALUES ('customer', 13, 'Dee', 1)"
+        )
+        conn.execute(
+            "UPDATE entity_aliases SET is_active = 0 "
+            "WHERE alias_name = 'ACME'"
+        )
+        conn.execute(
+            "INSERT INTO customer_sectors (customer_id, sector_id) "
+            "VALUES (13, 1)"
+        )
+        conn.execute("DELETE FROM entity_signals WHERE entity_id = 10")
+
+        assert _row(conn, "customer", 13)["primary_contact"] == "Dee"
+        assert _row(conn, "customer", 13)["sector_count"] == 1
+        assert _row(conn, "agency", 1)["alias_count"] == 0
+        assert _row(conn, "customer", 10)["signals"] == "[]"
+
+    def test_customer_moves_between_agencies(self, conn):
+        conn.execute("UPDATE customers SET agency_id = 2 WHERE customer_id = 10")
+        assert _row(conn, "agency", 1)["client_count"] == 1
+        assert _row(conn, "agency", 1)["sector_name"] == "Automotive"
+        assert _row(conn, "agency", 2)["client_count"] == 1
+        assert _row(conn, "customer", 10)["agency_name"] == "Idle Agency"
+
+    def test_agency_and_sector_renames(self, conn):
+        conn.execute(
+            "UPDATE agencies SET agency_name = 'Acme Group' "
+            "WHERE agency_id = 1"
+        )
+        conn.execute(
+            "UPDATE sectors SET sector_name = 'Dining' WHERE sector_id = 2"
+        )
+        assert _row(conn, "customer", 10)["agency_name"] == "Acme Group"
+        assert _row(conn, "customer", 13)["sector_name"] == "Dining"
+        assert _row(conn, "agency", 1)["sector_name"] in (
+            "Dining,Automotive", "Automotive,Dining"
+        )
+
+    def test_metrics_rewrite_and_deletes(self, conn):
+        conn.execute("DELETE FROM entity_metrics")
+        conn.execute(
+            "INSERT INTO entity_metrics (entity_type, entity_id, "
+            "total_revenue, spot_count) VALUES ('customer', 13, 75, 4)"
+        )
+        conn.execute("DELETE FROM customers WHERE customer_id = 14")
+
+        assert _row(conn, "customer", 13)["total_revenue"] == 75
+        assert _row(conn, "customer", 10)["spot_count"] == 0
+        assert _row(conn, "customer", 14) is None
+        before = [tuple(r) for r in conn.execute(
+            "SELECT * FROM entity_directory ORDER BY 1, 2")]
+        assert rebuild_directory(conn) == len(before)
+        assert [tuple(r) for r in conn.execute(
+            "SELECT * FROM entity_directory ORDER BY 1, 2")] == before
+
+
+class TestStaleEntities:
+    def test_categories_and_grace_period(self, conn):
+        rows, total = stale_entities(
+            conn, cutoff="2024-01-01", grace_cutoff="2026-01-01"
+        )
+        assert [(r["entity_name"], r["category"]) for r in rows] == [
+            ("Idle Agency", "zero_spot"),
+            ("Old Diner", "stale"),
+            ("Orphan:Client", "zero_spot"),
+        ]
+        assert total == 3
+        orphan = rows[2]
+        assert orphan["is_agency_client"] is True
+        assert orphan["alias_count"] == 0
+
+    def test_filters_sort_and_paging(self, conn):
+        rows, total = stale_entities(
+            conn, cutoff="2024-01-01", grace_cutoff="2026-01-01",
+            sort="spots", limit=1, offset=0,
+        )
+        assert total == 3
+        assert [r["entity_name"] for r in rows] == ["Old Diner"]
+
+        rows, total = stale_entities(
+            conn, cutoff="2024-01-01", grace_cutoff="2026-01-01",
+            entity_type="customer", category="zero_spot",
+        )
+        assert [r["entity_name"] for r in rows] == ["Orphan:Client"]
+
+        rows, _ = stale_entities(
+            conn, cutoff="2024-01-01", grace_cutoff="2026-01-01",
+            sector_id=2,
+        )
+        assert [r["entity_name"] for r in rows] == ["Old Diner"]
+
+    def test_summary(self, conn):
+        summary = stale_summary(conn, "2024-01-01", "2026-01-01")
+        assert summary == {
+            ("agency", "zero_spot"): {"count": 1, "revenue": 0.0},
+            ("customer", "stale"): {"count": 1, "revenue": 50.0},
+            ("customer", "zero_spot"): {"count": 1, "revenue": 0.0},
+        }
+
+
+class TestSectorCustomers:
+    def test_revenue_customers_without_worldlink(self, conn):
+        rows, total = sector_customers(conn)
+        assert [r["entity_name"] for r in rows] == [
+            "Acme Media:Car Lot", "Golden Dragon", "Old Diner"
+        ]
+        assert total == 3
+        dragon = rows[1]
+        assert dragon["sector_assigned_by"] == "jane"
+        assert dragon["total_revenue"] == 700
+
+    def test_worldlink_alias_excludes_customer(self, conn):
+        conn.execute(
+            "INSERT INTO entity_aliases (alias_name, entity_type, "
+            "target_entity_id) VALUES ('Worldlink:Old Diner', 'customer', 13)"
+        )
+        rows, _ = sector_customers(conn)
+        assert "Old Diner" not in [r["entity_name"] for r in rows]
+
+    def test_search_sector_and_paging(self, conn):
+        rows, total = sector_customers(conn, sort="revenue", limit=2,
+                                       offset=1)
+        assert total == 3
+        assert [r["entity_name"] for r in rows] == [
+            "Acme Media:Car Lot", "Old Diner"
+        ]
+        rows, _ = sector_customers(conn, search="dragon")
+        assert [r["entity_name"] for r in rows] == ["Golden Dragon"]
+        rows, _ = sector_customers(conn, sector="Automotive")
+        assert [r["entity_name"] for r in rows] == ["Acme Media:Car Lot"]
+
+
+SPOTS = """
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY,
+    agency_id INTEGER,
+    customer_id INTEGER,
+    air_date TEXT,
+    gross_rate REAL,
+    revenue_type TEXT
+);
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 7)
+INSERT INTO spots (agency_id, customer_id, air_date, gross_rate)
+SELECT 1, 10, '2025-06-01', 100 FROM n;
+INSERT INTO spots (agency_id, customer_id, air_date, gross_rate) VALUES
+    (1, 11, '2025-05-01', 100), (1, 11, '2025-04-01', 100),
+    (NULL, 13, '2021-02-01', 50), (NULL, 13, '2021-01-01', 0),
+    (NULL, 15, '2025-06-01', 400);
+INSERT INTO spots (customer_id, air_date, gross_rate, revenue_type)
+VALUES (13, '2020-06-01', 75, 'Trade');
+"""
+
+
+@pytest.fixture()
+def source_conn():
+    """The fixture data with spots and without migration 036."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    conn.executescript(SPOTS)
+    yield conn
+    conn.close()
+
+
+class TestWithoutDirectory:
+    def test_stale_entities_from_source_tables(self, source_conn):
+        rows, total = stale_entities(
+            source_conn, cutoff="2024-01-01", grace_cutoff="2026-01-01",
+            sort="spots",
+        )
+        assert [(r["entity_name"], r["category"]) for r in rows] == [
+            ("Old Diner", "stale"),
+            ("Idle Agency", "zero_spot"),
+            ("Orphan:Client", "zero_spot"),
+        ]
+        assert total == 3
+        diner = rows[0]
+        assert diner["spot_count"] == 3
+        assert diner["total_revenue"] == 50
+        assert diner["sector_name"] == "Food"
+
+        rows, _ = stale_entities(
+            source_conn, cutoff="2024-01-01", grace_cutoff="2026-01-01",
+            entity_type="customer", category="zero_spot", limit=5,
+        )
+        assert [r["entity_name"] for r in rows] == ["Orphan:Client"]
+
+    def test_stale_summary_from_source_tables(self, source_conn):
+        summary = stale_summary(source_conn, "2024-01-01", "2026-01-01")
+        assert summary == {
+            ("agency", "zero_spot"): {"count": 1, "revenue": 0.0},
+            ("customer", "stale"): {"count": 1, "revenue": 50.0},
+            ("customer", "zero_spot"): {"count": 1, "revenue": 0.0},
+        }
+
+    def test_sector_customers_from_source_tables(self, source_conn):
+        rows, total = sector_customers(source_conn, sort="revenue")
+        assert [r["entity_name"] for r in rows] == [
+            "Golden Dragon", "Acme Media:Car Lot", "Old Diner"
+        ]
+        assert total == 3
+        assert rows[0]["sector_assigned_by"] == "jane"
+        # Trade spots count toward neither figure
+        assert (rows[2]["total_revenue"], rows[2]["spot_count"]) == (50, 2)
+
+
+def _names(result):
+    return [r["entity_name"] for r in result["items"]]
+
+
+class TestQueryDirectory:
+    def test_unfiltered_matches_list(self, conn):
+        result = query_directory(conn)
+        assert sorted(result["items"], key=lambda r: (
+            r["entity_type"], r["entity_id"])) == sorted(
+            list_directory(conn), key=lambda r: (
+                r["entity_type"], r["entity_id"]))
+        assert _names(result)[:3] == [
+            "Acme Media", "Acme Media:Car Lot", "Brand New"
+        ]
+        assert result["total"] == 7
+        assert result["next_cursor"] is None
+        assert result["stats"] == {
+            "agencies": 2, "customers": 5,
+            "with_contacts": 2, "needs_attention": 1,
+        }
+
+    def test_filters(self, conn):
+        assert _names(query_directory(conn, search="ANN")) == ["Acme Media"]
+        assert _names(query_directory(conn, search="acme")) == [
+            "Acme Media", "Acme Media:Car Lot", "Golden Dragon"
+        ]
+        assert _names(query_directory(conn, ae="__none__",
+                                      entity_type="agency")) == [
+            "Idle Agency"
+        ]
+        assert _names(query_directory(conn, has_contacts="yes")) == [
+            "Acme Media", "Golden Dragon"
+        ]
+        # customer_sectors rows, not the legacy customers.sector_id
+        assert _names(query_directory(conn, sector_id="1")) == [
+            "Acme Media", "Golden Dragon"
+        ]
+
+    def test_market_and_signal_keep_parent_agencies(self, conn):
+        assert _names(query_directory(conn, market="SFO")) == [
+            "Acme Media", "Golden Dragon"
+        ]
+        assert _names(query_directory(conn, market="LAX")) == ["Old Diner"]
+        result = query_directory(conn, signal="attention")
+        assert _names(result) == ["Acme Media", "Golden Dragon"]
+        assert result["stats"]["needs_attention"] == 1
+        assert _names(query_directory(conn, signal="churned",
+                                      entity_type="customer")) == [
+            "Golden Dragon"
+        ]
+        assert "Golden Dragon" not in _names(
+            query_directory(conn, signal="clean"))
+        # The parent must itself pass the earlier filters
+        assert _names(query_directory(conn, market="SFO",
+                                      entity_type="customer")) == [
+            "Golden Dragon"
+        ]
+
+    def test_hide_agency_booked(self, conn):
+        result = query_directory(conn, hide_agency_booked=True)
+        assert "Golden Dragon" not in _names(result)
+        assert "Acme Media:Car Lot" not in _names(result)
+        assert result["stats"]["customers"] == 3
+
+    @pytest.mark.parametrize("sort", sorted(DIRECTORY_SORTS))
+    def test_keyset_pages_follow_full_order(self, conn, sort):
+        expected = _names(query_directory(conn, sort=sort,
+                                          include_inactive=True))
+        seen, cursor = [], None
+        while True:
+            page = query_directory(conn, sort=sort, include_inactive=True,
+                                   limit=2, cursor=cursor)
+            assert page["total"] == len(expected)
+            seen.extend(_names(page))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+    def test_sort_orders(self, conn):
+        assert _names(query_directory(conn, sort="revenue"))[:3] == [
+            "Acme Media", "Golden Dragon", "WorldLink Shopping"
+        ]
+        assert _names(query_directory(conn, sort="signal"))[0] == (
+            "Golden Dragon"
+        )
+        assert _names(query_directory(conn, sort="last_active"))[-2:] == [
+            "Brand New", "Idle Agency"
+        ]
+
+    def test_search_uses_index_when_present(self, conn):
+        assert _names(query_directory(conn, search="dragon sea")) == []
+        conn.executescript((MIGRATIONS / "038_entity_search.sql").read_text())
+        assert _names(query_directory(conn, search="dragon sea")) == [
+            "Golden Dragon"
+        ]
+        # Columns outside the index are still matched
+        assert _names(query_directory(conn, search="food")) == [
+            "Acme Media", "Golden Dragon", "Old Diner"
+        ]
+
+    def test_fields_and_bad_input(self, conn):
+        result = query_directory(conn, fields=["entity_name", "signals"],
+                                 limit=1)
+        assert result["items"] == [{
+            "entity_type": "agency", "entity_id": 1,
+            "entity_name": "Acme Media", "signals": [],
+        }]
+        with pytest.raises(ValueError):
+            query_directory(conn, fields=["normalized_name"])
+        with pytest.raises(ValueError):
+            query_directory(conn, cursor="not-a-cursor")
+
+    def test_tags_follow_directory_changes(self, conn):
+        conn.execute(
+            "UPDATE entity_metrics SET markets = 'LAX,SEA' "
+            "WHERE entity_type = 'customer' AND entity_id = 13"
+        )
+        conn.execute(
+            "INSERT INTO entity_signals (entity_type, entity_id, "
+            "signal_type, signal_priority) VALUES ('customer', 13, "
+            "'gone_quiet', 3)"
+        )
+        assert "Old Diner" in _names(query_directory(conn, market="SEA"))
+        assert "Old Diner" in _names(
+            query_directory(conn, signal="attention"))
+
+        conn.execute("DELETE FROM customers WHERE customer_id = 13")
+        assert conn.execute(
+            "SELECT COUNT(*) FROM entity_directory_tags "
+            "WHERE entity_type = 'customer' AND entity_id = 13"
+        ).fetchone()[0] == 0
+
+
+class TestFilterEntities:
+    """filter_entities() must agree with query_directory()."""
+
+    CASES = [
+        {},
+        {"search": "acme"},
+        {"search": "ANN"},
+        {"ae": "__none__", "entity_type": "agency"},
+        {"has_contacts": "yes"},
+        {"has_contacts": "no"},
+        {"sector_id": "1"},
+        {"market": "SFO"},
+        {"market": "SFO", "entity_type": "customer"},
+        {"signal": "attention"},
+        {"signal": "churned"},
+        {"signal": "clean"},
+        {"hide_agency_booked": True},
+    ]
+
+    @pytest.mark.parametrize("include_inactive", [False, True])
+    @pytest.mark.parametrize("case", CASES)
+    def test_filters_match_query_directory(self, conn, case,
+                                           include_inactive):
+        rows = list_directory(conn, include_inactive)
+        expected = query_directory(
+            conn, include_inactive=include_inactive, **case
+        )
+        result = filter_entities(rows, **case)
+        assert _names(result) == _names(expected)
+        assert result["total"] == expected["total"]
+        assert result["stats"] == expected["stats"]
+
+    @pytest.mark.parametrize("sort", sorted(DIRECTORY_SORTS))
+    def test_sorts_and_pages_match_query_directory(self, conn, sort):
+        rows = list_directory(conn, include_inactive=True)
+        expected = _names(query_directory(conn, sort=sort,
+                                          include_inactive=True))
+        seen, cursor = [], None
+        while True:
+            page = filter_entities(rows, sort=sort, limit=2, cursor=cursor)
+            seen.extend(_names(page))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+    def test_fields_and_bad_input(self, conn):
+        rows = list_directory(conn)
+        result = filter_entities(rows, fields=["entity_name", "signals"],
+                                 limit=1)
+        assert result["items"] == [{
+            "entity_type": "agency", "entity_id": 1,
+            "entity_name": "Acme Media", "signals": [],
+        }]
+        with pytest.raises(ValueError):
+            filter_entities(rows, fields=["normalized_name"])
+        with pytest.raises(ValueError):
+            filter_entities(rows, cursor="not-a-cursor")
+
+    def test_without_migrations(self, conn):
+        """Rows from the source tables, as the address book reads them
+        before migrations 036 and 037."""
+        source = sqlite3.connect(":memory:")
+        source.row_factory = sqlite3.Row
+        source.executescript(SCHEMA)
+        assert not directory_tags_exist(source)
+        result = filter_entities(_legacy(source), market="SFO",
+                                 sort="revenue")
+        assert _names(result) == _names(
+            query_directory(conn, market="SFO", sort="revenue")
+        )
+        source.close()
@@ -243,6 +243,30 @@ class TestAutoRefreshIfEmpty:
         ).fetchone()[0]
         assert count > 0
 
+    def test_auto_refresh_if_empty_queues_job(self, service, conn):
+        from pathlib import Path
+        from src.services.background_jobs import JobWorker
+
+        migration = (
+            Path(__file__).resolve().parents[2]
+            / "sql" / "migrations" / "030_background_jobs.sql"
+        )
+        conn.executescript(migration.read_text())
+        _insert_spot(conn, 1, customer_id=50, gross_rate=5000)
+        conn.commit()
+
+        assert service.auto_refresh_if_empty(conn) is True
+        count = conn.execute(
+            "SELECT COUNT(*) FROM entity_metrics"
+        ).fetchone()[0]
+        assert count == 0
+
+        assert JobWorker(service.db_connection).run_until_empty() == 1
+        count = conn.execute(
+            "SELECT COUNT(*) FROM entity_metrics"
+        ).fetchone()[0]
+        assert count > 0
+
 
 class TestRefreshMetricsForIds:
     def test_refresh_metrics_for_specific_ids(self, service, conn):
@@ -0,0 +1,177 @@
+"""Tests for the entity_search FTS index (migration 038)."""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.services.entity_search import (
+    rebuild_search_index,
+    search_entities,
+)
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE agencies (
+    agency_id INTEGER PRIMARY KEY,
+    agency_name TEXT UNIQUE,
+    address TEXT, city TEXT, state TEXT, zip TEXT,
+    notes TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE customers (
+    customer_id INTEGER PRIMARY KEY,
+    normalized_name TEXT UNIQUE,
+    agency_id INTEGER,
+    address TEXT, city TEXT, state TEXT, zip TEXT,
+    notes TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE entity_aliases (
+    alias_id INTEGER PRIMARY KEY,
+    alias_name TEXT,
+    entity_type TEXT,
+    target_entity_id INTEGER,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE entity_contacts (
+    contact_id INTEGER PRIMARY KEY,
+    entity_type TEXT,
+    entity_id INTEGER,
+    contact_name TEXT,
+    contact_title TEXT,
+    email TEXT,
+    phone TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE entity_addresses (
+    address_id INTEGER PRIMARY KEY,
+    entity_type TEXT,
+    entity_id INTEGER,
+    address TEXT, city TEXT, state TEXT, zip TEXT,
+    is_active INTEGER DEFAULT 1
+);
+
+INSERT INTO agencies (agency_id, agency_name, city) VALUES
+    (1, 'Acme Media', 'Seattle'), (2, 'Dragon Agency', NULL);
+INSERT INTO customers (customer_id, normalized_name, notes, is_active)
+VALUES
+    (10, 'Golden Dragon', 'dim sum, weekends only', 1),
+    (11, 'Golden Gate Motors', NULL, 1),
+    (12, 'Dragonfly Spa', NULL, 0),
+    (13, 'Pho Saigon', NULL, 1);
+INSERT INTO entity_aliases (alias_name, entity_type, target_entity_id)
+VALUES ('GOLDEN DRAGON SEA', 'customer', 10),
+       ('PHO SGN', 'customer', 13);
+INSERT INTO entity_contacts (entity_type, entity_id, contact_name, email,
+                             phone)
+VALUES ('customer', 13, 'Linh Tran', 'linh@phosaigon.com', '206-555-0199');
+INSERT INTO entity_addresses (entity_type, entity_id, address, city)
+VALUES ('customer', 11, '400 Harbor Way', 'Tacoma');
+"""
+
+
+@pytest.fixture()
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    conn.executescript((MIGRATIONS / "038_entity_search.sql").read_text())
+    yield conn
+    conn.close()
+
+
+def _hits(results):
+    return [(r["entity_name"], r["matched_on"]) for r in results]
+
+
+class TestSearchEntities:
+    def test_substring_tiers(self, conn):
+        assert _hits(search_entities(conn, "dragon")) == [
+            ("Dragon Agency", "name"),
+            ("Golden Dragon", "name"),
+        ]
+        assert _hits(search_entities(conn, "0199")) == [
+            ("Pho Saigon", "contact")
+        ]
+        assert _hits(search_entities(conn, "harbor")) == [
+            ("Golden Gate Motors", "address")
+        ]
+        assert _hits(search_entities(conn, "dim sum")) == [
+            ("Golden Dragon", "notes")
+        ]
+        assert _hits(search_entities(conn, "SGN")) == [
+            ("Pho Saigon", "alias")
+        ]
+
+    def test_filters(self, conn):
+        assert _hits(search_entities(conn, "dragon",
+                                     entity_type="customer")) == [
+            ("Golden Dragon", "name")
+        ]
+        assert ("Dragonfly Spa", "name") in _hits(
+            search_entities(conn, "dragon", include_inactive=True))
+        assert len(search_entities(conn, "golden", limit=1)) == 1
+
+    def test_near_misses(self, conn):
+        results = search_entities(conn, "golden dargon")
+        assert results[0]["entity_name"] == "Golden Dragon"
+        assert 0 < results[0]["score"] < 1
+        assert _hits(search_entities(conn, "pho saigonn"))[0] == (
+            "Pho Saigon", "name"
+        )
+        assert search_entities(conn, "zzzz") == []
+
+    def test_short_queries_scan_names(self, conn):
+        assert _hits(search_entities(conn, "ph")) == [("Pho Saigon", "name")]
+        assert search_entities(conn, "%") == []
+        assert search_entities(conn, " ") == []
+
+
+class TestMaintenance:
+    def test_writes_refresh_their_entity(self, conn):
+        conn.execute(
+            "UPDATE customers SET normalized_name = 'Jade Palace' "
+            "WHERE customer_id = 10"
+        )
+        conn.execute(
+            "UPDATE entity_aliases SET is_active = 0 "
+            "WHERE alias_name = 'PHO SGN'"
+        )
+        conn.execute(
+            "INSERT INTO entity_contacts (entity_type, entity_id, "
+            "contact_name) VALUES ('agency', 1, 'Quincy Adams')"
+        )
+        conn.execute(
+            "UPDATE entity_addresses SET entity_id = 13 "
+            "WHERE address_id = 1"
+        )
+        conn.execute("DELETE FROM agencies WHERE agency_id = 2")
+
+        assert _hits(search_entities(conn, "jade")) == [
+            ("Jade Palace", "name")
+        ]
+        assert _hits(search_entities(conn, "dragon sea")) == [
+            ("Jade Palace", "alias")
+        ]
+        assert search_entities(conn, "SGN") == []
+        assert _hits(search_entities(conn, "quincy")) == [
+            ("Acme Media", "contact")
+        ]
+        assert _hits(search_entities(conn, "harbor")) == [
+            ("Pho Saigon", "address")
+        ]
+        assert "Dragon Agency" not in [
+            r["entity_name"] for r in search_entities(conn, "agency")
+        ]
+
+    def test_rebuild_matches_triggers(self, conn):
+        conn.execute(
+            "INSERT INTO customers (customer_id, normalized_name, city) "
+            "VALUES (14, 'Harbor Fish', 'Everett')"
+        )
+        before = [tuple(r) for r in conn.execute(
+            "SELECT rowid, * FROM entity_search ORDER BY rowid")]
+        assert rebuild_search_index(conn) == len(before)
+        assert [tuple(r) for r in conn.execute(
+            "SELECT rowid, * FROM entity_search ORDER BY rowid")] == before
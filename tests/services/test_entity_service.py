@@ -433,6 +433,70 @@ class TestGetAgencyCustomers:
         result = service.get_agency_customers(conn, 9999)
         assert result["error"] == "Agency not found"
 
+    def test_combines_spot_prefix_and_assigned_sources(
+        self, service, conn
+    ):
+        aid = _seed_agency(conn, "Prefix Agency")
+        via_spots = _seed_customer(conn, "Spot Client")
+        via_alias = _seed_customer(conn, "PA:Alias Client")
+        assigned = _seed_customer(conn, "Assigned", agency_id=aid)
+        _seed_customer(conn, "Other:Unrelated")
+        conn.execute(
+            "INSERT INTO entity_aliases "
+            "(entity_type, alias_name, target_entity_id) "
+            "VALUES ('agency', 'PA', ?)", [aid]
+        )
+        conn.executemany(
+            "INSERT INTO spots "
+            "(agency_id, customer_id, gross_rate, revenue_type) "
+            "VALUES (?, ?, ?, ?)",
+            [(aid, via_spots, 500, "Cash"),
+             (aid, via_spots, 900, "Trade"),
+             (None, via_spots, 10000, "Cash")],
+        )
+        conn.execute(
+            "INSERT INTO entity_metrics "
+            "(entity_type, entity_id, total_revenue, spot_count) "
+            "VALUES ('customer', ?, 300, 4)", [via_alias]
+        )
+        conn.commit()
+
+        result = service.get_agency_customers(conn, aid)
+        by_id = {c["customer_id"]: c for c in result["customers"]}
+        assert set(by_id) == {via_spots, via_alias, assigned}
+        # Revenue through this agency only, Trade excluded
+        assert by_id[via_spots]["revenue_via_agency"] == 500
+        assert by_id[via_spots]["spot_count"] == 2
+        assert by_id[via_alias]["revenue_via_agency"] == 300
+        assert by_id[assigned]["revenue_via_agency"] == 0
+        assert result["customers"][0]["customer_id"] == via_spots
+
+
+class TestGetAgencyDuplicates:
+    def test_pairs_similar_clients(self, service, conn):
+        aid = _seed_agency(conn, "Dup Agency")
+        big = _seed_customer(conn, "Dup Agency:Acme Motors", agency_id=aid)
+        small = _seed_customer(conn, "Acme Motors Group", agency_id=aid)
+        _seed_customer(conn, "Dup Agency:Zephyr Foods", agency_id=aid)
+        conn.execute(
+            "INSERT INTO entity_metrics "
+            "(entity_type, entity_id, total_revenue, spot_count) "
+            "VALUES ('customer', ?, 1000, 10)", [big]
+        )
+        conn.commit()
+
+        result = service.get_agency_duplicates(conn, aid)
+        assert len(result["duplicates"]) == 1
+        dup = result["duplicates"][0]
+        assert dup["target"]["customer_id"] == big
+        assert dup["target"]["client_portion"] == "Acme Motors"
+        assert dup["source"]["customer_id"] == small
+        assert dup["score"] >= 0.5
+
+    def test_agency_not_found(self, service, conn):
+        result = service.get_agency_duplicates(conn, 9999)
+        assert result["error"] == "Agency not found"
+
 
 class TestUpdateAE:
     def test_creates_history(self, service, conn):
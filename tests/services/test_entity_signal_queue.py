@@ -0,0 +1,300 @@
+"""Tests for incremental signal refreshes over the dirty-entity queue
+(migration 039)."""
+
+import os
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.services.background_jobs import REFRESH_SIGNALS, JobWorker
+from src.services.entity_metrics_service import (
+    EntityMetricsService,
+    queue_signal_refresh,
+)
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE agencies (
+    agency_id INTEGER PRIMARY KEY,
+    agency_name TEXT UNIQUE,
+    is_active INTEGER DEFAULT 1,
+    assigned_ae TEXT
+);
+CREATE TABLE customers (
+    customer_id INTEGER PRIMARY KEY,
+    normalized_name TEXT UNIQUE,
+    agency_id INTEGER,
+    is_active INTEGER DEFAULT 1,
+    assigned_ae TEXT
+);
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY,
+    agency_id INTEGER,
+    customer_id INTEGER,
+    market_name TEXT,
+    air_date TEXT,
+    gross_rate REAL DEFAULT 0,
+    revenue_type TEXT,
+    broadcast_month TEXT,
+    is_historical INTEGER DEFAULT 0
+);
+CREATE TABLE signal_actions (
+    action_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    signal_type TEXT NOT NULL,
+    assigned_ae TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'new',
+    reason TEXT,
+    snooze_until DATE,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_by TEXT
+);
+
+INSERT INTO agencies (agency_id, agency_name, assigned_ae) VALUES
+    (1, 'Acme Media', 'Alice'), (2, 'Other Media', 'Bob');
+INSERT INTO customers (customer_id, normalized_name, agency_id, assigned_ae)
+VALUES
+    (10, 'Churned Co', 1, 'Alice'),
+    (11, 'Target Co', 2, 'Bob'),
+    (12, 'Steady Co', 2, 'Bob');
+"""
+
+
+def _days_ago(days):
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture()
+def db_path():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    c = sqlite3.connect(path)
+    c.executescript(SCHEMA)
+    c.executescript((MIGRATIONS / "030_background_jobs.sql").read_text())
+    c.executescript((MIGRATIONS / "034_background_job_progress.sql").read_text())
+    c.executescript((MIGRATIONS / "039_entity_signal_queue.sql").read_text())
+    # Customer 10: $15K a year and a half ago, nothing since -> churned
+    c.execute(
+        "INSERT INTO spots (spot_id, agency_id, customer_id, air_date,"
+        " gross_rate, revenue_type, broadcast_month)"
+        " VALUES (1, 1, 10, ?, 15000, 'Cash', 'Jan-24')",
+        [_days_ago(540)],
+    )
+    # Customer 12: booked last month
+    c.execute(
+        "INSERT INTO spots (spot_id, agency_id, customer_id, air_date,"
+        " gross_rate, revenue_type, broadcast_month)"
+        " VALUES (2, 2, 12, ?, 500, 'Cash', 'Feb-25')",
+        [_days_ago(30)],
+    )
+    c.commit()
+    c.close()
+    yield path
+    os.unlink(path)
+
+
+@pytest.fixture()
+def db(db_path):
+    return DatabaseConnection(db_path)
+
+
+@pytest.fixture()
+def service(db):
+    return EntityMetricsService(db)
+
+
+@pytest.fixture()
+def conn(db_path, service):
+    c = sqlite3.connect(db_path)
+    c.row_factory = sqlite3.Row
+    service.refresh_signals(c)
+    c.execute("DELETE FROM background_jobs")
+    c.commit()
+    yield c
+    c.close()
+
+
+def _signals(conn, entity_type, entity_id):
+    return {
+        r[0] for r in conn.execute(
+            "SELECT signal_type FROM entity_signals"
+            " WHERE entity_type = ? AND entity_id = ?",
+            [entity_type, entity_id],
+        ).fetchall()
+    }
+
+
+def _dirty(conn):
+    return {
+        tuple(r) for r in conn.execute(
+            "SELECT entity_type, entity_id FROM entity_signal_dirty"
+        ).fetchall()
+    }
+
+
+class TestDirtyQueue:
+    def test_full_refresh_records_sweep_and_clears_queue(self, conn):
+        assert _signals(conn, "customer", 10) == {"churned"}
+        assert _dirty(conn) == set()
+        swept = conn.execute(
+            "SELECT swept_on = date('now') FROM entity_signal_sweep"
+        ).fetchone()[0]
+        assert swept == 1
+
+    def test_spot_reassignment_queues_both_customers_and_agencies(self, conn):
+        conn.execute("UPDATE spots SET customer_id = 11 WHERE spot_id = 1")
+        assert _dirty(conn) == {
+            ("customer", 10), ("customer", 11), ("agency", 1), ("agency", 2),
+        }
+        jobs = conn.execute(
+            "SELECT job_type, status FROM background_jobs"
+        ).fetchall()
+        assert [tuple(j) for j in jobs] == [(REFRESH_SIGNALS, "QUEUED")]
+
+    def test_unchanged_writes_do_not_queue(self, conn):
+        conn.execute("UPDATE spots SET customer_id = 10 WHERE spot_id = 1")
+        conn.execute("UPDATE customers SET agency_id = 1 WHERE customer_id = 10")
+        assert _dirty(conn) == set()
+
+    def test_customer_agency_move_queues_both_agencies(self, conn):
+        conn.execute("UPDATE customers SET agency_id = 2 WHERE customer_id = 10")
+        assert _dirty(conn) == {("agency", 1), ("agency", 2)}
+
+    def test_queue_signal_refresh_for_months(self, conn):
+        queue_signal_refresh(conn, ["Feb-25"])
+        assert _dirty(conn) == {("customer", 12), ("agency", 2)}
+
+    def test_queue_signal_refresh_without_migration(self, conn):
+        conn.execute("DROP TABLE entity_signal_dirty")
+        queue_signal_refresh(conn, ["Feb-25"])
+
+
+class TestRefreshSignalsForIds:
+    def test_only_given_entities_recomputed(self, service, conn):
+        conn.execute(
+            "UPDATE entity_signals SET signal_label = 'stale'"
+        )
+        service.refresh_signals_for_ids(conn, customer_ids=[10])
+
+        labels = dict(conn.execute(
+            "SELECT entity_type || ':' || entity_id, signal_label"
+            " FROM entity_signals"
+        ).fetchall())
+        assert labels["customer:10"] != "stale"
+        assert labels["agency:1"] == "stale"
+
+    def test_actions_follow_moved_spots(self, service, conn):
+        action = conn.execute(
+            "SELECT status FROM signal_actions"
+            " WHERE entity_type = 'customer' AND entity_id = 10"
+        ).fetchone()
+        assert action["status"] == "new"
+
+        conn.execute("UPDATE spots SET customer_id = 11 WHERE spot_id = 1")
+        result = service.refresh_changed_signals(conn)
+
+        assert result == {"mode": "incremental", "dirty": 4, "aged": 0}
+        assert _signals(conn, "customer", 10) == set()
+        assert _signals(conn, "customer", 11) == {"churned"}
+        assert _dirty(conn) == set()
+        actions = {
+            (r[0], r[1]): (r[2], r[3]) for r in conn.execute(
+                "SELECT entity_id, signal_type, status, assigned_ae"
+                " FROM signal_actions WHERE entity_type = 'customer'"
+            ).fetchall()
+        }
+        assert actions[(10, "churned")] == ("acknowledged", "Alice")
+        assert actions[(11, "churned")] == ("new", "Bob")
+
+
+class TestRefreshChangedSignals:
+    def test_full_refresh_when_never_swept(self, service, conn):
+        conn.execute("UPDATE entity_signal_sweep SET swept_on = NULL")
+        assert service.refresh_changed_signals(conn) == {"mode": "full"}
+
+    def test_full_refresh_in_a_new_month(self, service, conn):
+        conn.execute(
+            "UPDATE entity_signal_sweep"
+            " SET swept_on = date('now', 'start of month', '-1 day')"
+        )
+        assert service.refresh_changed_signals(conn) == {"mode": "full"}
+
+    def test_full_refresh_without_migration(self, service, conn):
+        conn.execute("DROP TABLE entity_signal_dirty")
+        assert service.refresh_changed_signals(conn) == {"mode": "full"}
+        assert _signals(conn, "customer", 10) == {"churned"}
+
+    def test_nothing_queued_is_a_no_op(self, service, conn):
+        before = conn.execute("SELECT COUNT(*) FROM entity_signals").fetchone()
+        result = service.refresh_changed_signals(conn)
+        assert result == {"mode": "incremental", "dirty": 0, "aged": 0}
+        after = conn.execute("SELECT COUNT(*) FROM entity_signals").fetchone()
+        assert before[0] == after[0]
+
+    def test_job_drains_queue(self, db, conn):
+        conn.execute("UPDATE spots SET customer_id = 11 WHERE spot_id = 1")
+        conn.commit()
+
+        job = JobWorker(db).run_once()
+
+        assert job.job_type == REFRESH_SIGNALS
+        assert _dirty(conn) == set()
+        assert _signals(conn, "customer", 11) == {"churned"}
+
+
+class TestAgedEntities:
+    def test_boundary_crossings_since_last_sweep(self, service, conn):
+        conn.executemany(
+            "INSERT INTO spots (spot_id, customer_id, air_date, gross_rate)"
+            " VALUES (?, ?, ?, 100)",
+            [
+                (10, 11, _days_ago(3)),    # was future, now past
+                (11, 12, _days_ago(200)),  # no boundary passed
+                (12, 11, _days_ago(368)),  # left trailing 12 months
+            ],
+        )
+        since = _days_ago(5)
+
+        aged = service._aged_entities(conn, since)
+
+        assert ("customer", 11) in aged
+        assert ("customer", 12) not in aged
+        assert ("customer", 10) not in aged
+
+    def test_includes_gone_quiet_signals(self, service, conn):
+        conn.execute(
+            "INSERT INTO entity_signals (entity_type, entity_id, signal_type,"
+            " signal_label, signal_priority) VALUES"
+            " ('agency', 2, 'gone_quiet', 'Quiet 100d', 3)"
+        )
+        today = date.today().isoformat()
+        assert ("agency", 2) in service._aged_entities(conn, today)
+
+
+class TestRenewalGap:
+    def test_agency_sums_all_clients(self, service, conn):
+        months = service._renewal_gap_months(conn)
+        conn.executemany(
+            "INSERT INTO spots (spot_id, agency_id, customer_id,"
+            " gross_rate, revenue_type, broadcast_month)"
+            " VALUES (?, 2, ?, ?, 'Cash', ?)",
+            [
+                (20, 11, 8000, months[0]),   # trailing, nothing forward
+                (21, 12, 1000, months[1]),
+                (22, 12, 6000, months[3]),   # forward covers the agency
+            ],
+        )
+        conn.execute("DELETE FROM entity_signals")
+
+        service._compute_renewal_gap_signals(conn)
+
+        assert _signals(conn, "customer", 11) == {"renewal_gap"}
+        assert _signals(conn, "customer", 12) == set()
+        assert _signals(conn, "agency", 2) == set()
@@ -1,7 +1,11 @@
 """Tests for ExportService."""
 
+import csv
+import io
 import sqlite3
+
 import pytest
+
 from src.database.connection import DatabaseConnection
 from src.services.export_service import ExportService, VALID_IMPORT_ROLES
 
@@ -17,7 +21,8 @@ def db():
             state TEXT, zip TEXT, notes TEXT,
             assigned_ae TEXT, po_number TEXT,
             edi_billing INTEGER DEFAULT 0,
-            is_active INTEGER DEFAULT 1
+            is_active INTEGER DEFAULT 1,
+            edi_code TEXT
         )
     """)
     conn.execute("""
@@ -57,7 +62,7 @@ def db():
     """)
     conn.execute(
         "INSERT INTO agencies VALUES (1, 'Acme Agency', '123 Main', "
-        "'NYC', 'NY', '10001', NULL, 'John', NULL, 0, 1)"
+        "'NYC', 'NY', '10001', NULL, 'John', NULL, 0, 1, 'EDI1')"
     )
     conn.execute(
         "INSERT INTO customers VALUES (1, 'Direct Corp', '456 Oak', "
@@ -78,10 +83,7 @@ def db():
 
 def test_export_csv_basic(db):
     svc, conn = db
-    metrics_map = {}
-    csv_content = svc.export_entities_csv(
-        conn, {"type": "all"}, metrics_map,
-    )
+    csv_content = "".join(svc.export_entities_csv(conn, {"type": "all"}))
     assert "Entity Name" in csv_content
     assert "Acme Agency" in csv_content
     assert "Direct Corp" in csv_content
@@ -91,14 +93,12 @@ def test_export_csv_basic(db):
 
 def test_export_csv_filter_by_type(db):
     svc, conn = db
-    csv_agency = svc.export_entities_csv(
-        conn, {"type": "agency"}, {},
-    )
+    csv_agency = "".join(svc.export_entities_csv(conn, {"type": "agency"}))
     assert "Acme Agency" in csv_agency
     assert "Direct Corp" not in csv_agency
 
-    csv_customer = svc.export_entities_csv(
-        conn, {"type": "customer"}, {},
+    csv_customer = "".join(
+        svc.export_entities_csv(conn, {"type": "customer"})
     )
     assert "Acme Agency" not in csv_customer
     assert "Direct Corp" in csv_customer
@@ -125,6 +125,147 @@ def test_import_contacts_csv(db):
     assert len(contacts) == 2
 
 
+def _export_rows(svc, conn, **filters):
+    content = "".join(svc.export_entities_csv(conn, filters))
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+@pytest.fixture
+def populated(db):
+    svc, conn = db
+    conn.execute("""
+        CREATE TABLE entity_metrics (
+            entity_type TEXT, entity_id INTEGER, markets TEXT,
+            last_active TEXT, total_revenue REAL DEFAULT 0,
+            spot_count INTEGER DEFAULT 0,
+            agency_spot_count INTEGER DEFAULT 0,
+            PRIMARY KEY (entity_type, entity_id)
+        )
+    """)
+    conn.execute("INSERT INTO sectors VALUES (5, 'Retail', 'RET', 1)")
+    conn.executemany(
+        "INSERT INTO customers (customer_id, normalized_name, address, "
+        "assigned_ae, notes, sector_id) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (3, "beta Foods", "1 Elm", "Jane", "grocery chain", 5),
+            (4, "Booked Via Agency", "2 Elm", "Jane", None, None),
+        ],
+    )
+    conn.execute("INSERT INTO customer_sectors VALUES (3, 5)")
+    conn.executemany(
+        "INSERT INTO entity_metrics VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("agency", 1, "NYC,SEA", "2026-09-01", 1500.5, 10, 0),
+            ("customer", 1, "LAX", "2026-08-01", 200, 4, 1),
+            ("customer", 4, "SEA", "2026-07-01", 50, 3, 3),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO entity_contacts (entity_type, entity_id, contact_name, "
+        "email, phone, is_primary, is_active) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("agency", 1, "Old Primary", "old@acme.com", "1", 1, 0),
+            ("agency", 1, "Ann", "ann@acme.com", "555-1", 1, 1),
+            ("agency", 1, "Not Primary", "np@acme.com", "2", 0, 1),
+            ("customer", 3, "Cal", None, "555-3", 1, 1),
+        ],
+    )
+    conn.commit()
+    return svc, conn
+
+
+def test_export_joins_metrics_and_primary_contact(populated):
+    svc, conn = populated
+    rows = _export_rows(svc, conn)
+
+    # Sorted case-insensitively; customer 4 is an agency client
+    assert [r["Entity Name"] for r in rows] == [
+        "Acme Agency", "beta Foods", "Direct Corp",
+    ]
+    acme = rows[0]
+    assert (acme["Primary Contact"], acme["Email"], acme["Phone"]) == (
+        "Ann", "ann@acme.com", "555-1",
+    )
+    assert acme["Markets"] == "NYC,SEA"
+    assert acme["Total Revenue"] == "$1,500.50"
+    assert acme["EDI Code"] == "EDI1"
+    assert rows[1]["Sector"] == "Retail"
+    assert rows[2]["Primary Contact"] == ""
+    assert rows[2]["Total Revenue"] == "$200.00"
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"search": "GROCERY"}, ["beta Foods"]),
+    ({"search": "retail"}, ["beta Foods"]),
+    ({"has_contacts": "yes"}, ["Acme Agency", "beta Foods"]),
+    ({"has_contacts": "no"}, ["Direct Corp"]),
+    ({"has_address": "no"}, []),
+    ({"sector_id": "5"}, ["beta Foods"]),
+    ({"sector_id": "x"}, ["Acme Agency", "beta Foods", "Direct Corp"]),
+    ({"market": "SEA"}, ["Acme Agency"]),
+    ({"ae": "Jane"}, ["beta Foods", "Direct Corp"]),
+    ({"ae": "__none__"}, []),
+    ({"type": "customer", "ae": "John"}, []),
+])
+def test_export_filters(populated, filters, expected):
+    svc, conn = populated
+    assert [r["Entity Name"] for r in _export_rows(svc, conn, **filters)] == expected
+
+
+def test_export_streams_in_chunks(populated, monkeypatch):
+    svc, conn = populated
+    monkeypatch.setattr("src.services.export_service.EXPORT_BATCH_SIZE", 1)
+    chunks = list(svc.export_entities_csv(conn, {}))
+    assert len(chunks) == 3  # header with the first row, then one per row
+    assert chunks[0].startswith("Entity Name,")
+
+
+def test_import_matches_names_case_insensitively(db):
+    svc, conn = db
+    csv_content = (
+        "Entity Name,Type,Contact Name\n"
+        "ACME AGENCY,agency,Bob\n"
+        "direct corp,customer,Jane\n"
+        "Direct Corp,agency,Wrong Type\n"
+    )
+    result = svc.import_contacts_csv(conn, csv_content, "admin")
+
+    assert result["imported"] == 2
+    assert result["errors"] == [
+        "Row 4: Entity 'Direct Corp' (agency) not found",
+    ]
+    assert [tuple(r) for r in conn.execute(
+        "SELECT entity_type, entity_id, contact_name FROM entity_contacts "
+        "ORDER BY contact_id"
+    )] == [("agency", 1, "Bob"), ("customer", 1, "Jane")]
+
+
+def test_import_failed_row_skips_only_itself(db):
+    svc, conn = db
+    conn.execute("""
+        CREATE TRIGGER reject_bad BEFORE INSERT ON entity_contacts
+        WHEN NEW.contact_name = 'Bad'
+        BEGIN SELECT RAISE(ABORT, 'bad contact'); END
+    """)
+    conn.commit()
+    csv_content = (
+        "Entity Name,Type,Contact Name\n"
+        "Acme Agency,agency,Good\n"
+        ",agency,Nameless\n"
+        "Acme Agency,agency,Bad\n"
+        "Direct Corp,customer,Also Good\n"
+    )
+    result = svc.import_contacts_csv(conn, csv_content, "admin")
+    conn.commit()
+
+    assert (result["imported"], result["skipped"]) == (2, 2)
+    assert result["errors"][0].startswith("Row 3: Missing required field")
+    assert result["errors"][1] == "Row 4: bad contact"
+    assert [r[0] for r in conn.execute(
+        "SELECT contact_name FROM entity_contacts ORDER BY contact_id"
+    )] == ["Good", "Also Good"]
+
+
 def test_import_missing_columns(db):
     svc, conn = db
     csv_content = "Name,Phone\nTest,555\n"
@@ -2,12 +2,24 @@
 
 import sqlite3
 from datetime import date, timedelta
+from pathlib import Path
 
 import pytest
 
 from src.database.connection import DatabaseConnection
 from src.services.health_score_service import TIER_CADENCE, HealthScoreService
 
+ROLLUP_MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "sql" / "migrations" / "032_entity_activity_rollup.sql"
+)
+FOLLOW_UP_ORDER_MIGRATION = ROLLUP_MIGRATION.with_name(
+    "044_activity_rollup_follow_up_order.sql"
+)
+COMPONENTS_MIGRATION = ROLLUP_MIGRATION.with_name(
+    "033_entity_health_components.sql"
+)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -136,6 +148,8 @@ def health_db():
         INSERT INTO agencies (agency_id, agency_name, assigned_ae)
         VALUES (1, 'Alice Agency', 'Alice');
     """)
+    conn.executescript(ROLLUP_MIGRATION.read_text())
+    conn.executescript(FOLLOW_UP_ORDER_MIGRATION.read_text())
     conn.commit()
 
     db_conn = DatabaseConnection.__new__(DatabaseConnection)
@@ -273,6 +287,19 @@ class TestFollowUpComplianceScore:
         overdue = self.svc._load_overdue_set(self.conn)
         assert ("customer", 10) in overdue
 
+    def test_undated_followup_does_not_hide_overdue(self):
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        self.conn.executemany(
+            "INSERT INTO entity_activity "
+            "(entity_type, entity_id, activity_type, due_date, is_completed) "
+            "VALUES ('customer', 10, 'follow_up', ?, 0)",
+            [(None,), (yesterday,)],
+        )
+        self.conn.commit()
+
+        overdue = self.svc._load_overdue_set(self.conn)
+        assert ("customer", 10) in overdue
+
     def test_future_followup_not_overdue(self):
         tomorrow = (date.today() + timedelta(days=1)).isoformat()
         self.conn.execute(
@@ -587,3 +614,60 @@ class TestTouchCompliance:
         )
         pct = self.svc.touch_compliance(results)
         assert pct == 25  # 1 of 4 (3 customers + 1 agency)
+
+
+# ---------------------------------------------------------------------------
+# Persisted revenue components
+# ---------------------------------------------------------------------------
+
+
+class TestPersistedComponents:
+    @pytest.fixture(autouse=True)
+    def _setup(self, health_db):
+        self.svc, self.conn = health_db
+        self.conn.executescript(COMPONENTS_MIGRATION.read_text())
+
+    def _revenue_score(self, entity_type, entity_id):
+        scores = self.svc.get_health_scores(self.conn)
+        return _find(scores, entity_type, entity_id)["revenue_trend_score"]
+
+    def test_refresh_stores_every_active_entity(self):
+        _insert_spots_for_trend(self.conn, 10, prior=100, trailing=200)
+        self.conn.execute("UPDATE customers SET agency_id = 1 WHERE customer_id = 10")
+
+        assert self.svc.refresh_components(self.conn) == 5
+        rows = {
+            (r["entity_type"], r["entity_id"]): r
+            for r in self.conn.execute("SELECT * FROM entity_health_components")
+        }
+        assert rows[("customer", 10)]["trailing_3m"] == pytest.approx(200)
+        assert rows[("customer", 10)]["prior_3m"] == pytest.approx(100)
+        assert rows[("agency", 1)]["trailing_12m"] == pytest.approx(300)
+
+    def test_reads_stored_rows_until_next_refresh(self):
+        _insert_spots_for_trend(self.conn, 10, prior=100, trailing=100)
+        self.svc.refresh_components(self.conn)
+
+        _insert_spots_for_trend(self.conn, 10, prior=0, trailing=300)
+        assert self._revenue_score("customer", 10) == 60
+
+        self.svc.refresh_components(self.conn)
+        assert self._revenue_score("customer", 10) == 100
+
+    def test_entity_without_row_is_computed_live(self):
+        self.svc.refresh_components(self.conn)
+        self.conn.execute(
+            "INSERT INTO customers (customer_id, normalized_name, assigned_ae) "
+            "VALUES (30, 'New Customer', 'Bob')"
+        )
+        _insert_spots_for_trend(self.conn, 30, prior=100, trailing=200)
+
+        assert self._revenue_score("customer", 30) == 100
+
+    def test_spot_reassignment_drops_stored_rows(self):
+        _insert_spots_for_trend(self.conn, 10, prior=100, trailing=200)
+        self.svc.refresh_components(self.conn)
+
+        self.conn.execute("UPDATE spots SET customer_id = 11 WHERE customer_id = 10")
+        assert self._revenue_score("customer", 10) == 60
+        assert self._revenue_score("customer", 11) == 100
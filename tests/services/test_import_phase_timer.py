@@ -0,0 +1,87 @@
+"""Tests for import phase timing and its import_batch_phases persistence."""
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.repositories.import_batch_repository import ImportBatchRepository
+from src.services.import_phase_timer import ImportPhaseTimer
+
+MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "sql" / "migrations" / "028_import_batch_phases.sql"
+)
+
+
+@pytest.fixture()
+def db():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.executescript(MIGRATION.read_text())
+    conn.execute("CREATE TABLE spots (spot_id INTEGER PRIMARY KEY, bill_code TEXT)")
+    conn.commit()
+    conn.close()
+    database = DatabaseConnection(path)
+    yield database
+    database.close()
+    os.unlink(path)
+
+
+class TestImportPhaseTimer:
+    def test_phase_records_rows_and_sql_count(self, db):
+        with ImportPhaseTimer() as timer:
+            with timer.phase("insert") as phase:
+                with db.transaction() as conn:
+                    for code in ("A", "B", "C"):
+                        conn.execute(
+                            "INSERT INTO spots (bill_code) VALUES (?)", (code,)
+                        )
+                phase.rows = 3
+
+        [insert] = timer.phases
+        assert insert.phase == "insert"
+        assert insert.rows == 3
+        # BEGIN IMMEDIATE + 3 INSERTs + COMMIT
+        assert insert.sql_count == 5
+        assert insert.succeeded
+        assert insert.rows_per_second > 0
+
+    def test_failed_phase_is_recorded(self):
+        timer = ImportPhaseTimer()
+        with pytest.raises(ValueError):
+            with timer.phase("excel_read"):
+                raise ValueError("bad workbook")
+
+        assert [p.phase for p in timer.phases] == ["excel_read"]
+        assert timer.phases[0].succeeded is False
+
+    def test_persist_writes_phases_in_start_order(self, db):
+        with ImportPhaseTimer() as timer:
+            with timer.phase("outer"):
+                with timer.phase("inner") as inner:
+                    inner.rows = 10
+
+        assert timer.persist(db, "weekly_update_1") is True
+
+        with db.connection() as conn:
+            trends = ImportBatchRepository().get_phase_trends(5, conn)
+        phases = trends["weekly_update_1"]
+        assert [p["phase"] for p in phases] == ["outer", "inner"]
+        assert phases[1]["rows_processed"] == 10
+
+    def test_persist_without_table_does_not_raise(self):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database = DatabaseConnection(path)
+        try:
+            timer = ImportPhaseTimer()
+            with timer.phase("delete"):
+                pass
+            assert timer.persist(database, "batch") is False
+        finally:
+            database.close()
+            os.unlink(path)
@@ -0,0 +1,184 @@
+"""Tests for the IO directory index (migration 042) and the pending
+order listing that reads it."""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.services.io_index import (
+    list_entries,
+    refresh,
+    refresh_directory,
+    try_refresh,
+)
+from src.services.pending_order_service import PendingOrderService
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+
+@pytest.fixture()
+def share(tmp_path):
+    root = tmp_path / "Insertion Orders"
+    for ae, customers in {
+        "Charmaine Lane": ["1234 Acme Corp", "Beta"],
+        "House": ["5678 Gamma"],
+        "Traffic Only": ["9999 Skip"],
+    }.items():
+        for customer in customers:
+            (root / ae / customer).mkdir(parents=True)
+    (root / "Charmaine Lane" / "1234 Acme Corp" / "io.pdf").write_bytes(b"x" * 10)
+    (root / "notes.txt").write_text("not an AE")
+    return root
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    path = str(tmp_path / "index.db")
+    conn = sqlite3.connect(path)
+    conn.executescript((MIGRATIONS / "042_io_directory_index.sql").read_text())
+    conn.close()
+    return path
+
+
+@pytest.fixture()
+def conn(db_path):
+    c = sqlite3.connect(db_path)
+    c.row_factory = sqlite3.Row
+    yield c
+    c.close()
+
+
+def _touch_dir(path):
+    """Move a folder's mtime on, as the share would after a change."""
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+
+def _names(conn, path, is_dir):
+    return [r["name"] for r in list_entries(conn, str(path), is_dir)]
+
+
+class TestRefresh:
+    def test_builds_listing(self, conn, share):
+        result = refresh(conn, str(share))
+
+        assert result["exists"]
+        assert result["relisted"] == result["directories"] == 8
+        assert _names(conn, share, True) == [
+            "Charmaine Lane", "House", "Traffic Only",
+        ]
+        assert _names(conn, share, False) == ["notes.txt"]
+        acme = share / "Charmaine Lane" / "1234 Acme Corp"
+        (row,) = list_entries(conn, str(acme), False)
+        assert (row["name"], row["size"]) == ("io.pdf", 10)
+        (row,) = list_entries(conn, str(share / "House"), True)
+        assert (row["contract"], row["customer"]) == ("5678", "Gamma")
+
+    def test_relists_only_changed_folders(self, conn, share):
+        refresh(conn, str(share))
+        assert refresh(conn, str(share))["relisted"] == 0
+
+        house = share / "House"
+        (house / "7777 Delta").mkdir()
+        _touch_dir(house)
+
+        result = refresh(conn, str(share))
+        assert result["relisted"] == 2  # House and the new folder
+        assert _names(conn, house, True) == ["5678 Gamma", "7777 Delta"]
+
+    def test_max_depth_stops_descending(self, conn, share):
+        result = refresh(conn, str(share), max_depth=1)
+        assert result["directories"] == 4
+        acme = share / "Charmaine Lane" / "1234 Acme Corp"
+        assert _names(conn, acme, False) == []
+
+        assert refresh_directory(conn, str(acme))
+        assert _names(conn, acme, False) == ["io.pdf"]
+
+    def test_removed_folder_drops_subtree(self, conn, share):
+        refresh(conn, str(share))
+        lane = share / "Charmaine Lane"
+        acme = lane / "1234 Acme Corp"
+        (acme / "io.pdf").unlink()
+        acme.rmdir()
+        _touch_dir(lane)
+
+        refresh(conn, str(share))
+
+        assert _names(conn, lane, True) == ["Beta"]
+        assert conn.execute(
+            "SELECT COUNT(*) FROM io_directory_index WHERE path LIKE ?",
+            ["%1234 Acme Corp%"],
+        ).fetchone()[0] == 0
+        assert not refresh_directory(conn, str(acme))
+
+    def test_missing_root(self, conn, tmp_path):
+        assert not refresh(conn, str(tmp_path / "nope"))["exists"]
+
+
+@pytest.fixture()
+def locked(db_path):
+    """Hold the write lock, as an import's transaction does."""
+    writer = sqlite3.connect(db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    yield
+    writer.rollback()
+    writer.close()
+
+
+class TestTryRefresh:
+    def test_commits(self, conn, share, db_path):
+        assert try_refresh(conn, str(share), max_depth=0)["exists"]
+        other = sqlite3.connect(db_path)
+        assert other.execute(
+            "SELECT COUNT(*) FROM io_directory_index WHERE parent = ?",
+            [str(share)],
+        ).fetchone()[0] == 4
+        other.close()
+
+    def test_gives_up_while_locked(self, conn, share, locked):
+        conn.execute("PRAGMA busy_timeout = 30000")
+        started = time.monotonic()
+
+        assert try_refresh(conn, str(share)) is None
+
+        assert time.monotonic() - started < 5
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+        assert _names(conn, share, True) == []
+
+
+class TestPendingOrders:
+    def test_index_matches_live_walk(self, share, db_path):
+        live = PendingOrderService(io_path=str(share)).get_pending_orders()
+        indexed = PendingOrderService(
+            io_path=str(share), db_connection=DatabaseConnection(db_path)
+        ).get_pending_orders()
+
+        assert indexed["orders"] == live["orders"]
+        assert [o["customer"] for o in indexed["orders"]] == [
+            "Acme Corp", "Beta", "Gamma",
+        ]
+
+    def test_filters_by_ae(self, share, db_path):
+        svc = PendingOrderService(
+            io_path=str(share), db_connection=DatabaseConnection(db_path)
+        )
+        orders = svc.get_pending_orders(ae_name="house")["orders"]
+        assert [o["contract"] for o in orders] == ["5678"]
+
+    def test_missing_path(self, tmp_path, db_path):
+        svc = PendingOrderService(
+            io_path=str(tmp_path / "nope"),
+            db_connection=DatabaseConnection(db_path),
+        )
+        assert svc.get_pending_orders()["order_count"] == 0
+
+    def test_walks_share_while_locked(self, share, db_path, locked):
+        orders = PendingOrderService(
+            io_path=str(share), db_connection=DatabaseConnection(db_path)
+        ).get_pending_orders()["orders"]
+        assert [o["customer"] for o in orders] == ["Acme Corp", "Beta", "Gamma"]
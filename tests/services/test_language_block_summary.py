@@ -0,0 +1,310 @@
+"""Tests for the materialized language block revenue summary
+(migration 040)."""
+
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.services.broadcast_month_import_service import (
+    BroadcastMonthImportService,
+)
+from src.services.import_phase_timer import ImportPhaseTimer
+from src.services.language_block_summary import (
+    SUMMARY_TABLE,
+    SUMMARY_VIEW,
+    queue_block_summary_refresh,
+    refresh_block_summary,
+    summary_source,
+)
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY,
+    bill_code TEXT,
+    air_date DATE,
+    day_of_week TEXT,
+    time_in TEXT,
+    time_out TEXT,
+    gross_rate REAL,
+    station_net REAL,
+    sales_person TEXT,
+    revenue_type TEXT,
+    broadcast_month TEXT,
+    customer_id INTEGER,
+    market_id INTEGER,
+    language_id INTEGER
+);
+CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, normalized_name TEXT);
+CREATE TABLE markets (
+    market_id INTEGER PRIMARY KEY, market_name TEXT, market_code TEXT
+);
+CREATE TABLE languages (
+    language_id INTEGER PRIMARY KEY, language_code TEXT, language_name TEXT
+);
+CREATE TABLE programming_schedules (
+    schedule_id INTEGER PRIMARY KEY,
+    schedule_name TEXT,
+    schedule_version TEXT,
+    schedule_type TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE schedule_market_assignments (
+    assignment_id INTEGER PRIMARY KEY,
+    schedule_id INTEGER,
+    market_id INTEGER,
+    effective_start_date DATE,
+    effective_end_date DATE
+);
+CREATE TABLE language_blocks (
+    block_id INTEGER PRIMARY KEY,
+    schedule_id INTEGER,
+    language_id INTEGER,
+    block_name TEXT,
+    block_type TEXT,
+    day_part TEXT,
+    time_start TIME,
+    time_end TIME,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE spot_language_blocks (
+    assignment_id INTEGER PRIMARY KEY,
+    spot_id INTEGER UNIQUE,
+    schedule_id INTEGER,
+    block_id INTEGER,
+    customer_intent TEXT,
+    intent_confidence REAL,
+    spans_multiple_blocks INTEGER DEFAULT 0,
+    assignment_method TEXT,
+    requires_attention INTEGER DEFAULT 0,
+    alert_reason TEXT
+);
+
+CREATE VIEW spots_with_language_blocks_enhanced AS
+SELECT
+    s.spot_id, s.bill_code, s.air_date, s.day_of_week, s.time_in,
+    s.time_out, s.gross_rate, s.station_net, s.sales_person,
+    s.revenue_type, s.broadcast_month,
+    c.normalized_name as customer_name,
+    m.market_code,
+    m.market_name as market_display_name,
+    ps.schedule_name,
+    lb.block_id,
+    lb.block_name,
+    slb.customer_intent
+FROM spots s
+LEFT JOIN customers c ON s.customer_id = c.customer_id
+LEFT JOIN markets m ON s.market_id = m.market_id
+LEFT JOIN spot_language_blocks slb ON s.spot_id = slb.spot_id
+LEFT JOIN language_blocks lb ON slb.block_id = lb.block_id
+LEFT JOIN programming_schedules ps ON slb.schedule_id = ps.schedule_id
+LEFT JOIN schedule_market_assignments sma ON m.market_id = sma.market_id
+    AND s.air_date >= sma.effective_start_date
+    AND (s.air_date <= sma.effective_end_date OR sma.effective_end_date IS NULL)
+WHERE (s.revenue_type != 'Trade' OR s.revenue_type IS NULL);
+
+CREATE VIEW language_block_revenue_summary AS
+SELECT
+    lb.block_id, lb.block_name, lb.language_id, l.language_name,
+    lb.schedule_id, ps.schedule_name,
+    swlb.market_code, swlb.market_display_name,
+    lb.block_type, lb.day_part, lb.time_start, lb.time_end,
+    COUNT(DISTINCT swlb.spot_id) as total_spots,
+    COUNT(DISTINCT swlb.customer_name) as unique_customers,
+    SUM(swlb.station_net) as total_revenue,
+    AVG(swlb.station_net) as avg_spot_revenue,
+    MIN(swlb.air_date) as first_air_date,
+    MAX(swlb.air_date) as last_air_date,
+    strftime('%Y', swlb.air_date) as year,
+    strftime('%Y-%m', swlb.air_date) as year_month,
+    lb.is_active
+FROM language_blocks lb
+LEFT JOIN languages l ON lb.language_id = l.language_id
+LEFT JOIN programming_schedules ps ON lb.schedule_id = ps.schedule_id
+LEFT JOIN spots_with_language_blocks_enhanced swlb ON lb.block_id = swlb.block_id
+WHERE lb.is_active = 1 AND swlb.spot_id IS NOT NULL
+GROUP BY lb.block_id, lb.block_name, lb.language_id, l.language_name,
+    lb.schedule_id, ps.schedule_name, swlb.market_code,
+    swlb.market_display_name, lb.block_type, lb.day_part, lb.time_start,
+    lb.time_end, strftime('%Y', swlb.air_date),
+    strftime('%Y-%m', swlb.air_date), lb.is_active;
+
+INSERT INTO customers VALUES (1, 'Acme'), (2, 'Beta');
+INSERT INTO markets VALUES (1, 'Los Angeles', 'LAX'), (2, 'Seattle', 'SEA');
+INSERT INTO languages VALUES (1, 'M', 'Mandarin'), (2, 'V', 'Vietnamese');
+INSERT INTO programming_schedules VALUES (1, 'Standard', 'v1', 'standard', 1);
+INSERT INTO schedule_market_assignments VALUES
+    (1, 1, 1, '2024-01-01', NULL), (2, 1, 2, '2024-01-01', NULL);
+INSERT INTO language_blocks VALUES
+    (1, 1, 1, 'Mandarin Prime', 'Prime', 'Prime', '19:00', '20:00', 1),
+    (2, 1, 2, 'Viet Morning', 'News', 'Morning', '07:00', '08:00', 1);
+INSERT INTO spots (spot_id, bill_code, air_date, station_net, revenue_type,
+                   broadcast_month, customer_id, market_id) VALUES
+    (1, 'A', '2025-01-06', 100, 'Internal Ad Sales', 'Jan-25', 1, 1),
+    (2, 'A', '2025-01-07', 200, 'Internal Ad Sales', 'Jan-25', 2, 1),
+    (3, 'B', '2025-01-30', 300, 'Internal Ad Sales', 'Jan-25', 1, 2),
+    (4, 'B', '2025-02-03', 400, 'Trade', 'Feb-25', 1, 2),
+    (5, 'C', '2025-02-04', 500, 'Internal Ad Sales', 'Feb-25', 2, 2),
+    (6, 'C', '2024-12-30', 50, 'Internal Ad Sales', 'Jan-25', 2, 1);
+INSERT INTO spot_language_blocks
+    (spot_id, schedule_id, block_id, customer_intent, assignment_method)
+VALUES
+    (1, 1, 1, 'language_specific', 'auto_computed'),
+    (2, 1, 1, 'language_specific', 'auto_computed'),
+    (3, 1, 2, 'language_specific', 'auto_computed'),
+    (4, 1, 2, 'language_specific', 'auto_computed'),
+    (5, 1, 2, 'language_specific', 'auto_computed'),
+    (6, 1, 1, 'language_specific', 'auto_computed');
+"""
+
+ORDER = " ORDER BY block_id, market_code, year_month"
+
+
+@pytest.fixture()
+def conn():
+    c = sqlite3.connect(":memory:")
+    c.row_factory = sqlite3.Row
+    c.executescript(SCHEMA)
+    c.executescript((MIGRATIONS / "030_background_jobs.sql").read_text())
+    c.executescript(
+        (MIGRATIONS / "040_language_block_revenue_monthly.sql").read_text()
+    )
+    yield c
+    c.close()
+
+
+def _rows(conn, source):
+    return [tuple(r) for r in conn.execute(f"SELECT * FROM {source}" + ORDER)]
+
+
+def _dirty(conn):
+    return {
+        r[0] for r in conn.execute(
+            "SELECT year_month FROM language_block_summary_dirty"
+        ).fetchall()
+    }
+
+
+class TestBackfill:
+    def test_matches_view(self, conn):
+        assert _rows(conn, SUMMARY_TABLE) == _rows(conn, SUMMARY_VIEW)
+        assert len(_rows(conn, SUMMARY_TABLE)) == 4
+        assert _dirty(conn) == set()
+
+    def test_source_falls_back_to_view(self, conn):
+        assert summary_source(conn) == SUMMARY_TABLE
+        conn.execute(f"DROP TABLE {SUMMARY_TABLE}")
+        assert summary_source(conn) == SUMMARY_VIEW
+
+
+class TestQueue:
+    def test_assignment_queues_month_and_job(self, conn):
+        conn.execute(
+            "INSERT INTO spots (spot_id, bill_code, air_date, station_net,"
+            " broadcast_month, customer_id, market_id)"
+            " VALUES (7, 'D', '2025-03-03', 70, 'Mar-25', 1, 1)"
+        )
+        assert _dirty(conn) == set()
+
+        conn.execute(
+            "INSERT INTO spot_language_blocks (spot_id, schedule_id, block_id,"
+            " customer_intent, assignment_method)"
+            " VALUES (7, 1, 1, 'language_specific', 'auto_computed')"
+        )
+
+        assert _dirty(conn) == {"2025-03"}
+        jobs = conn.execute(
+            "SELECT job_type FROM background_jobs"
+        ).fetchall()
+        assert [j[0] for j in jobs] == ["refresh_block_summary"]
+
+    def test_reassignment_and_block_edit_queue_months(self, conn):
+        conn.execute("UPDATE spot_language_blocks SET block_id = 2"
+                     " WHERE spot_id = 1")
+        assert _dirty(conn) == {"2025-01"}
+
+        conn.execute("DELETE FROM language_block_summary_dirty")
+        conn.execute("UPDATE language_blocks SET block_name = 'Viet AM'"
+                     " WHERE block_id = 2")
+        assert _dirty(conn) == {"2025-01", "2025-02"}
+
+    def test_import_queues_calendar_months_of_broadcast_months(self, conn):
+        queue_block_summary_refresh(conn, ["Jan-25"])
+        assert _dirty(conn) == {"2024-12", "2025-01"}
+
+    def test_without_migration(self, conn):
+        conn.execute("DROP TABLE language_block_summary_dirty")
+        queue_block_summary_refresh(conn, ["Jan-25"])
+
+
+class TestRefresh:
+    def test_recomputes_queued_months(self, conn):
+        conn.execute("UPDATE spots SET station_net = 1000 WHERE spot_id = 5")
+        conn.execute(
+            "INSERT INTO spots (spot_id, bill_code, air_date, station_net,"
+            " broadcast_month, customer_id, market_id)"
+            " VALUES (7, 'D', '2025-03-03', 70, 'Mar-25', 1, 1)"
+        )
+        conn.execute(
+            "INSERT INTO spot_language_blocks (spot_id, schedule_id, block_id,"
+            " customer_intent, assignment_method)"
+            " VALUES (7, 1, 1, 'language_specific', 'auto_computed')"
+        )
+        queue_block_summary_refresh(conn, ["Feb-25"])
+
+        result = refresh_block_summary(conn)
+
+        assert result["months"] == 2
+        assert _rows(conn, SUMMARY_TABLE) == _rows(conn, SUMMARY_VIEW)
+        assert _dirty(conn) == set()
+
+    def test_removed_months_lose_their_rows(self, conn):
+        queue_block_summary_refresh(conn, ["Jan-25"])
+        conn.execute("DELETE FROM spot_language_blocks WHERE spot_id IN"
+                     " (SELECT spot_id FROM spots"
+                     "  WHERE broadcast_month = 'Jan-25')")
+        conn.execute("DELETE FROM spots WHERE broadcast_month = 'Jan-25'")
+
+        refresh_block_summary(conn)
+
+        assert _rows(conn, SUMMARY_TABLE) == _rows(conn, SUMMARY_VIEW)
+        months = {r[-2] for r in _rows(conn, SUMMARY_TABLE)}
+        assert months == {"2025-02"}
+
+    def test_deactivated_block_drops_out(self, conn):
+        conn.execute("UPDATE language_blocks SET is_active = 0"
+                     " WHERE block_id = 1")
+
+        refresh_block_summary(conn)
+
+        assert _rows(conn, SUMMARY_TABLE) == _rows(conn, SUMMARY_VIEW)
+        assert {r[0] for r in _rows(conn, SUMMARY_TABLE)} == {2}
+
+
+class TestReplica:
+    def test_import_replica_carries_queued_months(self, tmp_path):
+        db_path = str(tmp_path / "blocks.db")
+        c = sqlite3.connect(db_path)
+        c.executescript(SCHEMA)
+        c.executescript((MIGRATIONS / "030_background_jobs.sql").read_text())
+        c.executescript(
+            (MIGRATIONS / "040_language_block_revenue_monthly.sql").read_text()
+        )
+        # An import replacing Feb-25 queues the month; its job has not run
+        c.execute("UPDATE spots SET station_net = 1000 WHERE spot_id = 5")
+        queue_block_summary_refresh(c, ["Feb-25"])
+        c.commit()
+        c.close()
+
+        db = DatabaseConnection(db_path, read_replica_path=f"{db_path}.replica")
+        BroadcastMonthImportService(db)._refresh_read_replica(
+            SimpleNamespace(refresh_read_replica=True), ImportPhaseTimer()
+        )
+
+        with db.connection_ro(replica=True) as replica:
+            assert _rows(replica, SUMMARY_TABLE) == _rows(replica, SUMMARY_VIEW)
+            assert _dirty(replica) == set()
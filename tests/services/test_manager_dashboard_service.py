@@ -276,3 +276,60 @@ class TestWeeklyActivity:
     def test_zero_activity_ae(self):
         result = self.svc.get_weekly_activity(self.conn, ["Nobody"])
         assert result["Nobody"]["total"] == 0
+
+
+class TestScoreboardCache:
+    """Scoreboard is cached until a version source changes."""
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, mgr_db, tmp_path, monkeypatch):
+        from pathlib import Path
+        from src.database.connection import DatabaseConnection
+        from src.services import reference_data
+
+        svc, mem = mgr_db
+        path = str(tmp_path / "mgr.db")
+        disk = sqlite3.connect(path)
+        mem.commit()
+        mem.backup(disk)
+        migrations = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+        disk.executescript("""
+            CREATE TABLE sectors (sector_id INTEGER PRIMARY KEY);
+            CREATE TABLE markets (market_id INTEGER PRIMARY KEY);
+        """)
+        for name in ("029_reference_data_versions.sql",
+                     "031_crm_reference_versions.sql"):
+            disk.executescript((migrations / name).read_text())
+        disk.close()
+
+        monkeypatch.setattr(
+            reference_data, "_registry",
+            reference_data.ReferenceDataRegistry(check_interval=0),
+        )
+        svc.db_connection = DatabaseConnection(path)
+        self.svc = svc
+
+    def _scoreboard(self):
+        with self.svc.db_connection.connection_ro() as conn:
+            return self.svc.get_scoreboard(conn, ["Alice", "Bob"])
+
+    def test_reloads_after_activity_write(self):
+        assert self._scoreboard()["Bob"]["open_followups"] == 1
+
+        with self.svc.db_connection.connection() as conn:
+            conn.execute("""
+                INSERT INTO entity_activity
+                    (entity_type, entity_id, activity_type, due_date)
+                VALUES ('customer', 20, 'follow_up', date('now', '+1 day'))
+            """)
+            conn.commit()
+
+        assert self._scoreboard()["Bob"]["open_followups"] == 2
+
+    def test_serves_cached_result_without_writes(self, monkeypatch):
+        first = self._scoreboard()
+        monkeypatch.setattr(
+            self.svc, "_scoreboard_all",
+            lambda conn: pytest.fail("scoreboard recomputed"),
+        )
+        assert self._scoreboard() == first
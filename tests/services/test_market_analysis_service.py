@@ -0,0 +1,155 @@
+"""Tests for MarketAnalysisService and the revenue cube behind it."""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.services import reference_data
+from src.services.market_analysis_service import MarketAnalysisService
+from src.services.reference_data import bump_version
+from src.utils.revenue_cube import RevenueCube
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE sectors (sector_id INTEGER PRIMARY KEY);
+CREATE TABLE markets (market_id INTEGER PRIMARY KEY);
+CREATE TABLE agencies (agency_id INTEGER PRIMARY KEY, assigned_ae TEXT);
+CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, assigned_ae TEXT);
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY,
+    broadcast_month TEXT,
+    market_name TEXT,
+    language_code TEXT,
+    revenue_type TEXT,
+    spot_type TEXT,
+    gross_rate REAL,
+    station_net REAL
+);
+
+INSERT INTO spots (broadcast_month, market_name, language_code,
+                   revenue_type, spot_type, gross_rate, station_net)
+VALUES
+    ('Jan-25', 'CHI', 'm',  'Internal Ad Sales', 'COM', 1000, 850),
+    ('Feb-25', 'MSP', 'M ', 'Internal Ad Sales', 'COM', 500, 425),
+    ('Feb-25', 'CMP', 'M',  'Internal Ad Sales', 'BNS', NULL, NULL),
+    ('Mar-25', 'LAX', 'V',  'Internal Ad Sales', 'COM', 800, 680),
+    ('Mar-25', 'LAX', 'XX', 'Internal Ad Sales', 'COM', 200, 170),
+    ('Mar-25', 'LAX', '',   'Internal Ad Sales', 'COM', 50, 42),
+    ('Mar-25', 'SFO', 'V',  'Internal Ad Sales', 'PRG', 300, 255),
+    ('Apr-25', 'SFO', 'V',  'Direct Response',   'COM', 400, 340),
+    ('Apr-25', 'SFO', 'V',  'Trade',             'COM', 900, 0),
+    ('Jan-24', 'LAX', 'M',  'Internal Ad Sales', 'COM', 700, 595);
+"""
+
+
+@pytest.fixture()
+def db(monkeypatch):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    c = sqlite3.connect(path)
+    c.executescript(SCHEMA)
+    c.executescript((MIGRATIONS / "029_reference_data_versions.sql").read_text())
+    c.commit()
+    c.close()
+    monkeypatch.setattr(
+        reference_data, "_registry",
+        reference_data.ReferenceDataRegistry(check_interval=0),
+    )
+    yield DatabaseConnection(path)
+    os.unlink(path)
+
+
+@pytest.fixture()
+def service(db):
+    return MarketAnalysisService(db)
+
+
+class TestRevenueCube:
+    def test_one_cell_per_dimension_combination(self, db):
+        with db.connection_ro() as conn:
+            cube = RevenueCube.from_connection(conn)
+
+        assert cube.years() == ["2025", "2024"]
+        # 'M ' and 'M' share a cell once trimmed and upper-cased
+        feb = [c for c in cube.select(["25"])
+               if c.market_name == "MSP" and c.year == "-25"]
+        assert [(c.language_code, c.revenue, c.spots) for c in feb] == [
+            ("M", 500, 1),
+        ]
+        assert all(c.revenue_type != "Trade" for c in cube.cells)
+
+    def test_group_sorts_by_revenue(self, db):
+        with db.connection_ro() as conn:
+            cube = RevenueCube.from_connection(conn)
+
+        groups = cube.group(
+            cube.select(["25"], revenue_type="Internal Ad Sales",
+                        spot_types=("COM", "BNS")),
+            lambda c: cube.market_group(c.market_name),
+        )
+
+        assert list(groups) == ["CMP", "LAX"]
+        assert groups["CMP"] == {
+            "revenue": 1500, "paid_spots": 2, "bonus_spots": 1,
+            "total_spots": 3,
+        }
+
+
+class TestMarketAnalysisService:
+    def test_revenue_context(self, service):
+        context = service.get_revenue_context("2025")
+
+        assert context["total_gross"] == 3250
+        assert context["internal_ad_sales"] == 2850
+        assert context["report_scope"] == 2550
+        assert context["other_revenue_types"] == {"Direct Response": 400}
+
+    def test_language_summary_skips_empty_codes(self, service):
+        summary = {
+            r["language"]: r for r in service.get_language_summary("2025")
+        }
+
+        assert set(summary) == {"Chinese", "Vietnamese", "Other"}
+        assert summary["Chinese"]["revenue"] == 1500
+        assert summary["Chinese"]["bonus_spots"] == 1
+        assert summary["Other"]["revenue"] == 200
+
+    def test_code_distribution_reports_empty_codes(self, service):
+        codes = {
+            r["code"]: r["revenue"]
+            for r in service.get_code_distribution("2025")["codes"]
+        }
+
+        assert codes == {"M": 1500, "V": 800, "XX": 200, "EMPTY": 50}
+
+    def test_cube_cached_until_next_import(self, db, service, monkeypatch):
+        loads = []
+        load = service._load_cells
+        monkeypatch.setattr(
+            service, "_load_cells", lambda: loads.append(1) or load()
+        )
+
+        service.get_market_analysis_data("2025")
+        service.get_csv_data("2025", "market_summary")
+        assert loads == [1]
+
+        with db.connection() as conn:
+            conn.execute(
+                "INSERT INTO spots (broadcast_month, market_name,"
+                " language_code, revenue_type, spot_type, gross_rate)"
+                " VALUES ('May-25', 'LAX', 'V', 'Internal Ad Sales',"
+                " 'COM', 100)"
+            )
+            bump_version(conn, "spots")
+            conn.commit()
+
+        summary = service.get_csv_data("2025", "language_summary")
+        assert loads == [1, 1]
+        assert {r["language"]: r["revenue"] for r in summary}[
+            "Vietnamese"
+        ] == 900
@@ -0,0 +1,210 @@
+"""Tests for the chunked customer/agency merge engine."""
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.repositories.background_job_repository import (
+    BackgroundJobRepository,
+    JobStatus,
+)
+from src.services.background_jobs import MERGE_ENTITIES, JobWorker, enqueue_job
+from src.services.merge_engine import MergeEngine, MergeError
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE agencies (
+    agency_id INTEGER PRIMARY KEY,
+    agency_name TEXT UNIQUE,
+    notes TEXT,
+    is_active INTEGER DEFAULT 1,
+    updated_date TIMESTAMP
+);
+CREATE TABLE customers (
+    customer_id INTEGER PRIMARY KEY,
+    normalized_name TEXT UNIQUE,
+    agency_id INTEGER,
+    notes TEXT,
+    is_active INTEGER DEFAULT 1,
+    updated_date TIMESTAMP
+);
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY,
+    customer_id INTEGER,
+    agency_id INTEGER,
+    market_name TEXT,
+    air_date TEXT,
+    gross_rate REAL,
+    revenue_type TEXT
+);
+CREATE TABLE entity_aliases (
+    alias_id INTEGER PRIMARY KEY,
+    alias_name TEXT,
+    entity_type TEXT,
+    target_entity_id INTEGER,
+    confidence_score INTEGER,
+    created_by TEXT,
+    notes TEXT,
+    is_active INTEGER DEFAULT 1,
+    updated_date TIMESTAMP
+);
+CREATE TABLE canon_audit (
+    id INTEGER PRIMARY KEY,
+    actor TEXT, action TEXT, key TEXT, value TEXT, extra TEXT
+);
+
+INSERT INTO agencies (agency_id, agency_name) VALUES
+    (1, 'Acme Media'), (2, 'ACME Media Group');
+INSERT INTO customers (customer_id, normalized_name, agency_id) VALUES
+    (10, 'Golden Dragon', 1),
+    (11, 'Golden Dragon Restaurant', 2),
+    (12, 'Other Client', 1);
+INSERT INTO spots (spot_id, customer_id, agency_id, market_name, air_date,
+                   gross_rate, revenue_type) VALUES
+    (1, 10, 1, 'SEA', '2025-01-05', 100, 'Internal Ad Sales'),
+    (2, 12, 1, 'SEA', '2025-01-06', 50, 'Internal Ad Sales'),
+    (3, 10, 1, 'SFO', '2025-02-01', 200, 'Internal Ad Sales'),
+    (4, 11, 2, 'SEA', '2025-02-02', 300, 'Internal Ad Sales'),
+    (5, 10, 1, 'SEA', '2025-03-01', 400, 'Trade'),
+    (6, 10, 1, 'LAX', '2025-03-02', 500, 'Internal Ad Sales'),
+    (7, 10, NULL, 'SEA', '2025-03-03', 600, 'Internal Ad Sales');
+INSERT INTO entity_aliases (alias_id, alias_name, entity_type,
+                            target_entity_id) VALUES
+    (1, 'GOLDEN DRAGON SEA', 'customer', 10),
+    (2, 'Acme', 'agency', 1);
+"""
+
+
+@pytest.fixture()
+def db():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.executescript((MIGRATIONS / "030_background_jobs.sql").read_text())
+    conn.executescript(
+        (MIGRATIONS / "034_background_job_progress.sql").read_text()
+    )
+    conn.close()
+    yield DatabaseConnection(path)
+    os.unlink(path)
+
+
+def _rows(db, sql, params=()):
+    with db.connection() as conn:
+        return [tuple(r) for r in conn.execute(sql, params).fetchall()]
+
+
+class TestCustomerMerge:
+    def test_moves_spots_in_chunks_and_reports_progress(self, db):
+        seen = []
+        result = MergeEngine(db, chunk_size=2).merge(
+            "customer", 10, 11, merged_by="tester", progress=seen.append
+        )
+
+        assert result["success"] is True
+        assert result["spots_moved"] == 5
+        assert result["aliases_moved"] == 1
+        assert result["alias_created"] is True
+        assert [p["done"] for p in seen if p["phase"] == "moving"] == [
+            0, 2, 4, 5
+        ]
+        assert seen[-1] == {"phase": "done", "done": 5, "total": 5}
+
+        assert _rows(db, "SELECT customer_id, COUNT(*) FROM spots "
+                         "GROUP BY customer_id") == [(11, 6), (12, 1)]
+        assert _rows(db, "SELECT is_active FROM customers "
+                         "WHERE customer_id = 10") == [(0,)]
+        assert _rows(db, "SELECT alias_name, target_entity_id "
+                         "FROM entity_aliases WHERE entity_type = 'customer' "
+                         "ORDER BY alias_id") == [
+            ("GOLDEN DRAGON SEA", 11), ("Golden Dragon", 11)
+        ]
+        assert _rows(db, "SELECT action, key, value FROM canon_audit") == [
+            ("MERGE", "customer:10", "customer:11")
+        ]
+
+    def test_refreshes_only_merged_customer_metrics(self, db):
+        with db.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE entity_metrics (
+                    entity_type TEXT, entity_id INTEGER, markets TEXT,
+                    last_active TEXT, total_revenue REAL DEFAULT 0,
+                    spot_count INTEGER DEFAULT 0,
+                    agency_spot_count INTEGER DEFAULT 0,
+                    updated_at TEXT DEFAULT (datetime('now')),
+                    PRIMARY KEY (entity_type, entity_id)
+                );
+                INSERT INTO entity_metrics (entity_type, entity_id, spot_count)
+                VALUES ('customer', 10, 5), ('customer', 11, 1),
+                       ('customer', 12, 99);
+            """)
+
+        MergeEngine(db, chunk_size=2).merge("customer", 10, 11)
+
+        assert _rows(db, "SELECT entity_id, spot_count, total_revenue, "
+                         "agency_spot_count FROM entity_metrics "
+                         "ORDER BY entity_id") == [
+            (11, 6, 1700.0, 5), (12, 99, 0.0, 0)
+        ]
+
+    def test_sweeps_spots_added_after_plan(self, db):
+        engine = MergeEngine(db, chunk_size=2)
+        plan = engine.plan("customer", 10, 11)
+        with db.connection() as conn:
+            conn.execute("INSERT INTO spots (spot_id, customer_id) VALUES (8, 10)")
+            conn.commit()
+
+        result = engine.apply(plan)
+
+        assert len(plan.row_ids) == 5
+        assert result["spots_moved"] == 6
+        assert _rows(db, "SELECT COUNT(*) FROM spots "
+                         "WHERE customer_id = 10") == [(0,)]
+
+    def test_invalid_merges(self, db):
+        engine = MergeEngine(db)
+        with pytest.raises(MergeError):
+            engine.plan("customer", 10, 10)
+        assert engine.merge("customer", 10, 999) == {
+            "success": False, "error": "Target customer 999 not found"
+        }
+        assert _rows(db, "SELECT COUNT(*) FROM canon_audit") == [(0,)]
+
+
+class TestAgencyMerge:
+    def test_moves_customers_and_aliases(self, db):
+        result = MergeEngine(db, chunk_size=1).merge("agency", 1, 2)
+
+        assert result["success"] is True
+        assert result["customers_moved"] == 2
+        assert result["aliases_moved"] == 1
+        assert _rows(db, "SELECT DISTINCT agency_id FROM customers") == [(2,)]
+        # Spot agency_id is untouched, as before
+        assert _rows(db, "SELECT COUNT(*) FROM spots "
+                         "WHERE agency_id = 1") == [(5,)]
+        assert _rows(db, "SELECT is_active FROM agencies "
+                         "ORDER BY agency_id") == [(0,), (1,)]
+
+
+class TestMergeJob:
+    def test_worker_records_progress_and_result(self, db):
+        job_id = enqueue_job(db, MERGE_ENTITIES, payload={
+            "entity_type": "customer",
+            "source_id": 10,
+            "target_id": 11,
+            "merged_by": "tester",
+        })
+
+        JobWorker(db).run_once()
+
+        with db.connection() as conn:
+            job = BackgroundJobRepository().get_job(job_id, conn)
+        assert job.status is JobStatus.SUCCEEDED
+        assert job.progress == {"phase": "done", "done": 5, "total": 5}
+        assert job.result["spots_moved"] == 5
+        assert job.result["target_name"] == "Golden Dragon Restaurant"
@@ -0,0 +1,121 @@
+"""Tests for PlanningRepository.get_year_grid, the bulk booked/budget/
+forecast fetch behind the personal AE dashboard's "All" view."""
+
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from src.models.planning import PlanningYearGrid
+from src.repositories.planning_repository import PlanningRepository
+
+SCHEMA = """
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY,
+    bill_code TEXT,
+    broadcast_month TEXT,
+    gross_rate DECIMAL(12,2),
+    sales_person TEXT,
+    revenue_type TEXT
+);
+CREATE TABLE budget (
+    budget_id INTEGER PRIMARY KEY,
+    ae_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    budget_amount DECIMAL(12,2) NOT NULL
+);
+CREATE TABLE forecast (
+    forecast_id INTEGER PRIMARY KEY,
+    ae_name TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    forecast_amount DECIMAL(12,2) NOT NULL,
+    updated_date TEXT,
+    updated_by TEXT,
+    notes TEXT,
+    new_accounts_forecast INTEGER DEFAULT 0,
+    new_dollars_forecast DECIMAL(12,2) DEFAULT 0
+);
+
+INSERT INTO spots (bill_code, broadcast_month, gross_rate, sales_person,
+                   revenue_type) VALUES
+    ('Acme', 'Jan-26', 1000, 'Charmaine Lane', 'Internal Ad Sales'),
+    ('Acme', 'Jan-26', 500, 'Charmaine Lane', NULL),
+    ('Acme', 'Jan-26', 9999, 'Charmaine Lane', 'Trade'),
+    ('Beta', 'Feb-26', 300, 'House', 'Internal Ad Sales'),
+    ('WorldLink:Gamma', 'Feb-26', 200, 'House', 'Internal Ad Sales'),
+    ('Delta', 'Mar-26', 50, NULL, 'Internal Ad Sales'),
+    ('Acme', 'Jan-25', 7777, 'Charmaine Lane', 'Internal Ad Sales');
+INSERT INTO budget (ae_name, year, month, budget_amount) VALUES
+    ('Charmaine Lane', 2026, 1, 1200),
+    ('Charmaine Lane', 2026, 2, 800),
+    ('House', 2026, 2, 250),
+    ('Charmaine Lane', 2025, 1, 5);
+INSERT INTO forecast (ae_name, year, month, forecast_amount) VALUES
+    ('Charmaine Lane', 2026, 2, 900),
+    ('House', 2026, 3, 40);
+"""
+
+
+class _FileDB:
+    def __init__(self, path):
+        self._path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self._path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+@pytest.fixture()
+def repo(tmp_path):
+    path = str(tmp_path / "planning.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return PlanningRepository(_FileDB(path))
+
+
+NAMES = ["Charmaine Lane", "House", "WorldLink", "Nobody"]
+
+
+def test_matches_per_month_getters(repo):
+    grid = repo.get_year_grid(2026)
+
+    for name in NAMES:
+        for month in range(1, 13):
+            assert grid.booked_for(name, month) == repo.get_booked_revenue(
+                name, 2026, month
+            )
+            assert grid.budget_for(name, month) == (
+                repo.get_budget(name, 2026, month) or Decimal("0")
+            )
+            assert grid.forecast.get(name, {}).get(month) == repo.get_forecast(
+                name, 2026, month
+            )
+
+
+def test_company_totals(repo):
+    grid = repo.get_year_grid(2026)
+
+    assert grid.total_booked == {
+        1: Decimal("1500"), 2: Decimal("500"), 3: Decimal("50"),
+    }
+    assert grid.total_budget == {1: Decimal("1200"), 2: Decimal("1050")}
+
+
+def test_effective_forecast():
+    grid = PlanningYearGrid(
+        year=2026,
+        booked={"A": {1: Decimal("150"), 2: Decimal("10")}},
+        budget={"A": {1: Decimal("100"), 2: Decimal("100")}},
+        forecast={"A": {2: Decimal("50")}},
+    )
+
+    # No forecast entered: budget, raised to booked
+    assert grid.forecast_entered("A", 1) == Decimal("100")
+    assert grid.effective_forecast("A", 1) == Decimal("150")
+    # Entered forecast wins over budget
+    assert grid.effective_forecast("A", 2) == Decimal("50")
+    assert grid.effective_forecast("B", 2) == Decimal("0")
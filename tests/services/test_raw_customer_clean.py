@@ -0,0 +1,130 @@
+"""Tests for the maintained raw_customer_clean table (migration 041) and
+the canon tool previews that read it."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.web.routes.canon_tools import (
+    _preview_agency_hits,
+    _preview_customer_hits,
+)
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE raw_customer_inputs (
+  raw_text TEXT PRIMARY KEY,
+  created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE TABLE text_strips (needle TEXT PRIMARY KEY);
+
+INSERT INTO text_strips VALUES
+  (' (Broker Fees  - DO NOT INVOICE)'),
+  (' (Broker Fees - DO NOT INVOICE)'),
+  (' (Broker Costs - DO NOT INVOICE)'),
+  (' (BROKER COSTS - DO NOT INVOICE)'),
+  (' CREDIT MEMO');
+INSERT INTO raw_customer_inputs (raw_text) VALUES
+  ('Agency A:Agency B:Cust Co PROD'),
+  ('AGENCY A:Other  Co CREDIT MEMO'),
+  ('Solo Co PRODUCTION'),
+  ('Buyer:Cust Co (Broker Fees - DO NOT INVOICE)');
+"""
+
+
+@pytest.fixture()
+def conn():
+    c = sqlite3.connect(":memory:")
+    c.row_factory = sqlite3.Row
+    c.executescript(SCHEMA)
+    c.executescript((MIGRATIONS / "041_raw_customer_clean.sql").read_text())
+    yield c
+    c.close()
+
+
+def _row(conn, raw_text):
+    row = conn.execute(
+        "SELECT cleaned, agency1, agency2, customer_tail"
+        " FROM raw_customer_clean WHERE raw_text = ?",
+        [raw_text],
+    ).fetchone()
+    return tuple(row) if row else None
+
+
+class TestBackfill:
+    def test_segments(self, conn):
+        assert _row(conn, "Agency A:Agency B:Cust Co PROD") == (
+            "Agency A:Agency B:Cust Co PROD", "Agency A", "Agency B",
+            "Cust Co",
+        )
+        assert _row(conn, "AGENCY A:Other  Co CREDIT MEMO") == (
+            "AGENCY A:Other Co", "AGENCY A", None, "Other Co",
+        )
+        assert _row(conn, "Solo Co PRODUCTION") == (
+            "Solo Co PRODUCTION", None, None, "Solo Co",
+        )
+
+    def test_v_raw_clean_reads_table(self, conn):
+        rows = dict(conn.execute("SELECT raw_text, cleaned FROM v_raw_clean"))
+        assert rows["Buyer:Cust Co (Broker Fees - DO NOT INVOICE)"] == (
+            "Buyer:Cust Co"
+        )
+        assert len(rows) == 4
+
+
+class TestMaintenance:
+    def test_new_input_gets_a_row(self, conn):
+        conn.execute("INSERT INTO raw_customer_inputs (raw_text)"
+                     " VALUES ('Q:R PROD')")
+        assert _row(conn, "Q:R PROD") == ("Q:R PROD", "Q", None, "R")
+
+        conn.execute("UPDATE raw_customer_inputs SET raw_text = 'Q:S'"
+                     " WHERE raw_text = 'Q:R PROD'")
+        assert _row(conn, "Q:R PROD") is None
+        assert _row(conn, "Q:S") == ("Q:S", "Q", None, "S")
+
+        conn.execute("DELETE FROM raw_customer_inputs WHERE raw_text = 'Q:S'")
+        assert _row(conn, "Q:S") is None
+
+    def test_text_strips_change_recleans_every_row(self, conn):
+        conn.execute("DELETE FROM text_strips WHERE needle = ' CREDIT MEMO'")
+        # v_raw_clean's REPLACE with a missing needle yields NULL
+        assert _row(conn, "AGENCY A:Other  Co CREDIT MEMO") == (
+            None, None, None, None,
+        )
+
+        conn.execute("INSERT INTO text_strips VALUES (' CREDIT MEMO')")
+        assert _row(conn, "AGENCY A:Other  Co CREDIT MEMO")[0] == (
+            "AGENCY A:Other Co"
+        )
+
+
+class TestPreviews:
+    def test_agency_hits_match_either_agency_segment(self, conn):
+        assert _preview_agency_hits(conn, "agency a") == 2
+        assert _preview_agency_hits(conn, "Agency B") == 1
+        assert _preview_agency_hits(conn, "Cust Co") == 0
+
+    def test_customer_hits_match_tail(self, conn):
+        assert _preview_customer_hits(conn, "cust co") == 2
+        assert _preview_customer_hits(conn, "Solo Co") == 1
+
+    def test_previews_match_view_without_table(self, conn):
+        hits = [
+            (_preview_agency_hits(conn, a), _preview_customer_hits(conn, a))
+            for a in ("Agency A", "Agency B", "Buyer", "Cust Co", "Other Co")
+        ]
+
+        conn.executescript("""
+            DROP VIEW v_raw_clean;
+            CREATE VIEW v_raw_clean AS
+            SELECT raw_text, cleaned FROM raw_customer_clean_source;
+            DROP TABLE raw_customer_clean;
+        """)
+
+        assert hits == [
+            (_preview_agency_hits(conn, a), _preview_customer_hits(conn, a))
+            for a in ("Agency A", "Agency B", "Buyer", "Cust Co", "Other Co")
+        ]
@@ -0,0 +1,140 @@
+"""Tests for the version-stamped reference data registry."""
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from src.database.connection import DatabaseConnection
+from src.services.reference_data import ReferenceDataRegistry, bump_version
+
+MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "sql" / "migrations" / "029_reference_data_versions.sql"
+)
+
+SCHEMA = """
+CREATE TABLE sectors (
+    sector_id INTEGER PRIMARY KEY,
+    sector_name TEXT,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE markets (market_id INTEGER PRIMARY KEY, market_name TEXT);
+CREATE TABLE agencies (agency_id INTEGER PRIMARY KEY, assigned_ae TEXT);
+CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, assigned_ae TEXT);
+CREATE TABLE spots (spot_id INTEGER PRIMARY KEY, sales_person TEXT);
+INSERT INTO sectors (sector_name) VALUES ('Auto');
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _make_db(with_migration=True):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    if with_migration:
+        conn.executescript(MIGRATION.read_text())
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture()
+def db():
+    path = _make_db()
+    yield DatabaseConnection(path)
+    os.unlink(path)
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+def _sector_loader(db, calls):
+    def load():
+        calls.append(1)
+        with db.connection_ro() as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT sector_name FROM sectors ORDER BY sector_name"
+            )]
+    return load
+
+
+class TestReferenceDataRegistry:
+    def test_hit_until_trigger_bumps_version(self, db, clock):
+        registry = ReferenceDataRegistry(check_interval=5, clock=clock)
+        calls = []
+        load = _sector_loader(db, calls)
+
+        assert registry.get(db, "sectors", ("sectors",), load) == ["Auto"]
+        assert registry.get(db, "sectors", ("sectors",), load) == ["Auto"]
+        assert len(calls) == 1
+
+        # Another process adds a sector; the trigger bumps the version
+        with db.connection() as conn:
+            conn.execute("INSERT INTO sectors (sector_name) VALUES ('Bank')")
+            conn.commit()
+
+        # Versions are only re-read after the check interval
+        assert registry.get(db, "sectors", ("sectors",), load) == ["Auto"]
+        clock.now += 6
+        assert registry.get(db, "sectors", ("sectors",), load) == ["Auto", "Bank"]
+        assert len(calls) == 2
+
+    def test_invalidate_rechecks_immediately(self, db, clock):
+        registry = ReferenceDataRegistry(check_interval=5, clock=clock)
+        calls = []
+        load = _sector_loader(db, calls)
+        registry.get(db, "sectors", ("sectors",), load)
+
+        with db.connection() as conn:
+            conn.execute("UPDATE sectors SET sector_name = 'Automotive'")
+            conn.commit()
+        registry.invalidate(db, "sectors")
+
+        assert registry.get(db, "sectors", ("sectors",), load) == ["Automotive"]
+
+    def test_unrelated_source_bump_keeps_entry(self, db, clock):
+        registry = ReferenceDataRegistry(check_interval=0, clock=clock)
+        calls = []
+        load = _sector_loader(db, calls)
+        registry.get(db, "sectors", ("sectors",), load)
+
+        with db.transaction() as conn:
+            bump_version(conn, "spots")
+            conn.execute("UPDATE customers SET assigned_ae = 'Pat'")
+
+        registry.get(db, "sectors", ("sectors",), load)
+        assert len(calls) == 1
+
+    def test_results_are_copies(self, db, clock):
+        registry = ReferenceDataRegistry(clock=clock)
+        load = _sector_loader(db, [])
+        registry.get(db, "sectors", ("sectors",), load).append("Mutated")
+        assert registry.get(db, "sectors", ("sectors",), load) == ["Auto"]
+
+    def test_without_migration_always_loads(self, clock):
+        path = _make_db(with_migration=False)
+        try:
+            db = DatabaseConnection(path)
+            registry = ReferenceDataRegistry(clock=clock)
+            calls = []
+            load = _sector_loader(db, calls)
+            registry.get(db, "sectors", ("sectors",), load)
+            registry.get(db, "sectors", ("sectors",), load)
+            assert len(calls) == 2
+
+            with db.transaction() as conn:
+                bump_version(conn, "spots")  # no table: silently ignored
+        finally:
+            os.unlink(path)
@@ -1,9 +1,12 @@
 """Tests for RevenueClassificationService."""
 
 import sqlite3
+from pathlib import Path
 
 import pytest
 
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
 
 @pytest.fixture
 def rc_db():
@@ -530,3 +533,81 @@ class TestUpdateSector:
         )
         with pytest.raises(ValueError):
             svc.update_sector(rc_db, 9999, 1)
+
+
+def _apply_spot_catalog(conn):
+    """Add the spot catalog tables of migration 043."""
+    conn.executescript("""
+        ALTER TABLE spots ADD COLUMN sales_person TEXT;
+        CREATE TABLE alias_backfill_session (
+            session_id TEXT PRIMARY KEY,
+            spot_watermark INTEGER NOT NULL
+        );
+    """)
+    conn.executescript((MIGRATIONS / "043_spot_catalog.sql").read_text())
+
+
+@pytest.fixture
+def rc_catalog_db(rc_db):
+    _apply_spot_catalog(rc_db)
+    return rc_db
+
+
+class TestWithSpotCatalog:
+    def test_matches_spot_aggregation(self, rc_db):
+        from src.services.revenue_classification_service import (
+            RevenueClassificationService,
+        )
+
+        svc = RevenueClassificationService.__new__(
+            RevenueClassificationService
+        )
+        filter_sets = [None, {"sector_id": 1}, {"ae": "Bob"},
+                       {"classification": "irregular"}]
+        expected = [
+            (svc.get_summary(rc_db, 2025, f), svc.get_customers(rc_db, 2025, f))
+            for f in filter_sets
+        ]
+
+        _apply_spot_catalog(rc_db)
+        rc_db.execute("DELETE FROM spots")  # reads no longer touch spots
+
+        actual = [
+            (svc.get_summary(rc_db, 2025, f), svc.get_customers(rc_db, 2025, f))
+            for f in filter_sets
+        ]
+        assert actual == expected
+
+    def test_reclassification_applies_immediately(self, rc_catalog_db):
+        from src.services.revenue_classification_service import (
+            RevenueClassificationService,
+        )
+
+        svc = RevenueClassificationService.__new__(
+            RevenueClassificationService
+        )
+        svc.update_classification(rc_catalog_db, 10, "irregular")
+        svc.update_sector(rc_catalog_db, 10, 2)
+
+        result = svc.get_summary(rc_catalog_db, 2025, {"sector_id": 2})
+        assert result["regular_total"] == 0
+        assert result["irregular_total"] == 26000.0
+
+    def test_spots_moved_between_customers(self, rc_catalog_db):
+        from src.services.revenue_classification_service import (
+            RevenueClassificationService,
+        )
+
+        svc = RevenueClassificationService.__new__(
+            RevenueClassificationService
+        )
+        rc_catalog_db.execute(
+            "UPDATE spots SET customer_id = 30 WHERE customer_id = 10"
+        )
+
+        result = svc.get_customers(rc_catalog_db, 2025)
+        beta = next(c for c in result if c["name"] == "Beta Motors")
+        acme = next(c for c in result if c["name"] == "Acme Auto")
+        assert beta["current_year_revenue"] == 12000.0
+        assert beta["prior_year_revenue"] == 7500.0
+        assert acme["current_year_revenue"] == 0
@@ -75,3 +75,22 @@ def test_shared_filter(db):
 
     filters = svc.get_filters(conn)
     assert filters[0]["is_shared"] == 1
+
+
+def test_get_filter_and_query_params(db):
+    svc, conn = db
+    config = {
+        "search": " dragon ", "type": "all", "market": "SEA",
+        "ae": "", "sector_id": 3, "has_contacts": "all",
+        "signal": "attention", "sort": "revenue",
+    }
+    fid = svc.save_filter(conn, "Dragons", config, "admin")["filter_id"]
+    conn.commit()
+
+    saved = svc.get_filter(conn, fid)
+    assert saved["filter_config"] == config
+    assert svc.get_filter(conn, fid + 1) is None
+    assert svc.query_params(saved["filter_config"]) == {
+        "search": "dragon", "market": "SEA", "sector_id": "3",
+        "signal": "attention", "sort": "revenue",
+    }
@@ -21,6 +21,10 @@ class _FakeDB:
     def connection(self):
         yield self._conn
 
+    @contextmanager
+    def connection_ro(self, replica: bool = False):
+        yield self._conn
+
 
 @pytest.fixture
 def db():
@@ -0,0 +1,151 @@
+"""Tests for the spot catalog and customer monthly revenue (migration 043)."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.services.spot_catalog import (
+    ae_names,
+    available_months,
+    available_years,
+    refresh_spot_catalog,
+)
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+SCHEMA = """
+CREATE TABLE spots (
+    spot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER,
+    broadcast_month TEXT,
+    gross_rate REAL,
+    revenue_type TEXT,
+    sales_person TEXT
+);
+CREATE TABLE alias_backfill_session (
+    session_id TEXT PRIMARY KEY,
+    spot_watermark INTEGER NOT NULL
+);
+"""
+
+SPOTS = [
+    (1, "Dec-24", 100.10, None, "Ann"),
+    (1, "Jan-25", 200.00, "Internal Ad Sales", "Ann"),
+    (1, "Jan-25", 50.00, "Trade", "Ann"),
+    (2, "Jan-25", 75.25, None, "Bob"),
+    (None, "Feb-25", 10.00, None, None),
+]
+
+
+def _insert(conn, rows):
+    conn.executemany(
+        "INSERT INTO spots (customer_id, broadcast_month, gross_rate,"
+        " revenue_type, sales_person) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _revenue(conn):
+    return {
+        (r[0], r[1]): (r[2], r[3])
+        for r in conn.execute("SELECT * FROM customer_month_revenue")
+    }
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(":memory:")
+    c.executescript(SCHEMA)
+    _insert(c, SPOTS)
+    c.executescript((MIGRATIONS / "043_spot_catalog.sql").read_text())
+    yield c
+    c.close()
+
+
+class TestCatalog:
+    def test_backfill(self, conn):
+        assert available_years(conn) == [2024, 2025]
+        assert available_months(conn) == ["Dec-24", "Jan-25", "Feb-25"]
+        assert ae_names(conn) == ["Ann", "Bob"]
+        assert _revenue(conn) == {
+            ("Dec-24", 1): (10010, 1),
+            ("Jan-25", 1): (20000, 1),
+            ("Jan-25", 2): (7525, 1),
+        }
+
+    def test_readers_fall_back_to_spots(self):
+        c = sqlite3.connect(":memory:")
+        c.executescript(SCHEMA)
+        _insert(c, SPOTS)
+
+        assert available_years(c) == [2024, 2025]
+        assert available_months(c) == ["Dec-24", "Jan-25", "Feb-25"]
+        assert ae_names(c) == ["Ann", "Bob"]
+        assert refresh_spot_catalog(c, ["Jan-25"]) == {"months": 0}
+
+    def test_refresh_recomputes_only_given_months(self, conn):
+        conn.execute("DELETE FROM spots WHERE broadcast_month = 'Dec-24'")
+        conn.execute("DELETE FROM spots WHERE broadcast_month = 'Jan-25'")
+        _insert(conn, [(3, "Jan-25", 20.0, None, "Cy")])
+
+        result = refresh_spot_catalog(conn, ["Jan-25"])
+
+        assert result == {"months": 1, "revenue_rows": 1}
+        assert ae_names(conn) == ["Ann", "Cy"]  # Dec-24 not refreshed
+        assert _revenue(conn) == {
+            ("Dec-24", 1): (10010, 1),
+            ("Jan-25", 3): (2000, 1),
+        }
+
+        refresh_spot_catalog(conn, ["Dec-24"])
+        assert available_years(conn) == [2025]
+
+
+class TestRevenueTrigger:
+    def test_customer_change_moves_revenue(self, conn):
+        conn.execute("UPDATE spots SET customer_id = 2 WHERE customer_id = 1")
+        assert _revenue(conn) == {
+            ("Dec-24", 2): (10010, 1),
+            ("Jan-25", 2): (27525, 2),
+        }
+
+    def test_resolving_a_spot_adds_revenue(self, conn):
+        conn.execute(
+            "UPDATE spots SET customer_id = 2 WHERE customer_id IS NULL"
+        )
+        assert _revenue(conn)[("Feb-25", 2)] == (1000, 1)
+
+    def test_trade_and_rate_changes(self, conn):
+        conn.execute(
+            "UPDATE spots SET revenue_type = 'Trade' WHERE customer_id = 2"
+        )
+        conn.execute(
+            "UPDATE spots SET revenue_type = NULL, gross_rate = 60"
+            " WHERE revenue_type = 'Trade' AND customer_id = 1"
+        )
+        assert _revenue(conn) == {
+            ("Dec-24", 1): (10010, 1),
+            ("Jan-25", 1): (26000, 2),
+        }
+
+    def test_matches_a_full_refresh(self, conn):
+        conn.execute("UPDATE spots SET customer_id = 2 WHERE spot_id IN (1, 2)")
+        conn.execute("UPDATE spots SET broadcast_month = 'Feb-25' WHERE spot_id = 4")
+        conn.execute("UPDATE spots SET customer_id = 1 WHERE spot_id = 5")
+        maintained = _revenue(conn)
+
+        refresh_spot_catalog(conn, ["Dec-24", "Jan-25", "Feb-25"])
+        assert _revenue(conn) == maintained
+
+    def test_skips_spots_of_a_bulk_session(self, conn):
+        conn.execute(
+            "INSERT INTO alias_backfill_session VALUES ('s', 5)"
+        )
+        _insert(conn, [(None, "Mar-25", 30.0, None, "Ann")])
+        conn.execute("UPDATE spots SET customer_id = 1 WHERE spot_id = 6")
+        conn.execute("UPDATE spots SET customer_id = 1 WHERE spot_id = 5")
+
+        revenue = _revenue(conn)
+        assert ("Mar-25", 1) not in revenue
+        assert revenue[("Feb-25", 1)] == (1000, 1)
@@ -0,0 +1,97 @@
+"""Route-level tests for address book writes that must invalidate the
+in-process reference data cache."""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+import src.web.routes.address_book as address_book
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeDb:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+
+class FakeEntityService:
+    def __init__(self, result):
+        self.result = result
+
+    def create_entity(self, conn, data, created_by):
+        return dict(self.result)
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, db, *sources):
+        self.invalidated.append(sources)
+
+
+@pytest.fixture
+def route_env(monkeypatch):
+    db = FakeDb()
+    registry = FakeRegistry()
+    env = SimpleNamespace(db=db, registry=registry, result={})
+    monkeypatch.setattr(address_book, "_db", lambda: db)
+    monkeypatch.setattr(
+        address_book, "_svc", lambda name: FakeEntityService(env.result)
+    )
+    monkeypatch.setattr(address_book, "get_reference_data", lambda: registry)
+    monkeypatch.setattr(
+        address_book, "current_user",
+        SimpleNamespace(role=SimpleNamespace(value="admin"), full_name="Admin"),
+    )
+
+    app = Flask(__name__)
+    app.register_blueprint(address_book.address_book_bp)
+    env.client = app.test_client()
+    return env
+
+
+def test_create_entity_invalidates_ae_cache(route_env):
+    route_env.result = {"success": True, "entity_id": 7}
+
+    resp = route_env.client.post(
+        "/api/address-book/entities",
+        json={"entity_type": "customer", "name": "New Co", "assigned_ae": "Ann"},
+    )
+
+    assert resp.status_code == 201
+    assert route_env.db.conn.commits == 1
+    assert route_env.registry.invalidated == [("ae_assignments",)]
+
+
+@pytest.mark.parametrize("result, status", [
+    ({"error": "Duplicate", "status": 409}, 409),
+    ({"needs_confirmation": True}, 200),
+])
+def test_create_entity_without_commit_keeps_cache(route_env, result, status):
+    route_env.result = result
+
+    resp = route_env.client.post(
+        "/api/address-book/entities", json={"entity_type": "customer"},
+    )
+
+    assert resp.status_code == status
+    assert route_env.db.conn.commits == 0
+    assert route_env.registry.invalidated == []
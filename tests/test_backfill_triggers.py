@@ -10,6 +10,8 @@ import pytest
 MIGRATION_PATHS = [
     "sql/migrations/022_alias_spot_backfill_triggers.sql",
     "sql/migrations/023_spot_insert_alias_lookup_trigger.sql",
+    # Recreates the triggers above; outside a bulk load they behave the same
+    "sql/migrations/035_bulk_alias_backfill.sql",
 ]
 
 SCHEMA = """
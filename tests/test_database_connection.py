@@ -6,7 +6,7 @@ import os
 
 import pytest
 
-from src.database.connection import DatabaseConnection
+from src.database.connection import DatabaseConnection, StatementCounter
 
 
 @pytest.fixture()
@@ -64,3 +64,62 @@ class TestConnectionRw:
                 "SELECT COUNT(*) FROM test"
             ).fetchone()[0]
         assert count == 2
+
+
+class TestReadReplica:
+    """Tests for connection_ro(replica=True) and refresh_read_replica()."""
+
+    def test_falls_back_to_primary_without_snapshot(self, tmp_db):
+        dc = DatabaseConnection(tmp_db, read_replica_path=f"{tmp_db}.replica")
+        with dc.connection_ro(replica=True) as conn:
+            row = conn.execute("SELECT val FROM test").fetchone()
+        assert row["val"] == "hello"
+
+    def test_replica_reads_snapshot_until_next_refresh(self, tmp_db):
+        replica = f"{tmp_db}.replica"
+        dc = DatabaseConnection(tmp_db, read_replica_path=replica)
+        try:
+            assert dc.refresh_read_replica() is True
+            with dc.connection() as conn:
+                conn.execute("INSERT INTO test (val) VALUES ('world')")
+                conn.commit()
+
+            with dc.connection_ro(replica=True) as conn:
+                stale = conn.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+            with dc.connection_ro() as conn:
+                live = conn.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+            assert (stale, live) == (1, 2)
+
+            assert dc.refresh_read_replica() is True
+            with dc.connection_ro(replica=True) as conn:
+                fresh = conn.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+            assert fresh == 2
+            assert not os.path.exists(f"{replica}.tmp")
+        finally:
+            if os.path.exists(replica):
+                os.unlink(replica)
+
+    def test_refresh_without_replica_path(self, tmp_db):
+        assert DatabaseConnection(tmp_db).refresh_read_replica() is False
+
+
+class TestStatementCounter:
+    """Tests for StatementCounter tracing."""
+
+    def test_counts_statements_on_both_connection_kinds(self, tmp_db):
+        dc = DatabaseConnection(tmp_db)
+        with StatementCounter() as counter:
+            with dc.connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+            with dc.connection_ro() as conn:
+                conn.execute("SELECT val FROM test").fetchall()
+                conn.execute("SELECT COUNT(*) FROM test").fetchone()
+        assert counter.count == 3
+
+    def test_stops_counting_after_exit(self, tmp_db):
+        dc = DatabaseConnection(tmp_db)
+        with StatementCounter() as counter:
+            pass
+        with dc.connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+        assert counter.count == 0
@@ -63,6 +63,7 @@ FAST_ROUTES = [
     # -- Address book --
     "/address-book",
     "/api/address-book",
+    "/api/address-book?market=SEA&sort=revenue&limit=50",
     "/api/address-book/sectors",
     "/api/address-book/markets",
 
@@ -751,20 +751,17 @@ def execute_case(conn: sqlite3.Connection, a: CaseAnalysis) -> dict:
 
     conn.execute("BEGIN IMMEDIATE")
     try:
-        # Step 1: Set agency_id on source spots where NULL
-        if a.spots_agency_null > 0:
-            rc = conn.execute("""
-                UPDATE spots SET agency_id = ?
-                WHERE customer_id = ? AND agency_id IS NULL
-            """, [c.agency_id, c.source_id]).rowcount
-            stats["steps"].append(f"Set agency_id on {rc} spots")
-
-        # Step 2: Move spots from source -> target
+        # Steps 1-2: Move spots from source -> target, setting agency_id
+        # where NULL, in one pass over the source's spots
         if a.spots_total > 0:
             rc = conn.execute("""
-                UPDATE spots SET customer_id = ?
+                UPDATE spots
+                SET customer_id = ?,
+                    agency_id = COALESCE(agency_id, ?)
                 WHERE customer_id = ?
-            """, [c.target_id, c.source_id]).rowcount
+            """, [c.target_id, c.agency_id, c.source_id]).rowcount
+            if a.spots_agency_null > 0:
+                stats["steps"].append(f"Set agency_id on {a.spots_agency_null} spots")
             stats["steps"].append(f"Moved {rc} spots")
             stats["spots_moved"] = rc
 
@@ -1002,62 +999,65 @@ def execute_scenario2_case(conn: sqlite3.Connection, a: Scenario2Analysis) -> di
 
 
 def rebuild_metrics(conn: sqlite3.Connection, customer_ids: set, agency_ids: set):
-    """Targeted rebuild of entity_metrics for affected entities."""
+    """Targeted rebuild of entity_metrics for affected entities.
+
+    Same SQL as EntityMetricsService.refresh_metrics_for_ids, one
+    statement per entity type rather than one DELETE per id.
+    """
     print(f"\nRebuilding entity_metrics for {len(customer_ids)} customers and {len(agency_ids)} agencies...")
+    customer_ids, agency_ids = sorted(customer_ids), sorted(agency_ids)
+    cust_ph = ",".join("?" * len(customer_ids))
+    agency_ph = ",".join("?" * len(agency_ids))
 
-    # Delete stale rows for affected entities
-    for cid in customer_ids:
-        conn.execute("DELETE FROM entity_metrics WHERE entity_type = 'customer' AND entity_id = ?", [cid])
-    for aid in agency_ids:
-        conn.execute("DELETE FROM entity_metrics WHERE entity_type = 'agency' AND entity_id = ?", [aid])
-
-    # Rebuild customer metrics
-    if customer_ids:
-        placeholders = ",".join("?" * len(customer_ids))
-        conn.execute(f"""
-            INSERT OR REPLACE INTO entity_metrics (entity_type, entity_id, markets, last_active, total_revenue, spot_count, agency_spot_count)
-            SELECT
-                'customer', customer_id,
-                GROUP_CONCAT(DISTINCT CASE WHEN market_name != '' THEN market_name END),
-                MAX(air_date),
-                SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL THEN gross_rate ELSE 0 END),
-                COUNT(*),
-                COUNT(agency_id)
-            FROM spots
-            WHERE customer_id IN ({placeholders})
-            GROUP BY customer_id
-        """, list(customer_ids))
-
-    # Rebuild agency metrics
-    if agency_ids:
-        placeholders = ",".join("?" * len(agency_ids))
-        conn.execute(f"""
-            INSERT OR REPLACE INTO entity_metrics (entity_type, entity_id, markets, last_active, total_revenue, spot_count)
-            SELECT
-                'agency', agency_id,
-                GROUP_CONCAT(DISTINCT CASE WHEN market_name != '' THEN market_name END),
-                MAX(air_date),
-                SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL THEN gross_rate ELSE 0 END),
-                COUNT(*)
-            FROM spots
-            WHERE agency_id IN ({placeholders})
-            GROUP BY agency_id
-        """, list(agency_ids))
-
-    conn.commit()
-    print("  entity_metrics rebuilt.")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if customer_ids:
+            conn.execute(f"DELETE FROM entity_metrics WHERE entity_type = 'customer' AND entity_id IN ({cust_ph})", customer_ids)
+            conn.execute(f"""
+                INSERT INTO entity_metrics (entity_type, entity_id, markets, last_active, total_revenue, spot_count, agency_spot_count)
+                SELECT
+                    'customer', customer_id,
+                    GROUP_CONCAT(DISTINCT CASE WHEN market_name != '' THEN market_name END),
+                    MAX(air_date),
+                    SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL THEN gross_rate ELSE 0 END),
+                    COUNT(*),
+                    COUNT(agency_id)
+                FROM spots
+                WHERE customer_id IN ({cust_ph})
+                GROUP BY customer_id
+            """, customer_ids)
+
+        if agency_ids:
+            conn.execute(f"DELETE FROM entity_metrics WHERE entity_type = 'agency' AND entity_id IN ({agency_ph})", agency_ids)
+            conn.execute(f"""
+                INSERT INTO entity_metrics (entity_type, entity_id, markets, last_active, total_revenue, spot_count)
+                SELECT
+                    'agency', agency_id,
+                    GROUP_CONCAT(DISTINCT CASE WHEN market_name != '' THEN market_name END),
+                    MAX(air_date),
+                    SUM(CASE WHEN revenue_type != 'Trade' OR revenue_type IS NULL THEN gross_rate ELSE 0 END),
+                    COUNT(*)
+                FROM spots
+                WHERE agency_id IN ({agency_ph})
+                GROUP BY agency_id
+            """, agency_ids)
+
+        # Stale entity_signals for affected entities (rebuilt at next import)
+        signals_deleted = 0
+        if customer_ids:
+            signals_deleted += conn.execute(
+                f"DELETE FROM entity_signals WHERE entity_type = 'customer' AND entity_id IN ({cust_ph})", customer_ids
+            ).rowcount
+        if agency_ids:
+            signals_deleted += conn.execute(
+                f"DELETE FROM entity_signals WHERE entity_type = 'agency' AND entity_id IN ({agency_ph})", agency_ids
+            ).rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
 
-    # Delete stale entity_signals for affected entities (rebuilt at next import)
-    signals_deleted = 0
-    for cid in customer_ids:
-        signals_deleted += conn.execute(
-            "DELETE FROM entity_signals WHERE entity_type = 'customer' AND entity_id = ?", [cid]
-        ).rowcount
-    for aid in agency_ids:
-        signals_deleted += conn.execute(
-            "DELETE FROM entity_signals WHERE entity_type = 'agency' AND entity_id = ?", [aid]
-        ).rowcount
-    conn.commit()
+    print("  entity_metrics rebuilt.")
     print(f"  Deleted {signals_deleted} stale entity_signals rows (rebuilt at next import).")
 
 